@@ -0,0 +1,209 @@
+"""
+Benchmarks do gerador de relatórios.
+
+Gera dados sintéticos com data_example/create_sales_csv.py e mede, etapa por
+etapa, o tempo e o pico de memória de:
+
+    - extração (LocalDataSource.iter_rows de cada fonte);
+    - consolidação (SalesData.consolidate_data);
+    - estatísticas (SalesData.compute_basic_statistics), serial e em blocos
+      paralelos (--workers-estatisticas processos);
+    - cada formatador (write_report em um arquivo temporário).
+
+O resultado é gravado em JSON, para acompanhar regressões entre versões. Com
+--baseline, os tempos são comparados a um resultado anterior e o script
+termina com código 1 se alguma etapa ficar mais lenta que a tolerância.
+
+Exemplos:
+    python benchmarks/run_benchmarks.py --linhas 100000 --fontes 4 --saida bench.json
+    python benchmarks/run_benchmarks.py --linhas 100000 --baseline bench.json --tolerancia 0.2
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "data_example"))
+
+from create_sales_csv import ESQUEMAS, gerar_arquivos  # noqa: E402
+from gerador_relatorio.data_source.data_source import LocalDataSource  # noqa: E402
+from gerador_relatorio.sales_data.sales_data import SalesData  # noqa: E402
+from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter  # noqa: E402
+from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter  # noqa: E402
+from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter  # noqa: E402
+
+
+def medir(funcao: Callable[[], Any], repeticoes: int, memoria: bool) -> Dict[str, Any]:
+    """
+    Executa `funcao` várias vezes e mede o tempo e o pico de memória.
+
+    O tempo é medido sem o tracemalloc (que deixa o código bem mais lento);
+    a memória é medida em uma execução extra, com o tracemalloc ligado.
+
+    Returns:
+        Dict[str, Any]: seconds (o menor tempo), mean_seconds, runs e,
+                        se `memoria`, peak_memory_bytes.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    resultado = {"seconds": min(tempos), "mean_seconds": sum(tempos) / len(tempos), "runs": len(tempos)}
+    if memoria:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            funcao()
+            resultado["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return resultado
+
+
+def versao_git() -> Optional[str]:
+    """Retorna o commit atual do repositório, se disponível."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(args: argparse.Namespace) -> Dict[str, Any]:
+    """Gera os dados e executa todas as etapas medidas."""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = gerar_arquivos(num_linhas=args.linhas, num_fontes=args.fontes, esquema=args.esquema,
+                                  colunas_extras=args.colunas_extras, taxa_vazios=args.taxa_vazios,
+                                  taxa_sujos=args.taxa_sujos, sobreposicao=args.sobreposicao,
+                                  semente=args.semente, diretorio=os.path.join(diretorio, "dados"))
+        fontes = [LocalDataSource(caminho) for caminho in caminhos]
+        consolidado = SalesData.consolidate_data(fontes)
+        # Por padrão, um bloco por worker.
+        bloco = args.bloco_estatisticas or max(1, -(-len(consolidado["data"]) // args.workers_estatisticas))
+
+        etapas = {
+            "extracao": lambda: [sum(1 for _ in fonte.iter_rows()) for fonte in fontes],
+            "consolidacao": lambda: SalesData.consolidate_data(fontes),
+            "estatisticas": lambda: SalesData.compute_basic_statistics(consolidado["data"]),
+            "estatisticas_paralelas": lambda: SalesData.compute_basic_statistics(
+                consolidado["data"], max_workers=args.workers_estatisticas, chunk_size=bloco),
+        }
+        formatadores = {"csv": CSVReportFormatter(), "html": HTMLReportFormatter(), "texto": TextReportFormatter()}
+        for nome, formatador in formatadores.items():
+            def escrever(formatador=formatador, nome=nome):
+                caminho = os.path.join(diretorio, f"relatorio.{nome}")
+                with open(caminho, "w", newline="", encoding="utf-8", buffering=1 << 20) as arquivo:
+                    formatador.write_report(arquivo, consolidado)
+            etapas[f"formatador_{nome}"] = escrever
+
+        resultados = []
+        for nome, funcao in etapas.items():
+            if args.etapas and nome not in args.etapas:
+                continue
+            medida = medir(funcao, args.repeticoes, not args.sem_memoria)
+            resultados.append({"name": nome, **medida})
+            print(f"{nome:>20}: {medida['seconds']:.3f}s"
+                  + (f", pico {medida['peak_memory_bytes'] / 2 ** 20:.1f} MiB" if "peak_memory_bytes" in medida else ""))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": versao_git(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows_per_source": args.linhas,
+            "sources": args.fontes,
+            "total_rows": len(consolidado["data"]),
+            "schema": args.esquema,
+            "extra_columns": args.colunas_extras,
+            "blank_rate": args.taxa_vazios,
+            "dirty_rate": args.taxa_sujos,
+            "overlap": args.sobreposicao,
+            "seed": args.semente,
+            "repeat": args.repeticoes,
+            "statistics_workers": args.workers_estatisticas,
+            "statistics_chunk_size": args.bloco_estatisticas,
+        },
+        "results": resultados,
+    }
+
+
+def comparar(resultado: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float) -> List[str]:
+    """
+    Compara os tempos com um resultado anterior.
+
+    Returns:
+        List[str]: As etapas que ficaram mais lentas que (1 + tolerancia) vezes o baseline.
+    """
+    anteriores = {item["name"]: item for item in baseline.get("results", [])}
+    regressoes = []
+    for item in resultado["results"]:
+        anterior = anteriores.get(item["name"])
+        if anterior is None:
+            continue
+        razao = item["seconds"] / anterior["seconds"] if anterior["seconds"] else 1.0
+        item["baseline_seconds"] = anterior["seconds"]
+        item["ratio"] = razao
+        if razao > 1 + tolerancia:
+            regressoes.append(f"{item['name']}: {anterior['seconds']:.3f}s -> {item['seconds']:.3f}s ({razao:.2f}x)")
+    return regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Lê os argumentos da linha de comando, executa os benchmarks e grava o JSON."""
+    parser = argparse.ArgumentParser(description="Benchmarks do gerador de relatórios.")
+    parser.add_argument("--linhas", type=int, default=100000, help="linhas por fonte (padrão: 100000)")
+    parser.add_argument("--fontes", type=int, default=2, help="quantidade de fontes (padrão: 2)")
+    parser.add_argument("--esquema", choices=ESQUEMAS, default="padrao")
+    parser.add_argument("--colunas-extras", type=int, default=50)
+    parser.add_argument("--taxa-vazios", type=float, default=0.02)
+    parser.add_argument("--taxa-sujos", type=float, default=0.01)
+    parser.add_argument("--sobreposicao", type=float, default=0.5)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por etapa (vale o menor tempo)")
+    parser.add_argument("--workers-estatisticas", type=int, default=os.cpu_count() or 1,
+                        help="processos da etapa estatisticas_paralelas (padrão: número de CPUs)")
+    parser.add_argument("--bloco-estatisticas", type=int,
+                        help="linhas por bloco da etapa estatisticas_paralelas (padrão: um bloco por processo)")
+    parser.add_argument("--etapas", nargs="*", help="executa apenas as etapas informadas")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: apenas stdout)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="aumento de tempo tolerado em relação ao baseline (padrão: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    resultado = executar(args)
+    regressoes = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+
+    saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(saida + "\n")
+        print(f"Resultados salvos em: {args.saida}")
+    else:
+        print(saida)
+
+    for regressao in regressoes:
+        print(f"Regressão: {regressao}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,27 @@
+"""
+Gera arquivos CSV de vendas sintéticos para exemplos, testes e benchmarks.
+
+Sem argumentos, gera os mesmos dois arquivos de 20 linhas de sempre
+(colunas_1... e colunas_2...). Os parâmetros permitem gerar volumes reais
+(dezenas de milhões de linhas), esquemas largos ou esparsos, valores
+numéricos "sujos", campos em branco e várias fontes com pedidos em comum.
+As linhas são escritas em streaming (a memória não cresce com o tamanho do
+arquivo) e a geração é determinística para uma mesma semente.
+
+Exemplos:
+    python create_sales_csv.py
+    python create_sales_csv.py --linhas 1000000 --fontes 4 --sobreposicao 0.25 --taxa-vazios 0.02
+    python create_sales_csv.py --esquema largo --colunas-extras 80 --taxa-sujos 0.05
+"""
+
+import argparse
 import csv
+import os
 import random
 from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from faker import Faker
 
-# Inicializa o Faker para gerar dados em português do Brasil
-fake = Faker('pt_BR')
-
 # Define as colunas do arquivo CSV
 colunas_1 = [
     "order_id", "product_id", "product_name", "category", "price",
@@ -15,14 +31,10 @@ colunas_1 = [
 
 colunas_2 = [
     "order_id", "product_id", "product_name", "category", "price",
-    "quantity",  "dt_sale", "customer_id",  
+    "quantity",  "dt_sale", "customer_id",
     "payment_method", "store_id"
 ]
 
-
-# Número de linhas de dados
-num_linhas = 20
-
 # Data de início e fim do período de vendas
 data_inicio = datetime(2025, 4, 1)
 data_fim = datetime(2025, 4, 15)
@@ -40,65 +52,193 @@ nomes_produtos = {
     "Alimentos": ["Pão Francês", "Bolo de Chocolate", "Café", "Arroz", "Feijão", "Macarrão", "Refrigerante", "Suco Natural"]
 }
 
-
-# Gera os dados
-dados1 = []
-for i in range(num_linhas):
-    data_venda = data_inicio + timedelta(days=random.randint(0, (data_fim - data_inicio).days))
-    
-    categoria = random.choice(categorias) # Seleciona aleatoriamente uma das 3 categorias
-    nome_produto = random.choice(nomes_produtos[categoria]) # Seleciona um produto aleatório da categoria
-    
-    dados1.append({
-        "order_id": i + 1,
-        "product_id": random.randint(100, 400),
-        "product_name": nome_produto,
-        "category": categoria,
-        "price": round(random.uniform(10, 200), 2),
-        "quantity": random.randint(1, 5),
-        "discount": round(random.uniform(0, 0.2), 2),
-        "dt_sale": data_venda.strftime("%Y-%m-%d"),
-        "customer_id": random.randint(1001, 1010),
-        "customer_name": fake.name(),
-        "payment_method": metodos_pagamento[random.randint(0, len(metodos_pagamento) - 1)],
-        "store_id": random.randint(1, 3)
-    })
-
-
-# Gera os dados2
-dados2 = []
-for i in range(num_linhas):
-    data_venda = data_inicio + timedelta(days=random.randint(0, (data_fim - data_inicio).days))
-    
-    categoria = random.choice(categorias) # Seleciona aleatoriamente uma das 3 categorias
-    nome_produto = random.choice(nomes_produtos[categoria]) # Seleciona um produto aleatório da categoria
-    
-    dados2.append({
-        "order_id": i + 1,
-        "product_id": random.randint(100, 400),
-        "product_name": nome_produto,
-        "category": categoria,
-        "price": round(random.uniform(10, 200), 2),
-        "quantity": random.randint(1, 5),
-         "dt_sale": data_venda.strftime("%Y-%m-%d"),
-                 "customer_id": random.randint(1001, 1010),
-         "payment_method": metodos_pagamento[random.randint(0, len(metodos_pagamento) - 1)],
-        "store_id": random.randint(1, 3)
-    })
-
-
-# Salva os dados1 em um arquivo CSV
-nome_arquivo_csv = f"vendas_especificas_{data_inicio}.csv"
-with open( "colunas_1"+nome_arquivo_csv, mode="w", newline="", encoding="utf-8") as arquivo_csv:
-    writer = csv.DictWriter(arquivo_csv, fieldnames=colunas_1)
-    writer.writeheader()
-    writer.writerows(dados1)
-
-print(f"Arquivo CSV '{nome_arquivo_csv}' gerado com sucesso.")
-
-# Salva os dados2 em um arquivo CSV
-with open( "colunas_2"+nome_arquivo_csv, mode="w", newline="", encoding="utf-8") as arquivo_csv:
-    writer = csv.DictWriter(arquivo_csv, fieldnames=colunas_2)
-    writer.writeheader()
-    writer.writerows(dados2)
-print(f"Arquivo CSV '{nome_arquivo_csv}' gerado com sucesso.")
\ No newline at end of file
+ESQUEMAS = ("padrao", "largo", "esparso")
+
+# Colunas numéricas: recebem os valores "sujos" quando --taxa-sujos > 0.
+colunas_numericas = {"order_id", "product_id", "price", "quantity", "discount", "customer_id", "store_id"}
+
+# Tamanho do buffer de escrita dos arquivos gerados (1 MiB).
+TAMANHO_BUFFER = 1 << 20
+
+
+def valor_sujo(valor: Any, rng: random.Random) -> str:
+    """Devolve uma versão "suja" de um valor numérico, como as vistas em planilhas reais."""
+    formatos = (
+        lambda v: f"R$ {v}".replace(".", ","),
+        lambda v: f" {v} ",
+        lambda v: f"{v}e0",
+        lambda v: f"{v}.0.1",
+        lambda v: "N/A",
+        lambda v: "-",
+        lambda v: "NaN",
+    )
+    return rng.choice(formatos)(valor)
+
+
+def definir_colunas(esquema: str, indice_fonte: int, colunas_extras: int,
+                    rng: random.Random) -> List[str]:
+    """
+    Define as colunas de uma fonte.
+
+    Args:
+        esquema (str): "padrao" (alterna colunas_1 e colunas_2), "largo"
+                       (colunas_1 mais as colunas extras) ou "esparso" (cada
+                       fonte recebe um subconjunto aleatório das colunas extras).
+        indice_fonte (int): A posição da fonte (0, 1, ...).
+        colunas_extras (int): Quantidade de colunas extras dos esquemas largo e esparso.
+        rng (random.Random): O gerador de números aleatórios.
+
+    Returns:
+        List[str]: As colunas da fonte, na ordem do cabeçalho.
+    """
+    if esquema == "padrao":
+        return list(colunas_1 if indice_fonte % 2 == 0 else colunas_2)
+    extras = [f"extra_{'num' if k % 2 == 0 else 'txt'}_{k}" for k in range(colunas_extras)]
+    if esquema == "largo":
+        return colunas_1 + extras
+    return colunas_1 + [coluna for coluna in extras if rng.random() < 0.6]
+
+
+def geradores_de_valores(nomes_clientes: List[str]) -> Dict[str, Callable[[random.Random], Any]]:
+    """Retorna, para cada coluna conhecida, uma função que sorteia um valor."""
+    datas = [(data_inicio + timedelta(days=d)).strftime("%Y-%m-%d")
+             for d in range((data_fim - data_inicio).days + 1)]
+    produtos = [(categoria, nome) for categoria, nomes in nomes_produtos.items() for nome in nomes]
+    return {
+        "product_id": lambda rng: rng.randint(100, 400),
+        "price": lambda rng: round(rng.uniform(10, 200), 2),
+        "quantity": lambda rng: rng.randint(1, 5),
+        "discount": lambda rng: round(rng.uniform(0, 0.2), 2),
+        "dt_sale": lambda rng: rng.choice(datas),
+        "customer_id": lambda rng: rng.randint(1001, 1010),
+        "customer_name": lambda rng: rng.choice(nomes_clientes),
+        "payment_method": lambda rng: rng.choice(metodos_pagamento),
+        "store_id": lambda rng: rng.randint(1, 3),
+        "_produto": lambda rng: rng.choice(produtos),
+    }
+
+
+def gerar_linhas(colunas: List[str], num_linhas: int, rng: random.Random, nomes_clientes: List[str],
+                 primeiro_id: int = 1, taxa_vazios: float = 0.0,
+                 taxa_sujos: float = 0.0) -> Iterator[List[Any]]:
+    """
+    Gera as linhas de uma fonte, uma a uma.
+
+    Args:
+        colunas (List[str]): As colunas da fonte.
+        num_linhas (int): A quantidade de linhas.
+        rng (random.Random): O gerador de números aleatórios.
+        nomes_clientes (List[str]): Os nomes de clientes a sortear.
+        primeiro_id (int): O order_id da primeira linha.
+        taxa_vazios (float): Fração das células (exceto order_id) deixadas em branco.
+        taxa_sujos (float): Fração das células numéricas com valores "sujos".
+
+    Yields:
+        List[Any]: Os valores de uma linha, na ordem de `colunas`.
+    """
+    geradores = geradores_de_valores(nomes_clientes)
+    sortear_produto = geradores["_produto"]
+    for i in range(num_linhas):
+        categoria, nome_produto = sortear_produto(rng)
+        linha = []
+        for coluna in colunas:
+            if coluna == "order_id":
+                linha.append(primeiro_id + i)
+                continue
+            if taxa_vazios and rng.random() < taxa_vazios:
+                linha.append("")
+                continue
+            if coluna == "category":
+                valor = categoria
+            elif coluna == "product_name":
+                valor = nome_produto
+            elif coluna.startswith("extra_num_"):
+                valor = round(rng.uniform(0, 1000), 2)
+            elif coluna.startswith("extra_txt_"):
+                valor = rng.choice(categorias)
+            else:
+                valor = geradores[coluna](rng)
+            if taxa_sujos and rng.random() < taxa_sujos and (
+                    coluna in colunas_numericas or coluna.startswith("extra_num_")):
+                valor = valor_sujo(valor, rng)
+            linha.append(valor)
+        yield linha
+
+
+def gerar_arquivos(num_linhas: int = 20, num_fontes: int = 2, esquema: str = "padrao",
+                   colunas_extras: int = 50, taxa_vazios: float = 0.0, taxa_sujos: float = 0.0,
+                   sobreposicao: float = 1.0, semente: Optional[int] = 42,
+                   diretorio: str = ".") -> List[str]:
+    """
+    Gera os arquivos CSV de vendas, um por fonte.
+
+    Args:
+        num_linhas (int): Linhas por arquivo.
+        num_fontes (int): Quantidade de arquivos (fontes).
+        esquema (str): "padrao", "largo" ou "esparso" (veja definir_colunas).
+        colunas_extras (int): Colunas extras dos esquemas largo e esparso.
+        taxa_vazios (float): Fração das células em branco.
+        taxa_sujos (float): Fração das células numéricas com valores "sujos".
+        sobreposicao (float): Fração dos order_id de uma fonte que também
+                              aparecem na fonte seguinte (1.0: todas as
+                              fontes usam os mesmos order_id).
+        semente (int, opcional): Semente dos números aleatórios (None: aleatória).
+        diretorio (str): Onde os arquivos serão gravados.
+
+    Returns:
+        List[str]: Os caminhos dos arquivos gerados.
+    """
+    if esquema not in ESQUEMAS:
+        raise ValueError(f"Esquema desconhecido: {esquema}. Use um de {', '.join(ESQUEMAS)}.")
+    if not 0 <= sobreposicao <= 1:
+        raise ValueError("A sobreposição deve estar entre 0 e 1.")
+
+    rng = random.Random(semente)
+    # Um conjunto fixo de nomes: o Faker é lento demais para gerar um nome por linha.
+    fake = Faker('pt_BR')
+    fake.seed_instance(semente)
+    nomes_clientes = [fake.name() for _ in range(500)]
+
+    os.makedirs(diretorio, exist_ok=True)
+    passo_ids = round(num_linhas * (1 - sobreposicao))
+    caminhos = []
+    for indice in range(num_fontes):
+        colunas = definir_colunas(esquema, indice, colunas_extras, rng)
+        nome_arquivo_csv = f"colunas_{indice + 1}vendas_especificas_{data_inicio}.csv"
+        caminho = os.path.join(diretorio, nome_arquivo_csv)
+        with open(caminho, mode="w", newline="", encoding="utf-8", buffering=TAMANHO_BUFFER) as arquivo_csv:
+            writer = csv.writer(arquivo_csv)
+            writer.writerow(colunas)
+            writer.writerows(gerar_linhas(colunas, num_linhas, rng, nomes_clientes,
+                                          primeiro_id=indice * passo_ids + 1,
+                                          taxa_vazios=taxa_vazios, taxa_sujos=taxa_sujos))
+        print(f"Arquivo CSV '{caminho}' gerado com sucesso.")
+        caminhos.append(caminho)
+    return caminhos
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Lê os argumentos da linha de comando e gera os arquivos."""
+    parser = argparse.ArgumentParser(description="Gera arquivos CSV de vendas sintéticos.")
+    parser.add_argument("--linhas", type=int, default=20, help="linhas por arquivo (padrão: 20)")
+    parser.add_argument("--fontes", type=int, default=2, help="quantidade de arquivos (padrão: 2)")
+    parser.add_argument("--esquema", choices=ESQUEMAS, default="padrao", help="conjunto de colunas")
+    parser.add_argument("--colunas-extras", type=int, default=50,
+                        help="colunas extras dos esquemas largo e esparso (padrão: 50)")
+    parser.add_argument("--taxa-vazios", type=float, default=0.0, help="fração de células em branco")
+    parser.add_argument("--taxa-sujos", type=float, default=0.0,
+                        help="fração de células numéricas com valores sujos (ex.: 'R$ 12,50', 'N/A')")
+    parser.add_argument("--sobreposicao", type=float, default=1.0,
+                        help="fração dos order_id repetidos entre fontes consecutivas (padrão: 1.0)")
+    parser.add_argument("--semente", type=int, default=42, help="semente dos números aleatórios")
+    parser.add_argument("--diretorio", default=".", help="diretório de saída")
+    args = parser.parse_args(argv)
+
+    gerar_arquivos(num_linhas=args.linhas, num_fontes=args.fontes, esquema=args.esquema,
+                   colunas_extras=args.colunas_extras, taxa_vazios=args.taxa_vazios,
+                   taxa_sujos=args.taxa_sujos, sobreposicao=args.sobreposicao,
+                   semente=args.semente, diretorio=args.diretorio)
+
+
+if __name__ == "__main__":
+    main()
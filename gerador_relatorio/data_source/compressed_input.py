@@ -0,0 +1,188 @@
+"""
+Este módulo abre arquivos de texto locais, compactados ou não, para leitura
+em streaming pelo LocalDataSource.
+
+A compactação (gzip, bz2 ou xz) é detectada pelos primeiros bytes do arquivo
+ou, se eles não forem reconhecidos, pela extensão (.gz, .bz2, .xz). O
+arquivo é descompactado aos poucos, direto para o leitor de CSV, sem gravar
+uma cópia descompactada em disco.
+
+Com prefetch, a descompactação roda em uma thread própria, alguns blocos à
+frente do leitor de CSV: zlib, bz2 e lzma liberam o GIL enquanto
+descompactam, então a descompactação de um bloco acontece ao mesmo tempo que
+a leitura das linhas do bloco anterior.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import BinaryIO, Optional, TextIO, Tuple
+
+# Tamanho padrão do buffer de leitura (1 MiB).
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# Quantidade de blocos descompactados mantidos à frente do leitor (prefetch).
+PREFETCH_BLOCKS = 4
+
+GZIP = "gzip"
+BZ2 = "bz2"
+XZ = "xz"
+NONE = "none"
+AUTO = "auto"
+
+_MAGIC = ((b"\x1f\x8b", GZIP), (b"BZh", BZ2), (b"\xfd7zXZ\x00", XZ))
+_EXTENSIONS = {".gz": GZIP, ".gzip": GZIP, ".bz2": BZ2, ".xz": XZ, ".lzma": XZ}
+_OPENERS = {GZIP: lambda file: gzip.GzipFile(fileobj=file, mode="rb"), BZ2: bz2.BZ2File, XZ: lzma.LZMAFile}
+
+# Erros levantados pelos descompactadores com arquivos inválidos ou truncados.
+DECOMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError)
+
+
+def detect_compression(path: str, head: bytes) -> str:
+    """
+    Detecta a compactação de um arquivo.
+
+    Args:
+        path (str): O caminho do arquivo.
+        head (bytes): Os primeiros bytes do arquivo.
+
+    Returns:
+        str: GZIP, BZ2, XZ ou NONE.
+    """
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), NONE)
+
+
+class PrefetchReader(io.RawIOBase):
+    """
+    Lê um arquivo binário em uma thread própria, alguns blocos à frente de
+    quem consome os dados.
+
+    Atributos:
+        source (BinaryIO): O arquivo lido pela thread (por exemplo, um GzipFile).
+        block_size (int): O tamanho de cada bloco lido.
+    """
+
+    def __init__(self, source: BinaryIO, block_size: int = DEFAULT_BUFFER_SIZE,
+                 blocks: int = PREFETCH_BLOCKS) -> None:
+        """
+        Inicializa o leitor e inicia a thread de leitura.
+
+        Args:
+            source (BinaryIO): O arquivo lido pela thread.
+            block_size (int): O tamanho de cada bloco lido.
+            blocks (int): Quantidade máxima de blocos lidos à frente.
+        """
+        super().__init__()
+        self.source = source
+        self.block_size = block_size
+        self._blocks: "queue.Queue" = queue.Queue(maxsize=blocks)
+        self._stop = threading.Event()
+        self._current = memoryview(b"")
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                block = self.source.read(self.block_size)
+                if not self._put(block) or not block:
+                    return
+        except BaseException as e:  # repassada para quem lê, na thread principal
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            if self._finished:
+                return 0
+            block = self._blocks.get()
+            if isinstance(block, BaseException):
+                self._finished = True
+                raise block
+            if not block:
+                self._finished = True
+                return 0
+            self._current = memoryview(block)
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self.source.close()
+        super().close()
+
+
+class _DecompressedReader(io.BufferedReader):
+    """Buffer do texto descompactado que, ao ser fechado, fecha também o arquivo em disco."""
+
+    def __init__(self, stream: BinaryIO, buffer_size: int, file: BinaryIO) -> None:
+        super().__init__(stream, buffer_size)
+        self._file = file
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._file.close()
+
+
+def open_text(path: str, compression: str = AUTO, buffer_size: int = DEFAULT_BUFFER_SIZE,
+              prefetch: bool = True) -> Tuple[TextIO, os.stat_result]:
+    """
+    Abre um arquivo de texto UTF-8, compactado ou não, para leitura.
+
+    Args:
+        path (str): O caminho do arquivo.
+        compression (str): AUTO (padrão: detecta pelos primeiros bytes e pela
+                           extensão), GZIP, BZ2, XZ ou NONE.
+        buffer_size (int): O tamanho dos buffers de leitura, em bytes.
+        prefetch (bool): Se True, arquivos compactados são descompactados em
+                         uma thread própria, à frente do leitor.
+
+    Returns:
+        Tuple[TextIO, os.stat_result]: O texto (fechá-lo fecha o arquivo) e os
+            dados do arquivo em disco (tamanho e data de modificação).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        ValueError: Se a compactação pedida não for conhecida.
+    """
+    if compression != AUTO and compression != NONE and compression not in _OPENERS:
+        raise ValueError(f"Compactação desconhecida: {compression}")
+    raw = open(path, "rb", buffering=buffer_size)
+    try:
+        stat = os.fstat(raw.fileno())
+        if compression == AUTO:
+            compression = detect_compression(path, raw.peek(8)[:8])
+        if compression == NONE:
+            return io.TextIOWrapper(raw, encoding="utf-8", newline=""), stat
+        binary: BinaryIO = _OPENERS[compression](raw)
+        if prefetch:
+            binary = PrefetchReader(binary, buffer_size)
+        return io.TextIOWrapper(_DecompressedReader(binary, buffer_size, raw), encoding="utf-8", newline=""), stat
+    except BaseException:
+        raw.close()
+        raise
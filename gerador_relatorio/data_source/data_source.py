@@ -3,7 +3,48 @@ Este módulo define a classe base DataSource e suas subclasses
 WebDataSource e LocalDataSource para representar diferentes fontes de dados.
 """
 
+import csv
+import hashlib
+import json
+import os
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from gerador_relatorio.data_source.compressed_input import (
+    AUTO, DECOMPRESSION_ERRORS, DEFAULT_BUFFER_SIZE, open_text,
+)
+from gerador_relatorio.data_source.filters import RowFilter
+
+
+class DataSourceError(Exception):
+    """
+    Exceção personalizada para erros relacionados à fonte de dados.
+    """
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
+
+
+class SourceContext:
+    """
+    O que as fontes criadas a partir da configuração compartilham
+    (veja DataSource.from_config).
+
+    Atributos:
+        config (Dict[str, Any]): A configuração completa da execução.
+        hash_contents (bool): Se o cache de extração compara o conteúdo dos
+                              arquivos locais (opção 'hash_contents' do cache).
+        shared (Dict[str, Any]): Objetos criados por uma fonte e reaproveitados
+                                 pelas seguintes, como o engine das fontes web.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, hash_contents: bool = False) -> None:
+        self.config = config or {}
+        self.hash_contents = hash_contents
+        self.shared: Dict[str, Any] = {}
 
 
 class DataSource(ABC):
@@ -14,8 +55,36 @@ class DataSource(ABC):
         type (str): O tipo da fonte de dados ("web" ou "local").
         location (str): A localização da fonte de dados (URL, diretório, etc.).
         credentials (dict, opcional): Credenciais de acesso (login, senha, etc.).
+
+    Além de extract_data, toda fonte oferece uma API de streaming (iter_rows e
+    iter_batches). A implementação padrão apenas percorre o resultado de
+    extract_data; subclasses que conseguem ler os dados aos poucos (como
+    LocalDataSource) sobrescrevem iter_rows para manter a memória constante.
+
+    Fontes que sabem dizer se os seus dados mudaram sobrescrevem cache_key,
+    cache_validators e is_cache_valid para poderem ser lidas do cache de
+    extração (ExtractionCache).
+
+    Se a fonte tiver um filtro (atributo row_filter), apenas as linhas que o
+    satisfazem são retornadas por iter_rows. Subclasses aplicam o filtro o
+    mais cedo possível: durante a leitura do arquivo ou na própria requisição.
+    Da mesma forma, se a fonte tiver uma projeção (atributo columns), as
+    linhas trazem apenas essas colunas, na ordem pedida.
+
+    discover_columns informa as colunas da fonte sem extrair os dados: a
+    implementação padrão lê apenas uma amostra das linhas, e as subclasses
+    usam o que já descreve os dados (o cabeçalho do CSV, um esquema declarado).
+
+    Os tipos de fonte da configuração ("local", "web", ...) são registrados em
+    plugins.SOURCES e criados por from_config.
     """
 
+    DEFAULT_BATCH_SIZE = 10000
+
+    # Quantidade de linhas lidas por discover_columns quando a fonte não tem
+    # uma forma melhor de conhecer as suas colunas.
+    DISCOVERY_SAMPLE_SIZE = 1000
+
     def __init__(self, type: str, location: str, credentials: dict = None) -> None:
         """
         Inicializa uma nova instância de DataSource.
@@ -29,6 +98,28 @@ class DataSource(ABC):
         self.location = location
         self.credentials = credentials
 
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], row_filter: Optional[RowFilter] = None,
+                    columns: Optional[List[str]] = None,
+                    context: Optional[SourceContext] = None) -> "DataSource":
+        """
+        Cria a fonte a partir da sua entrada em 'sources' na configuração.
+
+        Args:
+            config (Dict[str, Any]): A configuração da fonte.
+            row_filter (RowFilter, opcional): O filtro da fonte (já com os filtros globais).
+            columns (List[str], opcional): As colunas lidas (projeção).
+            context (SourceContext, opcional): O que as fontes da execução compartilham.
+
+        Returns:
+            DataSource: A fonte de dados.
+
+        Raises:
+            ValueError: Se a configuração da fonte for inválida ou a classe não
+                implementar from_config.
+        """
+        raise ValueError(f"{cls.__name__} não pode ser criada a partir da configuração.")
+
     @abstractmethod
     def extract_data(self) -> list:
         """
@@ -40,62 +131,375 @@ class DataSource(ABC):
         """
         pass  # Método abstrato, não faz nada na classe base
 
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre as linhas da fonte de dados, uma de cada vez.
 
+        Yields:
+            Dict[str, Any]: Um dicionário por linha.
+        """
+        data = self.extract_data()
+        if not isinstance(data, list):
+            print(f"Aviso: extract_data de {self} não retornou uma lista.")
+            return
+        row_filter = getattr(self, "row_filter", None)
+        yield from self.project_rows(row_filter.filter_rows(data) if row_filter else data)
+
+    def discover_columns(self) -> List[str]:
+        """
+        Retorna as colunas da fonte sem extrair todos os dados.
+
+        A implementação padrão junta as colunas das primeiras
+        DISCOVERY_SAMPLE_SIZE linhas de iter_rows (já com o filtro e a projeção).
+
+        Returns:
+            List[str]: As colunas, na ordem em que aparecem nas linhas.
+        """
+        columns: Dict[str, None] = {}
+        for row in islice(self.iter_rows(), self.DISCOVERY_SAMPLE_SIZE):
+            columns.update(dict.fromkeys(row))
+        return list(columns)
+
+    def project_columns(self, columns: Iterable[str]) -> List[str]:
+        """
+        Aplica a projeção da fonte (atributo columns) a uma lista de colunas
+        descobertas: ficam apenas as colunas pedidas, na ordem da projeção.
+
+        Args:
+            columns (Iterable[str]): As colunas da fonte.
+
+        Returns:
+            List[str]: As colunas que as linhas da fonte trazem.
+        """
+        columns = list(dict.fromkeys(columns))
+        projection = getattr(self, "columns", None)
+        if not projection:
+            return columns
+        present = set(columns)
+        return [name for name in projection if name in present]
+
+    def project_rows(self, rows: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        """
+        Mantém apenas as colunas da projeção da fonte (atributo columns) em
+        cada linha; colunas ausentes na linha continuam ausentes.
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): As linhas completas.
+
+        Returns:
+            Iterable[Dict[str, Any]]: As linhas projetadas (as próprias linhas, sem projeção).
+        """
+        columns = getattr(self, "columns", None)
+        if not columns:
+            return rows
+        return ({name: row[name] for name in columns if name in row} for row in rows)
+
+    def read_options(self) -> Dict[str, Any]:
+        """
+        Retorna o filtro e a projeção da fonte, quando houver, na forma da
+        configuração. Fazem parte da chave do cache de extração: a mesma
+        fonte lida com outro filtro ou outras colunas é outra entrada.
+        """
+        options: Dict[str, Any] = {}
+        row_filter = getattr(self, "row_filter", None)
+        if row_filter:
+            options["filters"] = row_filter.to_config()
+        columns = getattr(self, "columns", None)
+        if columns:
+            options["columns"] = list(columns)
+        return options
+
+    def iter_batches(self, batch_size: int = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Percorre as linhas da fonte de dados em lotes de tamanho limitado.
+
+        Args:
+            batch_size (int, opcional): A quantidade máxima de linhas por lote.
+                                        Padrão: DEFAULT_BATCH_SIZE.
+
+        Yields:
+            List[Dict[str, Any]]: Listas com até `batch_size` linhas.
+        """
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior que zero.")
+        rows = self.iter_rows()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def cache_key(self) -> Optional[str]:
+        """
+        Identifica a fonte no cache de extração.
+
+        Returns:
+            Optional[str]: Uma chave estável entre execuções, ou None se a
+                           fonte não puder ser guardada em cache (padrão).
+        """
+        return None
+
+    def cache_validators(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a "versão" dos dados lidos na última extração (tamanho e data
+        de modificação do arquivo, ETag da resposta, etc.).
+
+        Returns:
+            Optional[Dict[str, Any]]: Os validadores, ou None se a fonte ainda
+                                      não foi extraída com sucesso.
+        """
+        return getattr(self, "_cache_validators", None)
+
+    def bytes_read(self) -> Optional[int]:
+        """
+        Retorna a quantidade de bytes lidos na última extração (o tamanho do
+        arquivo, por exemplo), para as métricas de execução.
+
+        Returns:
+            Optional[int]: Os bytes lidos, ou None se a fonte não os informar (padrão).
+        """
+        return getattr(self, "_bytes_read", None)
+
+    def is_cache_valid(self, validators: Dict[str, Any]) -> bool:
+        """
+        Verifica se os dados guardados com `validators` ainda são os atuais.
+
+        Args:
+            validators (Dict[str, Any]): Os validadores guardados junto com os dados.
+
+        Returns:
+            bool: True se os dados não mudaram desde então.
+        """
+        return False
+
+    def snapshot_validators(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a versão atual dos dados obtida sem lê-los (tamanho e data de
+        modificação dos arquivos), usada na impressão digital dos snapshots.
+
+        Returns:
+            Optional[Dict[str, Any]]: Os validadores, ou None se a fonte não
+                puder ser conferida sem uma extração (padrão; veja
+                SalesData.save_snapshot).
+        """
+        return None
 
-#### Mover para o cabecalho do arquivo
-import csv
-from typing import List, Dict
-#from gerador_relatorios.data_source.data_source import DataSource, DataSourceError  # DataSourceError deve ser definido em algum lugar
-# Definindo a exceção DataSourceError
-class DataSourceError(Exception):
-    """
-    Exceção personalizada para erros relacionados à fonte de dados.
-    """
-    def __init__(self, message: str) -> None:
-        super().__init__(message)
-        self.message = message
-    # Implementação da exceção local       
-    
 
 class LocalDataSource(DataSource):
     """
     Classe para representar uma fonte de dados local.
     Herda da classe DataSource.
+
+    Arquivos compactados (.csv.gz, .csv.bz2, .csv.xz) são descompactados em
+    streaming, direto para o leitor de CSV (veja compressed_input.open_text).
     """
 
-    def __init__(self, location: str) -> None:
+    def __init__(self, location: str, hash_contents: bool = False,
+                 row_filter: Optional[RowFilter] = None, columns: Optional[List[str]] = None,
+                 compression: str = AUTO, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 prefetch: bool = True) -> None:
         """
         Inicializa uma nova instância de LocalDataSource.
 
         Args:
             location (str): O caminho para o arquivo local.
+            hash_contents (bool): Se True, o cache de extração compara o
+                                  conteúdo do arquivo (SHA-256) em vez da data
+                                  de modificação.
+            row_filter (RowFilter, opcional): Filtro aplicado durante a leitura:
+                                              as linhas descartadas nem chegam
+                                              a virar dicionários.
+            columns (List[str], opcional): As colunas lidas (projeção): as
+                                           posições no cabeçalho são
+                                           calculadas uma única vez e só essas
+                                           células entram nas linhas.
+            compression (str): "auto" (padrão: detecta pelos primeiros bytes
+                               e pela extensão), "gzip", "bz2", "xz" ou "none".
+            buffer_size (int): O tamanho dos buffers de leitura, em bytes.
+            prefetch (bool): Se True, arquivos compactados são descompactados
+                             em uma thread própria, em paralelo com a leitura
+                             das linhas.
         """
         #self.location = location
         super().__init__(type="local", location=location)
-        
+        self.hash_contents = hash_contents
+        self.row_filter = row_filter or RowFilter()
+        self.columns = list(columns) if columns else None
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.prefetch = prefetch
 
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], row_filter: Optional[RowFilter] = None,
+                    columns: Optional[List[str]] = None,
+                    context: Optional[SourceContext] = None) -> "LocalDataSource":
+        """Cria a fonte a partir da configuração (veja DataSource.from_config)."""
+        context = context or SourceContext()
+        return cls(location=config.get('location'), hash_contents=context.hash_contents,
+                   row_filter=row_filter, columns=columns,
+                   compression=config.get('compression', AUTO),
+                   buffer_size=config.get('buffer_size', DEFAULT_BUFFER_SIZE),
+                   prefetch=config.get('prefetch', True))
 
     def extract_data(self) -> list:
         """
-        Extrai dados da fonte de dados local.
-        (Implementação a ser adicionada)
+        Extrai todos os dados da fonte de dados local.
+        Mantido por compatibilidade; para arquivos grandes prefira iter_rows.
 
         Returns:
             list: Uma lista de dicionários representando os dados extraídos.
         """
-        # Implementação da leitura de dados de arquivos locais (CSV, etc.)    def extract_data(self) -> List[Dict]:
-        data = []
+        return list(self.iter_rows())
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lê o arquivo CSV linha a linha, sem carregá-lo inteiro na memória
+        (descompactando-o em streaming, se for o caso).
+        Com um filtro, as linhas são testadas ainda como listas de células e
+        só as aceitas viram dicionários; com uma projeção, só as colunas
+        pedidas entram nos dicionários.
+
+        Yields:
+            Dict[str, Any]: Um dicionário por linha do arquivo.
+
+        Raises:
+            DataSourceError: Se o arquivo não existir ou não puder ser lido.
+        """
+        self._cache_validators = None
+        self._bytes_read = None
+        with self._reading():
+            file, stat = open_text(self.location, self.compression, self.buffer_size, self.prefetch)
+            with file:
+                if self.row_filter or self.columns:
+                    yield from self._parsed_rows(file)
+                else:
+                    yield from csv.DictReader(file)
+                self._cache_validators = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                self._bytes_read = stat.st_size
+
+    def discover_columns(self) -> List[str]:
+        """
+        Retorna as colunas do arquivo lendo apenas a linha de cabeçalho (nos
+        arquivos compactados, só o começo é descompactado).
+
+        Returns:
+            List[str]: As colunas do cabeçalho (com a projeção aplicada).
+
+        Raises:
+            DataSourceError: Se o arquivo não existir ou não puder ser lido.
+        """
+        with self._reading():
+            file, _ = open_text(self.location, self.compression, self.buffer_size, prefetch=False)
+            with file:
+                header = next(csv.reader(file), None)
+        return self.project_columns(header or [])
+
+    @contextmanager
+    def _reading(self) -> Iterator[None]:
+        """Converte os erros de abertura e leitura do arquivo em DataSourceError."""
         try:
-            with open(self.location, 'r', encoding='utf-8') as file:  # Ajuste a codificação se necessário
-                reader = csv.DictReader(file)
-                for row in reader:
-                    data.append(dict(row))  # Converte OrderedDict para dict
+            yield
         except FileNotFoundError:
             raise DataSourceError(f"Arquivo não encontrado: {self.location}")
         except csv.Error as e:
             raise DataSourceError(f"Erro ao ler o arquivo CSV: {e}")
         except UnicodeDecodeError as e:
             raise DataSourceError(f"Erro de encoding ao ler o arquivo CSV: {e}")
-        
-        return data
-     
\ No newline at end of file
+        except ValueError as e:
+            raise DataSourceError(f"Erro ao abrir o arquivo {self.location}: {e}")
+        except DECOMPRESSION_ERRORS as e:
+            raise DataSourceError(f"Erro ao ler ou descompactar o arquivo {self.location}: {e}")
+
+    def _parsed_rows(self, file) -> Iterator[Dict[str, Any]]:
+        """
+        Lê as linhas com csv.reader e monta o dicionário (como o csv.DictReader
+        faria) apenas das linhas que satisfazem o filtro e, com uma projeção,
+        apenas com as colunas pedidas.
+        """
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        matches = self.row_filter.compile_for_header(header) if self.row_filter else None
+        if self.columns:
+            yield from self._projected_rows(reader, header, matches)
+            return
+        width = len(header)
+        for cells in reader:
+            if not cells or (matches is not None and not matches(cells)):
+                continue
+            row = dict(zip(header, cells))
+            size = len(cells)
+            if size > width:
+                row[None] = cells[width:]
+            elif size < width:
+                for key in header[size:]:
+                    row[key] = None
+            yield row
+
+    def _projected_rows(self, reader, header: List[str], matches) -> Iterator[Dict[str, Any]]:
+        """Monta as linhas só com as colunas da projeção, pelas posições no cabeçalho."""
+        # Com nomes repetidos no cabeçalho vale a última coluna, como no csv.DictReader.
+        positions = {name: index for index, name in enumerate(header)}
+        fields = [(name, positions[name]) for name in self.columns if name in positions]
+        names = [name for name, _ in fields]
+        indexes = [index for _, index in fields]
+        if len(indexes) > 1:
+            getter = itemgetter(*indexes)
+        else:
+            getter = lambda cells: tuple(cells[index] for index in indexes)
+        needed = max(indexes) + 1 if indexes else 0
+        for cells in reader:
+            if not cells or (matches is not None and not matches(cells)):
+                continue
+            if len(cells) >= needed:
+                yield dict(zip(names, getter(cells)))
+            else:
+                size = len(cells)
+                yield {name: cells[index] if index < size else None for name, index in fields}
+
+    def cache_key(self) -> Optional[str]:
+        """Identifica o arquivo no cache de extração pelo caminho absoluto (e pelo filtro e projeção)."""
+        key = "local:" + os.path.abspath(self.location)
+        options = self.read_options()
+        if options:
+            key += "?" + json.dumps(options, sort_keys=True, default=str)
+        return key
+
+    def cache_validators(self) -> Optional[Dict[str, Any]]:
+        """Tamanho e data de modificação do arquivo lido (e o SHA-256, se hash_contents)."""
+        validators = getattr(self, "_cache_validators", None)
+        if validators is not None and self.hash_contents:
+            validators = dict(validators, sha256=self._content_hash())
+        return validators
+
+    def is_cache_valid(self, validators: Dict[str, Any]) -> bool:
+        """
+        Compara o arquivo atual com os validadores guardados: tamanho e data de
+        modificação ou, com hash_contents, tamanho e SHA-256 do conteúdo.
+        """
+        try:
+            stat = os.stat(self.location)
+        except OSError:
+            return False
+        if stat.st_size != validators.get("size"):
+            return False
+        if self.hash_contents:
+            return validators.get("sha256") == self._content_hash()
+        return stat.st_mtime_ns == validators.get("mtime_ns")
+
+    def snapshot_validators(self) -> Optional[Dict[str, Any]]:
+        """Tamanho e data de modificação atuais do arquivo (None se ele não existir)."""
+        try:
+            stat = os.stat(self.location)
+        except OSError:
+            return None
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _content_hash(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.location, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,229 @@
+"""
+Este módulo define os filtros declarativos de linhas (RowFilter), aplicados
+pelas próprias fontes de dados durante a leitura.
+
+Um filtro é uma lista de predicados sobre colunas, todos obrigatórios:
+
+    [
+        {"column": "dt_sale", "from": "2025-04-07", "to": "2025-04-13"},
+        {"column": "store_id", "in": ["1", "2"]},
+        {"column": "category", "equals": "Roupas"}
+    ]
+
+"from" e "to" são inclusivos e comparam números quando o limite é numérico e,
+caso contrário, o texto (o que funciona para datas ISO). "equals" e "in"
+comparam o texto do valor ou, para valores numéricos de APIs (JSON), o
+número. Células nulas ou ausentes nunca passam pelo filtro.
+
+As fontes aplicam o filtro antes de montar cada linha (LocalDataSource testa
+as células do CSV antes de criar o dicionário) ou o traduzem em parâmetros
+da requisição (WebDataSource), então as linhas descartadas nunca chegam à
+consolidação nem às estatísticas.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+_OPERATORS = ("equals", "in", "from", "to")
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or value.__class__ is bool:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class Predicate:
+    """
+    Uma condição sobre uma coluna.
+
+    Atributos:
+        column (str): A coluna testada.
+        equals (Any, opcional): O valor exigido.
+        values (List[Any], opcional): Os valores aceitos ("in").
+        lower (Any, opcional): O menor valor aceito ("from"), inclusivo.
+        upper (Any, opcional): O maior valor aceito ("to"), inclusivo.
+    """
+
+    def __init__(self, column: str, equals: Any = None, values: Optional[Sequence[Any]] = None,
+                 lower: Any = None, upper: Any = None) -> None:
+        """
+        Inicializa uma nova instância de Predicate.
+
+        Raises:
+            ValueError: Se a coluna não for informada ou não houver nenhuma condição.
+        """
+        if not column:
+            raise ValueError("Filtro sem 'column'.")
+        if equals is None and values is None and lower is None and upper is None:
+            raise ValueError(f"Filtro da coluna '{column}' sem condição ({', '.join(_OPERATORS)}).")
+        self.column = column
+        self.equals = equals
+        self.values = list(values) if values is not None else None
+        self.lower = lower
+        self.upper = upper
+        self.test = self._compile()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Predicate":
+        """Cria o predicado a partir da configuração ({"column", "equals"|"in"|"from"|"to"})."""
+        if not isinstance(config, Mapping):
+            raise ValueError(f"Filtro inválido: {config!r}.")
+        unknown = set(config) - {"column", *_OPERATORS}
+        if unknown:
+            raise ValueError(f"Filtro com chaves desconhecidas: {', '.join(sorted(unknown))}.")
+        values = config.get("in")
+        if values is not None and (isinstance(values, (str, bytes)) or not isinstance(values, Iterable)):
+            raise ValueError(f"'in' do filtro da coluna '{config.get('column')}' deve ser uma lista.")
+        return cls(config.get("column"), config.get("equals"), values, config.get("from"), config.get("to"))
+
+    def to_config(self) -> Dict[str, Any]:
+        """Retorna a configuração equivalente (usada nas chaves do cache de extração)."""
+        config: Dict[str, Any] = {"column": self.column}
+        for key, value in (("equals", self.equals), ("in", self.values), ("from", self.lower), ("to", self.upper)):
+            if value is not None:
+                config[key] = value
+        return config
+
+    def _compile(self) -> Callable[[Any], bool]:
+        """Monta a função que testa um único valor."""
+        tests: List[Callable[[Any], bool]] = []
+        accepted = [self.equals] if self.equals is not None else self.values
+        if accepted is not None:
+            texts = frozenset(map(str, accepted))
+            numbers = frozenset(number for number in map(_number, accepted) if number is not None)
+
+            def is_accepted(value: Any) -> bool:
+                if value.__class__ is str:
+                    return value in texts
+                number = _number(value)
+                return (number in numbers) if number is not None else str(value) in texts
+            tests.append(is_accepted)
+        for bound, is_lower in ((self.lower, True), (self.upper, False)):
+            if bound is None:
+                continue
+            number_bound = _number(bound)
+            if number_bound is not None:
+                def in_numeric_range(value: Any, bound: float = number_bound, is_lower: bool = is_lower) -> bool:
+                    number = _number(value)
+                    if number is None:
+                        return False
+                    return number >= bound if is_lower else number <= bound
+                tests.append(in_numeric_range)
+            else:
+                text_bound = str(bound)
+
+                def in_text_range(value: Any, bound: str = text_bound, is_lower: bool = is_lower) -> bool:
+                    text = value if value.__class__ is str else str(value)
+                    return text >= bound if is_lower else text <= bound
+                tests.append(in_text_range)
+
+        if len(tests) == 1:
+            only = tests[0]
+            return lambda value: value is not None and only(value)
+        return lambda value: value is not None and all(test(value) for test in tests)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # A função compilada não é serializável: é recriada ao desserializar
+        # (fontes com filtro são enviadas aos processos da extração paralela).
+        state = self.__dict__.copy()
+        del state["test"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.test = self._compile()
+
+    def __repr__(self) -> str:
+        return f"Predicate({self.to_config()!r})"
+
+
+class RowFilter:
+    """
+    Um conjunto de predicados que uma linha precisa satisfazer (E lógico).
+
+    Atributos:
+        predicates (List[Predicate]): Os predicados.
+    """
+
+    def __init__(self, predicates: Optional[Iterable[Predicate]] = None) -> None:
+        """
+        Inicializa uma nova instância de RowFilter.
+
+        Args:
+            predicates (Iterable[Predicate], opcional): Os predicados.
+        """
+        self.predicates = list(predicates or [])
+
+    @classmethod
+    def from_config(cls, config: Optional[Iterable[Mapping[str, Any]]]) -> "RowFilter":
+        """
+        Cria o filtro a partir da lista de predicados da configuração.
+
+        Raises:
+            ValueError: Se algum predicado for inválido.
+        """
+        if config is None:
+            return cls()
+        if isinstance(config, Mapping):
+            config = [config]
+        return cls(Predicate.from_config(item) for item in config)
+
+    def __bool__(self) -> bool:
+        return bool(self.predicates)
+
+    def __add__(self, other: "RowFilter") -> "RowFilter":
+        return RowFilter(self.predicates + other.predicates)
+
+    @property
+    def columns(self) -> List[str]:
+        """As colunas testadas pelo filtro."""
+        return list(dict.fromkeys(predicate.column for predicate in self.predicates))
+
+    def matches(self, row: Mapping[str, Any]) -> bool:
+        """Indica se a linha satisfaz todos os predicados."""
+        return all(predicate.test(row.get(predicate.column)) for predicate in self.predicates)
+
+    def filter_rows(self, rows: Iterable[Mapping[str, Any]]) -> Iterable[Mapping[str, Any]]:
+        """Retorna apenas as linhas que satisfazem o filtro (as próprias linhas, se não houver predicados)."""
+        if not self.predicates:
+            return rows
+        return filter(self.matches, rows)
+
+    def compile_for_header(self, header: Sequence[str]) -> Callable[[Sequence[Any]], bool]:
+        """
+        Monta uma função que testa uma linha ainda na forma de lista (como
+        lida pelo csv.reader), pela posição das colunas no cabeçalho, antes de
+        montar o dicionário da linha.
+
+        Args:
+            header (Sequence[str]): Os nomes das colunas do arquivo.
+
+        Returns:
+            Callable[[Sequence[Any]], bool]: True se a linha satisfaz o filtro.
+        """
+        # Com nomes repetidos no cabeçalho vale a última coluna, como em dict(zip(header, cells)).
+        positions = {name: index for index, name in enumerate(header)}
+        checks = []
+        for predicate in self.predicates:
+            index = positions.get(predicate.column)
+            if index is None:
+                return lambda cells: False  # Coluna ausente: nenhuma linha satisfaz o predicado.
+            checks.append((index, predicate.test))
+
+        def matches(cells: Sequence[Any]) -> bool:
+            size = len(cells)
+            for index, test in checks:
+                if not test(cells[index] if index < size else None):
+                    return False
+            return True
+        return matches
+
+    def to_config(self) -> List[Dict[str, Any]]:
+        """Retorna a configuração equivalente."""
+        return [predicate.to_config() for predicate in self.predicates]
+
+    def __repr__(self) -> str:
+        return f"RowFilter({self.to_config()!r})"
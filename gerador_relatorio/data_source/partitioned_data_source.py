@@ -0,0 +1,388 @@
+"""
+Este módulo define a classe PartitionedDataSource, uma fonte de dados formada
+por vários arquivos locais (um diretório ou um padrão glob), como as
+exportações diárias de vendas.
+
+Os valores de partição de cada arquivo vêm do caminho:
+
+* diretórios no formato coluna=valor (por exemplo, store_id=3/dt_sale=2025-04-01/);
+* grupos nomeados de uma expressão regular aplicada ao caminho relativo do
+  arquivo, por exemplo "(?P<dt_export>\\d{4}-\\d{2}-\\d{2})" para
+  "vendas_2025-04-01 00:00:00.csv".
+
+Os valores de partição viram colunas das linhas do arquivo. Predicados do
+filtro sobre colunas de partição são decididos por arquivo, antes de abri-lo:
+arquivos fora do filtro nem são lidos. Os demais predicados e a projeção são
+repassados à leitura de cada arquivo (LocalDataSource). Se o próprio arquivo
+tiver uma coluna com o nome de uma partição, as linhas trazem o valor do
+arquivo, então o predicado dessa coluna também é conferido linha a linha.
+"""
+
+import glob
+import json
+import os
+import re
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gerador_relatorio.data_source.compressed_input import AUTO, DEFAULT_BUFFER_SIZE
+from gerador_relatorio.data_source.data_source import DataSource, LocalDataSource, SourceContext
+from gerador_relatorio.data_source.filters import RowFilter
+
+# Padrão padrão dos arquivos de um diretório (CSVs, compactados ou não).
+DEFAULT_PATTERN = "*.csv*"
+
+_GLOB_CHARS = re.compile(r"[*?[]")
+
+
+# Leitura antecipada com max_workers > 1: linhas por lote e lotes guardados por arquivo.
+READ_AHEAD_ROWS = 1024
+READ_AHEAD_BATCHES = 4
+
+# Marca o fim dos lotes de um arquivo na fila de leitura antecipada.
+_END = object()
+
+
+class PartitionFile:
+    """
+    Um arquivo descoberto por PartitionedDataSource.
+
+    Atributos:
+        path (str): O caminho do arquivo.
+        relative_path (str): O caminho relativo à raiz da fonte.
+        partitions (Dict[str, str]): Os valores de partição do arquivo.
+    """
+
+    def __init__(self, path: str, relative_path: str, partitions: Dict[str, str]) -> None:
+        self.path = path
+        self.relative_path = relative_path
+        self.partitions = partitions
+
+    def __repr__(self) -> str:
+        return f"PartitionFile({self.relative_path!r}, {self.partitions!r})"
+
+
+def parse_partitions(relative_path: str, partition_pattern: Optional["re.Pattern"] = None) -> Dict[str, str]:
+    """
+    Extrai os valores de partição do caminho relativo de um arquivo.
+
+    Args:
+        relative_path (str): O caminho relativo à raiz da fonte.
+        partition_pattern (re.Pattern, opcional): Expressão com grupos nomeados.
+
+    Returns:
+        Dict[str, str]: Os valores de partição, na ordem em que aparecem.
+    """
+    parts = relative_path.replace(os.sep, "/").split("/")
+    partitions: Dict[str, str] = {}
+    for part in parts[:-1]:
+        key, separator, value = part.partition("=")
+        if separator and key:
+            partitions[key] = value
+    if partition_pattern is not None:
+        match = partition_pattern.search(relative_path)
+        if match:
+            partitions.update({key: value for key, value in match.groupdict().items() if value is not None})
+    return partitions
+
+
+def _put(batches: "queue.Queue", item: Any, stop: threading.Event) -> bool:
+    """Põe um item na fila, esperando por espaço até que `stop` seja sinalizado."""
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_file(source: LocalDataSource, partitions: Dict[str, str], batches: "queue.Queue",
+               stop: threading.Event) -> Any:
+    """
+    Lê um arquivo em lotes de READ_AHEAD_ROWS linhas para a fila `batches`
+    (limitada a READ_AHEAD_BATCHES lotes) e a termina com _END. Executada nas
+    threads de leitura antecipada de PartitionedDataSource.
+
+    Returns:
+        Any: Os validadores de cache do arquivo.
+    """
+    try:
+        rows = _with_partitions(source.iter_rows(), partitions)
+        while True:
+            batch = list(islice(rows, READ_AHEAD_ROWS))
+            if not batch or not _put(batches, batch, stop):
+                break
+        return source.cache_validators()
+    finally:
+        _put(batches, _END, stop)
+
+
+def _with_partitions(rows: Iterator[Dict[str, Any]], partitions: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    """Acrescenta as colunas de partição às linhas (as colunas do próprio arquivo têm prioridade)."""
+    if not partitions:
+        return rows
+    items = list(partitions.items())
+
+    def add(row: Dict[str, Any]) -> Dict[str, Any]:
+        for key, value in items:
+            row.setdefault(key, value)
+        return row
+    return map(add, rows)
+
+
+class PartitionedDataSource(DataSource):
+    """
+    Fonte de dados formada pelos arquivos de um diretório ou de um padrão glob,
+    lidos como uma única fonte.
+
+    Atributos:
+        pattern (str): O padrão dos arquivos, quando `location` é um diretório.
+        partition_pattern (re.Pattern, opcional): Expressão com grupos nomeados
+                                                  para extrair partições do caminho.
+        row_filter (RowFilter): O filtro das linhas (e dos arquivos).
+        columns (List[str], opcional): A projeção.
+        max_workers (int): Quantidade de arquivos lidos ao mesmo tempo.
+    """
+
+    def __init__(self, location: str, pattern: str = DEFAULT_PATTERN,
+                 partition_pattern: Optional[str] = None, row_filter: Optional[RowFilter] = None,
+                 columns: Optional[List[str]] = None, max_workers: int = 1,
+                 compression: str = AUTO, buffer_size: int = DEFAULT_BUFFER_SIZE, prefetch: bool = True) -> None:
+        """
+        Inicializa uma nova instância de PartitionedDataSource.
+
+        Args:
+            location (str): Um diretório (percorrido recursivamente) ou um
+                            padrão glob, como "exportacoes/vendas_*.csv.gz".
+            pattern (str): O padrão dos arquivos de um diretório. Padrão: "*.csv*".
+            partition_pattern (str, opcional): Expressão regular com grupos
+                nomeados, aplicada ao caminho relativo de cada arquivo.
+            row_filter (RowFilter, opcional): O filtro das linhas.
+            columns (List[str], opcional): As colunas lidas (projeção).
+            max_workers (int): Quantidade de arquivos lidos ao mesmo tempo.
+                               Padrão: 4; 1 lê um arquivo de cada vez, em streaming.
+            compression (str): A compactação dos arquivos (veja LocalDataSource).
+            buffer_size (int): O tamanho dos buffers de leitura, em bytes.
+            prefetch (bool): Se True, descompacta os arquivos em uma thread própria.
+
+        Raises:
+            ValueError: Se partition_pattern não for uma expressão regular válida.
+        """
+        super().__init__(type="partitioned", location=location)
+        self.pattern = pattern
+        try:
+            self.partition_pattern = re.compile(partition_pattern) if partition_pattern else None
+        except re.error as e:
+            raise ValueError(f"partition_pattern inválido: {e}")
+        self.row_filter = row_filter or RowFilter()
+        self.columns = list(columns) if columns else None
+        self.max_workers = max(1, max_workers)
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.prefetch = prefetch
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], row_filter: Optional[RowFilter] = None,
+                    columns: Optional[List[str]] = None,
+                    context: Optional[SourceContext] = None) -> "PartitionedDataSource":
+        """
+        Cria a fonte a partir da configuração (veja DataSource.from_config).
+
+        Raises:
+            ValueError: Se partition_pattern não for uma expressão regular válida.
+        """
+        return cls(location=config.get('location'), pattern=config.get('pattern', DEFAULT_PATTERN),
+                   partition_pattern=config.get('partition_pattern'), row_filter=row_filter,
+                   columns=columns, max_workers=config.get('max_workers', 1),
+                   compression=config.get('compression', AUTO),
+                   buffer_size=config.get('buffer_size', DEFAULT_BUFFER_SIZE),
+                   prefetch=config.get('prefetch', True))
+
+    def _root_and_pattern(self) -> Tuple[str, str]:
+        """A raiz dos caminhos relativos e o padrão glob completo."""
+        if _GLOB_CHARS.search(self.location):
+            parts = self.location.replace(os.sep, "/").split("/")
+            fixed = []
+            for part in parts:
+                if _GLOB_CHARS.search(part):
+                    break
+                fixed.append(part)
+            return "/".join(fixed) or ".", self.location
+        return self.location, os.path.join(self.location, "**", self.pattern)
+
+    def discover_files(self) -> List[PartitionFile]:
+        """
+        Lista os arquivos da fonte, em ordem, com os seus valores de partição.
+
+        Returns:
+            List[PartitionFile]: Todos os arquivos encontrados.
+        """
+        root, pattern = self._root_and_pattern()
+        files = []
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            if not os.path.isfile(path):
+                continue
+            relative_path = os.path.relpath(path, root)
+            files.append(PartitionFile(path, relative_path, parse_partitions(relative_path, self.partition_pattern)))
+        return files
+
+    def selected_files(self) -> List[PartitionFile]:
+        """
+        Lista os arquivos que podem ter linhas dentro do filtro: arquivos cujo
+        valor de partição não satisfaz o filtro são descartados sem ser abertos.
+
+        Returns:
+            List[PartitionFile]: Os arquivos que serão lidos.
+        """
+        predicates = self.row_filter.predicates
+        return [file for file in self.discover_files()
+                if all(predicate.test(file.partitions[predicate.column])
+                       for predicate in predicates if predicate.column in file.partitions)]
+
+    def _file_source(self, file: PartitionFile) -> LocalDataSource:
+        """
+        A leitura de um arquivo, com os predicados que não são decididos pelo
+        valor de partição.
+
+        O predicado de uma coluna de partição só é dispensado se o arquivo não
+        tiver uma coluna com o mesmo nome: nas linhas vale o valor do arquivo
+        (veja _with_partitions), que pode ser diferente do valor do caminho.
+        """
+        predicates = self.row_filter.predicates
+        header = set()
+        if any(predicate.column in file.partitions for predicate in predicates):
+            header = set(LocalDataSource(file.path, compression=self.compression,
+                                         buffer_size=self.buffer_size).discover_columns())
+        row_filter = RowFilter([predicate for predicate in predicates
+                                if predicate.column not in file.partitions or predicate.column in header])
+        return LocalDataSource(file.path, row_filter=row_filter, columns=self.columns,
+                               compression=self.compression, buffer_size=self.buffer_size,
+                               prefetch=self.prefetch)
+
+    def _partition_columns(self, file: PartitionFile) -> Dict[str, str]:
+        """Os valores de partição acrescentados às linhas (respeitando a projeção)."""
+        if self.columns is None:
+            return file.partitions
+        return {key: value for key, value in file.partitions.items() if key in self.columns}
+
+    def discover_columns(self) -> List[str]:
+        """
+        Retorna as colunas da fonte lendo apenas o cabeçalho de cada arquivo
+        selecionado, seguidas das colunas de partição.
+
+        Returns:
+            List[str]: As colunas, na ordem em que aparecem nas linhas.
+
+        Raises:
+            DataSourceError: Se algum arquivo não puder ser lido.
+        """
+        columns: Dict[str, None] = {}
+        for file in self.selected_files():
+            columns.update(dict.fromkeys(self._file_source(file).discover_columns()))
+            columns.update(dict.fromkeys(self._partition_columns(file)))
+        return list(columns)
+
+    def extract_data(self) -> list:
+        """
+        Extrai todos os dados da fonte.
+
+        Returns:
+            list: Uma lista de dicionários com as linhas de todos os arquivos.
+        """
+        return list(self.iter_rows())
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lê os arquivos selecionados, na ordem dos caminhos, como uma única fonte.
+
+        Com max_workers > 1, até max_workers arquivos são lidos ao mesmo tempo
+        (em threads) enquanto as linhas do arquivo atual são consumidas; as
+        linhas saem sempre na ordem dos arquivos. Cada thread guarda no máximo
+        READ_AHEAD_BATCHES lotes de READ_AHEAD_ROWS linhas, então a memória
+        continua limitada. A leitura do CSV disputa o GIL: a leitura antecipada
+        só compensa quando o disco (ou a rede) é o gargalo.
+
+        Yields:
+            Dict[str, Any]: Um dicionário por linha, com as colunas de partição.
+
+        Raises:
+            DataSourceError: Se algum arquivo não puder ser lido.
+        """
+        self._cache_validators = None
+        self._bytes_read = None
+        files = self.selected_files()
+        validators = []
+        if self.max_workers == 1 or len(files) <= 1:
+            for file in files:
+                source = self._file_source(file)
+                yield from _with_partitions(source.iter_rows(), self._partition_columns(file))
+                validators.append(self._file_validators(file, source.cache_validators()))
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            stop = threading.Event()
+            pending: deque = deque()
+
+            def submit(file: PartitionFile) -> None:
+                batches: queue.Queue = queue.Queue(maxsize=READ_AHEAD_BATCHES)
+                pending.append((file, batches, pool.submit(_read_file, self._file_source(file),
+                                                           self._partition_columns(file), batches, stop)))
+            try:
+                remaining = iter(files)
+                for file in islice(remaining, self.max_workers):
+                    submit(file)
+                while pending:
+                    file, batches, future = pending.popleft()
+                    following = next(remaining, None)
+                    if following is not None:
+                        submit(following)
+                    for batch in iter(batches.get, _END):
+                        yield from batch
+                    validators.append(self._file_validators(file, future.result()))
+            finally:
+                # Leitura interrompida (erro ou consumidor que parou antes): as threads param.
+                stop.set()
+                for _, _, future in pending:
+                    future.cancel()
+                pool.shutdown(wait=True)
+        self._cache_validators = {"files": validators}
+        self._bytes_read = sum(size for _, size, _ in validators if size is not None)
+
+    @staticmethod
+    def _file_validators(file: PartitionFile, validators: Optional[Dict[str, Any]]) -> List[Any]:
+        validators = validators or {}
+        return [file.relative_path, validators.get("size"), validators.get("mtime_ns")]
+
+    def cache_key(self) -> Optional[str]:
+        """Identifica a fonte no cache de extração pela raiz, padrões, filtro e projeção."""
+        partition_pattern = self.partition_pattern.pattern if self.partition_pattern else None
+        options = dict(self.read_options(), pattern=self.pattern, partition_pattern=partition_pattern)
+        return "partitioned:" + os.path.abspath(self.location) + "?" + json.dumps(options, sort_keys=True, default=str)
+
+    def _current_files(self) -> Optional[List[Any]]:
+        """O caminho, o tamanho e a data de modificação atuais dos arquivos selecionados."""
+        current = []
+        for file in self.selected_files():
+            try:
+                stat = os.stat(file.path)
+            except OSError:
+                return None
+            current.append([file.relative_path, stat.st_size, stat.st_mtime_ns])
+        return current
+
+    def is_cache_valid(self, validators: Dict[str, Any]) -> bool:
+        """
+        Confere se os arquivos selecionados são os mesmos, com o mesmo tamanho
+        e data de modificação, da extração guardada.
+        """
+        current = self._current_files()
+        return current is not None and current == validators.get("files")
+
+    def snapshot_validators(self) -> Optional[Dict[str, Any]]:
+        """Os arquivos selecionados, com o tamanho e a data de modificação atuais."""
+        current = self._current_files()
+        return {"files": current} if current is not None else None
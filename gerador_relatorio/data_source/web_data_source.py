@@ -1,6 +1,9 @@
+import json
 import requests
-from typing import List, Dict, Any
-from .data_source import DataSource
+from typing import List, Dict, Any, Iterator, Optional
+from .data_source import DataSource, DataSourceError, SourceContext
+from .filters import RowFilter
+from .web_engine import PAGINATION_TYPES, WebFetchEngine
 
 class WebDataSource(DataSource):
     """
@@ -8,10 +11,26 @@ class WebDataSource(DataSource):
     dados de uma fonte web.
 
     Esta implementação assume que a URL retorna um JSON com uma chave
-    específica contendo a lista de dados.
+    específica contendo a lista de dados. As requisições passam pelo
+    WebFetchEngine, compartilhado por todas as fontes web da execução
+    (pool de conexões, novas tentativas com backoff e paginação).
+
+    Um filtro (row_filter) é enviado ao servidor como parâmetros da query
+    string para as colunas mapeadas em filter_params; as linhas recebidas são
+    sempre conferidas com o filtro, então colunas sem parâmetro (ou servidores
+    que ignorem o parâmetro) continuam filtradas. Da mesma forma, uma projeção
+    (columns) pode ser enviada ao servidor em projection_param e é sempre
+    aplicada às linhas recebidas.
+
+    As colunas da fonte (discover_columns) vêm do esquema declarado (schema)
+    ou, sem ele, de uma amostra: os itens da primeira página.
     """
 
-    def __init__(self, name: str, location: str, data_key: str, credentials: Dict[str, Any] = None):
+    def __init__(self, name: str, location: str, data_key: str, credentials: Dict[str, Any] = None,
+                 pagination: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None,
+                 engine: Optional[WebFetchEngine] = None, row_filter: Optional[RowFilter] = None,
+                 filter_params: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None,
+                 projection_param: Optional[str] = None, schema: Optional[List[str]] = None):
         """
         Inicializa o WebDataSource.
 
@@ -19,39 +38,201 @@ class WebDataSource(DataSource):
             name (str): O nome da fonte de dados.
             location (str): A URL da fonte de dados.
             data_key (str): A chave no JSON que contém a lista de dados.
-            credentials (Dict[str, Any], optional): Credenciais, se necessário (ex: API key).
+            credentials (Dict[str, Any], optional): Credenciais, se necessário:
+                "token" (enviado como Bearer) ou "username"/"password" (Basic).
+            pagination (Dict[str, Any], optional): Configuração de paginação
+                (veja WebFetchEngine.fetch_pages). Padrão: uma única requisição.
+            params (Dict[str, Any], optional): Parâmetros fixos da query string.
+            engine (WebFetchEngine, optional): O engine de requisições.
+                Padrão: o engine compartilhado do processo.
+            row_filter (RowFilter, optional): Filtro das linhas.
+            filter_params (Dict[str, Any], optional): Os parâmetros da query
+                string que o endpoint aceita para cada coluna filtrada: um nome
+                (usado para "equals" e "in", com os valores separados por
+                vírgula) ou um dict com o parâmetro de cada condição, por
+                exemplo {"from": "data_inicio", "to": "data_fim"}.
+            columns (List[str], opcional): As colunas lidas (projeção).
+            projection_param (str, opcional): O parâmetro da query string com
+                a lista de campos retornados pelo endpoint (por exemplo
+                "select" ou "fields"), se houver.
+            schema (List[str], opcional): As colunas que o endpoint retorna,
+                se forem conhecidas; dispensa a requisição de amostra em
+                discover_columns.
+
+        Raises:
+            ValueError: Se o tipo de paginação for desconhecido.
         """
+        kind = (pagination or {}).get("type")
+        if kind is not None and kind not in PAGINATION_TYPES:
+            raise ValueError(f"Tipo de paginação desconhecido: {kind}.")
+        self.type = "web"
         self.name = name
         self.location = location
         self.data_key = data_key
         self.credentials = credentials or {}
+        self.pagination = pagination
+        self.params = params or {}
+        self.engine = engine
+        self.row_filter = row_filter or RowFilter()
+        self.filter_params = filter_params or {}
+        self.columns = list(columns) if columns else None
+        self.projection_param = projection_param
+        self.schema = list(schema) if schema else None
 
-    def extract_data(self) -> List[Dict]:
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], row_filter: Optional[RowFilter] = None,
+                    columns: Optional[List[str]] = None,
+                    context: Optional[SourceContext] = None) -> "WebDataSource":
+        """
+        Cria a fonte a partir da configuração (veja DataSource.from_config).
+        As fontes web de um mesmo contexto compartilham um único engine, criado
+        com a seção 'web' da configuração.
         """
-        Extrai os dados da fonte web, fazendo uma requisição GET para a URL.
+        if not config.get('data_key'):
+            raise ValueError("'data_key' não especificado para a fonte web.")
+        context = context or SourceContext()
+        engine = context.shared.get("web_engine")
+        if engine is None:
+            engine = context.shared["web_engine"] = WebFetchEngine(**context.config.get('web', {}))
+        return cls(name=config.get('name'), location=config.get('location'), data_key=config['data_key'],
+                   credentials=config.get('credentials'), pagination=config.get('pagination'),
+                   params=config.get('params'), engine=engine, row_filter=row_filter,
+                   filter_params=config.get('filter_params'), columns=columns,
+                   projection_param=config.get('projection_param'), schema=config.get('schema'))
+
+    def _auth(self) -> Dict[str, Any]:
+        """Monta os cabeçalhos e a autenticação a partir das credenciais."""
+        headers = {}
+        auth = None
+        if self.credentials.get("token"):
+            headers["Authorization"] = f"Bearer {self.credentials['token']}"
+        elif self.credentials.get("username"):
+            auth = (self.credentials["username"], self.credentials.get("password", ""))
+        return {"headers": headers or None, "auth": auth}
+
+    def filter_query(self) -> Dict[str, Any]:
+        """
+        Traduz o filtro em parâmetros da query string, para as colunas e
+        condições que o endpoint aceita (veja filter_params).
 
         Returns:
-            List[Dict]: Uma lista de dicionários com os dados.
+            Dict[str, Any]: Os parâmetros do filtro.
         """
-        try:
-            print(f"Extraindo dados da fonte web: {self.location}")
-            
-            response = requests.get(self.location, timeout=10)
-            response.raise_for_status()
-
-            # Acessa a chave correta no JSON retornado
-            data_dict = response.json()
-            data_list = data_dict.get(self.data_key, [])
-            
-            if not isinstance(data_list, list):
-                print(f"A chave '{self.data_key}' não contém uma lista. Retornando lista vazia.")
-                return []
-                
-            return data_list
+        query = {}
+        for predicate in self.row_filter.predicates:
+            mapping = self.filter_params.get(predicate.column)
+            if mapping is None:
+                continue
+            if isinstance(mapping, str):
+                mapping = {"equals": mapping, "in": mapping}
+            if predicate.equals is not None and "equals" in mapping:
+                query[mapping["equals"]] = predicate.equals
+            if predicate.values is not None and "in" in mapping:
+                query[mapping["in"]] = ",".join(map(str, predicate.values))
+            if predicate.lower is not None and "from" in mapping:
+                query[mapping["from"]] = predicate.lower
+            if predicate.upper is not None and "to" in mapping:
+                query[mapping["to"]] = predicate.upper
+        return query
 
+    def _request_params(self) -> Dict[str, Any]:
+        """Os parâmetros fixos da fonte com os parâmetros do filtro e da projeção."""
+        params = {**self.params, **self.filter_query()}
+        if self.columns and self.projection_param:
+            # As colunas do filtro também são pedidas: as linhas são conferidas aqui.
+            fields = dict.fromkeys(self.columns + self.row_filter.columns)
+            params[self.projection_param] = ",".join(fields)
+        return params
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """
+        Extrai os dados da fonte web, seguindo a paginação configurada e
+        aplicando o filtro e a projeção da fonte.
+
+        Em caso de erro (depois das novas tentativas) o erro é exibido e
+        nenhuma linha é retornada.
+
+        Returns:
+            Iterator[Dict]: Os itens de todas as páginas, em ordem.
+        """
+        print(f"Extraindo dados da fonte web: {self.location}")
+        engine = self.engine or WebFetchEngine.default()
+        self._cache_validators = None
+        try:
+            pages, validators = engine.fetch_all_pages_with_validators(
+                self.location, self.data_key, self.pagination, params=self._request_params(), **self._auth())
         except requests.exceptions.RequestException as e:
             print(f"Erro ao extrair dados da URL {self.location}: {e}")
+            return
+        except DataSourceError as e:
+            print(f"{e.message} Retornando lista vazia.")
+            return
+        except (json.JSONDecodeError, ValueError, KeyError) as e:
+            print(f"Erro ao decodificar JSON ou acessar a chave '{self.data_key}': {e}")
+            return
+        row_filter = self.row_filter
+        for page in pages:
+            yield from self.project_rows(row_filter.filter_rows(page) if row_filter else page)
+        # Sem ETag/Last-Modified não há como revalidar: a fonte não é guardada em cache.
+        self._cache_validators = validators or None
+
+    def discover_columns(self) -> List[str]:
+        """
+        Retorna as colunas da fonte: as do esquema declarado ou, sem ele, as
+        chaves dos itens da primeira página (uma única requisição).
+
+        Em caso de erro o erro é exibido e nenhuma coluna é retornada.
+
+        Returns:
+            List[str]: As colunas (com a projeção aplicada).
+        """
+        if self.schema:
+            return self.project_columns(self.schema)
+        engine = self.engine or WebFetchEngine.default()
+        try:
+            page = engine.fetch_first_page(self.location, self.data_key, self.pagination,
+                                           params=self._request_params(), **self._auth())
+        except requests.exceptions.RequestException as e:
+            print(f"Erro ao consultar as colunas da URL {self.location}: {e}")
+            return []
+        except DataSourceError as e:
+            print(f"{e.message} Retornando lista vazia.")
             return []
-        except (json.JSONDecodeError, KeyError) as e:
+        except (json.JSONDecodeError, ValueError) as e:
             print(f"Erro ao decodificar JSON ou acessar a chave '{self.data_key}': {e}")
-            return []
\ No newline at end of file
+            return []
+        columns: Dict[str, None] = {}
+        for item in page:
+            columns.update(dict.fromkeys(item))
+        return self.project_columns(columns)
+
+    def extract_data(self) -> List[Dict]:
+        """
+        Extrai os dados da fonte web, fazendo requisições GET para a URL.
+
+        Returns:
+            List[Dict]: Uma lista de dicionários com os dados.
+        """
+        return list(self.iter_rows())
+
+    def cache_key(self) -> Optional[str]:
+        """Identifica a fonte no cache de extração pela URL, chave de dados, parâmetros, paginação, filtro e projeção."""
+        key = {"data_key": self.data_key, "params": self.params, "pagination": self.pagination,
+               **self.read_options()}
+        query = json.dumps(key, sort_keys=True, default=str)
+        return f"web:{self.location}?{query}"
+
+    def is_cache_valid(self, validators: Dict[str, Any]) -> bool:
+        """
+        Revalida os dados em cache com um GET condicional da primeira página
+        (If-None-Match/If-Modified-Since): só são válidos se o servidor
+        responder 304 Not Modified.
+        """
+        engine = self.engine or WebFetchEngine.default()
+        try:
+            return engine.is_unchanged(self.location, validators,
+                                       params=WebFetchEngine.first_page_params(self.pagination,
+                                                                               self._request_params()),
+                                       **self._auth())
+        except requests.exceptions.RequestException:
+            return False
@@ -0,0 +1,387 @@
+"""
+Este módulo define o WebFetchEngine, o motor de requisições HTTP usado pelas
+fontes web (WebDataSource).
+
+Um único engine é compartilhado por todas as fontes web de uma execução: ele
+mantém um pool de conexões (requests.Session), refaz requisições que falham
+por erros transitórios com backoff exponencial e jitter, limita o número de
+requisições simultâneas por host e segue APIs paginadas (page, offset, cursor
+e next-link). A orquestração das páginas usa asyncio; as requisições em si
+rodam em um pool de threads do próprio engine.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .data_source import DataSourceError
+
+# Status HTTP considerados transitórios: a requisição é refeita.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+PAGINATION_TYPES = ("page", "offset", "cursor", "next_link")
+
+# Cabeçalhos da resposta usados para revalidar dados em cache.
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+
+class WebFetchError(DataSourceError):
+    """
+    Erro em uma resposta que chegou, mas não tem o formato esperado
+    (por exemplo, a chave de dados não contém uma lista).
+    """
+
+
+def _lookup(payload: Any, key: Optional[str]) -> Any:
+    """Busca uma chave no JSON; 'meta.next' percorre dicionários aninhados."""
+    if not key:
+        return None
+    value = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _page_items(payload: Any, data_key: str) -> List[Dict[str, Any]]:
+    """Retorna a lista de itens de uma página (a chave de dados do JSON)."""
+    value = _lookup(payload, data_key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise WebFetchError(f"A chave '{data_key}' não contém uma lista.")
+    return value
+
+
+class WebFetchEngine:
+    """
+    Motor de requisições HTTP compartilhado pelas fontes web.
+
+    Atributos:
+        session (requests.Session): A sessão com o pool de conexões.
+        per_host_limit (int): Máximo de requisições simultâneas para um mesmo host.
+        retries (int): Quantas vezes uma requisição com erro transitório é refeita.
+        backoff_factor (float): Base, em segundos, do backoff exponencial.
+        max_backoff (float): Espera máxima entre duas tentativas, em segundos.
+        timeout (float): Timeout de cada requisição, em segundos.
+        max_pages (int): Limite de páginas por fonte (proteção contra laços).
+    """
+
+    _default: Optional["WebFetchEngine"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_connections: int = 10, per_host_limit: int = 4, retries: int = 3,
+                 backoff_factor: float = 0.5, max_backoff: float = 30.0, timeout: float = 10.0,
+                 max_pages: int = 1000, session: Optional[requests.Session] = None,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Inicializa um novo WebFetchEngine.
+
+        Args:
+            max_connections (int): Tamanho do pool de conexões e de threads.
+            per_host_limit (int): Máximo de requisições simultâneas por host.
+            retries (int): Novas tentativas após um erro transitório
+                           (conexão, timeout ou status 429/5xx).
+            backoff_factor (float): A espera antes da tentativa n é sorteada
+                                    entre 0 e backoff_factor * 2**n segundos.
+            max_backoff (float): Espera máxima entre tentativas, em segundos.
+            timeout (float): Timeout de cada requisição, em segundos.
+            max_pages (int): Limite de páginas seguidas por fonte.
+            session (requests.Session, opcional): Sessão a ser usada. Padrão: uma nova.
+            sleep (Callable[[float], None]): Função de espera (substituível nos testes).
+        """
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit deve ser maior que zero.")
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self._sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="web-fetch")
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "WebFetchEngine":
+        """Retorna o engine padrão do processo, criado na primeira chamada."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def close(self) -> None:
+        """Encerra o pool de threads e as conexões abertas."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._host_limits.get(host)
+            if semaphore is None:
+                semaphore = self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return semaphore
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Tempo de espera antes da próxima tentativa (respeita Retry-After)."""
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, auth: Any = None) -> requests.Response:
+        """
+        Faz um GET, refazendo a requisição em caso de erro transitório.
+
+        Args:
+            url (str): A URL da requisição.
+            params (Dict[str, Any], opcional): Parâmetros da query string.
+            headers (Dict[str, str], opcional): Cabeçalhos adicionais.
+            auth (Any, opcional): Autenticação no formato aceito pelo requests.
+
+        Returns:
+            requests.Response: A resposta bem-sucedida.
+
+        Raises:
+            requests.exceptions.RequestException: Se a requisição falhar com um
+                erro não transitório ou depois de esgotar as tentativas.
+        """
+        semaphore = self._host_semaphore(url)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                with semaphore:
+                    response = self.session.get(url, params=params, headers=headers, auth=auth,
+                                                timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    response.raise_for_status()
+                    return response
+            self._sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]],
+                  auth: Any) -> Tuple[Any, requests.Response]:
+        response = self.get(url, params=params, headers=headers, auth=auth)
+        return response.json(), response
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       auth: Any = None) -> Tuple[Any, requests.Response]:
+        """
+        Versão assíncrona de get: retorna o JSON decodificado e a resposta
+        (para os cabeçalhos e os links do cabeçalho Link).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._get_json, url, params, headers, auth)
+
+    @staticmethod
+    def first_page_params(pagination: Optional[Dict[str, Any]] = None,
+                          params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Retorna os parâmetros da requisição da primeira página."""
+        pagination = pagination or {}
+        params = dict(params or {})
+        kind = pagination.get("type")
+        page_size = int(pagination.get("page_size", 100))
+        if kind == "page":
+            params[pagination.get("page_param", "page")] = int(pagination.get("start", 1))
+            if pagination.get("size_param"):
+                params[pagination["size_param"]] = page_size
+        elif kind == "offset":
+            params[pagination.get("limit_param", "limit")] = page_size
+            params[pagination.get("offset_param", "offset")] = 0
+        return params
+
+    def is_unchanged(self, url: str, validators: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None, auth: Any = None) -> bool:
+        """
+        Faz um GET condicional (If-None-Match/If-Modified-Since) e retorna True
+        se o servidor responder 304 Not Modified.
+
+        Args:
+            url (str): A URL da requisição.
+            validators (Dict[str, str]): Os cabeçalhos ETag/Last-Modified de uma resposta anterior.
+            params (Dict[str, Any], opcional): Parâmetros da query string.
+            headers (Dict[str, str], opcional): Cabeçalhos adicionais.
+            auth (Any, opcional): Autenticação no formato aceito pelo requests.
+        """
+        conditional = dict(headers or {})
+        if validators.get("ETag"):
+            conditional["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            conditional["If-Modified-Since"] = validators["Last-Modified"]
+        if len(conditional) == len(headers or {}):
+            return False
+        return self.get(url, params=params, headers=conditional, auth=auth).status_code == 304
+
+    async def fetch_pages(self, url: str, data_key: str, pagination: Optional[Dict[str, Any]] = None,
+                          params: Optional[Dict[str, Any]] = None,
+                          headers: Optional[Dict[str, str]] = None,
+                          auth: Any = None) -> List[List[Dict[str, Any]]]:
+        """
+        Busca todas as páginas de uma fonte (veja fetch_pages_with_validators).
+
+        Returns:
+            List[List[Dict[str, Any]]]: Os itens de cada página, em ordem.
+        """
+        pages, _ = await self.fetch_pages_with_validators(url, data_key, pagination, params, headers, auth)
+        return pages
+
+    async def fetch_pages_with_validators(self, url: str, data_key: str,
+                                          pagination: Optional[Dict[str, Any]] = None,
+                                          params: Optional[Dict[str, Any]] = None,
+                                          headers: Optional[Dict[str, str]] = None,
+                                          auth: Any = None) -> Tuple[List[List[Dict[str, Any]]], Dict[str, str]]:
+        """
+        Busca todas as páginas de uma fonte.
+
+        Paginação (chave "type" de `pagination`):
+            - page: parâmetro de número da página ("page_param", padrão "page",
+              a partir de "start", padrão 1) e, opcionalmente, de tamanho
+              ("size_param" e "page_size").
+            - offset: parâmetros "limit_param" (padrão "limit") e
+              "offset_param" (padrão "offset"), com "page_size" itens por página.
+            - cursor: o cursor da próxima página é lido da chave "cursor_key"
+              (padrão "next_cursor") e enviado em "cursor_param" (padrão "cursor").
+            - next_link: a URL da próxima página é lida da chave "next_key" ou,
+              se ela não for informada, do cabeçalho Link (rel="next").
+
+        Com page/offset, se a resposta informar o total de itens ("total_key",
+        padrão "total"), as páginas restantes são buscadas em paralelo; senão
+        a paginação termina na primeira página incompleta.
+
+        Returns:
+            Tuple[List[List[Dict[str, Any]]], Dict[str, str]]: Os itens de cada
+                página, em ordem, e os cabeçalhos ETag/Last-Modified da primeira
+                resposta (para revalidar um cache com is_unchanged).
+
+        Raises:
+            WebFetchError: Se a chave de dados não contiver uma lista.
+            requests.exceptions.RequestException: Se uma requisição falhar.
+        """
+        pagination = pagination or {}
+        kind = pagination.get("type")
+        params = dict(params or {})
+
+        def items(payload: Any) -> List[Dict[str, Any]]:
+            return _page_items(payload, data_key)
+
+        def validators(response: requests.Response) -> Dict[str, str]:
+            return {name: response.headers[name] for name in VALIDATOR_HEADERS if name in response.headers}
+
+        if kind is None:
+            payload, response = await self.get_json(url, params, headers, auth)
+            return [items(payload)], validators(response)
+        if kind not in PAGINATION_TYPES:
+            raise ValueError(f"Tipo de paginação desconhecido: {kind}.")
+
+        if kind in ("page", "offset"):
+            page_size = int(pagination.get("page_size", 100))
+            if kind == "page":
+                page_param = pagination.get("page_param", "page")
+                size_param = pagination.get("size_param")
+                start = int(pagination.get("start", 1))
+
+                def page_params(index: int) -> Dict[str, Any]:
+                    extra = {page_param: start + index}
+                    if size_param:
+                        extra[size_param] = page_size
+                    return {**params, **extra}
+            else:
+                limit_param = pagination.get("limit_param", "limit")
+                offset_param = pagination.get("offset_param", "offset")
+
+                def page_params(index: int) -> Dict[str, Any]:
+                    return {**params, limit_param: page_size, offset_param: index * page_size}
+
+            payload, first_response = await self.get_json(url, page_params(0), headers, auth)
+            pages = [items(payload)]
+            if kind == "page" and not size_param:
+                # Sem parâmetro de tamanho, o servidor decide: vale o tamanho da primeira página.
+                page_size = len(pages[0])
+            total = _lookup(payload, pagination.get("total_key", "total"))
+            if isinstance(total, int) and not isinstance(total, bool) and pages[0]:
+                # Total conhecido: busca as páginas restantes em paralelo.
+                page_count = min(math.ceil(total / page_size), self.max_pages)
+                payloads = await asyncio.gather(*(self.get_json(url, page_params(index), headers, auth)
+                                                  for index in range(1, page_count)))
+                pages.extend(items(payload) for payload, _ in payloads)
+                return pages, validators(first_response)
+            while pages[-1] and len(pages[-1]) >= page_size and len(pages) < self.max_pages:
+                payload, _ = await self.get_json(url, page_params(len(pages)), headers, auth)
+                pages.append(items(payload))
+            return pages, validators(first_response)
+
+        pages = []
+        first_validators: Dict[str, str] = {}
+        next_url: Optional[str] = url
+        next_params: Optional[Dict[str, Any]] = params
+        while next_url and len(pages) < self.max_pages:
+            payload, response = await self.get_json(next_url, next_params, headers, auth)
+            if not pages:
+                first_validators = validators(response)
+            pages.append(items(payload))
+            if kind == "cursor":
+                cursor = _lookup(payload, pagination.get("cursor_key", "next_cursor"))
+                if not cursor or not pages[-1]:
+                    break
+                next_params = {**params, pagination.get("cursor_param", "cursor"): cursor}
+            else:
+                next_key = pagination.get("next_key")
+                link = _lookup(payload, next_key) if next_key else response.links.get("next", {}).get("url")
+                # A URL seguinte já carrega os parâmetros da consulta.
+                next_url, next_params = (urljoin(next_url, link), None) if link else (None, None)
+        return pages, first_validators
+
+    def fetch_first_page(self, url: str, data_key: str, pagination: Optional[Dict[str, Any]] = None,
+                         params: Optional[Dict[str, Any]] = None,
+                         headers: Optional[Dict[str, str]] = None,
+                         auth: Any = None) -> List[Dict[str, Any]]:
+        """
+        Busca apenas a primeira página de uma fonte (uma única requisição),
+        por exemplo para amostrar as suas colunas.
+
+        Returns:
+            List[Dict[str, Any]]: Os itens da primeira página.
+
+        Raises:
+            WebFetchError: Se a chave de dados não contiver uma lista.
+            requests.exceptions.RequestException: Se a requisição falhar.
+        """
+        params = self.first_page_params(pagination, params)
+        return _page_items(self.get(url, params=params, headers=headers, auth=auth).json(), data_key)
+
+    def fetch_all_pages(self, url: str, data_key: str, pagination: Optional[Dict[str, Any]] = None,
+                        params: Optional[Dict[str, Any]] = None,
+                        headers: Optional[Dict[str, str]] = None,
+                        auth: Any = None) -> List[List[Dict[str, Any]]]:
+        """Versão síncrona de fetch_pages (roda o laço de eventos até o fim)."""
+        return asyncio.run(self.fetch_pages(url, data_key, pagination, params, headers, auth))
+
+    def fetch_all_pages_with_validators(self, url: str, data_key: str,
+                                        pagination: Optional[Dict[str, Any]] = None,
+                                        params: Optional[Dict[str, Any]] = None,
+                                        headers: Optional[Dict[str, str]] = None,
+                                        auth: Any = None) -> Tuple[List[List[Dict[str, Any]]], Dict[str, str]]:
+        """Versão síncrona de fetch_pages_with_validators."""
+        return asyncio.run(self.fetch_pages_with_validators(url, data_key, pagination, params, headers, auth))
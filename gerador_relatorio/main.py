@@ -3,22 +3,91 @@ Este módulo contém o ponto de entrada principal da POC para gerar relatórios
 Ele orquestra o fluxo de trabalho, desde a leitura da configuração até a geração do relatório.
 """
 
+import argparse
+import cProfile
 import json
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import os
+import sys
 
-from gerador_relatorio.data_source.data_source import DataSource, LocalDataSource
-from gerador_relatorio.data_source.web_data_source import WebDataSource
+from gerador_relatorio.data_source.data_source import DataSource, SourceContext
+from gerador_relatorio.plugins import FORMATTERS
+from gerador_relatorio.profiling import Profiler
+from gerador_relatorio.report_config.report_config import ReportConfig
+from gerador_relatorio.sales_data.aggregation import Aggregation
+from gerador_relatorio.sales_data.deduplication import DeduplicationOptions
+from gerador_relatorio.sales_data.extraction_cache import ExtractionCache
+from gerador_relatorio.sales_data.parallel_statistics import DEFAULT_CHUNK_SIZE
 from gerador_relatorio.sales_data.sales_data import SalesData
-from gerador_relatorio.sales_report.sales_report import SalesReport
-from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter
-from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter
-from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
+from gerador_relatorio.sales_data.sketches import SketchOptions
+from gerador_relatorio.sales_report.report_renderer import ReportRenderer
+# Os tipos de fonte e os formatos de relatório ficam nos registros de
+# gerador_relatorio.plugins e só são importados quando usados.
 
-def main():
+# Tamanho do buffer dos arquivos de relatório (1 MiB): as linhas são escritas
+# uma a uma, então um buffer grande reduz as chamadas de escrita no disco.
+REPORT_BUFFER_SIZE = 1 << 20
+
+# Arquivos gravados com --profile e --cprofile, no diretório dos relatórios.
+METRICS_FILE = "relatorio_vendas_metricas.json"
+CPROFILE_FILE = "relatorio_vendas.prof"
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description="Gerador de relatórios de vendas.")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"grava as métricas de cada etapa em {METRICS_FILE}, junto dos relatórios")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="com --profile, mede também o pico de memória de cada etapa (tracemalloc, mais lento)")
+    parser.add_argument("--cprofile", action="store_true",
+                        help=f"grava o perfil da execução (cProfile) em {CPROFILE_FILE}, junto dos relatórios")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """
     Função principal para executar a POC de geração de relatórios de vendas.
+
+    Args:
+        argv (List[str], opcional): As opções da linha de comando (veja parse_args).
+                                    Padrão: nenhuma opção.
+    """
+    args = parse_args([] if argv is None else argv)
+    profiler = Profiler(enabled=args.profile or args.profile_memory, trace_memory=args.profile_memory)
+    code_profile = cProfile.Profile() if args.cprofile else None
+    profiler.start()
+    if code_profile is not None:
+        code_profile.enable()
+    try:
+        output_dir = generate_reports(profiler)
+    finally:
+        if code_profile is not None:
+            code_profile.disable()
+        profiler.stop()
+    if output_dir is None:
+        return
+    if profiler.enabled:
+        metrics_path = os.path.join(output_dir, METRICS_FILE)
+        profiler.write(metrics_path)
+        print(f"Métricas da execução salvas em: {metrics_path}")
+    if code_profile is not None:
+        profile_path = os.path.join(output_dir, CPROFILE_FILE)
+        code_profile.dump_stats(profile_path)
+        print(f"Perfil da execução (cProfile) salvo em: {profile_path}")
+
+
+def generate_reports(profiler: Profiler) -> Optional[str]:
+    """
+    Lê a configuração, consolida os dados das fontes e gera os relatórios.
+
+    Args:
+        profiler (Profiler): Mede cada etapa da execução.
+
+    Returns:
+        Optional[str]: O diretório dos relatórios, ou None se a execução foi interrompida por um erro.
     """
     # 1. Carregar a Configuração
     config_data = None
@@ -32,66 +101,155 @@ def main():
             config_path = path
         else:
             print(f"Arquivo de configuração não encontrado em: {path.resolve()}")    
+    with profiler.stage("configuracao"):
+        try:
+            with open(path, 'r') as f:
+                config_data = json.load(f)
+        except FileNotFoundError:
+            print("Erro: Arquivo de configuração 'config.json' não encontrado.")
+            return
+        except json.JSONDecodeError:
+            print("Erro: Arquivo de configuração 'config.json' inválido.")
+            return
+
+    # Cache em disco das extrações (opcional): fontes sem mudanças não são relidas.
+    cache_config = dict(config_data.get('cache', {}))
+    hash_contents = cache_config.pop('hash_contents', False)
+    cache = ExtractionCache(**cache_config) if config_data.get('cache') else None
+    # Agregações (group by) configuradas, como receita por categoria ou por dia.
+    aggregations = []
+    for aggregation_config in config_data.get('aggregations', []):
+        try:
+            aggregations.append(Aggregation.from_config(aggregation_config))
+        except ValueError as e:
+            print(f"Erro na agregação {aggregation_config.get('name', '')}: {e} Ignorando.")
+    # Projeção: com 'columns' nos relatórios, as fontes leem apenas essas
+    # colunas e as usadas pelas agregações.
+    reports_config = config_data.get('reports', {})
+    columns = None
+    if reports_config.get('columns'):
+        columns = list(dict.fromkeys(reports_config['columns'] +
+                                     [column for aggregation in aggregations for column in aggregation.columns]))
+    # Fontes criadas pelo tipo (plugins.SOURCES): o engine das fontes web
+    # (pool de conexões, novas tentativas) só é criado se houver uma fonte web,
+    # e é compartilhado por todas. Os filtros são aplicados pelas próprias fontes.
     try:
-        with open(path, 'r') as f:
-            config_data = json.load(f)
-    except FileNotFoundError:
-        print("Erro: Arquivo de configuração 'config.json' não encontrado.")
-        return
-    except json.JSONDecodeError:
-        print("Erro: Arquivo de configuração 'config.json' inválido.")
+        sources: List[DataSource] = ReportConfig.create_sources(config_data, columns,
+                                                                SourceContext(config_data, hash_contents))
+    except ValueError as e:
+        print(f"Erro nos filtros da configuração: {e}")
         return
 
-    sources: List[DataSource] = []
-    for source_data in config_data.get('sources', []):
-        source_type = source_data.get('type')
-        source_location = source_data.get('location')
-        source_credentials = source_data.get('credentials')
-        source_name = source_data.get('name')
-
-        if source_type == 'web':
-            source_data_key = source_data.get('data_key')
-            if not source_data_key:
-                print(f"Erro: 'data_key' não especificado para a fonte web {source_name}. Ignorando.")
-                continue
-            sources.append(WebDataSource(name=source_name , location=source_location, data_key = source_data_key ,credentials=source_credentials))
-
-        elif source_type == 'local':
-            sources.append(LocalDataSource(location=source_location))
-        else:
-            print(f"Tipo de fonte de dados desconhecido: {source_type}. Ignorando.")
-
     # 2. Consolidar os Dados
-    sales_data = SalesData.consolidate_data(sources)
-
-    # 3. Gerar o Relatório
-    # Escolher o formatador (pode ser configurado também)
-    html_formatter = HTMLReportFormatter()
-    text_formatter = TextReportFormatter()
-
-    html_report = SalesReport(sales_data, html_formatter)
-    text_report = SalesReport(sales_data, text_formatter)
-
-    #print("Relatório HTML:\n", html_report.generate_report())
-    print("\nRelatório Texto:\n", text_report.generate_report())
-
-    csv_formatter = CSVReportFormatter()
-    csv_report_string, csv_statistics_string  = csv_formatter.format_report(sales_data)
+    # Com um snapshot (opcional), os dados consolidados são gravados em um
+    # arquivo binário colunar e, com 'reuse', reabertos na execução seguinte
+    # em vez de reler as fontes, desde que a configuração que gerou o snapshot
+    # (fontes, filtros, colunas, deduplicação e sketches) seja a mesma.
+    statistics_config = config_data.get('statistics', {})
+    try:
+        sketches = SketchOptions.from_config(statistics_config.get('sketches'))
+    except (TypeError, ValueError) as e:
+        print(f"Erro na configuração dos sketches: {e} Ignorando.")
+        sketches = None
+    try:
+        deduplication = DeduplicationOptions.from_config(config_data.get('deduplication'))
+    except (TypeError, ValueError) as e:
+        print(f"Erro na configuração da deduplicação: {e} Ignorando.")
+        deduplication = None
+    snapshot_config = config_data.get('snapshot', {})
+    snapshot_path = snapshot_config.get('path')
+    fingerprint = SalesData.snapshot_fingerprint(sources, sketches, deduplication) if snapshot_path else None
+    sales_data = None
+    if snapshot_path and snapshot_config.get('reuse') and os.path.exists(snapshot_path):
+        try:
+            with profiler.stage("snapshot_leitura", bytes=os.path.getsize(snapshot_path)):
+                sales_data = SalesData.load_snapshot(snapshot_path, fingerprint, sources)
+            print(f"Dados carregados do snapshot: {snapshot_path}")
+        except ValueError as e:
+            print(f"Erro ao abrir o snapshot {snapshot_path}: {e} Relendo as fontes.")
+    if sales_data is None:
+        concurrency = config_data.get('concurrency', {})
+        sales_data = SalesData.consolidate_data(sources,
+                                                max_workers=concurrency.get('max_workers', 1),
+                                                use_processes=concurrency.get('use_processes', False),
+                                                cache=cache,
+                                                statistics_workers=statistics_config.get('max_workers', 1),
+                                                statistics_chunk_size=statistics_config.get(
+                                                    'chunk_size', DEFAULT_CHUNK_SIZE),
+                                                sketches=sketches, deduplication=deduplication,
+                                                profiler=profiler)
+        if snapshot_path:
+            try:
+                with profiler.stage("snapshot_gravacao", rows=len(sales_data["data"])) as stage:
+                    SalesData.save_snapshot(sales_data, snapshot_path, fingerprint)
+                    stage.bytes = os.path.getsize(snapshot_path)
+                print(f"Snapshot dos dados salvo em: {snapshot_path}")
+            except ValueError as e:
+                print(f"Erro ao salvar o snapshot {snapshot_path}: {e}")
+    for result in sales_data["source_results"]:
+        origin = " (cache)" if result.from_cache else ""
+        duplicates = f", {result.duplicates} duplicadas removidas" if result.duplicates else ""
+        print(f"Fonte {result.name}: {result.row_count} linhas extraídas em {result.elapsed:.3f}s{origin}{duplicates}")
 
+    with profiler.stage("agregacoes", rows=len(sales_data["data"])):
+        sales_data["aggregations"] = SalesData.compute_aggregations(sales_data["data"], aggregations)
 
-    output_dir = "output"
+    # 3. Gerar o Relatório
+    # Todos os formatos são escritos com uma única passada pelos dados (ReportRenderer).
+    output_dir = reports_config.get('output_dir', "output")
+    formats = reports_config.get('formats', ["csv"])
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    output_path_report = os.path.join(output_dir, "relatorio_vendas.csv")
-    output_path_statistics = os.path.join(output_dir, "relatorio_vendas_estatisticas.csv")
-    # Instanciar e usar o formatador
-    # Salvar o relatório em um arquivo
-    with open(output_path_report, "w", newline="", encoding="utf-8") as file:
-        file.write(csv_report_string)
+
+    renderer = ReportRenderer()
+    # Com o profiler, cada formatador é uma sub-etapa de "relatorios".
+    with profiler.stage("relatorios") as reports_stage, ExitStack() as files:
+        # O relatório em texto também é exibido no console.
+        sys.stdout.write("\nRelatório Texto:\n ")
+        renderer.add_sink(FORMATTERS.load("text")(), sys.stdout)
+        for report_format in formats:
+            try:
+                formatter_class = FORMATTERS.load(report_format)
+            except ValueError as e:
+                print(f"{e} Ignorando.")
+                continue
+            if report_format == "html" and reports_config.get('html_page_size'):
+                # Relatórios grandes: o HTML vira um índice com links para páginas de N linhas.
+                from gerador_relatorio.sales_report.paginated_html_report_formatter import (
+                    PaginatedHTMLReportFormatter,
+                )
+                formatter = PaginatedHTMLReportFormatter(output_dir, page_size=reports_config['html_page_size'],
+                                                         max_workers=reports_config.get('html_workers', 1))
+            else:
+                formatter = formatter_class()
+            extension = getattr(formatter_class, "FILE_EXTENSION", report_format)
+            output_path_report = os.path.join(output_dir, f"relatorio_vendas.{extension}")
+            file = files.enter_context(open(output_path_report, "w", newline="", encoding="utf-8",
+                                            buffering=REPORT_BUFFER_SIZE))
+            renderer.add_sink(formatter, file)
+        reports_stage.rows = renderer.render(sales_data, profiler=profiler)
+        sys.stdout.write("\n")
+    # Os bytes escritos por cada formatador (os arquivos já estão fechados).
+    for metrics in reports_stage.children:
+        output = metrics.details.get("output")
+        if isinstance(output, str) and os.path.isfile(output):
+            metrics.bytes = os.path.getsize(output)
     print(f"Relatório final salvo em: {output_dir}")
-    with open(output_path_statistics, "w", newline="", encoding="utf-8") as file:
-        file.write(csv_statistics_string)
-    
+
+    if "csv" in formats:
+        csv_formatter = FORMATTERS.load("csv")()
+        with profiler.stage("relatorios_csv_estatisticas"):
+            output_path_statistics = os.path.join(output_dir, "relatorio_vendas_estatisticas.csv")
+            with open(output_path_statistics, "w", newline="", encoding="utf-8",
+                      buffering=REPORT_BUFFER_SIZE) as file:
+                csv_formatter.write_statistics(file, sales_data)
+            if sales_data["aggregations"]:
+                output_path_aggregations = os.path.join(output_dir, "relatorio_vendas_agregacoes.csv")
+                with open(output_path_aggregations, "w", newline="", encoding="utf-8",
+                          buffering=REPORT_BUFFER_SIZE) as file:
+                    csv_formatter.write_aggregations(file, sales_data)
+    return output_dir
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
\ No newline at end of file
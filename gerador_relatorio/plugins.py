@@ -0,0 +1,158 @@
+"""
+Este módulo define o registro de plugins: os tipos de fonte de dados e os
+formatos de relatório disponíveis para a configuração.
+
+As implementações são registradas como texto ("modulo:Classe") e importadas
+apenas quando usadas, de forma que uma execução só com arquivos locais não
+importa o requests nem os formatadores que não gerar. Pacotes de terceiros
+acrescentam tipos e formatos pelos grupos de entry points
+SOURCE_ENTRY_POINTS e FORMATTER_ENTRY_POINTS, por exemplo no pyproject.toml:
+
+    [project.entry-points."gerador_relatorio.formatters"]
+    json = "meu_pacote.json_formatter:JSONReportFormatter"
+"""
+
+import importlib
+from typing import Any, Dict, List, Optional
+
+# Grupos de entry points dos plugins de terceiros.
+SOURCE_ENTRY_POINTS = "gerador_relatorio.sources"
+FORMATTER_ENTRY_POINTS = "gerador_relatorio.formatters"
+
+
+def load_target(target: str) -> Any:
+    """
+    Importa um objeto a partir do seu caminho, no formato dos entry points.
+
+    Args:
+        target (str): O caminho "modulo:atributo" (o atributo pode ter pontos).
+
+    Returns:
+        Any: O objeto importado.
+
+    Raises:
+        ImportError: Se o módulo não puder ser importado.
+        AttributeError: Se o atributo não existir no módulo.
+    """
+    module_name, _, attribute = target.partition(":")
+    value = importlib.import_module(module_name)
+    for part in filter(None, attribute.split(".")):
+        value = getattr(value, part)
+    return value
+
+
+def _entry_points(group: str) -> Dict[str, Any]:
+    """Os entry points instalados de um grupo, por nome."""
+    # importlib.metadata percorre os pacotes instalados: só é importado se um
+    # nome não estiver registrado.
+    from importlib import metadata
+    found = metadata.entry_points()
+    if hasattr(found, "select"):
+        entry_points = found.select(group=group)
+    else:  # Python < 3.10
+        entry_points = found.get(group, [])
+    return {entry_point.name: entry_point for entry_point in entry_points}
+
+
+class PluginRegistry:
+    """
+    Associa nomes (o tipo de uma fonte, o formato de um relatório) às suas
+    implementações, importadas apenas em load.
+
+    Os nomes registrados têm prioridade; os entry points do grupo só são
+    consultados para nomes desconhecidos (e lidos uma única vez).
+
+    Atributos:
+        kind (str): O que o registro guarda, usado nas mensagens de erro
+            ("Tipo de fonte de dados", "Formato de relatório").
+        entry_point_group (str, opcional): O grupo de entry points dos plugins.
+    """
+
+    def __init__(self, kind: str, entry_point_group: Optional[str] = None,
+                 targets: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Inicializa o registro.
+
+        Args:
+            kind (str): O que o registro guarda, para as mensagens de erro.
+            entry_point_group (str, opcional): O grupo de entry points dos plugins.
+            targets (Dict[str, Any], opcional): As implementações iniciais, por
+                nome: o caminho "modulo:atributo" ou o próprio objeto.
+        """
+        self.kind = kind
+        self.entry_point_group = entry_point_group
+        self._targets: Dict[str, Any] = dict(targets or {})
+        self._loaded: Dict[str, Any] = {}
+        self._plugins: Optional[Dict[str, Any]] = None
+
+    def register(self, name: str, target: Any) -> None:
+        """
+        Registra (ou substitui) uma implementação.
+
+        Args:
+            name (str): O nome usado na configuração.
+            target (Any): O caminho "modulo:atributo" ou o próprio objeto.
+        """
+        self._targets[name] = target
+        self._loaded.pop(name, None)
+
+    def plugins(self) -> Dict[str, Any]:
+        """Os entry points do grupo do registro, por nome (lidos na primeira chamada)."""
+        if self._plugins is None:
+            self._plugins = _entry_points(self.entry_point_group) if self.entry_point_group else {}
+        return self._plugins
+
+    def names(self) -> List[str]:
+        """Os nomes disponíveis: os registrados e, em seguida, os dos plugins."""
+        return list(dict.fromkeys([*self._targets, *self.plugins()]))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets or name in self.plugins()
+
+    def load(self, name: str) -> Any:
+        """
+        Retorna a implementação de um nome, importando-a na primeira vez.
+
+        Args:
+            name (str): O nome usado na configuração.
+
+        Returns:
+            Any: A implementação (por exemplo, a classe da fonte ou do formatador).
+
+        Raises:
+            ValueError: Se o nome for desconhecido ou a implementação não
+                puder ser importada.
+        """
+        if name in self._loaded:
+            return self._loaded[name]
+        target = self._targets.get(name)
+        if target is None:
+            target = self.plugins().get(name) if isinstance(name, str) else None
+            if target is None:
+                raise ValueError(f"{self.kind} desconhecido: {name}.")
+        try:
+            if isinstance(target, str):
+                value = load_target(target)
+            elif hasattr(target, "load") and hasattr(target, "group"):  # EntryPoint
+                value = target.load()
+            else:
+                value = target
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"{self.kind} {name} não pôde ser carregado: {e}.")
+        self._loaded[name] = value
+        return value
+
+
+# Os tipos de fonte de dados (veja DataSource.from_config).
+SOURCES = PluginRegistry("Tipo de fonte de dados", SOURCE_ENTRY_POINTS, {
+    "local": "gerador_relatorio.data_source.data_source:LocalDataSource",
+    "web": "gerador_relatorio.data_source.web_data_source:WebDataSource",
+    "partitioned": "gerador_relatorio.data_source.partitioned_data_source:PartitionedDataSource",
+})
+
+# Os formatos de relatório (subclasses de ReportFormatter, com FILE_EXTENSION).
+FORMATTERS = PluginRegistry("Formato de relatório", FORMATTER_ENTRY_POINTS, {
+    "csv": "gerador_relatorio.sales_report.csv_report_formatter:CSVReportFormatter",
+    "html": "gerador_relatorio.sales_report.html_report_formatter:HTMLReportFormatter",
+    "text": "gerador_relatorio.sales_report.text_report_formatter:TextReportFormatter",
+})
@@ -0,0 +1,244 @@
+"""
+Este módulo define o Profiler, que mede as etapas de uma execução do gerador
+de relatórios (configuração, extração de cada fonte, cabeçalhos,
+estatísticas, cada formatador, ...) e grava as métricas em JSON.
+
+Cada etapa registra o tempo de relógio e de CPU, as linhas e os bytes
+processados (com as linhas por segundo) e o pico de memória: o pico de
+memória residente do processo (resource) ao fim da etapa e, com
+trace_memory, o pico de memória alocada pelo Python durante a etapa
+(tracemalloc, que deixa a execução bem mais lenta).
+
+Um Profiler desligado (enabled=False) não mede nem guarda nada: o código
+instrumentado pode usá-lo sempre, sem custo perceptível.
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def max_rss() -> Optional[int]:
+    """
+    Retorna o pico de memória residente do processo, em bytes.
+
+    Returns:
+        Optional[int]: O pico, ou None se a plataforma não o informar.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é informado em KiB no Linux e em bytes no macOS.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class StageMetrics:
+    """
+    As métricas de uma etapa.
+
+    Atributos:
+        name (str): O nome da etapa.
+        seconds (float): O tempo de relógio, em segundos.
+        cpu_seconds (float, opcional): O tempo de CPU, em segundos.
+        rows (int, opcional): As linhas processadas.
+        bytes (int, opcional): Os bytes lidos ou escritos.
+        peak_memory_bytes (int, opcional): O pico de memória alocada pelo
+                                           Python durante a etapa (tracemalloc).
+        max_rss_bytes (int, opcional): O pico de memória residente do
+                                       processo ao fim da etapa.
+        details (Dict[str, Any]): Informações adicionais (fonte, arquivo, ...).
+        children (List[StageMetrics]): As sub-etapas.
+    """
+
+    def __init__(self, name: str, seconds: float = 0.0, cpu_seconds: Optional[float] = None,
+                 rows: Optional[int] = None, bytes: Optional[int] = None, **details: Any) -> None:
+        self.name = name
+        self.seconds = seconds
+        self.cpu_seconds = cpu_seconds
+        self.rows = rows
+        self.bytes = bytes
+        self.peak_memory_bytes: Optional[int] = None
+        self.max_rss_bytes: Optional[int] = None
+        self.details = details
+        self.children: List["StageMetrics"] = []
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        """As linhas processadas por segundo, se houver linhas e tempo medido."""
+        if self.rows is None or self.seconds <= 0:
+            return None
+        return self.rows / self.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte as métricas em um dicionário serializável em JSON (sem os valores ausentes)."""
+        result: Dict[str, Any] = {"name": self.name, "seconds": self.seconds}
+        for key in ("cpu_seconds", "rows", "rows_per_second", "bytes", "peak_memory_bytes", "max_rss_bytes"):
+            value = getattr(self, key)
+            if value is not None:
+                result[key] = value
+        result.update({key: value for key, value in self.details.items() if value is not None})
+        if self.children:
+            result["children"] = [child.to_dict() for child in self.children]
+        return result
+
+    def __repr__(self) -> str:
+        return f"StageMetrics({self.name!r}, seconds={self.seconds:.3f}, rows={self.rows})"
+
+
+class Profiler:
+    """
+    Mede as etapas de uma execução.
+
+    As etapas podem ser aninhadas: uma etapa iniciada (ou registrada) dentro
+    de outra vira uma sub-etapa dela.
+
+    Atributos:
+        enabled (bool): Se as etapas são medidas e guardadas.
+        trace_memory (bool): Se o pico de memória de cada etapa é medido com tracemalloc.
+        stages (List[StageMetrics]): As etapas de primeiro nível, em ordem.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False) -> None:
+        """
+        Inicializa uma nova instância de Profiler.
+
+        Args:
+            enabled (bool): Se False, nada é medido nem guardado.
+            trace_memory (bool): Se True, liga o tracemalloc (em start) para
+                                 medir o pico de memória de cada etapa.
+        """
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages: List[StageMetrics] = []
+        self._stack: List[StageMetrics] = []
+        self._started_at: Optional[str] = None
+        self._start = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Marca o início da execução e liga o tracemalloc, se trace_memory."""
+        if not self.enabled:
+            return
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Desliga o tracemalloc, se foi ligado por start."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _add(self, metrics: StageMetrics) -> None:
+        (self._stack[-1].children if self._stack else self.stages).append(metrics)
+
+    def _update_parent_peaks(self) -> None:
+        """Guarda nas etapas abertas o pico atual, antes de reiniciá-lo para uma sub-etapa."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for parent in self._stack:
+            parent.peak_memory_bytes = max(parent.peak_memory_bytes or 0, peak)
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str, **details: Any) -> Iterator[StageMetrics]:
+        """
+        Mede uma etapa: o bloco `with` é a etapa.
+
+        Args:
+            name (str): O nome da etapa.
+            **details: Informações adicionais gravadas com a etapa.
+
+        Yields:
+            StageMetrics: As métricas da etapa; o bloco pode preencher rows e bytes.
+        """
+        metrics = StageMetrics(name, **details)
+        if not self.enabled:
+            yield metrics
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            self._update_parent_peaks()
+        self._add(metrics)
+        self._stack.append(metrics)
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield metrics
+        finally:
+            metrics.seconds = time.perf_counter() - start
+            metrics.cpu_seconds = time.process_time() - start_cpu
+            if tracing:
+                metrics.peak_memory_bytes = max(metrics.peak_memory_bytes or 0, tracemalloc.get_traced_memory()[1])
+            metrics.max_rss_bytes = max_rss()
+            self._stack.pop()
+
+    @contextmanager
+    def accumulate(self, metrics: StageMetrics) -> Iterator[StageMetrics]:
+        """
+        Soma o tempo do bloco `with` às métricas de uma etapa já registrada
+        (uma etapa executada em várias partes, como um formatador alimentado
+        lote a lote).
+        """
+        if not self.enabled:
+            yield metrics
+            return
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield metrics
+        finally:
+            metrics.seconds += time.perf_counter() - start
+            metrics.cpu_seconds = (metrics.cpu_seconds or 0.0) + time.process_time() - start_cpu
+
+    def record(self, name: str, seconds: float = 0.0, cpu_seconds: Optional[float] = None,
+               rows: Optional[int] = None, bytes: Optional[int] = None, **details: Any) -> StageMetrics:
+        """
+        Registra uma etapa medida por quem a executou (por exemplo, a extração
+        de uma fonte em um worker), como sub-etapa da etapa aberta.
+
+        Returns:
+            StageMetrics: As métricas registradas.
+        """
+        metrics = StageMetrics(name, seconds, cpu_seconds, rows, bytes, **details)
+        if self.enabled:
+            self._add(metrics)
+        return metrics
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte todas as métricas da execução em um dicionário serializável em JSON."""
+        return {
+            "meta": {
+                "started_at": self._started_at,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "trace_memory": self.trace_memory,
+            },
+            "seconds": time.perf_counter() - self._start,
+            "cpu_seconds": time.process_time() - self._start_cpu,
+            "max_rss_bytes": max_rss(),
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def write(self, path: str) -> None:
+        """
+        Grava as métricas em um arquivo JSON.
+
+        Args:
+            path (str): O caminho do arquivo.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2, ensure_ascii=False)
+            file.write("\n")
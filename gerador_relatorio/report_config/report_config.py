@@ -4,9 +4,11 @@ a configuração do relatório, incluindo as fontes de dados.
 """
 
 import json
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from gerador_relatorio.data_source.data_source import DataSource
+from gerador_relatorio.data_source.data_source import DataSource, SourceContext
+from gerador_relatorio.data_source.filters import RowFilter
+from gerador_relatorio.plugins import SOURCES
 
 
 class ReportConfig:
@@ -43,6 +45,7 @@ class ReportConfig:
         Raises:
             FileNotFoundError: Se o arquivo de configuração não for encontrado.
             json.JSONDecodeError: Se o arquivo de configuração não for um JSON válido.
+            ValueError: Se os filtros globais da configuração forem inválidos.
         """
         try:
             with open(config_file, 'r') as f:
@@ -52,17 +55,53 @@ class ReportConfig:
         except json.JSONDecodeError:
             raise json.JSONDecodeError(f"Arquivo de configuração inválido: {config_file}", '', 0)
 
+        return cls(cls.create_sources(config_data))
+
+    @staticmethod
+    def create_sources(config_data: Dict[str, Any], columns: Optional[List[str]] = None,
+                       context: Optional[SourceContext] = None) -> List[DataSource]:
+        """
+        Cria as fontes de dados listadas em 'sources' na configuração.
+
+        O tipo de cada fonte é procurado no registro de plugins (plugins.SOURCES),
+        que só importa a implementação dos tipos usados. Fontes de tipo
+        desconhecido (ou que não seja uma subclasse de DataSource) ou com
+        configuração inválida são exibidas e ignoradas.
+
+        Args:
+            config_data (Dict[str, Any]): A configuração completa.
+            columns (List[str], opcional): As colunas lidas (projeção) por todas as fontes.
+            context (SourceContext, opcional): O que as fontes compartilham.
+                                               Padrão: um contexto com config_data.
+
+        Returns:
+            List[DataSource]: As fontes de dados, na ordem da configuração.
+
+        Raises:
+            ValueError: Se os filtros globais ('filters') forem inválidos.
+        """
+        # Os filtros globais valem para todas as fontes.
+        global_filter = RowFilter.from_config(config_data.get('filters'))
+        context = context or SourceContext(config_data)
         sources = []
         for source_data in config_data.get('sources', []):  # Usar .get() para evitar KeyError
-            source_type = source_data.get('type')
-            source_location = source_data.get('location')
-            source_credentials = source_data.get('credentials')
-
-            if source_type == 'web':
-                sources.append(DataSource(type=source_type, location=source_location, credentials=source_credentials))  # Corrigido
-            elif source_type == 'local':
-                sources.append(DataSource(type=source_type, location=source_location))  # Corrigido
-            else:
-                print(f"Tipo de fonte de dados desconhecido: {source_type}. Ignorando.")
-
-        return cls(sources)
\ No newline at end of file
+            source_name = source_data.get('name') or source_data.get('location')
+            try:
+                row_filter = global_filter + RowFilter.from_config(source_data.get('filters'))
+            except ValueError as e:
+                print(f"Erro nos filtros da fonte {source_name}: {e} Ignorando.")
+                continue
+            try:
+                source_class = SOURCES.load(source_data.get('type'))
+            except ValueError as e:
+                print(f"{e} Ignorando.")
+                continue
+            if not (isinstance(source_class, type) and issubclass(source_class, DataSource)):
+                print(f"{SOURCES.kind} {source_data.get('type')} não é uma subclasse de DataSource. Ignorando.")
+                continue
+            try:
+                sources.append(source_class.from_config(source_data, row_filter=row_filter, columns=columns,
+                                                        context=context))
+            except ValueError as e:
+                print(f"Erro na fonte {source_name}: {e} Ignorando.")
+        return sources
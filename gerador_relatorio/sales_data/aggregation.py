@@ -0,0 +1,465 @@
+"""
+Este módulo define o motor de agregação (group by) dos dados de vendas.
+
+Uma Aggregation agrupa as linhas pelos valores de uma ou mais colunas-chave
+(por exemplo, category ou store_id) e calcula medidas por grupo: sum, count,
+avg, min e max de uma coluna ou de uma expressão derivada, como
+"price * quantity * (1 - coalesce(discount, 0))".
+
+A agregação é feita por hash, em uma única passada pelas linhas: apenas o
+estado de cada grupo fica em memória, nunca as linhas. Em um ColumnStore as
+colunas são lidas direto dos buffers, com os números já convertidos. Os dois
+caminhos dão o mesmo resultado: as chaves são comparadas pelo texto (o número
+7 de uma API e a string "7" de um CSV são o mesmo grupo, como em key_digest)
+e as medidas que não são count são sempre float.
+
+As expressões aceitam apenas nomes de colunas, números, + - * / // % **,
+parênteses e as funções coalesce, abs, min, max e round. Elas são validadas
+na árvore sintática (ast) antes de compiladas; qualquer outra construção
+(atributos, índices, outras chamadas) levanta ExpressionError. Valores nulos
+ou não numéricos propagam: a expressão resulta em None e a linha não entra na
+medida, exceto por coalesce, que devolve o primeiro argumento não nulo.
+"""
+
+import ast
+from itertools import repeat, tee
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from gerador_relatorio.sales_data.column_store import ColumnStore, to_number
+
+# Tamanho máximo de uma expressão, em caracteres.
+MAX_EXPRESSION_LENGTH = 1000
+
+# Maior expoente aceito em "**" (que precisa ser uma constante).
+MAX_EXPONENT = 100
+
+FUNCTIONS = ("sum", "count", "avg", "min", "max")
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+
+class ExpressionError(ValueError):
+    """Erro levantado por uma expressão ou medida inválida."""
+
+
+def coalesce(*values: Any) -> Any:
+    """Retorna o primeiro valor não nulo (None se todos forem nulos)."""
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+_EXPRESSION_FUNCTIONS = {"coalesce": coalesce, "abs": abs, "min": min, "max": max, "round": round}
+
+
+class _Validator(ast.NodeVisitor):
+    """Percorre a árvore da expressão recusando tudo o que não for permitido."""
+
+    def __init__(self) -> None:
+        self.columns: List[str] = []
+
+    def generic_visit(self, node: ast.AST) -> None:
+        raise ExpressionError(f"Construção não permitida na expressão: {type(node).__name__}.")
+
+    def visit_Expression(self, node: ast.Expression) -> None:
+        self.visit(node.body)
+
+    def visit_BinOp(self, node: ast.BinOp) -> None:
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise ExpressionError(f"Operador não permitido na expressão: {type(node.op).__name__}.")
+        if isinstance(node.op, ast.Pow) and not (
+                isinstance(node.right, ast.Constant) and node.right.value.__class__ in (int, float)
+                and abs(node.right.value) <= MAX_EXPONENT):
+            raise ExpressionError(f"O expoente de '**' deve ser um número de até {MAX_EXPONENT}.")
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> None:
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ExpressionError(f"Operador não permitido na expressão: {type(node.op).__name__}.")
+        self.visit(node.operand)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if node.value.__class__ not in (int, float):
+            raise ExpressionError(f"Constante não permitida na expressão: {node.value!r}.")
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id not in self.columns:
+            self.columns.append(node.id)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if not isinstance(node.func, ast.Name) or node.func.id not in _EXPRESSION_FUNCTIONS:
+            raise ExpressionError("Apenas as funções coalesce, abs, min, max e round são permitidas.")
+        if node.keywords or not node.args:
+            raise ExpressionError(f"Chamada inválida de {node.func.id}.")
+        for argument in node.args:
+            self.visit(argument)
+
+
+class _Renamer(ast.NodeTransformer):
+    """Troca os nomes das colunas pelos parâmetros posicionais da função compilada."""
+
+    def __init__(self, columns: List[str]) -> None:
+        self.names = {column: f"_c{index}" for index, column in enumerate(columns)}
+
+    def visit_Call(self, node: ast.Call) -> ast.Call:
+        node.args = [self.visit(argument) for argument in node.args]
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        return ast.copy_location(ast.Name(id=self.names[node.id], ctx=ast.Load()), node)
+
+
+class Expression:
+    """
+    Uma expressão aritmética sobre as colunas de uma linha.
+
+    Atributos:
+        text (str): A expressão original.
+        columns (List[str]): As colunas usadas, na ordem em que aparecem.
+    """
+
+    def __init__(self, text: str) -> None:
+        """
+        Valida e compila a expressão.
+
+        Raises:
+            ExpressionError: Se a expressão for inválida ou usar construções não permitidas.
+        """
+        if not isinstance(text, str) or not text.strip():
+            raise ExpressionError("A expressão não pode ser vazia.")
+        if len(text) > MAX_EXPRESSION_LENGTH:
+            raise ExpressionError(f"A expressão passa de {MAX_EXPRESSION_LENGTH} caracteres.")
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"Expressão inválida '{text}': {e.msg}.") from None
+        validator = _Validator()
+        validator.visit(tree)
+        self.text = text
+        self.columns = validator.columns
+
+        body = _Renamer(self.columns).visit(tree.body)
+        parameters = [ast.arg(arg=f"_c{index}") for index in range(len(self.columns))]
+        function = ast.Expression(ast.Lambda(
+            args=ast.arguments(posonlyargs=[], args=parameters, vararg=None, kwonlyargs=[],
+                               kw_defaults=[], kwarg=None, defaults=[]),
+            body=body))
+        ast.fix_missing_locations(function)
+        # Só chega aqui uma árvore validada: números, colunas, operadores e as funções permitidas.
+        namespace = {"__builtins__": {}, **_EXPRESSION_FUNCTIONS}
+        self._function = eval(compile(function, "<expressão>", "eval"), namespace)
+
+    def __call__(self, *values: Optional[float]) -> Optional[float]:
+        """
+        Avalia a expressão com os valores das colunas, na ordem de `columns`.
+
+        Returns:
+            Optional[float]: O resultado, ou None se algum operando for nulo
+                             ou a conta for inválida (divisão por zero, ...).
+        """
+        try:
+            return self._function(*values)
+        except (TypeError, ArithmeticError, ValueError):
+            return None
+
+    def __repr__(self) -> str:
+        return f"Expression({self.text!r})"
+
+
+class Measure:
+    """
+    Uma medida calculada por grupo.
+
+    Atributos:
+        name (str): O nome da medida (a coluna no resultado).
+        function (str): sum, count, avg, min ou max.
+        expression (Expression, opcional): A coluna ou expressão medida. Sem
+                                           expressão, count conta as linhas do grupo.
+        decimals (int): Casas decimais usadas ao formatar os resultados.
+    """
+
+    def __init__(self, name: str, function: str = "sum", expression: Optional[str] = None,
+                 decimals: int = 2) -> None:
+        """
+        Inicializa uma nova instância de Measure.
+
+        Raises:
+            ExpressionError: Se a função ou a expressão forem inválidas.
+        """
+        if function not in FUNCTIONS:
+            raise ExpressionError(f"Função de agregação desconhecida: {function}. Use {', '.join(FUNCTIONS)}.")
+        if expression is None and function != "count":
+            raise ExpressionError(f"A medida '{name}' ({function}) precisa de uma coluna ou expressão.")
+        self.name = name
+        self.function = function
+        self.expression = Expression(expression) if expression is not None else None
+        self.decimals = decimals
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Measure":
+        """
+        Cria a medida a partir da configuração: {"name", "function", e "expression" ou "column"}.
+        """
+        expression = config.get("expression", config.get("column"))
+        function = config.get("function", "sum")
+        name = config.get("name") or (f"{function}({expression})" if expression else function)
+        return cls(name, function, expression, config.get("decimals", 2))
+
+    def value(self, state: List[Any]) -> Any:
+        """
+        Retorna o resultado da medida a partir do estado [n, soma, mínimo,
+        máximo] do grupo: um int em count e um float nas demais funções, seja
+        qual for o tipo dos valores lidos.
+        """
+        count, total, low, high = state
+        function = self.function
+        if function == "count":
+            return count
+        if not count:
+            return None
+        if function == "sum":
+            return float(total)
+        if function == "avg":
+            return total / count
+        return float(low if function == "min" else high)
+
+    def __repr__(self) -> str:
+        expression = self.expression.text if self.expression else "*"
+        return f"Measure({self.name!r}, {self.function}({expression}))"
+
+
+class AggregationResult:
+    """
+    O resultado de uma agregação: uma linha por grupo, ordenada pelas chaves.
+
+    Atributos:
+        name (str): O nome da agregação (título da seção nos relatórios).
+        group_by (List[str]): As colunas-chave.
+        measures (List[Measure]): As medidas.
+        rows (List[Tuple[Any, ...]]): Os valores das chaves seguidos dos valores das medidas.
+    """
+
+    def __init__(self, name: str, group_by: List[str], measures: List[Measure],
+                 rows: List[Tuple[Any, ...]]) -> None:
+        self.name = name
+        self.group_by = group_by
+        self.measures = measures
+        self.rows = rows
+
+    @property
+    def columns(self) -> List[str]:
+        """Os nomes das colunas do resultado: as chaves e depois as medidas."""
+        return self.group_by + [measure.name for measure in self.measures]
+
+    def formatted_rows(self, missing: str = "") -> Iterator[Tuple[str, ...]]:
+        """
+        Percorre as linhas com os valores prontos para os relatórios: chaves
+        como texto, count como inteiro e as demais medidas com as casas
+        decimais de cada uma.
+        """
+        keys = len(self.group_by)
+        decimals = [measure.decimals for measure in self.measures]
+        for row in self.rows:
+            cells = [missing if value is None else str(value) for value in row[:keys]]
+            for value, places in zip(row[keys:], decimals):
+                if value is None:
+                    cells.append(missing)
+                elif value.__class__ is int:
+                    cells.append(str(value))
+                else:
+                    cells.append(format(value, f".{places}f"))
+            yield tuple(cells)
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Retorna as linhas como dicionários."""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def __repr__(self) -> str:
+        return f"AggregationResult({self.name!r}, groups={len(self.rows)})"
+
+
+def _key_text(value: Any) -> Optional[str]:
+    """O valor de uma coluna-chave como texto (None continua None)."""
+    return None if value is None else str(value)
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """Chaves numéricas em ordem numérica, depois texto, e nulos no fim."""
+    if value is None:
+        return (2, "")
+    number = to_number(value)
+    if number is not None and number == number:
+        return (0, number)
+    return (1, str(value))
+
+
+class Aggregation:
+    """
+    Agregação por hash de linhas de vendas.
+
+    O estado de cada grupo é uma lista [n, soma, mínimo, máximo] por medida,
+    então a memória depende da quantidade de grupos, não de linhas.
+
+    Atributos:
+        name (str): O nome da agregação.
+        group_by (List[str]): As colunas-chave.
+        measures (List[Measure]): As medidas calculadas por grupo.
+    """
+
+    def __init__(self, group_by: Sequence[str], measures: Sequence[Measure], name: Optional[str] = None) -> None:
+        """
+        Inicializa uma nova instância de Aggregation.
+
+        Args:
+            group_by (Sequence[str]): As colunas-chave (ao menos uma).
+            measures (Sequence[Measure]): As medidas (ao menos uma).
+            name (str, opcional): O nome da agregação. Padrão: "Agregação por <chaves>".
+
+        Raises:
+            ExpressionError: Se não houver chaves ou medidas.
+        """
+        if isinstance(group_by, str):
+            group_by = [group_by]
+        if not group_by:
+            raise ExpressionError("A agregação precisa de ao menos uma coluna em group_by.")
+        if not measures:
+            raise ExpressionError("A agregação precisa de ao menos uma medida.")
+        self.group_by = list(group_by)
+        self.measures = list(measures)
+        self.name = name or f"Agregação por {', '.join(self.group_by)}"
+        self._groups: Dict[Tuple[Any, ...], List[List[Any]]] = {}
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Aggregation":
+        """
+        Cria a agregação a partir da configuração:
+        {"name", "group_by": [...], "measures": [{"name", "function", "expression"}, ...]}.
+        """
+        measures = [Measure.from_config(measure) for measure in config.get("measures", [])]
+        return cls(config.get("group_by") or [], measures, config.get("name"))
+
+    @property
+    def columns(self) -> List[str]:
+        """As colunas lidas pela agregação: as chaves e as usadas nas medidas."""
+        columns = list(self.group_by)
+        for measure in self.measures:
+            if measure.expression is not None:
+                columns.extend(c for c in measure.expression.columns if c not in columns)
+        return columns
+
+    def _accumulate(self, pairs: Iterable[Tuple[Tuple[Any, ...], Tuple[Any, ...]]]) -> None:
+        """Acumula pares (chave do grupo, valores das medidas na linha)."""
+        groups = self._groups
+        measure_count = len(self.measures)
+        for key, row_values in pairs:
+            states = groups.get(key)
+            if states is None:
+                states = groups[key] = [[0, 0, None, None] for _ in range(measure_count)]
+            for state, value in zip(states, row_values):
+                if value is None:
+                    continue
+                state[0] += 1
+                state[1] += value
+                if state[2] is None or value < state[2]:
+                    state[2] = value
+                if state[3] is None or value > state[3]:
+                    state[3] = value
+
+    def update(self, row: Mapping[str, Any]) -> None:
+        """Acrescenta uma linha (um dict ou RowView)."""
+        self.update_many((row,))
+
+    def update_many(self, rows: Iterable[Mapping[str, Any]]) -> "Aggregation":
+        """
+        Acrescenta várias linhas, em streaming.
+
+        Returns:
+            Aggregation: A própria agregação, para encadeamento.
+        """
+        group_by = self.group_by
+        expressions = [measure.expression for measure in self.measures]
+        self._accumulate(
+            (tuple([_key_text(row.get(column)) for column in group_by]),
+             tuple([1 if expression is None
+                    else expression(*[to_number(row.get(column)) for column in expression.columns])
+                    for expression in expressions]))
+            for row in rows)
+        return self
+
+    def update_store(self, store: ColumnStore) -> "Aggregation":
+        """
+        Acrescenta todas as linhas de um ColumnStore, lendo apenas as colunas
+        usadas, direto dos buffers (veja Column.iter_numbers).
+
+        Returns:
+            Aggregation: A própria agregação, para encadeamento.
+        """
+        length = len(store)
+        columns = store.columns
+
+        def key_values(name: str) -> Iterator[Any]:
+            column = columns.get(name)
+            return repeat(None, length) if column is None else map(_key_text, column.iter_values(length, None))
+
+        uses: Dict[str, int] = {}
+        for measure in self.measures:
+            if measure.expression is not None:
+                for name in measure.expression.columns:
+                    uses[name] = uses.get(name, 0) + 1
+        numbers: Dict[str, List[Iterator[Optional[float]]]] = {}
+        for name, count in uses.items():
+            column = columns.get(name)
+            iterator = repeat(None, length) if column is None else column.iter_numbers(length)
+            numbers[name] = list(tee(iterator, count)) if count > 1 else [iterator]
+
+        measure_values = []
+        for measure in self.measures:
+            if measure.expression is None:
+                measure_values.append(repeat(1, length))
+            elif not measure.expression.columns:
+                measure_values.append(repeat(measure.expression(), length))
+            else:
+                measure_values.append(map(measure.expression,
+                                          *[numbers[name].pop() for name in measure.expression.columns]))
+        keys = zip(*[key_values(name) for name in self.group_by])
+        self._accumulate(zip(keys, zip(*measure_values)))
+        return self
+
+    def result(self) -> AggregationResult:
+        """
+        Retorna uma linha por grupo, ordenada pelas chaves.
+
+        Returns:
+            AggregationResult: Os grupos e os valores das medidas.
+        """
+        measures = self.measures
+        rows = []
+        for key in sorted(self._groups, key=lambda key: tuple(map(_sort_key, key))):
+            states = self._groups[key]
+            rows.append(key + tuple(measure.value(state) for measure, state in zip(measures, states)))
+        return AggregationResult(self.name, self.group_by, measures, rows)
+
+
+def aggregate(data: Iterable[Mapping[str, Any]], aggregations: Sequence[Aggregation]) -> List[AggregationResult]:
+    """
+    Calcula várias agregações sobre os mesmos dados.
+
+    Em um ColumnStore cada agregação lê apenas as suas colunas; em qualquer
+    outro iterável (inclusive um gerador) todas são alimentadas na mesma
+    passada pelas linhas.
+
+    Returns:
+        List[AggregationResult]: Um resultado por agregação, na mesma ordem.
+    """
+    if isinstance(data, ColumnStore):
+        for aggregation in aggregations:
+            aggregation.update_store(data)
+    else:
+        for row in data:
+            for aggregation in aggregations:
+                aggregation.update(row)
+    return [aggregation.result() for aggregation in aggregations]
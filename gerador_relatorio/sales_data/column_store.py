@@ -0,0 +1,771 @@
+"""
+Este módulo define o armazenamento colunar dos dados de vendas (ColumnStore).
+
+Em vez de um dicionário por linha, cada coluna é guardada em um único buffer:
+
+* colunas numéricas (int/float, ou strings que representam exatamente um
+  número, como "3", "111.04" e "0.10") e colunas de datas ISO ("2023-01-15",
+  guardadas como o ordinal do dia) ficam em um array.array tipado com um
+  bitmap de validade;
+* as demais colunas ficam em uma lista, com as strings internadas
+  (valores repetidos como categorias e meios de pagamento compartilham o
+  mesmo objeto).
+
+Uma célula pode estar preenchida, ser None ou não existir (a linha não tinha
+a coluna); as três situações são preservadas, e as strings numéricas voltam
+exatamente como foram lidas. O acesso por linha é feito com RowView, um
+Mapping somente leitura que os formatadores usam como um dict.
+"""
+
+import sys
+from array import array
+from datetime import date
+from collections.abc import Mapping, Sequence
+from itertools import compress, islice, repeat
+from operator import add, itemgetter, sub
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _MissingType:
+    """Marca uma célula cuja coluna não existia na linha original."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _MissingType()
+
+# Tipos de coluna
+OBJECT = "object"
+INT = "int"                # int do Python
+FLOAT = "float"            # float do Python
+INT_TEXT = "int_text"      # str com um inteiro canônico ("3", "-12")
+FLOAT_TEXT = "float_text"  # str com um decimal de casas fixas ("111.04", "0.10")
+DATE_TEXT = "date_text"    # str com uma data ISO ("2023-01-15")
+
+_TYPECODES = {INT: "q", INT_TEXT: "q", FLOAT: "d", FLOAT_TEXT: "d", DATE_TEXT: "q"}
+
+# Especificações de formato por quantidade de casas decimais (FLOAT_TEXT)
+_MAX_SCALE = 20
+_SPECS = [f".{scale}f" for scale in range(_MAX_SCALE + 1)]
+
+_intern = sys.intern
+
+
+def _set_bits(bitmap: bytearray, start: int, stop: int) -> None:
+    """Liga os bits [start, stop) do bitmap, que já deve ter o tamanho necessário."""
+    while start < stop and start & 7:
+        bitmap[start >> 3] |= 1 << (start & 7)
+        start += 1
+    full_stop = stop & ~7
+    if start < full_stop:
+        bitmap[start >> 3:full_stop >> 3] = b"\xff" * ((full_stop - start) >> 3)
+        start = full_stop
+    while start < stop:
+        bitmap[start >> 3] |= 1 << (start & 7)
+        start += 1
+
+
+def _parse_int(value: Any) -> int:
+    if value.__class__ is not int:
+        raise TypeError(value)
+    return value
+
+
+def _parse_float(value: Any) -> float:
+    if value.__class__ is not float:
+        raise TypeError(value)
+    return value
+
+
+def _parse_int_text(value: Any) -> int:
+    number = int(value)
+    if value.__class__ is not str or str(number) != value:
+        raise ValueError(value)
+    return number
+
+
+def _parse_float_text(value: Any) -> Tuple[float, int]:
+    """Retorna (número, casas decimais) se format(número) reproduz a string exatamente."""
+    if value.__class__ is not str:
+        raise TypeError(value)
+    number = float(value)
+    dot = value.find(".")
+    scale = len(value) - dot - 1 if dot >= 0 else 0
+    if scale > _MAX_SCALE or format(number, _SPECS[scale]) != value:
+        raise ValueError(value)
+    return number, scale
+
+
+def _parse_date_text(value: Any) -> int:
+    """Retorna o ordinal do dia se a string for exatamente a data ISO (AAAA-MM-DD)."""
+    if value.__class__ is not str:
+        raise TypeError(value)
+    day = date.fromisoformat(value)
+    if day.isoformat() != value:
+        raise ValueError(value)
+    return day.toordinal()
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Converte um valor para número como float() (None se for nulo ou não numérico)."""
+    if value is None or value is MISSING:
+        return None
+    cls = value.__class__
+    if cls is int or cls is float:
+        return value
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+_PARSERS = {INT: _parse_int, FLOAT: _parse_float, INT_TEXT: _parse_int_text, FLOAT_TEXT: _parse_float_text,
+            DATE_TEXT: _parse_date_text}
+
+
+def _parse_batch(kind: str, values: List[Any]) -> Tuple[array, Optional[array]]:
+    """
+    Converte um lote inteiro de valores com funções nativas (map), sem chamar
+    código Python por célula. Levanta ValueError/TypeError/OverflowError/
+    IndexError se algum valor não couber exatamente no tipo da coluna.
+
+    Returns:
+        Tuple[array, Optional[array]]: Os valores e, em FLOAT_TEXT, as casas decimais.
+    """
+    if kind == INT_TEXT:
+        numbers = list(map(int, values))
+        if list(map(str, numbers)) != values:
+            raise ValueError("lote fora do padrão da coluna")
+        return array("q", numbers), None
+    if kind == FLOAT_TEXT:
+        numbers = list(map(float, values))
+        # casas decimais = len(v) - posição do ponto - 1 (sem ponto, a conferência abaixo falha)
+        scales = list(map(sub, map(len, values), map(add, map(str.find, values, repeat(".")), repeat(1))))
+        if list(map(format, numbers, map(_SPECS.__getitem__, scales))) != values:
+            raise ValueError("lote fora do padrão da coluna")
+        return array("d", numbers), array("B", scales)
+    if kind == DATE_TEXT:
+        days = list(map(date.fromisoformat, values))
+        if list(map(date.isoformat, days)) != values:
+            raise ValueError("lote fora do padrão da coluna")
+        return array("q", map(date.toordinal, days)), None
+    if set(map(type, values)) - {int if kind == INT else float}:
+        raise TypeError("lote fora do padrão da coluna")
+    return array(_TYPECODES[kind], values), None
+
+
+def _infer_kind(value: Any) -> str:
+    """Escolhe o tipo de armazenamento a partir do primeiro valor não nulo da coluna."""
+    for kind in (INT, FLOAT, INT_TEXT, FLOAT_TEXT, DATE_TEXT):
+        try:
+            parsed = _PARSERS[kind](value)
+            array(_TYPECODES[kind], [parsed[0] if kind == FLOAT_TEXT else parsed])
+        except (ValueError, TypeError, OverflowError):
+            continue
+        return kind
+    return OBJECT
+
+
+class Column:
+    """
+    Uma coluna do ColumnStore.
+
+    Em colunas tipadas, `data` é um array.array e `validity` um bitmap (um bit
+    por linha, 1 = o array guarda o valor). Colunas FLOAT_TEXT guardam também
+    a quantidade de casas decimais de cada célula em `scales`, para devolver
+    a string original. Células inválidas guardam 0 no array; o valor original
+    delas (None ou um valor fora do padrão da coluna) fica em `others`, e a
+    ausência de entrada significa que a coluna não existia na linha. Se os
+    valores fora do padrão passarem de um quarto da coluna, ela vira uma
+    coluna OBJECT (lista).
+
+    Atributos:
+        kind (str, opcional): O tipo de armazenamento (None enquanto só houver nulos
+                              e strings vazias).
+        data (array | list): Os valores da coluna.
+        scales (array, opcional): As casas decimais de cada célula (FLOAT_TEXT).
+        validity (bytearray, opcional): O bitmap de validade das colunas tipadas.
+        others (Dict[int, Any]): Os valores das células inválidas de colunas tipadas.
+    """
+
+    __slots__ = ("kind", "data", "scales", "validity", "others")
+
+    def __init__(self, kind: Optional[str] = None) -> None:
+        """
+        Inicializa uma coluna vazia.
+
+        Args:
+            kind (str, opcional): O tipo de armazenamento, se já for conhecido
+                                  (por exemplo, pelo esquema inferido da fonte).
+                                  Padrão: inferido pelo primeiro valor não nulo.
+        """
+        self.kind: Optional[str] = None
+        self.data: Any = []
+        self.scales: Optional[array] = None
+        self.validity: Optional[bytearray] = None
+        self.others: Dict[int, Any] = {}
+        if kind is not None:
+            self._set_kind(kind)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def buffer(self) -> Any:
+        """
+        Acesso sem cópia aos valores: um memoryview do array em colunas tipadas
+        ou a própria lista em colunas OBJECT.
+        """
+        if self.validity is not None:
+            return memoryview(self.data)
+        return self.data
+
+    def is_valid(self, index: int) -> bool:
+        """Indica se a célula `index` de uma coluna tipada guarda um valor no array."""
+        validity = self.validity
+        return validity is not None and index < len(self.data) and bool(validity[index >> 3] >> (index & 7) & 1)
+
+    def _decode(self, index: int) -> Any:
+        value = self.data[index]
+        kind = self.kind
+        if kind == INT_TEXT:
+            return str(value)
+        if kind == FLOAT_TEXT:
+            return format(value, _SPECS[self.scales[index]])
+        if kind == DATE_TEXT:
+            return date.fromordinal(value).isoformat()
+        return value
+
+    def get(self, index: int) -> Any:
+        """Retorna o valor da linha `index` (MISSING se a coluna não existia na linha)."""
+        data = self.data
+        if index >= len(data):
+            return MISSING
+        validity = self.validity
+        if validity is None:
+            return data[index]
+        if validity[index >> 3] >> (index & 7) & 1:
+            return self._decode(index)
+        return self.others.get(index, MISSING)
+
+    def iter_values(self, length: int, missing: Any = MISSING, start: int = 0) -> Iterator[Any]:
+        """
+        Percorre os valores das linhas [start, length).
+
+        Args:
+            length (int): A quantidade de linhas do ColumnStore (ou o fim do intervalo).
+            missing (Any): O valor devolvido quando a coluna não existia na linha.
+            start (int): A primeira linha. Padrão: 0.
+        """
+        data = self.data
+        stop = min(length, len(data))
+        tail = length - max(stop, start)
+        if start or stop < len(data):
+            values = data[start:stop]
+            scales = self.scales[start:stop] if self.scales is not None else None
+        else:
+            values = data
+            scales = self.scales
+        if self.validity is None:
+            if missing is MISSING:
+                yield from values
+            else:
+                for value in values:
+                    yield missing if value is MISSING else value
+        elif not self.others and self._all_valid():
+            kind = self.kind
+            if kind == INT_TEXT:
+                yield from map(str, values)
+            elif kind == FLOAT_TEXT:
+                yield from map(format, values, map(_SPECS.__getitem__, scales))
+            elif kind == DATE_TEXT:
+                yield from map(date.isoformat, map(date.fromordinal, values))
+            else:
+                yield from values
+        else:
+            get = self.get
+            for index in range(start, stop):
+                value = get(index)
+                yield missing if value is MISSING else value
+        if tail > 0:
+            yield from repeat(missing, tail)
+
+    def iter_numbers(self, length: int) -> Iterator[Optional[float]]:
+        """
+        Percorre os valores das `length` primeiras linhas como números.
+
+        Colunas numéricas devolvem os valores já convertidos, direto do array;
+        células nulas, ausentes ou que float() não converte (texto, datas)
+        devolvem None. Em colunas OBJECT cada valor distinto é convertido uma
+        única vez.
+
+        Args:
+            length (int): A quantidade de linhas do ColumnStore.
+        """
+        data = self.data
+        tail = length - len(data)
+        if self.validity is None:
+            numbers: Dict[Any, Optional[float]] = {}
+            for value in data:
+                try:
+                    number = numbers[value]
+                except KeyError:
+                    number = numbers[value] = to_number(value)
+                except TypeError:  # valor não hasheável
+                    number = to_number(value)
+                yield number
+        elif self.kind == DATE_TEXT:
+            others = self.others
+            yield from map(to_number, map(others.get, range(len(data))))
+        elif not self.others and self._all_valid():
+            yield from data
+        else:
+            validity = self.validity
+            others = self.others
+            for index, value in enumerate(data):
+                if validity[index >> 3] >> (index & 7) & 1:
+                    yield value
+                else:
+                    yield to_number(others.get(index))
+        if tail > 0:
+            yield from repeat(None, tail)
+
+    def _all_valid(self) -> bool:
+        full, rest = divmod(len(self.data), 8)
+        validity = self.validity
+        if validity.__class__ is memoryview:  # coluna de um snapshot (veja open_snapshot)
+            validity = validity.tobytes()
+        if validity.count(0xFF, 0, full) != full:
+            return False
+        return not rest or validity[full] & ((1 << rest) - 1) == (1 << rest) - 1
+
+    def pad(self, length: int) -> None:
+        """Completa a coluna até `length` linhas com células ausentes."""
+        missing_count = length - len(self.data)
+        if missing_count <= 0:
+            return
+        if self.validity is None:
+            self.data.extend(repeat(MISSING, missing_count))
+            return
+        self.data.extend(repeat(0, missing_count))
+        if self.scales is not None:
+            self.scales.extend(repeat(0, missing_count))
+        self._grow_validity(length)
+
+    def extend(self, values: List[Any]) -> None:
+        """
+        Acrescenta valores ao fim da coluna.
+
+        Args:
+            values (List[Any]): Os valores (MISSING para células ausentes).
+        """
+        if self.kind is None:
+            # Nulos e strings vazias não dizem nada sobre o tipo da coluna.
+            first = next((v for v in values if v is not None and v is not MISSING and v != ""), None)
+            if first is None:
+                self.data.extend(values)
+                return
+            self._set_kind(_infer_kind(first))
+        if self.validity is None:
+            try:
+                values = list(map(_intern, values))
+            except TypeError:
+                values = [_intern(v) if v.__class__ is str else v for v in values]
+            self.data.extend(values)
+            return
+
+        # Converte o lote inteiro antes de tocar nos buffers da coluna; se
+        # algum valor não couber no tipo, cai para a conversão célula a célula.
+        start = len(self.data)
+        try:
+            parsed, scales = _parse_batch(self.kind, values)
+        except (ValueError, TypeError, OverflowError, IndexError):
+            self._extend_slow(values)
+            return
+        self.data.extend(parsed)
+        if scales is not None:
+            self.scales.extend(scales)
+        self._grow_validity(start + len(parsed))
+        _set_bits(self.validity, start, start + len(parsed))
+
+    def extend_column(self, other: "Column") -> None:
+        """
+        Acrescenta todos os valores de outra coluna ao fim desta.
+
+        Quando as duas colunas têm o mesmo tipo, os buffers são concatenados
+        diretamente (sem converter valor a valor).
+
+        Args:
+            other (Column): A coluna cujos valores serão acrescentados.
+        """
+        if other.kind is None or other.kind != (self.kind or other.kind):
+            self.extend(list(other.iter_values(len(other))))
+            return
+        if self.kind is None:
+            self._set_kind(other.kind)
+        start = len(self.data)
+        self.data.extend(other.data)
+        if self.validity is None:
+            return
+        if self.scales is not None:
+            self.scales.extend(other.scales)
+        for index, value in other.others.items():
+            self.others[start + index] = value
+        bits = int.from_bytes(self.validity, "little") | (int.from_bytes(other.validity, "little") << start)
+        self.validity = bytearray(bits.to_bytes((len(self.data) + 7) >> 3, "little"))
+        if len(self.others) > 64 and len(self.others) * 4 > len(self.data):
+            self._demote()
+
+    def _extend_slow(self, values: List[Any]) -> None:
+        index = len(self.data)
+        self._grow_validity(index + len(values))
+        for position, value in enumerate(values):
+            if not self._append_typed(index, value):
+                if self.kind == INT_TEXT and self._upgrade_to_float_text(value):
+                    self._extend_slow(values[position:])
+                    return
+                self.data.append(0)
+                if self.scales is not None:
+                    self.scales.append(0)
+                if value is not MISSING:
+                    self.others[index] = value
+            index += 1
+        if len(self.others) > 64 and len(self.others) * 4 > index:
+            self._demote()
+
+    def _append_typed(self, index: int, value: Any) -> bool:
+        try:
+            parsed = _PARSERS[self.kind](value)
+            if self.kind == FLOAT_TEXT:
+                self.data.append(parsed[0])
+                self.scales.append(parsed[1])
+            else:
+                self.data.append(parsed)
+        except (ValueError, TypeError, OverflowError):
+            return False
+        self.validity[index >> 3] |= 1 << (index & 7)
+        return True
+
+    def _upgrade_to_float_text(self, value: Any) -> bool:
+        """Converte uma coluna INT_TEXT em FLOAT_TEXT ao surgir o primeiro decimal ("3" -> "3.5")."""
+        try:
+            _parse_float_text(value)
+        except (ValueError, TypeError):
+            return False
+        if any(abs(number) > 2 ** 53 for number in self.data):
+            return False
+        self.kind = FLOAT_TEXT
+        self.data = array("d", map(float, self.data))
+        self.scales = array("B", bytes(len(self.data)))
+        return True
+
+    def _grow_validity(self, length: int) -> None:
+        needed = (length + 7) >> 3
+        if len(self.validity) < needed:
+            self.validity.extend(bytes(needed - len(self.validity)))
+
+    def _set_kind(self, kind: str) -> None:
+        """Define o tipo de uma coluna que até agora só tinha nulos e strings vazias."""
+        nulls = self.data
+        self.kind = kind
+        if kind == OBJECT:
+            return
+        self.data = array(_TYPECODES[kind], bytes(len(nulls) * 8))
+        if kind == FLOAT_TEXT:
+            self.scales = array("B", bytes(len(nulls)))
+        self.validity = bytearray((len(nulls) + 7) >> 3)
+        self.others = {index: value for index, value in enumerate(nulls) if value is not MISSING}
+
+    def _demote(self) -> None:
+        """Converte a coluna para OBJECT, mantendo todos os valores."""
+        values = [self.get(index) for index in range(len(self.data))]
+        self.kind = OBJECT
+        self.data = []
+        self.scales = None
+        self.validity = None
+        self.others = {}
+        self.extend(values)
+
+
+class RowView(Mapping):
+    """
+    Visão somente leitura de uma linha do ColumnStore, usada como um dict.
+    Só contém as colunas que existiam na linha original.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "ColumnStore", index: int) -> None:
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._store.columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        value = column.get(self._index)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        column = self._store.columns.get(key)
+        if column is None:
+            return default
+        value = column.get(self._index)
+        return default if value is MISSING else value
+
+    def __contains__(self, key: object) -> bool:
+        column = self._store.columns.get(key)
+        return column is not None and column.get(self._index) is not MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._index
+        for name, column in self._store.columns.items():
+            if column.get(index) is not MISSING:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)!r})"
+
+
+class _RowSequence(Sequence):
+    """Sequência de RowViews sobre um intervalo de linhas de um ColumnStore (sem cópia)."""
+
+    def __init__(self, store: "ColumnStore", indices: range) -> None:
+        self._store = store
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _RowSequence(self._store, self._indices[index])
+        return RowView(self._store, self._indices[index])
+
+    def __iter__(self) -> Iterator[RowView]:
+        store = self._store
+        return (RowView(store, index) for index in self._indices)
+
+    def __eq__(self, other: object) -> bool:
+        return _sequence_equals(self, other)
+
+
+def _sequence_equals(rows: Sequence, other: object) -> bool:
+    if not isinstance(other, (Sequence, list)) or isinstance(other, (str, bytes)):
+        return NotImplemented
+    return len(rows) == len(other) and all(a == b for a, b in zip(rows, other))
+
+
+class ColumnStore(Sequence):
+    """
+    Armazenamento colunar de linhas de vendas.
+
+    Linhas são acrescentadas com append/extend e transpostas para as colunas em
+    lotes de BATCH_SIZE linhas, o que permite converter cada coluna de uma vez
+    (map(int, ...), map(float, ...)) em vez de célula a célula.
+
+    Atributos:
+        columns (Dict[str, Column]): As colunas, na ordem em que apareceram.
+        kind_hints (Dict[str, str]): O tipo de armazenamento das colunas novas,
+                                     quando já é conhecido (veja Schema.storage).
+    """
+
+    BATCH_SIZE = 4096
+
+    def __init__(self) -> None:
+        """Inicializa um ColumnStore vazio."""
+        self.kind_hints: Dict[str, str] = {}
+        self._columns: Dict[str, Column] = {}
+        self._length = 0
+        self._pending: List[Mapping[str, Any]] = []
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "ColumnStore":
+        """Cria um ColumnStore a partir de linhas (dicts ou RowViews)."""
+        store = cls()
+        store.extend(rows)
+        return store
+
+    @property
+    def columns(self) -> Dict[str, Column]:
+        """As colunas do armazenamento."""
+        if self._pending:
+            self._flush()
+        return self._columns
+
+    @property
+    def column_names(self) -> List[str]:
+        """Os nomes das colunas, na ordem em que apareceram."""
+        return list(self.columns)
+
+    def column(self, name: str) -> Column:
+        """
+        Retorna uma coluna, sem cópia.
+
+        Raises:
+            KeyError: Se a coluna não existir.
+        """
+        return self.columns[name]
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """Acrescenta uma linha."""
+        self._pending.append(row)
+        if len(self._pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def extend(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Acrescenta várias linhas."""
+        append = self.append
+        for row in rows:
+            append(row)
+
+    def _flush(self) -> None:
+        rows = self._pending
+        self._pending = []
+        start = self._length
+        columns = self._columns
+
+        keys = rows[0].keys()
+        uniform = all(row.keys() == keys for row in rows)
+        if uniform:
+            names = list(keys)
+        else:
+            names = list(dict.fromkeys(name for row in rows for name in row))
+
+        for name in names:
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = Column(self.kind_hints.get(name))
+            column.pad(start)
+            if uniform:
+                values = list(map(itemgetter(name), rows))
+            else:
+                values = [row.get(name, MISSING) for row in rows]
+            column.extend(values)
+        self._length = start + len(rows)
+
+    def extend_store(self, other: "ColumnStore") -> None:
+        """
+        Acrescenta todas as linhas de outro ColumnStore, coluna a coluna.
+
+        Usado para juntar os dados extraídos em paralelo (cada fonte monta o
+        seu próprio ColumnStore) sem voltar a percorrer as linhas.
+
+        Args:
+            other (ColumnStore): As linhas a serem acrescentadas.
+        """
+        if self._pending:
+            self._flush()
+        start = self._length
+        columns = self._columns
+        for name, other_column in other.columns.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = Column()
+            column.pad(start)
+            column.extend_column(other_column)
+        self._length = start + len(other)
+
+    def __len__(self) -> int:
+        return self._length + len(self._pending)
+
+    def __getitem__(self, index):
+        if self._pending:
+            self._flush()
+        if isinstance(index, slice):
+            return _RowSequence(self, range(self._length)[index])
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("índice de linha fora do intervalo")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        if self._pending:
+            self._flush()
+        return (RowView(self, index) for index in range(self._length))
+
+    def __eq__(self, other: object) -> bool:
+        return _sequence_equals(self, other)
+
+    def __repr__(self) -> str:
+        return f"ColumnStore(rows={len(self)}, columns={list(self._columns)})"
+
+    def iter_values(self, columns: List[str], missing: Any = "", start: int = 0,
+                    stop: Optional[int] = None) -> Iterator[Tuple[Any, ...]]:
+        """
+        Percorre as linhas como tuplas com os valores das colunas pedidas.
+
+        É o caminho rápido para os formatadores: cada coluna é percorrida
+        diretamente no seu buffer, sem criar um RowView por linha.
+
+        Args:
+            columns (List[str]): As colunas, na ordem desejada.
+            missing (Any): O valor usado quando a coluna não existe na linha.
+            start (int): A primeira linha. Padrão: 0.
+            stop (int, opcional): O fim do intervalo. Padrão: todas as linhas.
+
+        Yields:
+            Tuple[Any, ...]: Os valores de cada linha.
+        """
+        store_columns = self.columns
+        stop = self._length if stop is None else max(min(stop, self._length), 0)
+        start = min(max(start, 0), stop)
+        iterators = []
+        for name in columns:
+            column = store_columns.get(name)
+            if column is None:
+                iterators.append(repeat(missing, stop - start))
+            else:
+                iterators.append(column.iter_values(stop, missing, start))
+        if not iterators:
+            return iter(repeat((), stop - start))
+        return zip(*iterators)
+
+    def compress(self, selectors: Sequence[int]) -> "ColumnStore":
+        """
+        Retorna um ColumnStore novo apenas com as linhas cujo seletor é
+        verdadeiro (como itertools.compress), mantendo a ordem e o tipo de
+        cada coluna.
+
+        Args:
+            selectors (Sequence[int]): Um seletor por linha (por exemplo, um
+                                       bytearray com 1 para as linhas mantidas).
+        """
+        store_columns = self.columns
+        length = self._length
+        selected = ColumnStore()
+        for name, column in store_columns.items():
+            values = list(compress(column.iter_values(length), selectors))
+            if all(value is MISSING for value in values):
+                continue
+            new_column = selected._columns[name] = Column(column.kind)
+            for start in range(0, len(values), self.BATCH_SIZE):
+                new_column.extend(values[start:start + self.BATCH_SIZE])
+        selected._length = sum(1 for selector in islice(selectors, length) if selector)
+        return selected
+
+    def project(self, columns: List[str]) -> "ColumnStore":
+        """
+        Retorna um ColumnStore apenas com as colunas pedidas, compartilhando os
+        buffers das colunas (sem copiar os valores).
+
+        Args:
+            columns (List[str]): As colunas a manter; colunas inexistentes são ignoradas.
+        """
+        store_columns = self.columns
+        projected = ColumnStore()
+        projected._columns = {name: store_columns[name] for name in columns if name in store_columns}
+        projected._length = self._length
+        return projected
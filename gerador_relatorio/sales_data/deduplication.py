@@ -0,0 +1,325 @@
+"""
+Este módulo define a deduplicação das vendas consolidadas: linhas com a
+mesma chave (por exemplo, order_id e store_id) vindas de arquivos reenviados
+ou da mesma venda vista pela API e por uma exportação CSV.
+
+As chaves já vistas ficam em um KeyIndex: um hash de 128 bits por chave, em
+memória até max_memory_keys chaves e, a partir daí, despejado em uma tabela
+SQLite temporária em disco, onde as chaves novas são procuradas em lote.
+Opcionalmente (bloom_error), um filtro de Bloom de todas as chaves vistas
+responde sem consultar o disco à maioria das chaves novas; só as chaves que
+o filtro pode já ter visto são procuradas no SQLite. O filtro custa mais CPU
+do que as consultas em lote enquanto o arquivo cabe no cache do sistema, e
+compensa quando o índice em disco passa disso. A memória usada fica limitada
+pela quantidade de chaves em memória (mais cerca de 1,2 byte por linha do
+filtro de Bloom), e não pela quantidade de linhas.
+
+Com keep="first" fica a primeira ocorrência de cada chave (na ordem das
+fontes e das linhas); com keep="last", a última, na posição em que aparece.
+"""
+
+import math
+import os
+import sqlite3
+import tempfile
+from hashlib import blake2b
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from gerador_relatorio.sales_data.column_store import ColumnStore
+
+# Quantidade de linhas lidas (e de chaves procuradas no índice) de cada vez.
+BLOCK_SIZE = 65536
+
+# Quantidade máxima de chaves por consulta ao SQLite (limite de parâmetros).
+_QUERY_SIZE = 500
+
+_MASK64 = (1 << 64) - 1
+
+
+def key_digest(values: Sequence[Any]) -> Optional[int]:
+    """
+    Retorna o hash de 128 bits da chave de uma linha.
+
+    Os valores são comparados pelo texto (o número 7 e a string "7" são a
+    mesma chave, como nas linhas de uma API e de um CSV).
+
+    Args:
+        values (Sequence[Any]): Os valores das colunas da chave.
+
+    Returns:
+        Optional[int]: O hash, ou None se algum valor for nulo ou vazio (linhas
+                       sem chave completa nunca são consideradas duplicadas).
+    """
+    parts = []
+    for value in values:
+        if value is None or value == "":
+            return None
+        parts.append(value if value.__class__ is str else str(value))
+    data = "\x1f".join(parts).encode("utf-8", "surrogatepass")
+    return int.from_bytes(blake2b(data, digest_size=16).digest(), "big")
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de hashes de 128 bits (veja key_digest).
+
+    Atributos:
+        size (int): A quantidade de bits.
+        hash_count (int): A quantidade de bits ligados por chave.
+        bits (bytearray): Os bits do filtro.
+    """
+
+    def __init__(self, capacity: int, error: float = 0.01) -> None:
+        """
+        Inicializa um filtro vazio.
+
+        Args:
+            capacity (int): A quantidade de chaves esperada.
+            error (float): A taxa de falsos positivos com `capacity` chaves.
+        """
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) >> 3)
+
+    def _positions(self, digest: int) -> List[int]:
+        # Hash duplo: as duas metades do hash de 128 bits geram todas as posições.
+        first, second = digest & _MASK64, (digest >> 64) | 1
+        size = self.size
+        return [(first + index * second) % size for index in range(self.hash_count)]
+
+    def add(self, digest: int) -> None:
+        """Acrescenta uma chave."""
+        bits = self.bits
+        for position in self._positions(digest):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: int) -> bool:
+        bits = self.bits
+        for position in self._positions(digest):
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+
+class KeyIndex:
+    """
+    Conjunto das chaves já vistas, com despejo em disco.
+
+    Atributos:
+        max_memory_keys (int): A quantidade máxima de chaves em memória.
+        expected_keys (int): A quantidade de chaves esperada (dimensiona o filtro de Bloom).
+        bloom_error (float, opcional): A taxa de falsos positivos do filtro de
+                                       Bloom (None: sem filtro).
+        directory (str, opcional): O diretório do arquivo SQLite temporário.
+        spilled_keys (int): A quantidade de chaves despejadas em disco.
+    """
+
+    def __init__(self, max_memory_keys: int = 1_000_000, expected_keys: int = 0,
+                 bloom_error: Optional[float] = None, directory: Optional[str] = None) -> None:
+        """
+        Inicializa um índice vazio.
+
+        Args:
+            max_memory_keys (int): A quantidade máxima de chaves em memória.
+            expected_keys (int): A quantidade de chaves esperada.
+            bloom_error (float, opcional): A taxa de falsos positivos do filtro
+                                           de Bloom (None: sem filtro).
+            directory (str, opcional): O diretório do arquivo SQLite temporário.
+                                       Padrão: o diretório temporário do sistema.
+        """
+        self.max_memory_keys = max_memory_keys
+        self.expected_keys = expected_keys
+        self.bloom_error = bloom_error
+        self.directory = directory
+        self.spilled_keys = 0
+        self._memory: set = set()
+        self._bloom: Optional[BloomFilter] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._path: Optional[str] = None
+
+    def __enter__(self) -> "KeyIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Fecha e apaga o arquivo SQLite, se houver um."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._path is not None:
+            os.remove(self._path)
+            self._path = None
+
+    @property
+    def spilled(self) -> bool:
+        """Se alguma chave foi despejada em disco."""
+        return self._connection is not None
+
+    def add_many(self, digests: Iterable[int]) -> List[bool]:
+        """
+        Acrescenta chaves, na ordem recebida.
+
+        Args:
+            digests (Iterable[int]): Os hashes das chaves (veja key_digest).
+
+        Returns:
+            List[bool]: Para cada chave, se ela é nova (não tinha sido vista
+                        antes, nem nesta chamada).
+        """
+        memory = self._memory
+        bloom = self._bloom
+        spilled = self.spilled
+        results: List[bool] = []
+        candidates: List[Tuple[int, int]] = []  # (posição em results, hash) a procurar em disco
+        for digest in digests:
+            if digest in memory:
+                results.append(False)
+                continue
+            memory.add(digest)
+            results.append(True)
+            if spilled and (bloom is None or digest in bloom):
+                candidates.append((len(results) - 1, digest))
+            if bloom is not None:
+                bloom.add(digest)
+        if candidates:
+            found = self._find_on_disk([digest for _, digest in candidates])
+            for position, digest in candidates:
+                if digest in found:
+                    results[position] = False
+        if len(memory) >= self.max_memory_keys:
+            self._spill()
+        return results
+
+    def _find_on_disk(self, digests: List[int]) -> set:
+        found = set()
+        for start in range(0, len(digests), _QUERY_SIZE):
+            block = [digest.to_bytes(16, "big") for digest in digests[start:start + _QUERY_SIZE]]
+            query = f"SELECT digest FROM keys WHERE digest IN ({','.join('?' * len(block))})"
+            found.update(int.from_bytes(row[0], "big") for row in self._connection.execute(query, block))
+        return found
+
+    def _spill(self) -> None:
+        """Despeja as chaves em memória no SQLite (criando o arquivo e o filtro de Bloom na primeira vez)."""
+        if self._connection is None:
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+            descriptor, self._path = tempfile.mkstemp(prefix="deduplicacao-", suffix=".sqlite3", dir=self.directory)
+            os.close(descriptor)
+            self._connection = sqlite3.connect(self._path)
+            self._connection.execute("PRAGMA journal_mode = OFF")
+            self._connection.execute("PRAGMA synchronous = OFF")
+            self._connection.execute("CREATE TABLE keys (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+            if self.bloom_error is not None:
+                self._bloom = BloomFilter(max(self.expected_keys, len(self._memory)), self.bloom_error)
+                for digest in self._memory:
+                    self._bloom.add(digest)
+        # Em ordem, as inserções só acrescentam páginas ao fim da árvore B do SQLite.
+        with self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO keys VALUES (?)",
+                                         ((digest.to_bytes(16, "big"),) for digest in sorted(self._memory)))
+        self.spilled_keys += len(self._memory)
+        self._memory = set()
+
+
+class DeduplicationOptions:
+    """
+    Configuração da deduplicação.
+
+    Atributos:
+        keys (List[str]): As colunas que identificam uma venda.
+        keep (str): "first" (a primeira ocorrência) ou "last" (a última).
+        max_memory_keys (int): A quantidade máxima de chaves em memória antes
+                               do despejo em disco.
+        bloom_error (float, opcional): A taxa de falsos positivos do filtro de
+                                       Bloom do índice em disco (None: sem filtro).
+        spill_directory (str, opcional): O diretório do índice em disco.
+    """
+
+    KEEP_POLICIES = ("first", "last")
+
+    def __init__(self, keys: List[str], keep: str = "first", max_memory_keys: int = 1_000_000,
+                 bloom_error: Optional[float] = None, spill_directory: Optional[str] = None) -> None:
+        """
+        Inicializa uma nova instância de DeduplicationOptions.
+
+        Raises:
+            ValueError: Se as opções forem inválidas.
+        """
+        if isinstance(keys, str) or not keys:
+            raise ValueError("'keys' deve ser uma lista não vazia de colunas.")
+        if keep not in self.KEEP_POLICIES:
+            raise ValueError(f"'keep' deve ser um de: {', '.join(self.KEEP_POLICIES)}.")
+        if max_memory_keys < 1:
+            raise ValueError("max_memory_keys deve ser maior que zero.")
+        if bloom_error is not None and not 0 < bloom_error < 1:
+            raise ValueError("bloom_error deve estar entre 0 e 1.")
+        self.keys = list(keys)
+        self.keep = keep
+        self.max_memory_keys = max_memory_keys
+        self.bloom_error = bloom_error
+        self.spill_directory = spill_directory
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["DeduplicationOptions"]:
+        """
+        Cria as opções a partir da configuração ("deduplication").
+
+        Args:
+            config: None (sem deduplicação) ou um dicionário com keys, keep,
+                    max_memory_keys, bloom_error e spill_directory.
+
+        Raises:
+            ValueError: Se a configuração for inválida.
+        """
+        if not config:
+            return None
+        if not isinstance(config, Mapping):
+            raise ValueError("'deduplication' deve ser um objeto.")
+        unknown = set(config) - {"keys", "keep", "max_memory_keys", "bloom_error", "spill_directory"}
+        if unknown:
+            raise ValueError(f"Opções de deduplicação desconhecidas: {', '.join(sorted(unknown))}.")
+        if "keys" not in config:
+            raise ValueError("'keys' não especificado.")
+        return cls(**config)
+
+    def __repr__(self) -> str:
+        return f"DeduplicationOptions(keys={self.keys!r}, keep={self.keep!r})"
+
+
+def duplicate_mask(store: ColumnStore, options: DeduplicationOptions) -> Tuple[bytearray, int, bool]:
+    """
+    Marca as linhas mantidas pela deduplicação, em uma passada por blocos
+    (do fim para o começo com keep="last").
+
+    Args:
+        store (ColumnStore): As vendas consolidadas.
+        options (DeduplicationOptions): As chaves e a política.
+
+    Returns:
+        Tuple[bytearray, int, bool]: Um byte por linha (1 = mantida), a
+            quantidade de linhas removidas e se o índice precisou do disco.
+    """
+    length = len(store)
+    keep = bytearray(b"\x01") * length
+    removed = 0
+    blocks = [(start, min(start + BLOCK_SIZE, length)) for start in range(0, length, BLOCK_SIZE)]
+    last = options.keep == "last"
+    if last:
+        blocks.reverse()
+    with KeyIndex(options.max_memory_keys, length, options.bloom_error, options.spill_directory) as index:
+        for start, stop in blocks:
+            positions: Iterable[int] = range(start, stop)
+            keys: Iterable[Tuple[Any, ...]] = store.iter_values(options.keys, None, start, stop)
+            if last:
+                positions, keys = reversed(positions), reversed(list(keys))
+            keyed = [(position, digest) for position, digest in zip(positions, map(key_digest, keys))
+                     if digest is not None]
+            for (position, _), new in zip(keyed, index.add_many(digest for _, digest in keyed)):
+                if not new:
+                    keep[position] = 0
+                    removed += 1
+        spilled = index.spilled
+    return keep, removed, spilled
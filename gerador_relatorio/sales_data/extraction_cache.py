@@ -0,0 +1,182 @@
+"""
+Este módulo define a classe ExtractionCache, um cache em disco do resultado da
+extração de cada fonte: os dados já convertidos para ColumnStore, as
+estatísticas parciais e o esquema inferido da fonte.
+
+Uma fonte só é lida do cache se ainda estiver igual à versão guardada
+(DataSource.is_cache_valid): para arquivos locais, mesmo tamanho e data de
+modificação (ou mesmo conteúdo); para fontes web, uma revalidação com o
+servidor (ETag/Last-Modified). As entradas mais antigas são removidas quando
+o cache passa do tamanho ou da quantidade de entradas configurados (LRU).
+
+Cada entrada guarda dois pickles em sequência: um cabeçalho pequeno (versão,
+chave e validadores) e a extração. A validação lê só o cabeçalho; os dados
+são carregados apenas quando a entrada ainda vale.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from gerador_relatorio.data_source.data_source import DataSource
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.schema import Schema
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+
+# Versão do formato das entradas; entradas de outra versão são ignoradas.
+CACHE_FORMAT_VERSION = 5
+
+_SUFFIX = ".pkl"
+
+
+class ExtractionCache:
+    """
+    Cache em disco das extrações de fontes de dados.
+
+    Cada entrada é um arquivo no diretório do cache, com o cabeçalho e a
+    extração gravados como dois pickles. O cache deve ficar
+    em um diretório confiável: os arquivos são lidos com pickle.
+
+    Atributos:
+        directory (str): O diretório das entradas.
+        max_bytes (int): O tamanho máximo do cache, em bytes.
+        max_entries (int, opcional): A quantidade máxima de entradas.
+    """
+
+    def __init__(self, directory: str = ".cache/extracao", max_bytes: int = 512 * 2 ** 20,
+                 max_entries: Optional[int] = None) -> None:
+        """
+        Inicializa uma nova instância de ExtractionCache.
+
+        Args:
+            directory (str): O diretório das entradas (criado se não existir).
+            max_bytes (int): O tamanho máximo do cache, em bytes. Padrão: 512 MiB.
+            max_entries (int, opcional): A quantidade máxima de entradas.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + _SUFFIX)
+
+    def load(self, source: DataSource) -> Optional[Tuple[ColumnStore, StatisticsAccumulator, Schema]]:
+        """
+        Lê a extração da fonte do cache, se ela ainda for válida.
+
+        Args:
+            source (DataSource): A fonte de dados.
+
+        Returns:
+            Optional[Tuple[ColumnStore, StatisticsAccumulator, Schema]]: Os dados,
+                as estatísticas parciais e o esquema, ou None se não houver
+                entrada válida.
+        """
+        key = source.cache_key()
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                header = pickle.load(file)
+                if (not isinstance(header, dict) or header.get("version") != CACHE_FORMAT_VERSION
+                        or header.get("key") != key or not source.is_cache_valid(header["validators"])):
+                    return None
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Aviso: entrada de cache inválida para {key}: {e}")
+            return None
+        try:
+            os.utime(path)  # Marca a entrada como usada recentemente (LRU).
+        except OSError:
+            pass
+        return entry["data"], entry["statistics"], entry["schema"]
+
+    def save(self, source: DataSource, data: ColumnStore, statistics: StatisticsAccumulator,
+             schema: Optional[Schema] = None) -> bool:
+        """
+        Guarda a extração da fonte no cache.
+
+        Nada é guardado se a fonte não tiver chave ou validadores (por exemplo,
+        uma fonte web sem ETag/Last-Modified) ou se a entrada sozinha for maior
+        que max_bytes.
+
+        Args:
+            source (DataSource): A fonte de dados, já extraída.
+            data (ColumnStore): Os dados extraídos da fonte.
+            statistics (StatisticsAccumulator): As estatísticas parciais da fonte.
+            schema (Schema, opcional): O esquema inferido da fonte.
+
+        Returns:
+            bool: True se a entrada foi guardada.
+        """
+        key = source.cache_key()
+        validators = source.cache_validators()
+        if key is None or validators is None:
+            return False
+        header: Dict[str, Any] = {"version": CACHE_FORMAT_VERSION, "key": key, "validators": validators,
+                                  "created": time.time()}
+        entry: Dict[str, Any] = {"data": data, "statistics": statistics,
+                                 "schema": schema if schema is not None else Schema()}
+        os.makedirs(self.directory, exist_ok=True)
+        # Grava em um arquivo temporário e renomeia: leitores nunca veem uma entrada pela metade.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.getsize(tmp_path) > self.max_bytes:
+                os.remove(tmp_path)
+                return False
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """Remove as entradas usadas há mais tempo até respeitar os limites do cache."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for item in scan:
+                    if item.name.endswith(_SUFFIX):
+                        try:
+                            stat = item.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, item.path))
+        except FileNotFoundError:
+            return
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            count -= 1
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        try:
+            with os.scandir(self.directory) as scan:
+                paths = [item.path for item in scan if item.name.endswith(_SUFFIX)]
+        except FileNotFoundError:
+            return
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
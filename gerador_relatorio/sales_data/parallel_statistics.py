@@ -0,0 +1,87 @@
+"""
+Este módulo calcula as estatísticas de um ColumnStore em paralelo, em vários
+processos.
+
+As linhas são divididas em blocos de `chunk_size` linhas; cada processo
+calcula as estatísticas parciais dos seus blocos (StatisticsAccumulator.update_store)
+e os parciais são combinados na ordem dos blocos com merge(), que é exato: o
+resultado é idêntico ao cálculo serial.
+
+O ColumnStore não é enviado bloco a bloco: cada worker o recebe uma única vez,
+na inicialização do processo. Com o método de início "fork" (o padrão no
+Linux) nem isso é serializado, já que o processo filho herda a memória do pai;
+os blocos trafegam apenas como intervalos (início, fim) e os parciais como
+acumuladores pequenos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.sketches import SketchOptions
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+
+# Quantidade padrão de linhas por bloco.
+DEFAULT_CHUNK_SIZE = 250_000
+
+# O ColumnStore e as opções de sketches do processo worker (definidos por _init_worker).
+_worker_store: Optional[ColumnStore] = None
+_worker_sketch_options: Optional[SketchOptions] = None
+
+
+def _init_worker(store: ColumnStore, sketch_options: Optional[SketchOptions] = None) -> None:
+    global _worker_store, _worker_sketch_options
+    _worker_store = store
+    _worker_sketch_options = sketch_options
+
+
+def _chunk_statistics(start: int, stop: int) -> StatisticsAccumulator:
+    return StatisticsAccumulator(_worker_sketch_options).update_store(_worker_store, start, stop)
+
+
+def chunk_ranges(start: int, stop: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Divide o intervalo de linhas [start, stop) em blocos de até chunk_size linhas."""
+    return [(chunk, min(chunk + chunk_size, stop)) for chunk in range(start, stop, chunk_size)]
+
+
+def compute_statistics(store: ColumnStore, start: int = 0, stop: Optional[int] = None,
+                       max_workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       sketch_options: Optional[SketchOptions] = None) -> StatisticsAccumulator:
+    """
+    Calcula as estatísticas das linhas [start, stop) de um ColumnStore.
+
+    Com max_workers > 1 e mais de um bloco, os blocos são calculados em um
+    pool de processos; caso contrário, o cálculo é serial, no próprio processo.
+
+    Args:
+        store (ColumnStore): Os dados.
+        start (int): A primeira linha. Padrão: 0.
+        stop (int, opcional): O fim do intervalo. Padrão: todas as linhas.
+        max_workers (int): A quantidade máxima de processos. Padrão: 1 (serial).
+        chunk_size (int): A quantidade de linhas por bloco.
+        sketch_options (SketchOptions, opcional): Calcula também os sketches das
+                                                  colunas escolhidas (aproximados).
+
+    Returns:
+        StatisticsAccumulator: As estatísticas, idênticas às do cálculo serial
+                               (os sketches podem diferir dentro dos seus erros).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size deve ser maior que zero.")
+    if stop is None:
+        stop = len(store)
+    chunks = chunk_ranges(start, stop, chunk_size)
+    if max_workers <= 1 or len(chunks) <= 1:
+        return StatisticsAccumulator(sketch_options).update_store(store, start, stop)
+
+    store.columns  # Descarrega as linhas pendentes antes de compartilhar o store.
+    statistics = StatisticsAccumulator(sketch_options)
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)),
+                             initializer=_init_worker, initargs=(store, sketch_options)) as pool:
+        starts, stops = zip(*chunks)
+        for partial in pool.map(_chunk_statistics, starts, stops):
+            statistics.merge(partial)
+    # Cada bloco só vê as colunas que existem nele: restaura a ordem do cálculo serial.
+    statistics.columns = {name: statistics.columns[name] for name in store.columns
+                          if name in statistics.columns}
+    return statistics
@@ -3,164 +3,571 @@ Este módulo define a classe SalesData para armazenar e consolidar
 os dados de vendas extraídos das diferentes fontes de dados.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+import hashlib
+import json
 import numbers
+import time
 from gerador_relatorio.data_source.data_source import DataSource
+from gerador_relatorio.profiling import Profiler
+from gerador_relatorio.sales_data.aggregation import Aggregation, AggregationResult, aggregate
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.deduplication import DeduplicationOptions, duplicate_mask
+from gerador_relatorio.sales_data.extraction_cache import ExtractionCache
+from gerador_relatorio.sales_data.parallel_statistics import DEFAULT_CHUNK_SIZE, compute_statistics
+from gerador_relatorio.sales_data.schema import SAMPLE_SIZE, Schema, infer_schema
+from gerador_relatorio.sales_data.sketches import SketchOptions
+from gerador_relatorio.sales_data.snapshot import open_snapshot, write_snapshot
+from gerador_relatorio.sales_data.source_result import SourceResult
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+
+
+def _extract_into(source: DataSource, data: ColumnStore, statistics_workers: int = 1,
+                  statistics_chunk_size: int = DEFAULT_CHUNK_SIZE, sketches: Optional[SketchOptions] = None
+                  ) -> Tuple[StatisticsAccumulator, Schema, float, Dict[str, Any]]:
+    """
+    Lê as linhas da fonte em streaming e as grava em `data`, um ColumnStore
+    vazio.
+
+    As primeiras linhas são usadas como amostra para inferir o esquema da
+    fonte, que define o armazenamento de cada coluna antes da gravação (cada
+    célula é convertida uma única vez). As estatísticas parciais são
+    calculadas depois, coluna a coluna, sobre os valores já convertidos, em
+    blocos paralelos se statistics_workers > 1 (veja compute_statistics).
+
+    Returns:
+        Tuple[StatisticsAccumulator, Schema, float, Dict[str, Any]]: As
+            estatísticas e o esquema da fonte, o tempo de extração e as
+            métricas da extração (cpu_time, statistics_elapsed e bytes_read).
+    """
+    start, start_cpu = time.perf_counter(), time.thread_time()
+    rows = iter(source.iter_rows())
+    sample = list(islice(rows, SAMPLE_SIZE))
+    schema = infer_schema(sample)
+    data.kind_hints.update(schema.storage)
+    data.extend(sample)
+    data.extend(rows)
+    statistics_start = time.perf_counter()
+    statistics = compute_statistics(data, max_workers=statistics_workers, chunk_size=statistics_chunk_size,
+                                    sketch_options=sketches)
+    end = time.perf_counter()
+    metrics = {"cpu_time": time.thread_time() - start_cpu, "statistics_elapsed": end - statistics_start,
+               "bytes_read": source.bytes_read()}
+    return statistics, schema.adjusted_to(data), end - start, metrics
+
+
+def _extract_partition(source: DataSource, cache: Optional[ExtractionCache] = None,
+                       statistics_workers: int = 1, statistics_chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       sketches: Optional[SketchOptions] = None
+                       ) -> Tuple[ColumnStore, StatisticsAccumulator, Schema, float, bool, Dict[str, Any]]:
+    """
+    Extrai uma fonte para um ColumnStore próprio, passando pelo cache de
+    extração se houver um. Executada nos workers da extração concorrente
+    (threads ou processos), por isso fica no nível do módulo: precisa ser
+    serializável com pickle.
+
+    Returns:
+        Tuple[ColumnStore, StatisticsAccumulator, Schema, float, bool, Dict[str, Any]]:
+            Os dados, as estatísticas, o esquema, o tempo gasto, se os dados
+            vieram do cache e as métricas da extração.
+    """
+    start, start_cpu = time.perf_counter(), time.thread_time()
+    if cache is not None:
+        cached = cache.load(source)
+        if cached is not None:
+            data, statistics, schema = cached
+            if statistics.sketch_options != sketches:
+                # Guardado com outros sketches: só eles são recalculados, a partir dos dados do cache.
+                statistics.sketch_options, statistics.sketches = sketches, {}
+                if sketches is not None:
+                    statistics.update_sketches(data)
+            return (data, statistics, schema, time.perf_counter() - start, True,
+                    {"cpu_time": time.thread_time() - start_cpu})
+    data = ColumnStore()
+    statistics, schema, elapsed, metrics = _extract_into(source, data, statistics_workers, statistics_chunk_size,
+                                                         sketches)
+    if cache is not None:
+        cache.save(source, data, statistics, schema)
+    return data, statistics, schema, elapsed, False, metrics
 
 
 class SalesData:
     """
     Classe para representar os dados de vendas extraídos das fontes de dados.
 
+    Os dados ficam em um ColumnStore (armazenamento colunar): colunas numéricas
+    em arrays tipados e colunas de texto em listas compactas. Cada linha pode
+    ser lida como um dicionário (RowView).
+
     Atributos:
-        data (List[Dict[str, Any]]): Uma lista de dicionários, onde cada dicionário
-                                     representa uma venda.
+        data (ColumnStore): As vendas, uma linha por venda.
         available_columns (List[str]): Uma lista das colunas disponíveis nos dados.
     """
 
-    def __init__(self, data: List[Dict[str, Any]], available_columns: List[str]) -> None:
+    def __init__(self, data: Iterable[Dict[str, Any]], available_columns: List[str]) -> None:
         """
         Inicializa uma nova instância de SalesData.
 
         Args:
-            data (List[Dict[str, Any]]): A lista inicial de dados de vendas.
+            data (Iterable[Dict[str, Any]]): Os dados de vendas (lista de
+                                             dicionários ou ColumnStore).
             available_columns (List[str]): As colunas disponíveis nos dados.
         """
-        self.data = data
+        self.data = data if isinstance(data, ColumnStore) else ColumnStore.from_rows(data)
         self.available_columns = available_columns
 
+    @staticmethod
+    def extract_source(source: DataSource, data: Optional[ColumnStore] = None,
+                       cache: Optional[ExtractionCache] = None, statistics_workers: int = 1,
+                       statistics_chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       sketches: Optional[SketchOptions] = None) -> SourceResult:
+        """
+        Extrai os dados de uma única fonte, uma única vez.
+
+        As linhas são lidas em streaming (DataSource.iter_rows) para um
+        ColumnStore da fonte, com o armazenamento de cada coluna definido pelo
+        esquema inferido de uma amostra (veja infer_schema), e então
+        acrescentadas a `data` coluna a coluna. As estatísticas parciais da
+        fonte são calculadas sobre as colunas já convertidas.
+        Com um cache, fontes que não mudaram desde a última execução são lidas
+        do cache, sem reprocessar as linhas.
+
+        Args:
+            source (DataSource): A fonte de dados a ser extraída.
+            data (ColumnStore, opcional): Onde as linhas serão acrescentadas.
+                                          Padrão: um ColumnStore novo.
+            cache (ExtractionCache, opcional): O cache de extração.
+            statistics_workers (int): Processos usados nas estatísticas da fonte.
+                                      Padrão: 1 (cálculo serial).
+            statistics_chunk_size (int): Linhas por bloco das estatísticas em paralelo.
+            sketches (SketchOptions, opcional): Os sketches calculados com as estatísticas.
+
+        Returns:
+            SourceResult: As colunas, a quantidade de linhas, as estatísticas
+                          parciais, o esquema e o tempo de extração.
+        """
+        if data is None:
+            data = ColumnStore()
+        return SalesData._add_partition(source, data, *_extract_partition(
+            source, cache, statistics_workers, statistics_chunk_size, sketches))
+
+    @staticmethod
+    def _add_partition(source: DataSource, data: ColumnStore, partition: ColumnStore,
+                       statistics: StatisticsAccumulator, schema: Schema, elapsed: float,
+                       from_cache: bool = False, metrics: Optional[Dict[str, Any]] = None) -> SourceResult:
+        """Acrescenta os dados extraídos de uma fonte a `data` e monta o seu SourceResult."""
+        start_index = len(data)
+        data.extend_store(partition)
+        if not statistics.row_count:
+            print(f"Aviso: {source} retornou uma lista de dados vazia.")
+        metrics = metrics or {}
+        return SourceResult(source, data, start_index, statistics.row_count,
+                            list(statistics.columns), elapsed, statistics, from_cache, schema,
+                            cpu_time=metrics.get("cpu_time"), statistics_elapsed=metrics.get("statistics_elapsed"),
+                            bytes_read=metrics.get("bytes_read"))
+
+    @staticmethod
+    def extract_sources(sources: List[DataSource], data: Optional[ColumnStore] = None,
+                        cache: Optional[ExtractionCache] = None, statistics_workers: int = 1,
+                        statistics_chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        sketches: Optional[SketchOptions] = None) -> List[SourceResult]:
+        """
+        Extrai cada fonte de dados exatamente uma vez, na ordem recebida.
+
+        Args:
+            sources (List[DataSource]): As fontes de dados a serem extraídas.
+            data (ColumnStore, opcional): Onde as linhas de todas as fontes
+                                          serão acrescentadas.
+            cache (ExtractionCache, opcional): O cache de extração.
+            statistics_workers (int): Processos usados nas estatísticas de cada fonte.
+            statistics_chunk_size (int): Linhas por bloco das estatísticas em paralelo.
+            sketches (SketchOptions, opcional): Os sketches calculados com as estatísticas.
+
+        Returns:
+            List[SourceResult]: Um resultado por fonte, na mesma ordem de `sources`.
+        """
+        if data is None:
+            data = ColumnStore()
+        return [SalesData.extract_source(source, data, cache, statistics_workers, statistics_chunk_size, sketches)
+                for source in sources]
+
+    @staticmethod
+    def extract_sources_concurrently(sources: List[DataSource], data: Optional[ColumnStore] = None,
+                                     max_workers: int = 4, use_processes: bool = False,
+                                     cache: Optional[ExtractionCache] = None,
+                                     sketches: Optional[SketchOptions] = None, statistics_workers: int = 1,
+                                     statistics_chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[SourceResult]:
+        """
+        Extrai as fontes de dados em paralelo.
+
+        Cada fonte é extraída em um worker para um ColumnStore próprio, junto
+        com as suas estatísticas parciais. Os resultados são acrescentados a
+        `data` sempre na ordem de `sources` (e não na ordem em que terminam),
+        então as linhas, o mapa de cabeçalhos e as estatísticas ficam
+        idênticos aos de SalesData.extract_sources. As estatísticas de cada
+        fonte são calculadas no próprio worker: nas threads, fontes grandes
+        usam statistics_workers processos (veja compute_statistics); fontes
+        extraídas em processos calculam as suas estatísticas em série, já que
+        o worker é um processo de um pool.
+
+        Args:
+            sources (List[DataSource]): As fontes de dados a serem extraídas.
+            data (ColumnStore, opcional): Onde as linhas de todas as fontes
+                                          serão acrescentadas.
+            max_workers (int): A quantidade máxima de workers de cada pool.
+            use_processes (bool): Se True, as fontes locais (CSV, limitadas
+                                  pela CPU) são extraídas em um pool de
+                                  processos; as demais usam sempre threads.
+            cache (ExtractionCache, opcional): O cache de extração, consultado
+                                               e atualizado pelos próprios workers.
+            sketches (SketchOptions, opcional): Os sketches calculados com as estatísticas.
+            statistics_workers (int): Processos usados nas estatísticas de cada
+                                      fonte extraída em uma thread. Padrão: 1 (serial).
+            statistics_chunk_size (int): Linhas por bloco das estatísticas em paralelo.
+
+        Returns:
+            List[SourceResult]: Um resultado por fonte, na mesma ordem de `sources`.
+        """
+        if data is None:
+            data = ColumnStore()
+        thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        process_pool: Optional[Executor] = None
+        if use_processes and any(getattr(source, "type", None) == "local" for source in sources):
+            process_pool = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = []
+            for source in sources:
+                if process_pool is not None and getattr(source, "type", None) == "local":
+                    futures.append(process_pool.submit(_extract_partition, source, cache, sketches=sketches))
+                else:
+                    futures.append(thread_pool.submit(_extract_partition, source, cache, statistics_workers,
+                                                      statistics_chunk_size, sketches))
+
+            return [SalesData._add_partition(source, data, *future.result())
+                    for source, future in zip(sources, futures)]
+        finally:
+            for pool in (thread_pool, process_pool):
+                if pool is not None:
+                    pool.shutdown(wait=True)
+
+    @staticmethod
+    def header_map_from_results(results: List[SourceResult]) -> Dict[str, List[DataSource]]:
+        """
+        Monta o mapa de cabeçalhos a partir de extrações já realizadas.
+
+        As colunas aparecem na ordem em que foram encontradas, fonte a fonte,
+        de forma que o relatório tenha sempre a mesma ordem de colunas.
+
+        Args:
+            results (List[SourceResult]): Os resultados de extração das fontes.
+
+        Returns:
+            Dict[str, List[DataSource]]: Para cada coluna, as fontes que a possuem.
+        """
+        header_map: Dict[str, List[DataSource]] = defaultdict(list)
+        for result in results:
+            if not result.row_count:
+                continue
+            for column in result.columns:
+                if result.source not in header_map[column]:
+                    header_map[column].append(result.source)
+        return dict(header_map)
+
     @staticmethod
     def consolidate_header(sources: List[DataSource]) -> Dict[str, List[DataSource]]:
+        """
+        Monta o mapa de cabeçalhos a partir dos esquemas das fontes
+        (DataSource.discover_columns), sem extrair as linhas: para um CSV
+        basta a linha de cabeçalho. Fontes sem colunas não entram no mapa.
+        Dentro de consolidate_data use header_map_from_results, que reaproveita a extração.
+
+        Args:
+            sources (List[DataSource]): As fontes de dados.
+
+        Returns:
+            Dict[str, List[DataSource]]: Para cada coluna, as fontes que a possuem.
+        """
         header_map: Dict[str, List[DataSource]] = defaultdict(list)
         for source in sources:
-            data = source.extract_data()
-            if data:  # Check if data is not empty
-                source_columns = set().union(*(row.keys() for row in data))
-                for column in source_columns:
-                    if source not in header_map[column]:
-                        header_map[column].append(source)
+            for column in source.discover_columns():
+                if source not in header_map[column]:
+                    header_map[column].append(source)
         return dict(header_map)
  
     @staticmethod
-    def compute_basic_statistics(data: List[Dict]) -> Dict[str, Dict[str, Any]]:
+    def deduplicate(data: ColumnStore, results: List[SourceResult], options: DeduplicationOptions,
+                    statistics_workers: int = 1, statistics_chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    sketches: Optional[SketchOptions] = None) -> Tuple[ColumnStore, int]:
         """
-        Calcula estatísticas básicas para cada coluna nos dados,
-        lidando com tipos de dados mistos e strings numéricas.
+        Remove as linhas com chaves repetidas dos dados consolidados (veja
+        duplicate_mask).
+
+        Os resultados das fontes passam a apontar para os dados sem as
+        duplicadas; as estatísticas das fontes que perderam linhas são
+        recalculadas sobre as linhas que ficaram.
+
+        Args:
+            data (ColumnStore): Os dados consolidados.
+            results (List[SourceResult]): Os resultados das fontes, na ordem de `data`.
+            options (DeduplicationOptions): As chaves e a política (primeira ou última).
+            statistics_workers (int): Processos usados nas estatísticas recalculadas.
+            statistics_chunk_size (int): Linhas por bloco das estatísticas em paralelo.
+            sketches (SketchOptions, opcional): Os sketches calculados com as estatísticas.
+
+        Returns:
+            Tuple[ColumnStore, int]: Os dados sem as duplicadas (o próprio `data`
+                                     se não houver nenhuma) e a quantidade de
+                                     linhas removidas.
         """
-        statistics: Dict[str, Dict[str, Any]] = {}
-        if not data:
-            return statistics
-    
-        all_columns = set().union(*(row.keys() for row in data))
-    
-        for column in all_columns:
-            values = [row.get(column) for row in data]
-            
-            # Filtra os valores não nulos e tenta convertê-los para números
-            numeric_values = []
-            for v in values:
-                if v is not None:
-                    try:
-                        # Tenta converter para float
-                        numeric_values.append(float(v))
-                    except (ValueError, TypeError):
-                        # Ignora valores que não são numéricos
-                        pass
-                    
-            non_null_values = [v for v in values if v is not None]
-    
-            col_min = None
-            col_max = None
-            
-            if numeric_values:
-                col_min = min(numeric_values)
-                col_max = max(numeric_values)
-            
-            statistics[column] = {
-                "min": col_min,
-                "max": col_max,
-                "blank_count": sum(1 for v in values if v is None),
-            }
-        return statistics        
-    
-    
-    
-    
+        keep, removed, _ = duplicate_mask(data, options)
+        if not removed:
+            return data, 0
+        deduplicated = data.compress(keep)
+        start = 0
+        for result in results:
+            kept = keep.count(1, result.start, result.start + result.row_count)
+            result.duplicates = result.row_count - kept
+            result.data, result.start = deduplicated, start
+            if result.duplicates:
+                result.row_count = kept
+                result.statistics = compute_statistics(deduplicated, start, start + kept,
+                                                       max_workers=statistics_workers,
+                                                       chunk_size=statistics_chunk_size, sketch_options=sketches)
+                result.columns = list(result.statistics.columns)
+            start += kept
+        return deduplicated, removed
 
-    
-    
-    
+    @staticmethod
+    def compute_basic_statistics(data: Iterable[Dict], max_workers: int = 1,
+                                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                 sketches: Optional[SketchOptions] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Calcula estatísticas básicas para cada coluna nos dados,
+        lidando com tipos de dados mistos e strings numéricas.
 
-    
-    
+        Todas as colunas são calculadas em uma única passada sobre as linhas
+        (veja StatisticsAccumulator), então `data` pode ser qualquer iterável,
+        inclusive um gerador. Um ColumnStore é lido coluna a coluna, direto dos
+        valores já convertidos, e pode ser dividido em blocos calculados em
+        paralelo por vários processos, com resultado idêntico ao serial.
 
-    
-    
+        Args:
+            data (Iterable[Dict]): As linhas (dicionários ou um ColumnStore).
+            max_workers (int): Processos usados em um ColumnStore. Padrão: 1 (serial).
+            chunk_size (int): Linhas por bloco do cálculo em paralelo.
+            sketches (SketchOptions, opcional): Acrescenta distinct_count e
+                top_values (aproximados) às colunas escolhidas.
 
-        
-    
+        Returns:
+            Dict[str, Dict[str, Any]]: Para cada coluna: min, max, blank_count,
+                                       count, numeric_count, sum, mean e variance.
+        """
+        if isinstance(data, ColumnStore):
+            return compute_statistics(data, max_workers=max_workers, chunk_size=chunk_size,
+                                      sketch_options=sketches).result()
+        return StatisticsAccumulator(sketches).update_many(data).result()
 
-    
-    
-    
-    
-    
+    @staticmethod
+    def compute_aggregations(data: Iterable[Dict], aggregations: List[Aggregation]) -> List[AggregationResult]:
+        """
+        Calcula agregações (group by) sobre os dados, como receita por
+        categoria, loja, meio de pagamento ou dia.
 
-    
-    
-    
-    
-    
-    
- 
+        Cada agregação é feita por hash, em uma única passada, com memória
+        proporcional à quantidade de grupos (veja Aggregation).
 
+        Args:
+            data (Iterable[Dict]): As linhas (dicionários ou um ColumnStore).
+            aggregations (List[Aggregation]): As agregações a calcular.
 
+        Returns:
+            List[AggregationResult]: Um resultado por agregação, na mesma ordem.
+        """
+        return aggregate(data, aggregations)
 
     @staticmethod
-    def consolidate_data(sources: List[DataSource]) -> Dict[str, Any]:
+    def consolidate_data(sources: List[DataSource], max_workers: int = 1,
+                         use_processes: bool = False,
+                         cache: Optional[ExtractionCache] = None, statistics_workers: int = 1,
+                         statistics_chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         profiler: Optional[Profiler] = None,
+                         sketches: Optional[SketchOptions] = None,
+                         deduplication: Optional[DeduplicationOptions] = None) -> Dict[str, Any]:
         """
         Consolida os dados de vendas de diferentes fontes de dados,
         lidando com diferentes conjuntos de colunas.
 
+        Cada fonte é extraída uma única vez; as linhas, o mapa de cabeçalhos e
+        as estatísticas são montados a partir dessa mesma extração. Com
+        max_workers > 1 as fontes são extraídas em paralelo (veja
+        extract_sources_concurrently), com o mesmo resultado da extração sequencial.
+
         Args:
             sources (List[DataSource]): Uma lista de objetos DataSource
                                         representando as fontes de dados.
+            max_workers (int): A quantidade máxima de fontes extraídas ao mesmo
+                               tempo. Padrão: 1 (extração sequencial).
+            use_processes (bool): Se True, extrai as fontes locais em processos.
+            cache (ExtractionCache, opcional): Cache em disco das extrações;
+                                               fontes sem mudanças não são relidas.
+            statistics_workers (int): Processos usados nas estatísticas de cada fonte
+                                      (exceto as extraídas em processos, veja
+                                      extract_sources_concurrently). Padrão: 1 (serial).
+            statistics_chunk_size (int): Linhas por bloco das estatísticas em paralelo.
+            profiler (Profiler, opcional): Mede as etapas "extracao" (com uma
+                                           sub-etapa por fonte), "cabecalhos" e "estatisticas".
+            sketches (SketchOptions, opcional): Acrescenta às estatísticas das
+                colunas escolhidas a contagem aproximada de valores distintos
+                (distinct_count) e os valores mais frequentes (top_values).
+            deduplication (DeduplicationOptions, opcional): Remove as vendas
+                repetidas entre e dentro das fontes (etapa "deduplicacao", veja
+                deduplicate) antes dos cabeçalhos e das estatísticas.
 
         Returns:
-            SalesData: Uma instância de SalesData com os dados consolidados.
+            Dict[str, Any]: Dicionário com 'data' (um ColumnStore), 'statistics',
+                            'header_map', 'schema' (os tipos das colunas de todas
+                            as fontes) e 'source_results' (um SourceResult por fonte).
         """
-        all_data: List[Dict] = []
-        has_data = False
-        for source in sources:
-            data = source.extract_data()
-            if isinstance(data, list) and data:
-                all_data.extend(data)
-                has_data = True
-            elif isinstance(data, list) and not data:
-                print(f"Aviso: {source} retornou uma lista de dados vazia.")
+        profiler = profiler or Profiler(enabled=False)
+        all_data = ColumnStore()
+        with profiler.stage("extracao") as stage:
+            if max_workers > 1 and len(sources) > 1:
+                results = SalesData.extract_sources_concurrently(sources, all_data, max_workers,
+                                                                 use_processes, cache, sketches,
+                                                                 statistics_workers, statistics_chunk_size)
             else:
-                print(f"Aviso: extract_data de {source} não retornou uma lista.")
+                results = SalesData.extract_sources(sources, all_data, cache, statistics_workers,
+                                                    statistics_chunk_size, sketches)
+            for result in results:
+                profiler.record(result.name, result.elapsed, result.cpu_time, result.row_count,
+                                result.bytes_read, from_cache=result.from_cache,
+                                statistics_seconds=result.statistics_elapsed)
+            stage.rows = len(all_data)
+            stage.bytes = sum(result.bytes_read for result in results if result.bytes_read is not None)
 
-        header_map = {}
-        if has_data:
-            header_map = SalesData.consolidate_header(sources)
+        if deduplication is not None:
+            with profiler.stage("deduplicacao", rows=len(all_data)) as stage:
+                all_data, removed = SalesData.deduplicate(all_data, results, deduplication, statistics_workers,
+                                                          statistics_chunk_size, sketches)
+                stage.details["duplicates"] = removed
 
-        statistics = SalesData.compute_basic_statistics(all_data)
-        return {"data": all_data, "statistics": statistics, "header_map": header_map}
+        with profiler.stage("cabecalhos") as stage:
+            header_map = SalesData.header_map_from_results(results)
+            stage.details["columns"] = len(header_map)
+        # As estatísticas de cada fonte são calculadas na extração (statistics_seconds de
+        # cada fonte); esta etapa junta os resultados parciais.
+        with profiler.stage("estatisticas", rows=len(all_data),
+                            sources_seconds=sum(result.statistics_elapsed or 0.0 for result in results)):
+            statistics = StatisticsAccumulator(sketches)
+            schema = Schema()
+            for result in results:
+                statistics.merge(result.statistics)
+                schema = schema.merge(result.schema)
+        return {"data": all_data, "statistics": statistics.result(), "header_map": header_map,
+                "schema": schema, "source_results": results}
     
-    def get_data_by_columns(self, columns: List[str]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def snapshot_fingerprint(sources: List[DataSource], sketches: Optional[SketchOptions] = None,
+                             deduplication: Optional[DeduplicationOptions] = None) -> str:
+        """
+        Identifica a configuração que gera os dados consolidados: as fontes
+        (cache_key, com o filtro e a projeção de cada uma, e a versão atual dos
+        arquivos, veja DataSource.snapshot_validators), a deduplicação e os
+        sketches. Um snapshot gravado com outra configuração, ou antes de um
+        arquivo ser trocado ou crescer, não é reaproveitado.
+
+        Args:
+            sources (List[DataSource]): As fontes de dados.
+            sketches (SketchOptions, opcional): Os sketches das estatísticas.
+            deduplication (DeduplicationOptions, opcional): A deduplicação.
+
+        Returns:
+            str: Um hash SHA-256 (hexadecimal) da configuração.
+        """
+        description = {
+            "sources": [[source.cache_key() or f"{getattr(source, 'type', '')}:{getattr(source, 'location', '')}",
+                         source.read_options(), source.snapshot_validators()] for source in sources],
+            "deduplication": [deduplication.keys, deduplication.keep] if deduplication else None,
+            "sketches": sketches.to_config() if sketches else None,
+        }
+        text = json.dumps(description, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def save_snapshot(consolidated: Dict[str, Any], path: str, fingerprint: Optional[str] = None) -> None:
+        """
+        Grava os dados consolidados em um snapshot binário colunar (veja
+        write_snapshot), para gerar relatórios de novo sem reler as fontes.
+
+        As fontes que a impressão digital não confere (sem snapshot_validators,
+        como as fontes web) têm os validadores da extração (ETag/Last-Modified)
+        gravados no snapshot, para load_snapshot revalidá-las.
+
+        Args:
+            consolidated (Dict[str, Any]): O resultado de consolidate_data.
+            path (str): O caminho do snapshot.
+            fingerprint (str, opcional): A configuração que gerou os dados
+                                         (veja snapshot_fingerprint).
+        """
+        validators = {}
+        for result in consolidated.get("source_results", []):
+            source = result.source
+            key, recorded = source.cache_key(), source.cache_validators()
+            if key is not None and recorded is not None and source.snapshot_validators() is None:
+                validators[key] = recorded
+        write_snapshot(path, consolidated, fingerprint, validators)
+
+    @staticmethod
+    def load_snapshot(path: str, fingerprint: Optional[str] = None,
+                      sources: Optional[List[DataSource]] = None) -> Dict[str, Any]:
+        """
+        Abre um snapshot gravado por save_snapshot com mmap: as colunas não são
+        copiadas e só as usadas são lidas do disco.
+
+        Args:
+            path (str): O caminho do snapshot.
+            fingerprint (str, opcional): A configuração atual (veja
+                snapshot_fingerprint); se informada, um snapshot gravado com
+                outra configuração é rejeitado.
+            sources (List[DataSource], opcional): As fontes atuais; as que
+                tiverem validadores gravados no snapshot são revalidadas
+                (is_cache_valid, por exemplo um GET condicional).
+
+        Returns:
+            Dict[str, Any]: Os dados consolidados, no formato de consolidate_data;
+                            'data' é um ColumnStore somente leitura.
+
+        Raises:
+            ValueError: Se o arquivo não for um snapshot válido, tiver sido
+                        gravado com outra configuração ou alguma fonte tiver mudado.
+        """
+        consolidated = open_snapshot(path, fingerprint)
+        recorded = consolidated.pop("source_validators")
+        for source in sources or []:
+            validators = recorded.get(source.cache_key())
+            if validators is not None and not source.is_cache_valid(validators):
+                name = getattr(source, "name", None) or getattr(source, "location", None) or repr(source)
+                raise ValueError(f"A fonte {name} mudou desde a gravação do snapshot.")
+        return consolidated
+
+    def get_data_by_columns(self, columns: List[str]) -> ColumnStore:
         """
         Retorna os dados apenas com as colunas especificadas.
 
+        A projeção compartilha os buffers das colunas com os dados originais,
+        sem copiar valores nem montar um dicionário por linha. Quando as
+        colunas são conhecidas antes da extração, prefira a projeção nas
+        próprias fontes (atributo columns de DataSource), que nem chega a ler
+        as demais colunas.
+
         Args:
             columns (List[str]): A lista de colunas a serem incluídas nos dados retornados.
 
         Returns:
-            List[Dict[str, Any]]: Uma nova lista de dicionários contendo apenas as colunas especificadas.
+            ColumnStore: Os dados contendo apenas as colunas especificadas; cada
+                         linha pode ser lida como um dicionário.
         """
-        filtered_data = []
-        for row in self.data:
-            new_row = {col: row[col] for col in columns if col in row}
-            filtered_data.append(new_row)
-        return filtered_data
\ No newline at end of file
+        return self.data.project(columns)
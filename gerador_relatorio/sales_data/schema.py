@@ -0,0 +1,260 @@
+"""
+Este módulo define a classe Schema, com os tipos das colunas de uma fonte de
+dados inferidos a partir de uma amostra das linhas, antes de gravá-las.
+
+Os tipos são semânticos (inteiro, float, decimal, data, categórico, texto) e
+também indicam o armazenamento de cada coluna no ColumnStore, de modo que
+cada célula é convertida uma única vez, direto para o seu tipo, e as
+estatísticas, agregações e formatadores reaproveitam essa conversão em vez de
+tentar float() valor a valor.
+"""
+
+import re
+from collections.abc import Mapping
+from datetime import date
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from gerador_relatorio.sales_data.column_store import (
+    DATE_TEXT, FLOAT, FLOAT_TEXT, INT, INT_TEXT, OBJECT, ColumnStore,
+)
+
+# Tipos de coluna
+INTEGER = "int"
+FLOAT_TYPE = "float"
+DECIMAL = "decimal"
+DATE = "date"
+CATEGORICAL = "categorical"
+TEXT = "text"
+EMPTY = "empty"  # só nulos e strings vazias na amostra
+
+NUMERIC_TYPES = frozenset({INTEGER, FLOAT_TYPE, DECIMAL})
+
+# Quantidade de linhas lidas para inferir o esquema de cada fonte.
+SAMPLE_SIZE = 1000
+
+# Fração de valores fora do padrão tolerada na amostra (valores "sujos" como
+# "N/A" em uma coluna de preços não mudam o tipo da coluna).
+TOLERANCE = 0.05
+
+# Colunas de texto com no máximo esta fração de valores distintos na amostra
+# são categóricas (categorias, meios de pagamento, ...).
+CATEGORICAL_RATIO = 0.5
+
+_INT_RE = re.compile(r"-?[0-9]+")
+_DECIMAL_RE = re.compile(r"-?[0-9]+\.[0-9]+")
+_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+# Tipo da coluna a partir do tipo de armazenamento no ColumnStore
+_KIND_TYPES = {INT: INTEGER, INT_TEXT: INTEGER, FLOAT: FLOAT_TYPE, FLOAT_TEXT: DECIMAL,
+               DATE_TEXT: DATE, None: EMPTY}
+
+
+def _classify(value: Any) -> Optional[str]:
+    """Retorna o tipo de armazenamento de um único valor (None para texto)."""
+    cls = value.__class__
+    if cls is int:
+        return INT
+    if cls is float:
+        return FLOAT
+    if cls is not str:
+        return None
+    if _INT_RE.fullmatch(value):
+        return INT_TEXT if str(int(value)) == value else None
+    if _DECIMAL_RE.fullmatch(value):
+        dot = value.find(".")
+        return FLOAT_TEXT if format(float(value), f".{len(value) - dot - 1}f") == value else None
+    if _DATE_RE.fullmatch(value):
+        try:
+            return DATE_TEXT if date.fromisoformat(value).isoformat() == value else None
+        except ValueError:
+            return None
+    return None
+
+
+def merge_types(first: str, second: str) -> str:
+    """
+    Retorna o tipo que comporta os valores de dois tipos de coluna.
+
+    Inteiros e decimais viram decimais, números com float viram float, e
+    qualquer outra mistura vira texto.
+    """
+    if first == second or second == EMPTY:
+        return first
+    if first == EMPTY:
+        return second
+    if first in NUMERIC_TYPES and second in NUMERIC_TYPES:
+        return FLOAT_TYPE if FLOAT_TYPE in (first, second) else DECIMAL
+    return TEXT
+
+
+class Schema(Mapping):
+    """
+    Os tipos das colunas de uma fonte de dados, indexados pelo nome da coluna.
+
+    Atributos:
+        types (Dict[str, str]): O tipo de cada coluna (INTEGER, FLOAT_TYPE,
+                                DECIMAL, DATE, CATEGORICAL, TEXT ou EMPTY).
+        storage (Dict[str, str]): O tipo de armazenamento no ColumnStore das
+                                  colunas em que a amostra foi conclusiva.
+    """
+
+    def __init__(self, types: Optional[Dict[str, str]] = None,
+                 storage: Optional[Dict[str, str]] = None) -> None:
+        """
+        Inicializa uma nova instância de Schema.
+
+        Args:
+            types (Dict[str, str], opcional): O tipo de cada coluna.
+            storage (Dict[str, str], opcional): O armazenamento de cada coluna.
+        """
+        self.types = dict(types or {})
+        self.storage = dict(storage or {})
+
+    def __getitem__(self, column: str) -> str:
+        return self.types[column]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.types)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __repr__(self) -> str:
+        return f"Schema({self.types!r})"
+
+    def columns_of_type(self, *types: str) -> List[str]:
+        """Retorna as colunas de algum dos tipos pedidos, na ordem do esquema."""
+        return [column for column, column_type in self.types.items() if column_type in types]
+
+    def merge(self, other: "Schema") -> "Schema":
+        """
+        Combina o esquema de outra fonte a este (veja merge_types).
+
+        Returns:
+            Schema: Um novo esquema com as colunas dos dois.
+        """
+        types = dict(self.types)
+        for column, column_type in other.types.items():
+            types[column] = merge_types(types[column], column_type) if column in types else column_type
+        storage = {column: kind for column, kind in self.storage.items()
+                   if other.storage.get(column, kind) == kind}
+        for column, kind in other.storage.items():
+            storage.setdefault(column, kind)
+        return Schema(types, storage)
+
+    def adjusted_to(self, store: ColumnStore) -> "Schema":
+        """
+        Confere o esquema da amostra com as colunas efetivamente gravadas.
+
+        Valores depois da amostra podem alargar o tipo de uma coluna (um
+        decimal em uma coluna de inteiros, texto demais em uma coluna de
+        datas); o tipo final reflete o armazenamento de cada coluna.
+
+        Args:
+            store (ColumnStore): Os dados da fonte.
+
+        Returns:
+            Schema: O esquema com os tipos de todas as colunas de `store`.
+        """
+        types = {}
+        storage = {}
+        for name, column in store.columns.items():
+            inferred = self.types.get(name, EMPTY)
+            if column.kind == OBJECT:
+                types[name] = inferred if inferred in (CATEGORICAL, TEXT) else TEXT
+            else:
+                types[name] = merge_types(inferred, _KIND_TYPES[column.kind])
+            if column.kind is not None:
+                storage[name] = column.kind
+        return Schema(types, storage)
+
+
+class _ColumnProfile:
+    """Contagens de uma coluna na amostra usada por infer_schema."""
+
+    __slots__ = ("values", "kinds", "distinct")
+
+    def __init__(self) -> None:
+        self.values = 0
+        self.kinds: Dict[Optional[str], int] = {}
+        self.distinct = set()
+
+    def column_type(self) -> str:
+        if not self.values:
+            return EMPTY
+        limit = self.values * TOLERANCE
+        kinds = self.kinds
+        text = kinds.get(None, 0)
+        numeric = sum(kinds.get(kind, 0) for kind in (INT, FLOAT, INT_TEXT, FLOAT_TEXT))
+        if self.values - numeric <= limit:
+            if kinds.get(FLOAT) or (kinds.get(FLOAT_TEXT) and kinds.get(INT)):
+                return FLOAT_TYPE
+            return DECIMAL if kinds.get(FLOAT_TEXT) else INTEGER
+        if self.values - kinds.get(DATE_TEXT, 0) <= limit:
+            return DATE
+        if text and len(self.distinct) <= self.values * CATEGORICAL_RATIO:
+            return CATEGORICAL
+        return TEXT
+
+    def storage(self, column_type: str) -> Optional[str]:
+        """O armazenamento da coluna, se a amostra for conclusiva."""
+        kinds = self.kinds
+        if column_type in (CATEGORICAL, TEXT):
+            return OBJECT
+        if column_type == DATE:
+            return DATE_TEXT
+        if column_type == DECIMAL:
+            return FLOAT_TEXT if not kinds.get(INT) else None
+        if column_type == INTEGER:
+            if kinds.get(INT) and not kinds.get(INT_TEXT):
+                return INT
+            if kinds.get(INT_TEXT) and not kinds.get(INT):
+                return INT_TEXT
+        if column_type == FLOAT_TYPE and kinds.get(FLOAT) and len(kinds) == 1:
+            return FLOAT
+        return None
+
+
+def infer_schema(rows: Iterable[Dict[str, Any]], sample_size: int = SAMPLE_SIZE) -> Schema:
+    """
+    Infere o esquema a partir das primeiras linhas de uma fonte.
+
+    Nulos e strings vazias não contam para o tipo. Uma coluna é numérica ou
+    de datas se quase todos os valores (veja TOLERANCE) tiverem esse formato,
+    exatamente como seriam gravados no ColumnStore: "007" não é inteiro e
+    "1.50" é decimal com duas casas. As demais colunas são de texto, e
+    categóricas quando os valores se repetem bastante na amostra.
+
+    Args:
+        rows (Iterable[Dict[str, Any]]): As linhas da fonte; apenas as
+                                         `sample_size` primeiras são lidas.
+        sample_size (int): A quantidade máxima de linhas da amostra.
+
+    Returns:
+        Schema: Os tipos das colunas, na ordem em que apareceram.
+    """
+    profiles: Dict[str, _ColumnProfile] = {}
+    for row in islice(rows, sample_size):
+        for column, value in row.items():
+            profile = profiles.get(column)
+            if profile is None:
+                profile = profiles[column] = _ColumnProfile()
+            if value is None or value == "":
+                continue
+            kind = _classify(value)
+            profile.values += 1
+            profile.kinds[kind] = profile.kinds.get(kind, 0) + 1
+            if kind is None:
+                try:
+                    profile.distinct.add(value)
+                except TypeError:
+                    profile.distinct.add(repr(value))
+    types = {}
+    storage = {}
+    for column, profile in profiles.items():
+        column_type = types[column] = profile.column_type()
+        kind = profile.storage(column_type)
+        if kind is not None:
+            storage[column] = kind
+    return Schema(types, storage)
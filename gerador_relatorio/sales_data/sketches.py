@@ -0,0 +1,517 @@
+"""
+Este módulo define os sketches das estatísticas: estruturas de tamanho fixo
+que resumem colunas de alta cardinalidade (customer_id, product_id,
+order_id, ...) sem guardar todos os valores.
+
+* HyperLogLog estima a quantidade de valores distintos com erro relativo
+  padrão de cerca de 1.04 / sqrt(2 ** precision).
+* SpaceSaving guarda os valores mais frequentes (heavy hitters): a contagem
+  de cada valor é um limite superior, que passa da contagem exata em no
+  máximo cerca de top_k_error * total de valores.
+* KLL estima os quantis (mediana, p90, p99) dos valores numéricos com erro
+  de posição (rank) de cerca de quantile_error, guardando cerca de
+  3 / quantile_error valores.
+
+Os dois podem ser combinados com merge(), então blocos, fontes e processos
+diferentes calculam os seus sketches separadamente. Os valores são
+comparados pelo texto (o número 7 e a string "7" são o mesmo valor), e o hash
+usado é estável entre processos e execuções.
+"""
+
+import heapq
+import math
+import random
+from collections import Counter
+from hashlib import blake2b
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from gerador_relatorio.sales_data.column_store import MISSING, Column
+
+# Limites da precisão do HyperLogLog (16 a 262144 registradores).
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+# Os quantis informados nas estatísticas, com os nomes das métricas.
+QUANTILES = (("median", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+# Quantidade de células contadas de cada vez antes de alimentar os sketches:
+# a memória dos sketches depende deste bloco e das opções, não das linhas.
+BLOCK_SIZE = 65536
+
+
+def _key(value: Any) -> str:
+    """O texto com que o valor é comparado e contado."""
+    return value if value.__class__ is str else str(value)
+
+
+def _hash64(key: str) -> int:
+    return int.from_bytes(blake2b(key.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "big")
+
+
+def precision_for_error(error: float) -> int:
+    """
+    Retorna a menor precisão do HyperLogLog com erro relativo padrão até `error`.
+
+    Args:
+        error (float): O erro relativo desejado, entre 0 e 1.
+
+    Returns:
+        int: A precisão, entre MIN_PRECISION e MAX_PRECISION.
+    """
+    precision = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(max(precision, MIN_PRECISION), MAX_PRECISION)
+
+
+class HyperLogLog:
+    """
+    Estimador da quantidade de valores distintos.
+
+    Atributos:
+        precision (int): Os bits do hash que escolhem o registrador.
+        registers (bytearray): Os 2 ** precision registradores.
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        """
+        Inicializa um HyperLogLog vazio.
+
+        Args:
+            precision (int): Entre MIN_PRECISION e MAX_PRECISION. Padrão: 14
+                             (16 KiB, erro relativo padrão de cerca de 0.8%).
+
+        Raises:
+            ValueError: Se a precisão estiver fora dos limites.
+        """
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision deve estar entre {MIN_PRECISION} e {MAX_PRECISION}.")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        """Acrescenta um valor."""
+        self.add_keys((_key(value),))
+
+    def add_keys(self, keys: Iterable[str]) -> None:
+        """Acrescenta valores já convertidos para texto (veja _key)."""
+        precision = self.precision
+        width = 64 - precision
+        mask = (1 << width) - 1
+        registers = self.registers
+        for hashed in map(_hash64, keys):
+            index = hashed >> width
+            rank = width - (hashed & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Combina outro HyperLogLog a este (a união dos valores).
+
+        Raises:
+            ValueError: Se as precisões forem diferentes.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Não é possível combinar HyperLogLogs de precisões diferentes.")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self) -> int:
+        """Retorna a quantidade estimada de valores distintos."""
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / sum(map(_INVERSE_POWERS.__getitem__, self.registers))
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Poucos valores: a contagem linear dos registradores vazios é mais precisa.
+            raw = m * math.log(m / zeros)
+        return int(round(raw))
+
+
+class SpaceSaving:
+    """
+    Resumo dos valores mais frequentes, com no máximo `capacity` contadores.
+
+    Cada bloco de valores é contado exatamente e reduzido aos `capacity`
+    valores mais frequentes; os resumos são combinados somando as contagens.
+    Um valor fora do resumo tem contagem de no máximo `floor`.
+
+    Atributos:
+        capacity (int): A quantidade máxima de valores guardados.
+        counts (Dict[str, int]): A contagem (limite superior) de cada valor guardado.
+        errors (Dict[str, int]): O quanto cada contagem pode passar da exata.
+        floor (int): O limite da contagem dos valores fora do resumo.
+        total (int): A quantidade de valores resumidos.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity deve ser maior que zero.")
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.floor = 0
+        self.total = 0
+
+    @staticmethod
+    def _order(item: Tuple[str, int]) -> Tuple[int, str]:
+        # Maiores contagens primeiro; empates pelo valor, para um resultado determinístico.
+        return -item[1], item[0]
+
+    def update(self, counts: Mapping[str, int]) -> "SpaceSaving":
+        """
+        Acrescenta as contagens exatas de um bloco de valores.
+
+        Args:
+            counts (Mapping[str, int]): Quantas vezes cada valor (em texto) apareceu.
+
+        Returns:
+            SpaceSaving: O próprio resumo, para encadeamento.
+        """
+        block = SpaceSaving(self.capacity)
+        top = heapq.nsmallest(self.capacity + 1, counts.items(), key=self._order)
+        block.counts = dict(top[:self.capacity])
+        block.errors = dict.fromkeys(block.counts, 0)
+        block.floor = top[self.capacity][1] if len(top) > self.capacity else 0
+        block.total = sum(counts.values())
+        return self.merge(block)
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combina outro resumo a este."""
+        if not self.counts and not self.floor:
+            self.counts, self.errors = dict(other.counts), dict(other.errors)
+            self.floor, self.total = other.floor, self.total + other.total
+            return self
+        merged = []
+        for key in self.counts.keys() | other.counts.keys():
+            merged.append((key, self.counts.get(key, self.floor) + other.counts.get(key, other.floor)))
+        top = heapq.nsmallest(self.capacity + 1, merged, key=self._order)
+        floor = self.floor + other.floor
+        if len(top) > self.capacity:
+            floor = max(floor, top[self.capacity][1])
+        self.errors = {key: self.errors.get(key, self.floor) + other.errors.get(key, other.floor)
+                       for key, _ in top[:self.capacity]}
+        self.counts = dict(top[:self.capacity])
+        self.floor = floor
+        self.total += other.total
+        return self
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """
+        Retorna os k valores mais frequentes.
+
+        Returns:
+            List[Tuple[str, int]]: Pares (valor, contagem), da maior contagem para a menor.
+        """
+        return sorted(self.counts.items(), key=self._order)[:k]
+
+
+class KLL:
+    """
+    Estimador de quantis KLL (Karnin, Lang e Liberty).
+
+    Os valores ficam em níveis (compactadores); os valores do nível h valem
+    2 ** h valores originais. Quando um nível enche, ele é ordenado e metade
+    dos valores (as posições pares ou ímpares, escolhidas ao acaso) sobe para
+    o nível seguinte. Os níveis mais baixos têm capacidades menores (fator
+    2/3 por nível), então a memória fica em cerca de 3 * k valores, qualquer
+    que seja a quantidade de valores. Enquanto cabem, os valores são guardados
+    sem compactação e os quantis são exatos.
+
+    O gerador aleatório tem semente fixa: os mesmos valores, na mesma ordem
+    de blocos, dão sempre os mesmos quantis.
+
+    Atributos:
+        k (int): A capacidade do nível mais alto.
+        levels (List[List[float]]): Os valores de cada nível.
+        count (int): A quantidade de valores resumidos.
+    """
+
+    _DECAY = 2 / 3
+
+    def __init__(self, k: int = 200, seed: int = 0) -> None:
+        """
+        Inicializa um KLL vazio.
+
+        Args:
+            k (int): A capacidade do nível mais alto (erro de posição de cerca
+                     de 2 / k). Padrão: 200.
+            seed (int): A semente da escolha das metades compactadas.
+
+        Raises:
+            ValueError: Se k for menor que 8.
+        """
+        if k < 8:
+            raise ValueError("k deve ser pelo menos 8.")
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.count = 0
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        height = len(self.levels) - level - 1
+        return int(math.ceil(self.k * self._DECAY ** height)) + 1
+
+    def _grow(self) -> None:
+        self.levels.append([])
+        self._max_size = sum(map(self._capacity, range(len(self.levels))))
+
+    def add_numbers(self, numbers: Iterable[float], times: int = 1) -> None:
+        """
+        Acrescenta números (NaN é ignorado), cada um `times` vezes.
+
+        Os números entram em blocos do tamanho da capacidade do nível 0, com
+        compactação entre um bloco e outro, então a memória não cresce com a
+        quantidade de números.
+        """
+        if times != 1:
+            for number in numbers:
+                self.add_weighted(number, times)
+            return
+        numbers = iter(numbers)
+        while True:
+            batch = list(islice(numbers, self._capacity(0)))
+            if not batch:
+                break
+            batch = [number for number in batch if number == number]
+            self.levels[0].extend(batch)
+            self.count += len(batch)
+            self._size += len(batch)
+            self._compress()
+
+    def add_weighted(self, number: float, times: int) -> None:
+        """
+        Acrescenta um número repetido `times` vezes sem repeti-lo: o número
+        entra uma vez em cada nível h correspondente a um bit de `times` (no
+        nível h cada valor vale 2 ** h), o que preserva exatamente o peso.
+        """
+        if number != number or times < 1:
+            return
+        self.count += times
+        level = 0
+        while times:
+            if times & 1:
+                while level >= len(self.levels):
+                    self._grow()
+                self.levels[level].append(number)
+                self._size += 1
+            times >>= 1
+            level += 1
+        self._compress()
+
+    def _compress(self) -> None:
+        while self._size >= self._max_size:
+            for level, items in enumerate(self.levels):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self._grow()
+                items.sort()
+                # Com quantidade ímpar, o maior valor fica no nível, para não perder peso.
+                kept = [items.pop()] if len(items) % 2 else []
+                self.levels[level + 1].extend(items[self._random.getrandbits(1)::2])
+                self._size -= len(items) // 2
+                items[:] = kept
+                if self._size < self._max_size:
+                    break
+
+    def merge(self, other: "KLL") -> "KLL":
+        """Combina outro KLL a este (a união dos valores)."""
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for items, other_items in zip(self.levels, other.levels):
+            items.extend(other_items)
+        self.count += other.count
+        self._size = sum(map(len, self.levels))
+        self._compress()
+        return self
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """
+        Retorna o quantil estimado: o menor valor com pelo menos `fraction`
+        dos valores menores ou iguais a ele.
+
+        Returns:
+            Optional[float]: O quantil, ou None se não houver valores.
+        """
+        return self.quantiles((fraction,))[0]
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Optional[float]]:
+        """Retorna vários quantis (veja quantile) com uma única ordenação."""
+        fractions = list(fractions)
+        if not self.count:
+            return [None] * len(fractions)
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        results = []
+        for fraction in fractions:
+            target, cumulative = fraction * self.count, 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(value)
+        return results
+
+
+class SketchOptions:
+    """
+    Configuração dos sketches das estatísticas.
+
+    Atributos:
+        columns (List[str], opcional): As colunas com sketches (None: todas).
+        distinct_error (float): O erro relativo padrão da contagem de distintos.
+        top_k (int): Quantos valores mais frequentes são informados.
+        top_k_error (float): O erro máximo das contagens dos mais frequentes,
+                             como fração do total de valores da coluna.
+        quantiles (bool): Se a mediana, o p90 e o p99 das colunas numéricas são estimados.
+        quantile_error (float): O erro aproximado de posição dos quantis, como
+                                fração do total de valores numéricos.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None, distinct_error: float = 0.01,
+                 top_k: int = 10, top_k_error: float = 0.001, quantiles: bool = True,
+                 quantile_error: float = 0.01) -> None:
+        """
+        Inicializa uma nova instância de SketchOptions.
+
+        Raises:
+            ValueError: Se os erros não estiverem entre 0 e 1 ou se top_k for menor que 1.
+        """
+        if not 0 < distinct_error < 1 or not 0 < top_k_error < 1 or not 0 < quantile_error < 1:
+            raise ValueError("distinct_error, top_k_error e quantile_error devem estar entre 0 e 1.")
+        if top_k < 1:
+            raise ValueError("top_k deve ser maior que zero.")
+        self.columns = list(columns) if columns is not None else None
+        self.distinct_error = distinct_error
+        self.top_k = top_k
+        self.top_k_error = top_k_error
+        self.quantiles = bool(quantiles)
+        self.quantile_error = quantile_error
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["SketchOptions"]:
+        """
+        Cria as opções a partir da configuração ("sketches" em "statistics").
+
+        Args:
+            config: None ou False (sem sketches), True (todas as colunas, com os
+                    valores padrão) ou um dicionário com columns, distinct_error,
+                    top_k, top_k_error, quantiles e quantile_error.
+
+        Raises:
+            ValueError: Se a configuração for inválida.
+        """
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        if not isinstance(config, Mapping):
+            raise ValueError("'sketches' deve ser true ou um objeto.")
+        unknown = set(config) - {"columns", "distinct_error", "top_k", "top_k_error", "quantiles", "quantile_error"}
+        if unknown:
+            raise ValueError(f"Opções de sketches desconhecidas: {', '.join(sorted(unknown))}.")
+        return cls(**config)
+
+    def to_config(self) -> Dict[str, Any]:
+        """Retorna as opções na forma da configuração."""
+        return {"columns": self.columns, "distinct_error": self.distinct_error,
+                "top_k": self.top_k, "top_k_error": self.top_k_error,
+                "quantiles": self.quantiles, "quantile_error": self.quantile_error}
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, SketchOptions) and self.to_config() == other.to_config()
+
+    def __repr__(self) -> str:
+        return f"SketchOptions({self.to_config()!r})"
+
+    def includes(self, column: str) -> bool:
+        """Se a coluna tem sketches."""
+        return self.columns is None or column in self.columns
+
+    def new_sketch(self) -> "ColumnSketch":
+        """Cria os sketches vazios de uma coluna."""
+        return ColumnSketch(precision_for_error(self.distinct_error),
+                            max(self.top_k, math.ceil(1 / self.top_k_error)), self.top_k,
+                            max(8, math.ceil(2 / self.quantile_error)) if self.quantiles else None)
+
+
+class ColumnSketch:
+    """
+    Os sketches de uma coluna: valores distintos, mais frequentes e quantis.
+
+    Atributos:
+        distinct (HyperLogLog): A contagem de distintos.
+        heavy_hitters (SpaceSaving): Os valores mais frequentes.
+        top_k (int): Quantos valores mais frequentes são informados.
+        quantiles (KLL, opcional): Os quantis dos valores numéricos.
+    """
+
+    def __init__(self, precision: int, capacity: int, top_k: int, quantile_k: Optional[int] = None) -> None:
+        self.distinct = HyperLogLog(precision)
+        self.heavy_hitters = SpaceSaving(capacity)
+        self.top_k = top_k
+        self.quantiles = KLL(quantile_k) if quantile_k else None
+
+    def add_values(self, values: Iterable[Any]) -> None:
+        """
+        Acrescenta valores (None e células inexistentes são ignorados), em
+        blocos de BLOCK_SIZE: só as contagens de um bloco ficam em memória.
+        """
+        values = iter(values)
+        while True:
+            block = list(islice(values, BLOCK_SIZE))
+            if not block:
+                break
+            counts = Counter(_key(value) for value in block if value is not None and value is not MISSING)
+            del block
+            if counts:
+                self.distinct.add_keys(counts)
+                self.heavy_hitters.update(counts)
+                if self.quantiles is not None:
+                    self._add_numbers(counts)
+
+    def _add_numbers(self, counts: Mapping[str, int]) -> None:
+        # Cada valor distinto é convertido uma única vez, como nas estatísticas exatas.
+        # Valores repetidos entram com peso, sem ser repetidos (veja KLL.add_weighted).
+        numbers: List[float] = []
+        for key, times in counts.items():
+            try:
+                number = float(key)
+            except ValueError:
+                continue
+            if times == 1:
+                numbers.append(number)
+            else:
+                self.quantiles.add_weighted(number, times)
+        if numbers:
+            self.quantiles.add_numbers(numbers)
+
+    def add_column(self, column: Column, start: int, stop: int) -> None:
+        """Acrescenta as células [start, stop) de uma coluna de um ColumnStore, bloco a bloco."""
+        for begin in range(start, stop, BLOCK_SIZE):
+            self.add_values(column.iter_values(min(begin + BLOCK_SIZE, stop), MISSING, begin))
+
+    def merge(self, other: "ColumnSketch") -> None:
+        """Combina os sketches de outra parte da mesma coluna."""
+        self.distinct.merge(other.distinct)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: distinct_count (estimado), top_values, uma lista de
+                            pares [valor, contagem] dos valores mais frequentes,
+                            e, se houver valores numéricos, median, p90 e p99.
+        """
+        result = {"distinct_count": self.distinct.estimate(),
+                  "top_values": [[value, count] for value, count in self.heavy_hitters.top(self.top_k)]}
+        if self.quantiles is not None and self.quantiles.count:
+            names, fractions = zip(*QUANTILES)
+            result.update(zip(names, self.quantiles.quantiles(fractions)))
+        return result
@@ -0,0 +1,373 @@
+"""
+Este módulo grava e abre snapshots binários colunares dos dados consolidados
+(o dicionário retornado por SalesData.consolidate_data).
+
+Um snapshot permite gerar relatórios de novo (outro formato, outra agregação)
+sem reler e reconverter as fontes. O arquivo tem o seguinte formato:
+
+* um prefixo fixo: MAGIC, a posição e o tamanho do cabeçalho (dois inteiros
+  de 64 bits little-endian);
+* os buffers das colunas, cada um alinhado em 8 bytes: os arrays tipados do
+  ColumnStore (inteiros, floats e datas com largura fixa), o bitmap de
+  validade e as casas decimais, exatamente como estão na memória; colunas de
+  texto são codificadas por dicionário (um código por linha, de 1, 2 ou 4
+  bytes, e os valores distintos em JSON);
+* o cabeçalho, em JSON: quantidade de linhas, colunas (tipo e posição de cada
+  buffer), esquema, estatísticas, mapa de cabeçalhos, a impressão digital da
+  configuração que gerou os dados (veja SalesData.snapshot_fingerprint) e os
+  validadores das fontes que só podem ser conferidas com uma requisição
+  (o ETag de uma fonte web, por exemplo).
+
+open_snapshot abre o arquivo com mmap: as colunas tipadas são memoryviews
+sobre o arquivo (sem cópia) e os dicionários de texto só são decodificados
+quando a coluna é lida. Abrir um snapshot custa apenas a leitura do cabeçalho;
+o sistema operacional carrega do disco só as páginas das colunas usadas.
+O ColumnStore aberto é somente leitura.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from gerador_relatorio.sales_data.column_store import MISSING, Column, ColumnStore
+from gerador_relatorio.sales_data.schema import Schema
+
+# Identificação do arquivo e versão do formato.
+MAGIC = b"GRSNAP01"
+SNAPSHOT_FORMAT_VERSION = 1
+
+_PRELUDE = struct.Struct("<8sQQ")
+_ALIGNMENT = 8
+
+# Chave de MISSING no dicionário de códigos.
+_MISSING_KEY = (MISSING.__class__, MISSING)
+
+
+class _Codes(dict):
+    """Atribui o próximo código a cada valor novo (usado com map, sem laço em Python)."""
+
+    def __missing__(self, key: Any) -> int:
+        code = self[key] = len(self)
+        return code
+
+
+def _typecode(buffer: Any) -> str:
+    """O tipo dos itens de um array ou de um memoryview (colunas de um snapshot aberto)."""
+    return buffer.typecode if isinstance(buffer, array) else buffer.format
+
+
+def _code_typecode(size: int) -> str:
+    """O menor tipo de array que comporta `size` códigos."""
+    if size <= 1 << 8:
+        return "B"
+    if size <= 1 << 16:
+        return "H"
+    return "I"
+
+
+def _json_value(value: Any) -> Any:
+    """Confere que o valor volta igual do JSON (texto, números, booleanos, listas e dicts)."""
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor não suportado no snapshot: {value!r}")
+    return value
+
+
+def _encode(values: Sequence[Any]) -> Tuple[array, List[Any]]:
+    """
+    Codifica os valores por dicionário.
+
+    Returns:
+        Tuple[array, List[Any]]: Os códigos e os valores distintos; o código 0
+            é sempre MISSING (célula ausente).
+    """
+    codes = _Codes()
+    codes[_MISSING_KEY] = 0
+    try:
+        # A classe faz parte da chave: 1, 1.0 e True são valores distintos.
+        numbers = list(map(codes.__getitem__, zip(map(type, values), values)))
+        dictionary = [value for _, value in codes]
+        exact = (float, 0.0) not in codes  # 0.0 e -0.0 teriam a mesma chave
+    except TypeError:  # valores não hasheáveis (listas e dicts de uma API)
+        exact = False
+    if not exact:
+        codes = _Codes()
+        codes[_MISSING_KEY] = 0
+        dictionary = [None]
+        numbers = []
+        for value in values:
+            cls = value.__class__
+            if cls is float:
+                key = (cls, repr(value))
+            else:
+                try:
+                    key = (cls, value)
+                    hash(key)
+                except TypeError:
+                    key = (cls, json.dumps(_json_value(value), sort_keys=True))
+            code = codes[key]
+            if code == len(dictionary):
+                dictionary.append(value)
+            numbers.append(code)
+    dictionary[0] = None
+    for value in dictionary:
+        if value.__class__ not in (str, int, float, bool, type(None)):
+            _json_value(value)
+    return array(_code_typecode(len(dictionary)), numbers), dictionary
+
+
+class _Dictionary:
+    """Os valores distintos de uma coluna de texto, decodificados no primeiro uso."""
+
+    __slots__ = ("_buffer", "_values")
+
+    def __init__(self, buffer: memoryview) -> None:
+        self._buffer = buffer
+        self._values: Optional[List[Any]] = None
+
+    @property
+    def values(self) -> List[Any]:
+        if self._values is None:
+            values = json.loads(bytes(self._buffer).decode("utf-8"))
+            values[0] = MISSING
+            self._values = values
+            self._buffer = None
+        return self._values
+
+
+class _EncodedValues(Sequence):
+    """
+    Os valores de uma coluna codificada por dicionário, usada pelo Column no
+    lugar da lista de valores (somente leitura).
+    """
+
+    __slots__ = ("_codes", "_dictionary")
+
+    def __init__(self, codes: memoryview, dictionary: _Dictionary) -> None:
+        self._codes = codes
+        self._dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index):
+        values = self._dictionary.values
+        if isinstance(index, slice):
+            return list(map(values.__getitem__, self._codes[index]))
+        return values[self._codes[index]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self._dictionary.values.__getitem__, self._codes)
+
+
+class _SparseValues(Mapping):
+    """
+    As células inválidas de uma coluna tipada (Column.others): os índices em
+    ordem crescente e os valores codificados por dicionário.
+    """
+
+    __slots__ = ("_indices", "_values")
+
+    def __init__(self, indices: memoryview, values: _EncodedValues) -> None:
+        self._indices = indices
+        self._values = values
+
+    def __getitem__(self, index: int) -> Any:
+        indices = self._indices
+        position = bisect_left(indices, index)
+        if position == len(indices) or indices[position] != index:
+            raise KeyError(index)
+        return self._values[position]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._indices)
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def items(self):
+        return zip(self._indices, self._values)
+
+
+class _Writer:
+    """Grava os buffers alinhados e registra a posição de cada um."""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.offset = _PRELUDE.size
+
+    def write(self, buffer: Any, typecode: Optional[str] = None) -> List[Any]:
+        view = memoryview(buffer).cast("B")
+        self.file.write(view)
+        entry = [self.offset, len(view)]
+        if typecode is not None:
+            entry.append(typecode)
+        self.offset += len(view)
+        padding = -self.offset % _ALIGNMENT
+        if padding:
+            self.file.write(bytes(padding))
+            self.offset += padding
+        return entry
+
+    def write_values(self, values: Sequence[Any]) -> Dict[str, List[Any]]:
+        codes, dictionary = _encode(values)
+        text = json.dumps(dictionary, ensure_ascii=False, separators=(",", ":"))
+        return {"codes": self.write(codes, codes.typecode),
+                "dictionary": self.write(text.encode("utf-8"))}
+
+
+def _write_column(writer: _Writer, column: Column, length: int) -> Dict[str, Any]:
+    column.pad(length)
+    entry: Dict[str, Any] = {"kind": column.kind}
+    if column.validity is None:
+        entry["values"] = writer.write_values(column.data)
+        return entry
+    entry["data"] = writer.write(column.data, _typecode(column.data))
+    entry["validity"] = writer.write(column.validity)
+    if column.scales is not None:
+        entry["scales"] = writer.write(column.scales, _typecode(column.scales))
+    if column.others:
+        indices = sorted(column.others)
+        entry["others"] = {"indices": writer.write(array("q", indices), "q"),
+                           **writer.write_values([column.others[index] for index in indices])}
+    return entry
+
+
+def write_snapshot(path: str, consolidated: Dict[str, Any], fingerprint: Optional[str] = None,
+                   validators: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Grava os dados consolidados em um snapshot.
+
+    O arquivo é gravado em um temporário no mesmo diretório e renomeado:
+    leitores nunca veem um snapshot pela metade.
+
+    Args:
+        path (str): O caminho do snapshot.
+        consolidated (Dict[str, Any]): Os dados consolidados ('data',
+            'statistics', 'header_map' e, opcionalmente, 'schema').
+        fingerprint (str, opcional): Identifica a configuração (fontes,
+            filtros, colunas, deduplicação, sketches) que gerou os dados.
+        validators (Dict[str, Any], opcional): Os validadores da extração de
+            cada fonte, por cache_key (veja DataSource.cache_validators).
+
+    Raises:
+        ValueError: Se alguma célula não puder ser representada em JSON.
+    """
+    data = consolidated["data"]
+    if not isinstance(data, ColumnStore):
+        data = ColumnStore.from_rows(data)
+    length = len(data)
+    schema = consolidated.get("schema") or Schema()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(bytes(_PRELUDE.size))
+            writer = _Writer(file)
+            columns = [{"name": name, **_write_column(writer, column, length)}
+                       for name, column in data.columns.items()]
+            header = {
+                "version": SNAPSHOT_FORMAT_VERSION,
+                "byteorder": sys.byteorder,
+                "fingerprint": fingerprint,
+                "validators": validators or {},
+                "rows": length,
+                "columns": columns,
+                "schema": {"types": schema.types, "storage": schema.storage},
+                "statistics": consolidated.get("statistics", {}),
+                "header_map": {name: [str(source) for source in sources]
+                               for name, sources in consolidated.get("header_map", {}).items()},
+            }
+            header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+            file.write(header_bytes)
+            file.seek(0)
+            file.write(_PRELUDE.pack(MAGIC, writer.offset, len(header_bytes)))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _buffer(view: memoryview, entry: List[Any]) -> memoryview:
+    offset, size = entry[0], entry[1]
+    buffer = view[offset:offset + size]
+    return buffer.cast(entry[2]) if len(entry) > 2 else buffer
+
+
+def _open_values(view: memoryview, entry: Dict[str, Any]) -> _EncodedValues:
+    return _EncodedValues(_buffer(view, entry["codes"]), _Dictionary(_buffer(view, entry["dictionary"])))
+
+
+def _open_column(view: memoryview, entry: Dict[str, Any]) -> Column:
+    column = Column()
+    column.kind = entry["kind"]
+    if "values" in entry:
+        column.data = _open_values(view, entry["values"])
+        return column
+    column.data = _buffer(view, entry["data"])
+    column.validity = _buffer(view, entry["validity"])
+    if "scales" in entry:
+        column.scales = _buffer(view, entry["scales"])
+    if "others" in entry:
+        others = entry["others"]
+        column.others = _SparseValues(_buffer(view, others["indices"]), _open_values(view, others))
+    return column
+
+
+def open_snapshot(path: str, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Abre um snapshot com mmap, sem copiar as colunas.
+
+    Args:
+        path (str): O caminho do snapshot.
+        fingerprint (str, opcional): A impressão digital da configuração atual:
+            se informada, o snapshot só é aberto se tiver sido gravado com ela.
+
+    Returns:
+        Dict[str, Any]: Os dados consolidados: 'data' (um ColumnStore somente
+            leitura), 'statistics', 'header_map' (com a descrição das fontes),
+            'schema', 'source_results' (vazio) e 'source_validators' (os
+            validadores gravados com write_snapshot).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        ValueError: Se o arquivo não for um snapshot desta versão ou tiver
+                    sido gravado com outra configuração.
+    """
+    with open(path, "rb") as file:
+        prelude = file.read(_PRELUDE.size)
+        if len(prelude) < _PRELUDE.size or prelude[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"O arquivo não é um snapshot: {path}")
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    _, header_offset, header_size = _PRELUDE.unpack(prelude)
+    view = memoryview(mapped)
+    try:
+        header = json.loads(bytes(view[header_offset:header_offset + header_size]).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError(f"Cabeçalho do snapshot inválido: {path}")
+    if header.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Versão de snapshot não suportada: {header.get('version')}")
+    if header.get("byteorder") != sys.byteorder:
+        raise ValueError(f"Snapshot gravado em outra ordem de bytes ({header.get('byteorder')}).")
+    if fingerprint is not None and header.get("fingerprint") != fingerprint:
+        raise ValueError("Snapshot gravado com outra configuração (fontes, filtros, colunas, "
+                         "deduplicação ou sketches).")
+
+    data = ColumnStore()
+    data._columns = {entry["name"]: _open_column(view, entry) for entry in header["columns"]}
+    data._length = header["rows"]
+    schema = header.get("schema", {})
+    return {"data": data, "statistics": header.get("statistics", {}),
+            "header_map": header.get("header_map", {}),
+            "schema": Schema(schema.get("types"), schema.get("storage")), "source_results": [],
+            "source_validators": header.get("validators", {})}
@@ -0,0 +1,90 @@
+"""
+Este módulo define a classe SourceResult, que guarda o resultado da extração
+de uma única fonte de dados durante a consolidação.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from gerador_relatorio.data_source.data_source import DataSource
+from gerador_relatorio.sales_data.schema import Schema
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+
+
+class SourceResult:
+    """
+    Resultado da extração de uma fonte de dados.
+
+    Cada fonte é extraída uma única vez por execução; o SourceResult guarda
+    tudo o que foi obtido nessa extração para que a consolidação, as
+    estatísticas e os formatadores não precisem acessar a fonte novamente.
+    As linhas não são copiadas: o resultado aponta para o trecho
+    [start, start + row_count) dos dados consolidados.
+
+    Atributos:
+        source (DataSource): A fonte de dados extraída.
+        data (Sequence[Dict[str, Any]]): Os dados onde as linhas da fonte foram gravadas.
+        start (int): A posição da primeira linha da fonte em `data`.
+        columns (List[str]): As colunas encontradas na fonte, na ordem em que apareceram.
+        row_count (int): A quantidade de linhas extraídas.
+        elapsed (float): O tempo gasto na extração, em segundos.
+        statistics (StatisticsAccumulator): As estatísticas parciais da fonte.
+        from_cache (bool): Se os dados foram lidos do cache de extração.
+        schema (Schema): Os tipos das colunas da fonte.
+        cpu_time (float, opcional): O tempo de CPU gasto na extração, em segundos.
+        statistics_elapsed (float, opcional): A parte de `elapsed` gasta nas estatísticas.
+        bytes_read (int, opcional): Os bytes lidos da fonte (veja DataSource.bytes_read).
+        duplicates (int): As linhas da fonte removidas pela deduplicação (já
+                          descontadas de row_count).
+    """
+
+    def __init__(self, source: DataSource, data: Sequence[Dict[str, Any]], start: int,
+                 row_count: int, columns: List[str], elapsed: float,
+                 statistics: StatisticsAccumulator = None, from_cache: bool = False,
+                 schema: Schema = None, cpu_time: Optional[float] = None,
+                 statistics_elapsed: Optional[float] = None, bytes_read: Optional[int] = None,
+                 duplicates: int = 0) -> None:
+        """
+        Inicializa uma nova instância de SourceResult.
+
+        Args:
+            source (DataSource): A fonte de dados extraída.
+            data (Sequence[Dict[str, Any]]): Os dados onde as linhas da fonte foram gravadas.
+            start (int): A posição da primeira linha da fonte em `data`.
+            row_count (int): A quantidade de linhas extraídas.
+            columns (List[str]): As colunas encontradas na fonte.
+            elapsed (float): O tempo gasto na extração, em segundos.
+            statistics (StatisticsAccumulator, opcional): As estatísticas parciais da fonte.
+            from_cache (bool): Se os dados foram lidos do cache de extração.
+            schema (Schema, opcional): Os tipos das colunas da fonte.
+            cpu_time (float, opcional): O tempo de CPU gasto na extração.
+            statistics_elapsed (float, opcional): O tempo gasto nas estatísticas.
+            bytes_read (int, opcional): Os bytes lidos da fonte.
+            duplicates (int): As linhas removidas pela deduplicação.
+        """
+        self.source = source
+        self.data = data
+        self.start = start
+        self.row_count = row_count
+        self.columns = columns
+        self.elapsed = elapsed
+        self.statistics = statistics if statistics is not None else StatisticsAccumulator()
+        self.from_cache = from_cache
+        self.schema = schema if schema is not None else Schema()
+        self.cpu_time = cpu_time
+        self.statistics_elapsed = statistics_elapsed
+        self.bytes_read = bytes_read
+        self.duplicates = duplicates
+
+    @property
+    def rows(self) -> Sequence[Dict[str, Any]]:
+        """Retorna as linhas extraídas desta fonte."""
+        return self.data[self.start:self.start + self.row_count]
+
+    @property
+    def name(self) -> str:
+        """Retorna um nome legível para a fonte (nome, localização ou repr)."""
+        return getattr(self.source, "name", None) or getattr(self.source, "location", None) or repr(self.source)
+
+    def __repr__(self) -> str:
+        return (f"SourceResult(source={self.name!r}, row_count={self.row_count}, "
+                f"columns={len(self.columns)}, elapsed={self.elapsed:.3f}s)")
@@ -0,0 +1,461 @@
+"""
+Este módulo define a classe StatisticsAccumulator, que calcula as estatísticas
+básicas das colunas em uma única passada sobre as linhas.
+
+Os acumuladores parciais (de lotes, de fontes ou de processos diferentes)
+podem ser combinados com merge() e o resultado é exatamente o mesmo de uma
+única passada sobre todas as linhas: contagens, mínimo, máximo e somas são
+exatos e não dependem da ordem em que os valores chegam.
+
+Dados em um ColumnStore são acumulados coluna a coluna (update_store): os
+números já convertidos saem direto dos arrays tipados, e colunas de texto
+convertem cada valor distinto uma única vez.
+
+Com SketchOptions, as colunas escolhidas também ganham sketches (valores
+distintos, mais frequentes e quantis, veja sketches.py), combinados no mesmo
+merge(); esses resultados são aproximados.
+"""
+
+import math
+import string
+from collections import Counter
+from fractions import Fraction
+from itertools import chain, compress, islice
+from operator import mul
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from gerador_relatorio.sales_data.column_store import (
+    DATE_TEXT, INT, INT_TEXT, MISSING, Column, ColumnStore,
+)
+from gerador_relatorio.sales_data.sketches import ColumnSketch, SketchOptions
+
+# Primeiros caracteres com os quais float() nunca funciona: letras ASCII, exceto
+# as iniciais de "inf"/"infinity"/"nan", e a string vazia. Strings que começam
+# assim são contadas como texto sem pagar o custo de uma exceção.
+_TEXT_START = frozenset(string.ascii_letters) - frozenset("iInN") | {""}
+
+# Os bits de cada byte de um bitmap de validade, do menos para o mais significativo.
+_BYTE_BITS = [tuple(byte >> bit & 1 for bit in range(8)) for byte in range(256)]
+
+# Inteiros até este valor absoluto são convertidos para float sem arredondamento.
+_EXACT_INT = 2 ** 53
+
+
+class ColumnAccumulator:
+    """
+    Estado acumulado de uma única coluna.
+
+    As somas são guardadas de forma exata: cada float é decomposto em
+    numerador/denominador inteiros (float.as_integer_ratio) e os numeradores
+    são somados por denominador. Somar inteiros não depende da ordem, por isso
+    o merge de parciais é exato.
+
+    Atributos:
+        count (int): Quantidade de valores não nulos.
+        numeric_count (int): Quantidade de valores convertíveis para número.
+        min (float): O menor valor numérico visto (NaN é ignorado).
+        max (float): O maior valor numérico visto (NaN é ignorado).
+    """
+
+    __slots__ = ("count", "numeric_count", "min", "max", "_sums", "_nan_count", "_non_finite")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.numeric_count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._sums: Dict[int, List[int]] = {}  # denominador -> [soma dos numeradores, soma dos quadrados]
+        self._nan_count = 0
+        self._non_finite = 0.0
+
+    def add_number(self, number: float, times: int = 1) -> None:
+        """Acrescenta um valor numérico já convertido para float (`times` vezes)."""
+        self.numeric_count += times
+        if number < self.min:
+            self.min = number
+        if number > self.max:
+            self.max = number
+        try:
+            numerator, denominator = number.as_integer_ratio()
+        except (OverflowError, ValueError):
+            self.add_non_finite(number, times)
+            return
+        sums = self._sums.get(denominator)
+        if sums is None:
+            self._sums[denominator] = [numerator * times, numerator * numerator * times]
+        else:
+            sums[0] += numerator * times
+            sums[1] += numerator * numerator * times
+
+    def add_non_finite(self, number: float, times: int = 1) -> None:
+        """Registra um valor inf ou NaN, que não entra na soma exata."""
+        if number != number:
+            self._nan_count += times
+        self._non_finite += number * times
+
+    def add_value(self, value: Any, times: int = 1) -> None:
+        """Acrescenta um valor qualquer (`times` vezes), como em StatisticsAccumulator.update."""
+        if value is None:
+            return
+        self.count += times
+        if value.__class__ is str and value[:1] in _TEXT_START:
+            return
+        try:
+            number = float(value)
+        except (ValueError, TypeError):
+            return
+        self.add_number(number, times)
+
+    def add_integers(self, values: Iterable[int]) -> None:
+        """
+        Acrescenta inteiros não nulos (contados em `count` também) com somas
+        nativas: até 2**53 o float de cada inteiro é exato e o denominador é 1.
+        """
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        if not values:
+            return
+        low, high = min(values), max(values)
+        if low < -_EXACT_INT or high > _EXACT_INT:
+            self.add_floats(list(map(float, values)))
+            return
+        self.count += len(values)
+        self.numeric_count += len(values)
+        if low < self.min:
+            self.min = float(low)
+        if high > self.max:
+            self.max = float(high)
+        sums = self._sums.setdefault(1, [0, 0])
+        sums[0] += sum(values)
+        sums[1] += sum(map(mul, values, values))
+
+    def add_floats(self, values: Iterable[float]) -> None:
+        """Acrescenta floats não nulos (contados em `count` também)."""
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        if not values:
+            return
+        self.count += len(values)
+        if not all(map(math.isfinite, values)):
+            for number in values:
+                self.add_number(number)
+            return
+        self.numeric_count += len(values)
+        low, high = min(values), max(values)
+        if low < self.min:
+            self.min = low
+        if high > self.max:
+            self.max = high
+        all_sums = self._sums
+        for numerator, denominator in map(float.as_integer_ratio, values):
+            sums = all_sums.get(denominator)
+            if sums is None:
+                all_sums[denominator] = [numerator, numerator * numerator]
+            else:
+                sums[0] += numerator
+                sums[1] += numerator * numerator
+
+    def add_column(self, column: Column, start: int, stop: int) -> bool:
+        """
+        Acrescenta as células [start, stop) de uma coluna de um ColumnStore.
+
+        Células de colunas tipadas já estão convertidas: os números entram
+        direto (add_integers/add_floats) e datas só contam como preenchidas.
+        Em colunas de texto, cada valor distinto é convertido uma única vez.
+
+        Returns:
+            bool: Se alguma das células existia (não era MISSING).
+        """
+        data = column.data
+        stop = min(stop, len(data))
+        if stop <= start:
+            return False
+        if column.validity is None:
+            values = data[start:stop]
+            try:
+                counts = Counter(values).items()
+            except TypeError:  # valores não hasheáveis (por exemplo, dicts de uma API)
+                counts = zip(values, [1] * len(values))
+            present = False
+            add_value = self.add_value
+            for value, times in counts:
+                if value is not MISSING:
+                    present = True
+                    add_value(value, times)
+            return present
+
+        kind = column.kind
+        others = column.others
+        present = False
+        if others:
+            for index, value in others.items():
+                if start <= index < stop:
+                    present = True
+                    self.add_value(value)
+        values = data[start:stop]
+        if others or not column._all_valid():
+            offset = start & 7
+            bits = chain.from_iterable(map(_BYTE_BITS.__getitem__, column.validity[start >> 3:(stop + 7) >> 3]))
+            values = list(compress(values, islice(bits, offset, offset + stop - start)))
+        if not values:
+            return present
+        if kind == DATE_TEXT:
+            self.count += len(values)
+        elif kind in (INT, INT_TEXT):
+            self.add_integers(values.tolist() if hasattr(values, "tolist") else values)
+        else:
+            self.add_floats(values.tolist() if hasattr(values, "tolist") else values)
+        return True
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        """Combina o estado de outra coluna a este."""
+        self.count += other.count
+        self.numeric_count += other.numeric_count
+        if other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        for denominator, (numerator, square) in other._sums.items():
+            sums = self._sums.get(denominator)
+            if sums is None:
+                self._sums[denominator] = [numerator, square]
+            else:
+                sums[0] += numerator
+                sums[1] += square
+        self._nan_count += other._nan_count
+        self._non_finite += other._non_finite
+
+    def result(self, row_count: int) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas da coluna.
+
+        Args:
+            row_count (int): A quantidade total de linhas acumuladas.
+
+        Returns:
+            Dict[str, Any]: min, max, blank_count, count, numeric_count, sum, mean e variance.
+        """
+        col_min = col_max = total = mean = variance = None
+        n = self.numeric_count
+        if n > self._nan_count:
+            col_min, col_max = self.min, self.max
+        if n:
+            if self._non_finite:
+                total = mean = self._non_finite
+            else:
+                exact_sum = sum((Fraction(s, d) for d, (s, _) in self._sums.items()), Fraction(0))
+                total = float(exact_sum)
+                mean = float(exact_sum / n)
+                if n > 1:
+                    exact_sq = sum((Fraction(q, d * d) for d, (_, q) in self._sums.items()), Fraction(0))
+                    variance = float((exact_sq - exact_sum * exact_sum / n) / (n - 1))
+        return {
+            "min": col_min,
+            "max": col_max,
+            "blank_count": row_count - self.count,
+            "count": self.count,
+            "numeric_count": n,
+            "sum": total,
+            "mean": mean,
+            "variance": variance,
+        }
+
+
+class StatisticsAccumulator:
+    """
+    Acumula as estatísticas básicas de todas as colunas em uma única passada.
+
+    Um valor é considerado em branco quando é None ou quando a coluna não
+    existe na linha; é numérico quando float(valor) funciona.
+
+    Atributos:
+        row_count (int): A quantidade de linhas acumuladas.
+        columns (Dict[str, ColumnAccumulator]): O estado de cada coluna, na
+                                                ordem em que as colunas apareceram.
+        sketch_options (SketchOptions, opcional): As colunas e os erros dos sketches.
+        sketches (Dict[str, ColumnSketch]): Os sketches de cada coluna escolhida.
+    """
+
+    def __init__(self, sketch_options: Optional[SketchOptions] = None) -> None:
+        """
+        Inicializa um acumulador vazio.
+
+        Args:
+            sketch_options (SketchOptions, opcional): Calcula também os sketches
+                                                      das colunas escolhidas.
+        """
+        self.row_count = 0
+        self.columns: Dict[str, ColumnAccumulator] = {}
+        self.sketch_options = sketch_options
+        self.sketches: Dict[str, ColumnSketch] = {}
+
+    def update(self, row: Mapping[str, Any]) -> None:
+        """
+        Acrescenta uma linha às estatísticas.
+
+        Args:
+            row (Mapping[str, Any]): A linha a ser acumulada.
+        """
+        self.row_count += 1
+        if self.sketch_options is not None:
+            self._update_row_sketches(row)
+        columns = self.columns
+        for column, value in row.items():
+            state = columns.get(column)
+            if state is None:
+                state = columns[column] = ColumnAccumulator()
+            if value is None:
+                continue
+            state.count += 1
+            if value.__class__ is str and value[:1] in _TEXT_START:
+                continue
+            try:
+                number = float(value)
+            except (ValueError, TypeError):
+                continue
+            # Mesmo código de ColumnAccumulator.add_number, em linha por desempenho.
+            state.numeric_count += 1
+            if number < state.min:
+                state.min = number
+            if number > state.max:
+                state.max = number
+            try:
+                numerator, denominator = number.as_integer_ratio()
+            except (OverflowError, ValueError):
+                state.add_non_finite(number)
+                continue
+            sums = state._sums.get(denominator)
+            if sums is None:
+                state._sums[denominator] = [numerator, numerator * numerator]
+            else:
+                sums[0] += numerator
+                sums[1] += numerator * numerator
+
+    def update_store(self, store: ColumnStore, start: int = 0, stop: Optional[int] = None,
+                     columns: Optional[Iterable[str]] = None) -> "StatisticsAccumulator":
+        """
+        Acrescenta as linhas [start, stop) de um ColumnStore, coluna a coluna.
+
+        O resultado é o mesmo de update_many sobre as mesmas linhas, sem montar
+        um RowView nem chamar float() por célula.
+
+        Args:
+            store (ColumnStore): Os dados.
+            start (int): A primeira linha. Padrão: 0.
+            stop (int, opcional): O fim do intervalo. Padrão: todas as linhas.
+            columns (Iterable[str], opcional): As colunas, na ordem em que devem
+                aparecer nas estatísticas. Padrão: as colunas do store.
+
+        Returns:
+            StatisticsAccumulator: O próprio acumulador, para encadeamento.
+        """
+        store_columns = store.columns
+        if stop is None:
+            stop = len(store)
+        self.row_count += max(stop - start, 0)
+        for name in (store_columns if columns is None else columns):
+            column = store_columns.get(name)
+            if column is None:
+                continue
+            partial = ColumnAccumulator()
+            if not partial.add_column(column, start, stop):
+                continue
+            state = self.columns.get(name)
+            if state is None:
+                self.columns[name] = partial
+            else:
+                state.merge(partial)
+        if self.sketch_options is not None:
+            self.update_sketches(store, start, stop, columns)
+        return self
+
+    def update_sketches(self, store: ColumnStore, start: int = 0, stop: Optional[int] = None,
+                        columns: Optional[Iterable[str]] = None) -> "StatisticsAccumulator":
+        """
+        Acrescenta as linhas [start, stop) de um ColumnStore apenas aos sketches
+        (as estatísticas exatas não mudam).
+
+        Returns:
+            StatisticsAccumulator: O próprio acumulador, para encadeamento.
+        """
+        options = self.sketch_options
+        store_columns = store.columns
+        if stop is None:
+            stop = len(store)
+        for name in (store_columns if columns is None else columns):
+            column = store_columns.get(name)
+            if column is None or not options.includes(name):
+                continue
+            sketch = self.sketches.get(name)
+            if sketch is None:
+                sketch = self.sketches[name] = options.new_sketch()
+            sketch.add_column(column, start, stop)
+        # Colunas sem nenhum valor no intervalo não ficam com sketches vazios.
+        self.sketches = {name: sketch for name, sketch in self.sketches.items() if sketch.heavy_hitters.total}
+        return self
+
+    def _update_row_sketches(self, row: Mapping[str, Any]) -> None:
+        options = self.sketch_options
+        for column, value in row.items():
+            if value is None or not options.includes(column):
+                continue
+            sketch = self.sketches.get(column)
+            if sketch is None:
+                sketch = self.sketches[column] = options.new_sketch()
+            sketch.add_values((value,))
+
+    def update_many(self, rows: Iterable[Mapping[str, Any]]) -> "StatisticsAccumulator":
+        """
+        Acrescenta várias linhas às estatísticas.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): As linhas a serem acumuladas.
+
+        Returns:
+            StatisticsAccumulator: O próprio acumulador, para encadeamento.
+        """
+        update = self.update
+        for row in rows:
+            update(row)
+        return self
+
+    def merge(self, other: "StatisticsAccumulator") -> "StatisticsAccumulator":
+        """
+        Combina outro acumulador a este, como se as linhas dele viessem depois.
+
+        Args:
+            other (StatisticsAccumulator): O acumulador parcial a ser combinado.
+
+        Returns:
+            StatisticsAccumulator: O próprio acumulador, para encadeamento.
+        """
+        self.row_count += other.row_count
+        for column, other_state in other.columns.items():
+            state = self.columns.get(column)
+            if state is None:
+                state = self.columns[column] = ColumnAccumulator()
+            state.merge(other_state)
+        if other.sketches:
+            if self.sketch_options is None:
+                self.sketch_options = other.sketch_options
+            for column, other_sketch in other.sketches.items():
+                sketch = self.sketches.get(column)
+                if sketch is None:
+                    # Uma cópia: o acumulador parcial continua independente.
+                    sketch = self.sketches[column] = other.sketch_options.new_sketch()
+                sketch.merge(other_sketch)
+        return self
+
+    def result(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna as estatísticas de cada coluna.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: As estatísticas por coluna, no formato de
+                                       SalesData.compute_basic_statistics (com
+                                       distinct_count, top_values e os quantis
+                                       nas colunas com sketches).
+        """
+        statistics = {column: state.result(self.row_count) for column, state in self.columns.items()}
+        for column, sketch in self.sketches.items():
+            if column in statistics:
+                statistics[column].update(sketch.result())
+        return statistics
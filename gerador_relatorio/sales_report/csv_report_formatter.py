@@ -2,7 +2,7 @@
 
 import csv
 import io
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Sequence, TextIO, Tuple
 from gerador_relatorio.sales_report.report_formatter import ReportFormatter
 
 class CSVReportFormatter(ReportFormatter):
@@ -10,6 +10,8 @@ class CSVReportFormatter(ReportFormatter):
     Formatador de relatório para o formato CSV.
     """
 
+    FILE_EXTENSION = "csv"
+
     def format_report(self, consolidated_data: Dict[str, Any]) -> Tuple[str, str]:
         """
         Formata os dados de vendas consolidados e as estatísticas em relatórios CSV.
@@ -30,33 +32,55 @@ class CSVReportFormatter(ReportFormatter):
         """
         Gera a string CSV para os dados de vendas.
         """
-        data = consolidated_data.get('data')
-        if not data:
-            raise ValueError("Não há dados para gerar o relatório CSV.")
-        
         output = io.StringIO()
-        columns = list(consolidated_data['header_map'].keys())
-        
-        writer = csv.DictWriter(output, fieldnames=columns)
-        writer.writeheader()
-
-        for row in data:
-            row_to_write = {col: row.get(col, '') for col in columns}
-            writer.writerow(row_to_write)
-        
+        self.write_report(output, consolidated_data)
         return output.getvalue()
 
+    def begin_report(self, stream: TextIO, consolidated_data: Dict[str, Any],
+                     columns: List[str], has_rows: bool) -> None:
+        """
+        Escreve a linha de cabeçalho do CSV.
+
+        Raises:
+            ValueError: Se não houver dados para o relatório.
+        """
+        if not has_rows:
+            raise ValueError("Não há dados para gerar o relatório CSV.")
+        csv.writer(stream).writerow(columns)
+
+    def write_rows(self, stream: TextIO, rows: List[Sequence[Any]]) -> None:
+        """Escreve um lote de linhas do CSV."""
+        csv.writer(stream).writerows(rows)
+
+    def end_report(self, stream: TextIO, consolidated_data: Dict[str, Any], has_rows: bool) -> None:
+        """O CSV de dados não tem rodapé: as estatísticas vão para outro arquivo (write_statistics)."""
+
     def format_statistics(self, consolidated_data: Dict[str, Any]) -> str:
         """
         Gera a string CSV para as estatísticas de vendas.
         """
+        output = io.StringIO()
+        self.write_statistics(output, consolidated_data)
+        return output.getvalue()
+
+    def write_statistics(self, stream: TextIO, consolidated_data: Dict[str, Any]) -> None:
+        """
+        Escreve o CSV das estatísticas de vendas em `stream`.
+        Não escreve nada se não houver estatísticas.
+        """
         statistics = consolidated_data.get('statistics')
         if not statistics:
-            return "" # Retorna string vazia se não houver estatísticas
+            return
 
-        output = io.StringIO()
         fieldnames = ["metric", "min", "max", "blank_count"]
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
+        # Com sketches, as colunas de valores distintos e mais frequentes (aproximados).
+        sketches = self.has_sketches(statistics)
+        if sketches:
+            fieldnames += ["distinct_count", "top_values"]
+        quantiles = self.has_quantiles(statistics)
+        if quantiles:
+            fieldnames += self.QUANTILE_METRICS
+        writer = csv.DictWriter(stream, fieldnames=fieldnames)
         writer.writeheader()
 
         for column, metrics in statistics.items():
@@ -66,6 +90,35 @@ class CSVReportFormatter(ReportFormatter):
                 "max": metrics.get("max", ""),
                 "blank_count": metrics.get("blank_count", 0),
             }
+            if sketches:
+                row["distinct_count"] = metrics.get("distinct_count", "")
+                row["top_values"] = self.format_top_values(metrics.get("top_values"))
+            if quantiles:
+                row.update({name: metrics.get(name, "") for name in self.QUANTILE_METRICS})
             writer.writerow(row)
 
-        return output.getvalue()
\ No newline at end of file
+    def format_aggregations(self, consolidated_data: Dict[str, Any]) -> str:
+        """
+        Gera a string CSV para as agregações.
+        """
+        output = io.StringIO()
+        self.write_aggregations(output, consolidated_data)
+        return output.getvalue()
+
+    def write_aggregations(self, stream: TextIO, consolidated_data: Dict[str, Any]) -> None:
+        """
+        Escreve o CSV das agregações em `stream`: para cada agregação, uma linha
+        com o nome, o cabeçalho e uma linha por grupo, separadas por uma linha
+        em branco. Não escreve nada se não houver agregações.
+        """
+        aggregations = consolidated_data.get('aggregations')
+        if not aggregations:
+            return
+
+        writer = csv.writer(stream)
+        for index, aggregation in enumerate(aggregations):
+            if index:
+                writer.writerow([])
+            writer.writerow([aggregation.name])
+            writer.writerow(aggregation.columns)
+            writer.writerows(aggregation.formatted_rows())
@@ -2,7 +2,8 @@
 Este módulo define a classe HTMLReportFormatter para formatar relatórios em HTML.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Sequence, TextIO
+from gerador_relatorio.sales_data.aggregation import AggregationResult
 from gerador_relatorio.sales_report.report_formatter import ReportFormatter
 
 class HTMLReportFormatter(ReportFormatter):
@@ -10,23 +11,30 @@ class HTMLReportFormatter(ReportFormatter):
     Formatador de relatório para HTML.
     """
 
-    def format_report(self, consolidated_data: Dict[str, Any]) -> str:
-        """
-        Formata os dados e as estatísticas de vendas em um relatório HTML completo.
+    FILE_EXTENSION = "html"
 
-        Args:
-            consolidated_data (Dict[str, Any]): Dicionário com os dados consolidados,
-                                                incluindo 'data', 'statistics' e 'header_map'.
+    # Fim da tabela de dados.
+    TABLE_END = "\n        </tbody>\n    </table>"
 
-        Returns:
-            str: O relatório em formato HTML.
-        """
-        html_content = [
+    def begin_report(self, stream: TextIO, consolidated_data: Dict[str, Any],
+                     columns: List[str], has_rows: bool) -> None:
+        """Escreve o cabeçalho do documento e o início da tabela de dados."""
+        stream.write(self._format_head("Relatório de Vendas") + "\n")
+
+        if not has_rows:
+            stream.write("<p>Nenhum dado de vendas disponível.</p>")
+            return
+
+        stream.write("    <h2>Dados de Vendas</h2>\n" + self._format_table_start(columns))
+
+    def _format_head(self, title: str) -> str:
+        """Gera o início do documento, até o título da página."""
+        html_head = [
             "<!DOCTYPE html>",
             "<html lang='pt-BR'>",
             "<head>",
             "    <meta charset='UTF-8'>",
-            "    <title>Relatório de Vendas</title>",
+            f"    <title>{title}</title>",
             "    <style>",
             "        body { font-family: sans-serif; margin: 20px; }",
             "        h1, h2 { color: #333; }",
@@ -38,25 +46,14 @@ class HTMLReportFormatter(ReportFormatter):
             "    </style>",
             "</head>",
             "<body>",
-            "    <h1>Relatório de Vendas</h1>",
-            self._format_data_table(consolidated_data),
-            self._format_statistics_section(consolidated_data),
-            "</body>",
-            "</html>"
+            f"    <h1>{title}</h1>",
         ]
-        return "\n".join(html_content)
+        return "\n".join(html_head)
 
-    def _format_data_table(self, consolidated_data: Dict[str, Any]) -> str:
-        """Gera a tabela de dados HTML."""
-        data = consolidated_data.get("data", [])
-        header_map = consolidated_data.get("header_map", {})
-        
-        if not data:
-            return "<p>Nenhum dado de vendas disponível.</p>"
+    def _format_table_start(self, columns: List[str]) -> str:
+        """Gera o início da tabela de dados, com o cabeçalho das colunas."""
+        table_html = ["    <table>"]
 
-        columns = list(header_map.keys())
-        table_html = ["    <h2>Dados de Vendas</h2>", "    <table>"]
-        
         # Cabeçalho da tabela
         table_html.append("        <thead>")
         table_html.append("            <tr>")
@@ -64,20 +61,27 @@ class HTMLReportFormatter(ReportFormatter):
             table_html.append(f"                <th>{col}</th>")
         table_html.append("            </tr>")
         table_html.append("        </thead>")
-        
-        # Corpo da tabela
         table_html.append("        <tbody>")
-        for row in data:
-            table_html.append("            <tr>")
-            for col in columns:
-                value = row.get(col, '')
-                table_html.append(f"                <td>{value}</td>")
-            table_html.append("            </tr>")
-        table_html.append("        </tbody>")
-        
-        table_html.append("    </table>")
         return "\n".join(table_html)
-    
+
+    def write_rows(self, stream: TextIO, rows: List[Sequence[Any]]) -> None:
+        """Escreve um lote de linhas da tabela de dados."""
+        parts = []
+        for values in rows:
+            cells = "".join([f"\n                <td>{value}</td>" for value in values])
+            parts.append(f"\n            <tr>{cells}\n            </tr>")
+        stream.write("".join(parts))
+
+    def end_report(self, stream: TextIO, consolidated_data: Dict[str, Any], has_rows: bool) -> None:
+        """Fecha a tabela de dados e escreve as seções de estatísticas e de agregações."""
+        if has_rows:
+            stream.write(self.TABLE_END)
+        stream.write("\n" + self._format_statistics_section(consolidated_data))
+        aggregations = consolidated_data.get("aggregations")
+        if aggregations:
+            stream.write("\n" + self._format_aggregations_section(aggregations))
+        stream.write("\n</body>\n</html>")
+
     def _format_statistics_section(self, consolidated_data: Dict[str, Any]) -> str:
         """Gera a seção de estatísticas HTML."""
         statistics = consolidated_data.get("statistics", {})
@@ -86,6 +90,17 @@ class HTMLReportFormatter(ReportFormatter):
             return "<p class='statistics-section'>Nenhuma estatística disponível.</p>"
 
         stats_html = ["    <div class='statistics-section'>", "        <h2>Estatísticas</h2>", "        <table class='statistics-table'>", "            <thead>", "                <tr>", "                    <th>Métrica</th>", "                    <th>Mínimo</th>", "                    <th>Máximo</th>", "                    <th>Contagem de Nulos</th>", "                </tr>", "            </thead>", "            <tbody>"]
+        # Com sketches, as colunas de valores distintos e mais frequentes (aproximados).
+        sketches = self.has_sketches(statistics)
+        if sketches:
+            # Antes do fechamento do cabeçalho ("</tr>", "</thead>", "<tbody>").
+            stats_html[-3:-3] = ["                    <th>Valores Distintos (aprox.)</th>",
+                                 "                    <th>Mais Frequentes (aprox.)</th>"]
+        quantiles = self.has_quantiles(statistics)
+        if quantiles:
+            stats_html[-3:-3] = ["                    <th>Mediana (aprox.)</th>",
+                                 "                    <th>P90 (aprox.)</th>",
+                                 "                    <th>P99 (aprox.)</th>"]
 
         for column, metrics in statistics.items():
             min_val = metrics.get('min', 'N/A')
@@ -97,10 +112,41 @@ class HTMLReportFormatter(ReportFormatter):
             stats_html.append(f"                    <td>{min_val}</td>")
             stats_html.append(f"                    <td>{max_val}</td>")
             stats_html.append(f"                    <td>{blank_count}</td>")
+            if sketches:
+                stats_html.append(f"                    <td>{metrics.get('distinct_count', 'N/A')}</td>")
+                stats_html.append(f"                    <td>{self.format_top_values(metrics.get('top_values'), 'N/A')}</td>")
+            if quantiles:
+                for name in self.QUANTILE_METRICS:
+                    value = metrics.get(name)
+                    stats_html.append(f"                    <td>{value if value is not None else 'N/A'}</td>")
             stats_html.append("                </tr>")
         
         stats_html.append("            </tbody>")
         stats_html.append("        </table>")
         stats_html.append("    </div>")
 
-        return "\n".join(stats_html)
\ No newline at end of file
+        return "\n".join(stats_html)
+
+    def _format_aggregations_section(self, aggregations: List[AggregationResult]) -> str:
+        """Gera a seção de agregações HTML: uma tabela por agregação."""
+        html = ["    <div class='statistics-section'>", "        <h2>Agregações</h2>"]
+        for aggregation in aggregations:
+            html.append(f"        <h3>{aggregation.name}</h3>")
+            html.append("        <table class='statistics-table'>")
+            html.append("            <thead>")
+            html.append("                <tr>")
+            for column in aggregation.columns:
+                html.append(f"                    <th>{column}</th>")
+            html.append("                </tr>")
+            html.append("            </thead>")
+            html.append("            <tbody>")
+            for values in aggregation.formatted_rows(missing="N/A"):
+                html.append("                <tr>")
+                for value in values:
+                    html.append(f"                    <td>{value}</td>")
+                html.append("                </tr>")
+            html.append("            </tbody>")
+            html.append("        </table>")
+        html.append("    </div>")
+
+        return "\n".join(html)
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Este módulo define a classe PaginatedHTMLReportFormatter, que divide o
+relatório HTML em páginas para relatórios muito grandes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter
+
+# Quantidade padrão de linhas por página.
+DEFAULT_PAGE_SIZE = 10000
+
+# O formatador e os dados do processo worker (definidos por _init_worker).
+_worker_state: Optional[Tuple["PaginatedHTMLReportFormatter", ColumnStore, List[str], int]] = None
+
+
+def _init_worker(formatter: "PaginatedHTMLReportFormatter", data: ColumnStore,
+                 columns: List[str], page_count: int) -> None:
+    global _worker_state
+    _worker_state = (formatter, data, columns, page_count)
+
+
+def _render_page(number: int) -> None:
+    formatter, data, columns, page_count = _worker_state
+    formatter.render_page(data, columns, number, page_count)
+
+
+class PaginatedHTMLReportFormatter(HTMLReportFormatter):
+    """
+    Formatador de relatório HTML em páginas.
+
+    As linhas são escritas em arquivos numerados de até `page_size` linhas
+    (relatorio_vendas_pagina_0001.html, ...), abertos e fechados à medida que
+    as linhas chegam, então a memória e o tempo por página não dependem do
+    tamanho do relatório. O arquivo do relatório (o `stream` recebido) vira o
+    índice: estatísticas, agregações e os links para as páginas.
+
+    Com max_workers > 1 e os dados em um ColumnStore, as páginas são geradas
+    em paralelo por um pool de processos, cada um lendo o seu intervalo de
+    linhas direto das colunas; o resultado é idêntico ao da geração em série.
+
+    Atributos:
+        output_dir (str): O diretório das páginas (o mesmo do índice).
+        page_size (int): A quantidade máxima de linhas por página.
+        max_workers (int): A quantidade de processos que geram as páginas.
+        report_name (str): O nome do relatório: o índice é `report_name`.html
+                           e as páginas `report_name`_pagina_0001.html, ...
+    """
+
+    # Tamanho do buffer dos arquivos das páginas (1 MiB).
+    PAGE_BUFFER_SIZE = 1 << 20
+
+    def __init__(self, output_dir: str = "output", page_size: int = DEFAULT_PAGE_SIZE,
+                 max_workers: int = 1, report_name: str = "relatorio_vendas") -> None:
+        """
+        Inicializa uma nova instância de PaginatedHTMLReportFormatter.
+
+        Args:
+            output_dir (str): O diretório das páginas.
+            page_size (int): A quantidade máxima de linhas por página.
+            max_workers (int): Processos que geram as páginas. Padrão: 1 (em série).
+            report_name (str): O nome do relatório (sem extensão).
+
+        Raises:
+            ValueError: Se page_size não for maior que zero.
+        """
+        if page_size < 1:
+            raise ValueError("page_size deve ser maior que zero.")
+        self.output_dir = output_dir
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.report_name = report_name
+        self._reset()
+
+    def _reset(self) -> None:
+        self._columns: List[str] = []
+        self._page: Optional[TextIO] = None
+        self._page_rows = 0
+        self._page_count = 0
+        self._row_count = 0
+        self._rendered = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Só a configuração vai para os workers (a página aberta não é serializável).
+        return {"output_dir": self.output_dir, "page_size": self.page_size,
+                "max_workers": self.max_workers, "report_name": self.report_name}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset()
+
+    @property
+    def index_name(self) -> str:
+        """O nome do arquivo do índice (o relatório HTML)."""
+        return f"{self.report_name}.html"
+
+    def page_name(self, number: int) -> str:
+        """O nome do arquivo da página `number` (a partir de 1)."""
+        return f"{self.report_name}_pagina_{number:04d}.html"
+
+    def begin_report(self, stream: TextIO, consolidated_data: Dict[str, Any],
+                     columns: List[str], has_rows: bool) -> None:
+        """
+        Escreve o início do índice. Com max_workers > 1 e os dados em um
+        ColumnStore, gera aqui todas as páginas em paralelo.
+        """
+        self._reset()
+        self._columns = columns
+        stream.write(self._format_head("Relatório de Vendas") + "\n")
+        if not has_rows:
+            stream.write("<p>Nenhum dado de vendas disponível.</p>")
+            return
+        data = consolidated_data.get("data")
+        if self.max_workers > 1 and isinstance(data, ColumnStore) and len(data) > self.page_size:
+            self._render_pages(data, columns)
+
+    def write_rows(self, stream: TextIO, rows: List[Sequence[Any]]) -> None:
+        """Escreve um lote de linhas nas páginas, abrindo uma página nova a cada page_size linhas."""
+        if self._rendered:
+            return
+        self._row_count += len(rows)
+        position = 0
+        while position < len(rows):
+            if self._page is None or self._page_rows == self.page_size:
+                self._next_page()
+            count = min(self.page_size - self._page_rows, len(rows) - position)
+            super().write_rows(self._page, rows[position:position + count])
+            self._page_rows += count
+            position += count
+
+    def end_report(self, stream: TextIO, consolidated_data: Dict[str, Any], has_rows: bool) -> None:
+        """Fecha a última página e escreve os links das páginas, as estatísticas e as agregações no índice."""
+        if self._page is not None:
+            self._close_page(has_next=False)
+        if has_rows:
+            stream.write("\n" + self._format_pages_section())
+        stream.write("\n" + self._format_statistics_section(consolidated_data))
+        aggregations = consolidated_data.get("aggregations")
+        if aggregations:
+            stream.write("\n" + self._format_aggregations_section(aggregations))
+        stream.write("\n</body>\n</html>")
+
+    def render_page(self, data: ColumnStore, columns: List[str], number: int, page_count: int) -> None:
+        """
+        Gera uma única página a partir das colunas de um ColumnStore.
+
+        Args:
+            data (ColumnStore): Os dados.
+            columns (List[str]): As colunas do relatório.
+            number (int): O número da página (a partir de 1).
+            page_count (int): A quantidade total de páginas.
+        """
+        start = (number - 1) * self.page_size
+        values = data.iter_values(columns, "", start, start + self.page_size)
+        with self._open_page(number) as page:
+            page.write(self._format_page_start(number, columns))
+            while True:
+                batch = list(islice(values, self.ROW_BATCH_SIZE))
+                if not batch:
+                    break
+                super().write_rows(page, batch)
+            page.write(self._format_page_end(number, has_next=number < page_count))
+
+    def _render_pages(self, data: ColumnStore, columns: List[str]) -> None:
+        """Gera todas as páginas em um pool de processos."""
+        page_count = -(-len(data) // self.page_size)
+        data.columns  # Descarrega as linhas pendentes antes de compartilhar o store.
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, page_count), initializer=_init_worker,
+                                 initargs=(self, data, columns, page_count)) as pool:
+            for _ in pool.map(_render_page, range(1, page_count + 1)):
+                pass
+        self._page_count = page_count
+        self._row_count = len(data)
+        self._rendered = True
+
+    def _open_page(self, number: int) -> TextIO:
+        return open(os.path.join(self.output_dir, self.page_name(number)), "w", newline="",
+                    encoding="utf-8", buffering=self.PAGE_BUFFER_SIZE)
+
+    def _next_page(self) -> None:
+        if self._page is not None:
+            self._close_page(has_next=True)
+        self._page_count += 1
+        self._page_rows = 0
+        self._page = self._open_page(self._page_count)
+        self._page.write(self._format_page_start(self._page_count, self._columns))
+
+    def _close_page(self, has_next: bool) -> None:
+        self._page.write(self._format_page_end(self._page_count, has_next))
+        self._page.close()
+        self._page = None
+
+    def _format_navigation(self, number: int, has_next: bool) -> str:
+        """Gera os links para o índice e para as páginas vizinhas."""
+        links = [f"<a href='{self.index_name}'>Índice</a>"]
+        if number > 1:
+            links.append(f"<a href='{self.page_name(number - 1)}'>Página anterior</a>")
+        if has_next:
+            links.append(f"<a href='{self.page_name(number + 1)}'>Próxima página</a>")
+        return "    <p class='pages-navigation'>" + " | ".join(links) + "</p>"
+
+    def _format_page_start(self, number: int, columns: List[str]) -> str:
+        """Gera o início de uma página: cabeçalho do documento e da tabela."""
+        return (self._format_head(f"Relatório de Vendas - Página {number}") + "\n"
+                + self._format_navigation(number, has_next=False) + "\n"
+                + self._format_table_start(columns))
+
+    def _format_page_end(self, number: int, has_next: bool) -> str:
+        """Gera o fim de uma página: fim da tabela e a navegação completa."""
+        return self.TABLE_END + "\n" + self._format_navigation(number, has_next) + "\n</body>\n</html>"
+
+    def _format_pages_section(self) -> str:
+        """Gera a lista de páginas do índice."""
+        html = ["    <h2>Dados de Vendas</h2>",
+                f"    <p>{self._row_count} linhas em {self._page_count} páginas de até {self.page_size} linhas.</p>",
+                "    <ul class='pages'>"]
+        for number in range(1, self._page_count + 1):
+            first = (number - 1) * self.page_size + 1
+            last = min(number * self.page_size, self._row_count)
+            html.append(f"        <li><a href='{self.page_name(number)}'>Página {number}</a> "
+                        f"(linhas {first} a {last})</li>")
+        html.append("    </ul>")
+        return "\n".join(html)
@@ -2,17 +2,36 @@
 Este módulo define a interface abstrata ReportFormatter para formatar relatórios.
 """
 
+import io
 from abc import ABC, abstractmethod
+from itertools import chain, islice
+from gerador_relatorio.sales_data.column_store import ColumnStore
 from gerador_relatorio.sales_data.sales_data import SalesData
-from typing import Dict, Any, List
+from gerador_relatorio.sales_data.sketches import QUANTILES
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, TextIO
 
 
 class ReportFormatter(ABC):
     """
     Interface abstrata para formatadores de relatório.
+
+    Os formatadores escrevem o relatório de forma incremental em um arquivo
+    (write_report), sem montar o relatório inteiro em memória. Cada formato
+    implementa três etapas: begin_report (cabeçalho), write_rows (um lote de
+    linhas) e end_report (rodapé e estatísticas). Assim vários formatadores
+    podem ser alimentados pela mesma leitura dos dados (veja ReportRenderer).
+    format_report é apenas um atalho que escreve em um io.StringIO.
     """
 
-    @abstractmethod
+    # Quantidade de linhas passadas de cada vez para write_rows.
+    ROW_BATCH_SIZE = 1024
+
+    # A extensão do arquivo do relatório (relatorio_vendas.<extensão>).
+    FILE_EXTENSION = "txt"
+
+    # As métricas dos quantis estimados (veja sketches.KLL), na ordem do relatório.
+    QUANTILE_METRICS = [name for name, _ in QUANTILES]
+
     def format_report(self, data: SalesData) -> str:
         """
         Formata os dados de vendas em um relatório.
@@ -23,4 +42,135 @@ class ReportFormatter(ABC):
         Returns:
             str: O relatório formatado como uma string.
         """
-        pass
\ No newline at end of file
+        output = io.StringIO()
+        self.write_report(output, data)
+        return output.getvalue()
+
+    def write_report(self, stream: TextIO, consolidated_data: Dict[str, Any],
+                     rows: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """
+        Escreve o relatório em `stream`, à medida que as linhas são lidas.
+
+        Args:
+            stream (TextIO): Onde o relatório será escrito (um arquivo aberto
+                             em modo texto, de preferência com buffer).
+            consolidated_data (Dict[str, Any]): Dicionário com os dados consolidados,
+                                                incluindo 'data', 'statistics' e 'header_map'.
+            rows (Iterable[Dict[str, Any]], opcional): As linhas do relatório. Pode
+                ser qualquer iterável, inclusive um gerador. Padrão: consolidated_data['data'].
+        """
+        columns = self.report_columns(consolidated_data)
+        values = self.iter_report_rows(consolidated_data, columns, rows)
+        has_rows = values is not None
+        self.begin_report(stream, consolidated_data, columns, has_rows)
+        if has_rows:
+            while True:
+                batch = list(islice(values, self.ROW_BATCH_SIZE))
+                if not batch:
+                    break
+                self.write_rows(stream, batch)
+        self.end_report(stream, consolidated_data, has_rows)
+
+    @abstractmethod
+    def begin_report(self, stream: TextIO, consolidated_data: Dict[str, Any],
+                     columns: List[str], has_rows: bool) -> None:
+        """
+        Escreve o início do relatório (até o cabeçalho da tabela de dados).
+
+        Args:
+            stream (TextIO): Onde o relatório é escrito.
+            consolidated_data (Dict[str, Any]): Os dados consolidados.
+            columns (List[str]): As colunas do relatório.
+            has_rows (bool): Se há linhas de dados (False: relatório sem dados).
+        """
+        pass
+
+    @abstractmethod
+    def write_rows(self, stream: TextIO, rows: List[Sequence[Any]]) -> None:
+        """
+        Escreve um lote de linhas de dados.
+
+        Args:
+            stream (TextIO): Onde o relatório é escrito.
+            rows (List[Sequence[Any]]): Os valores de cada linha, na ordem das colunas.
+        """
+        pass
+
+    @abstractmethod
+    def end_report(self, stream: TextIO, consolidated_data: Dict[str, Any], has_rows: bool) -> None:
+        """
+        Escreve o fim do relatório (depois da última linha de dados).
+
+        Args:
+            stream (TextIO): Onde o relatório é escrito.
+            consolidated_data (Dict[str, Any]): Os dados consolidados.
+            has_rows (bool): Se havia linhas de dados.
+        """
+        pass
+
+    @staticmethod
+    def has_sketches(statistics: Dict[str, Dict[str, Any]]) -> bool:
+        """Se alguma coluna das estatísticas tem sketches (distinct_count e top_values)."""
+        return any("distinct_count" in metrics for metrics in statistics.values())
+
+    @classmethod
+    def has_quantiles(cls, statistics: Dict[str, Dict[str, Any]]) -> bool:
+        """Se alguma coluna das estatísticas tem quantis estimados (median, p90 e p99)."""
+        return any(cls.QUANTILE_METRICS[0] in metrics for metrics in statistics.values())
+
+    @staticmethod
+    def format_top_values(top_values: Optional[List[Sequence[Any]]], missing: str = "") -> str:
+        """Formata os valores mais frequentes de uma coluna como "valor (contagem); ..."."""
+        if not top_values:
+            return missing
+        return "; ".join(f"{value} ({count})" for value, count in top_values)
+
+    @staticmethod
+    def report_columns(consolidated_data: Dict[str, Any]) -> List[str]:
+        """Retorna as colunas do relatório, na ordem do mapa de cabeçalhos."""
+        return list(consolidated_data.get("header_map", {}).keys())
+
+    def iter_report_rows(self, consolidated_data: Dict[str, Any], columns: List[str],
+                         rows: Optional[Iterable[Dict[str, Any]]] = None,
+                         missing: Any = '') -> Optional[Iterator[Sequence[Any]]]:
+        """
+        Prepara as linhas a serem escritas por write_report.
+
+        A primeira linha é lida antecipadamente para saber se há dados; assim
+        `rows` pode ser um gerador, que é percorrido uma única vez.
+
+        Args:
+            consolidated_data (Dict[str, Any]): Os dados consolidados.
+            columns (List[str]): As colunas do relatório.
+            rows (Iterable[Dict[str, Any]], opcional): As linhas. Padrão: consolidated_data['data'].
+            missing (Any): O valor usado quando a coluna não existe na linha.
+
+        Returns:
+            Optional[Iterator[Sequence[Any]]]: Os valores de cada linha, na ordem
+                                               de `columns`, ou None se não houver linhas.
+        """
+        if rows is None:
+            rows = consolidated_data.get("data") or []
+        values = iter(self.iter_row_values(rows, columns, missing))
+        first = next(values, None)
+        if first is None:
+            return None
+        return chain((first,), values)
+
+    @staticmethod
+    def iter_row_values(data: Iterable[Dict[str, Any]], columns: List[str],
+                        missing: Any = '') -> Iterator[Sequence[Any]]:
+        """
+        Percorre as linhas como sequências de valores, na ordem de `columns`.
+
+        Com um ColumnStore os valores são lidos direto dos buffers das colunas;
+        com uma lista de dicionários, linha a linha.
+
+        Args:
+            data (Iterable[Dict[str, Any]]): As linhas (ColumnStore ou dicionários).
+            columns (List[str]): As colunas desejadas.
+            missing (Any): O valor usado quando a coluna não existe na linha.
+        """
+        if isinstance(data, ColumnStore):
+            return data.iter_values(columns, missing)
+        return ([row.get(col, missing) for col in columns] for row in data)
@@ -0,0 +1,98 @@
+"""
+Este módulo define a classe ReportRenderer, que gera vários relatórios
+(CSV, HTML, texto, ...) com uma única leitura dos dados consolidados.
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from gerador_relatorio.profiling import Profiler
+from gerador_relatorio.sales_report.report_formatter import ReportFormatter
+
+
+class ReportRenderer:
+    """
+    Alimenta vários formatadores ao mesmo tempo, cada um com o seu arquivo.
+
+    As linhas são lidas uma única vez, em lotes, e cada lote é repassado a
+    todos os formatadores (ReportFormatter.write_rows). Acrescentar um formato
+    custa apenas a serialização das linhas nesse formato, não mais uma
+    passada pelos dados.
+
+    Atributos:
+        sinks (List[Tuple[ReportFormatter, TextIO]]): Os formatadores e onde cada um escreve.
+        batch_size (int): Quantidade de linhas lidas de cada vez.
+    """
+
+    def __init__(self, sinks: Optional[List[Tuple[ReportFormatter, TextIO]]] = None,
+                 batch_size: int = ReportFormatter.ROW_BATCH_SIZE) -> None:
+        """
+        Inicializa uma nova instância de ReportRenderer.
+
+        Args:
+            sinks (List[Tuple[ReportFormatter, TextIO]], opcional): Os pares
+                (formatador, arquivo de saída).
+            batch_size (int): Quantidade de linhas lidas de cada vez.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior que zero.")
+        self.sinks = list(sinks or [])
+        self.batch_size = batch_size
+
+    def add_sink(self, formatter: ReportFormatter, stream: TextIO) -> "ReportRenderer":
+        """
+        Acrescenta um formatador e o arquivo onde ele escreve.
+
+        Returns:
+            ReportRenderer: O próprio renderer, para encadeamento.
+        """
+        self.sinks.append((formatter, stream))
+        return self
+
+    def render(self, consolidated_data: Dict[str, Any],
+               rows: Optional[Iterable[Dict[str, Any]]] = None, profiler: Optional[Profiler] = None) -> int:
+        """
+        Escreve todos os relatórios com uma única passada pelas linhas.
+
+        Todos os formatadores recebem as mesmas colunas (as do mapa de cabeçalhos).
+
+        Args:
+            consolidated_data (Dict[str, Any]): Dicionário com os dados consolidados,
+                                                incluindo 'data', 'statistics' e 'header_map'.
+            rows (Iterable[Dict[str, Any]], opcional): As linhas do relatório.
+                                                       Padrão: consolidated_data['data'].
+            profiler (Profiler, opcional): Registra o tempo de cada formatador
+                                           (uma sub-etapa por formatador, com o
+                                           nome do arquivo em 'output').
+
+        Returns:
+            int: A quantidade de linhas escritas.
+        """
+        if not self.sinks:
+            return 0
+        profiler = profiler or Profiler(enabled=False)
+        columns = ReportFormatter.report_columns(consolidated_data)
+        values = self.sinks[0][0].iter_report_rows(consolidated_data, columns, rows)
+        has_rows = values is not None
+        sinks = [(formatter, stream, profiler.record(type(formatter).__name__,
+                                                     output=getattr(stream, "name", None)))
+                 for formatter, stream in self.sinks]
+
+        for formatter, stream, metrics in sinks:
+            with profiler.accumulate(metrics):
+                formatter.begin_report(stream, consolidated_data, columns, has_rows)
+        row_count = 0
+        if has_rows:
+            while True:
+                batch = list(islice(values, self.batch_size))
+                if not batch:
+                    break
+                for formatter, stream, metrics in sinks:
+                    with profiler.accumulate(metrics):
+                        formatter.write_rows(stream, batch)
+                row_count += len(batch)
+        for formatter, stream, metrics in sinks:
+            with profiler.accumulate(metrics):
+                formatter.end_report(stream, consolidated_data, has_rows)
+            metrics.rows = row_count
+        return row_count
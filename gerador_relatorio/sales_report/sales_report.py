@@ -3,6 +3,8 @@ Este módulo define a classe SalesReport para gerar relatórios de vendas
 a partir dos dados consolidados.
 """
 
+from typing import TextIO
+
 from gerador_relatorio.sales_data.sales_data import SalesData
 from gerador_relatorio.sales_report.report_formatter import ReportFormatter
 
@@ -34,4 +36,13 @@ class SalesReport:
         Returns:
             str: O relatório gerado como uma string.
         """
-        return self.formatter.format_report(self.data)
\ No newline at end of file
+        return self.formatter.format_report(self.data)
+
+    def write_report(self, stream: TextIO) -> None:
+        """
+        Escreve o relatório de vendas em `stream`, de forma incremental.
+
+        Args:
+            stream (TextIO): Onde o relatório será escrito.
+        """
+        self.formatter.write_report(stream, self.data)
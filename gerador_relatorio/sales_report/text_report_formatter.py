@@ -2,7 +2,8 @@
 Este módulo define a classe TextReportFormatter para formatar relatórios em texto simples.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Sequence, TextIO
+from gerador_relatorio.sales_data.aggregation import AggregationResult
 from gerador_relatorio.sales_report.report_formatter import ReportFormatter
 
 class TextReportFormatter(ReportFormatter):
@@ -10,48 +11,31 @@ class TextReportFormatter(ReportFormatter):
     Formatador de relatório para texto simples.
     """
 
-    def format_report(self, consolidated_data: Dict[str, Any]) -> str:
-        """
-        Formata os dados e as estatísticas de vendas em um relatório de texto completo.
+    FILE_EXTENSION = "txt"
 
-        Args:
-            consolidated_data (Dict[str, Any]): Dicionário com os dados consolidados,
-                                                incluindo 'data', 'statistics' e 'header_map'.
+    def begin_report(self, stream: TextIO, consolidated_data: Dict[str, Any],
+                     columns: List[str], has_rows: bool) -> None:
+        """Escreve o título e o cabeçalho da seção de dados."""
+        stream.write("====================== Relatório de Vendas ======================\n")
+        if not has_rows:
+            stream.write("Nenhum dado de vendas disponível.\n")
+            return
 
-        Returns:
-            str: O relatório em formato de texto.
-        """
-        report_parts = [
-            "====================== Relatório de Vendas ======================\n",
-            self._format_data_section(consolidated_data),
-            "\n" + "=" * 59,
-            "\n" + self._format_statistics_section(consolidated_data)
-        ]
-        
-        return "".join(report_parts)
-
-    def _format_data_section(self, consolidated_data: Dict[str, Any]) -> str:
-        """Gera a seção de dados do relatório de texto."""
-        data = consolidated_data.get("data", [])
-        header_map = consolidated_data.get("header_map", {})
-        
-        if not data:
-            return "Nenhum dado de vendas disponível.\n"
-
-        columns = list(header_map.keys())
-        
-        # Cria o cabeçalho
-        data_text = ["Dados de Vendas:\n"]
         header_line = " | ".join(columns)
-        data_text.append(header_line)
-        data_text.append("-" * len(header_line))
+        stream.write("Dados de Vendas:\n\n" + header_line + "\n" + "-" * len(header_line))
 
-        # Adiciona as linhas de dados
-        for row in data:
-            row_values = [str(row.get(col, '')) for col in columns]
-            data_text.append(" | ".join(row_values))
-        
-        return "\n".join(data_text)
+    def write_rows(self, stream: TextIO, rows: List[Sequence[Any]]) -> None:
+        """Escreve um lote de linhas da seção de dados."""
+        stream.write("".join(["\n" + " | ".join(map(str, values)) for values in rows]))
+
+    def end_report(self, stream: TextIO, consolidated_data: Dict[str, Any], has_rows: bool) -> None:
+        """Escreve a seção de estatísticas e, se houver, a de agregações."""
+        stream.write("\n" + "=" * 59)
+        stream.write("\n" + self._format_statistics_section(consolidated_data))
+        aggregations = consolidated_data.get("aggregations")
+        if aggregations:
+            stream.write("\n" + "=" * 59)
+            stream.write("\n" + self._format_aggregations_section(aggregations))
 
     def _format_statistics_section(self, consolidated_data: Dict[str, Any]) -> str:
         """Gera a seção de estatísticas do relatório de texto."""
@@ -70,6 +54,25 @@ class TextReportFormatter(ReportFormatter):
             stats_text.append(f"    Mínimo: {min_val if min_val is not None else 'N/A'}")
             stats_text.append(f"    Máximo: {max_val if max_val is not None else 'N/A'}")
             stats_text.append(f"    Nulos: {blank_count if blank_count is not None else 0}")
+            if "distinct_count" in metrics:
+                stats_text.append(f"    Distintos (aprox.): {metrics['distinct_count']}")
+                stats_text.append(f"    Mais frequentes (aprox.): {self.format_top_values(metrics.get('top_values'), 'N/A')}")
+            if "median" in metrics:
+                stats_text.append(f"    Mediana / P90 / P99 (aprox.): {metrics['median']} / {metrics['p90']} / {metrics['p99']}")
             stats_text.append("")  # Linha em branco para separar as métricas
 
-        return "\n".join(stats_text)
\ No newline at end of file
+        return "\n".join(stats_text)
+
+    def _format_aggregations_section(self, aggregations: List[AggregationResult]) -> str:
+        """Gera a seção de agregações do relatório de texto: uma tabela por agregação."""
+        lines = ["Agregações:\n"]
+        for aggregation in aggregations:
+            header_line = " | ".join(aggregation.columns)
+            lines.append(f"  {aggregation.name}")
+            lines.append(f"  {header_line}")
+            lines.append("  " + "-" * len(header_line))
+            for values in aggregation.formatted_rows(missing="N/A"):
+                lines.append("  " + " | ".join(values))
+            lines.append("")  # Linha em branco para separar as agregações
+
+        return "\n".join(lines)
\ No newline at end of file
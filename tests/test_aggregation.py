@@ -0,0 +1,135 @@
+# tests/test_aggregation.py
+
+import pytest
+
+from gerador_relatorio.sales_data.aggregation import Aggregation, Expression, ExpressionError, Measure
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
+from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter
+from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter
+
+REVENUE = "price * quantity * (1 - coalesce(discount, 0))"
+
+
+@pytest.fixture
+def sales_rows():
+    return [
+        {"category": "Roupas", "store_id": "2", "price": "100.00", "quantity": "2", "discount": "0.10"},
+        {"category": "Alimentos", "store_id": "10", "price": "10.50", "quantity": "4", "discount": ""},
+        {"category": "Roupas", "store_id": "2", "price": "50.00", "quantity": "1", "discount": "0.00"},
+        {"category": "Alimentos", "store_id": "1", "price": "N/A", "quantity": "3", "discount": "0.05"},
+        {"category": None, "store_id": "1", "price": "5.00", "quantity": "1"},
+    ]
+
+
+def revenue_by_category():
+    return Aggregation(["category"], [Measure("receita", "sum", REVENUE), Measure("vendas", "count"),
+                                      Measure("ticket", "avg", REVENUE), Measure("maior", "max", "price")])
+
+
+def test_expression_evaluates_columns_in_order():
+    expression = Expression(REVENUE)
+
+    assert expression.columns == ["price", "quantity", "discount"]
+    assert expression(100.0, 2, 0.1) == pytest.approx(180.0)
+    assert expression(100.0, 2, None) == 200.0
+    assert expression(None, 2, 0.1) is None
+    assert Expression("price / quantity")(1.0, 0) is None
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os').system('ls')",
+    "price.__class__",
+    "price[0]",
+    "open('x')",
+    "'texto'",
+    "price if quantity else 0",
+    "2 ** 10 ** 10",
+    "lambda: 1",
+    "",
+])
+def test_unsafe_or_invalid_expressions_are_rejected(text):
+    with pytest.raises(ExpressionError):
+        Expression(text)
+
+
+def test_measure_requires_valid_function_and_expression():
+    with pytest.raises(ExpressionError):
+        Measure("x", "median", "price")
+    with pytest.raises(ExpressionError):
+        Measure("x", "sum")
+
+
+def test_group_by_from_column_store_matches_rows(sales_rows):
+    from_rows = revenue_by_category().update_many(sales_rows).result()
+    from_store = revenue_by_category().update_store(ColumnStore.from_rows(sales_rows)).result()
+
+    assert from_store.rows == from_rows.rows
+    assert from_rows.columns == ["category", "receita", "vendas", "ticket", "maior"]
+    assert from_rows.as_dicts() == [
+        {"category": "Alimentos", "receita": 42.0, "vendas": 2, "ticket": 42.0, "maior": 10.5},
+        {"category": "Roupas", "receita": pytest.approx(230.0), "vendas": 2, "ticket": pytest.approx(115.0),
+         "maior": 100.0},
+        {"category": None, "receita": 5.0, "vendas": 1, "ticket": 5.0, "maior": 5.0},
+    ]
+
+
+def test_store_and_rows_agree_on_keys_and_measure_types():
+    csv_rows = [{"store_id": "7", "price": "10", "quantity": "1"}, {"store_id": "8", "price": "4", "quantity": "2"}]
+    api_rows = [{"store_id": 7, "price": 10, "quantity": 1}, {"store_id": 8.5, "price": 2.5, "quantity": 3}]
+
+    def by_store():
+        return Aggregation("store_id", [Measure("receita", "sum", "price * quantity"), Measure("vendas", "count"),
+                                        Measure("menor", "min", "quantity")])
+    from_rows = by_store().update_many(csv_rows + api_rows).result()
+    from_store = by_store().update_store(ColumnStore.from_rows(csv_rows + api_rows)).result()
+    mixed = by_store().update_store(ColumnStore.from_rows(csv_rows)).update_many(api_rows).result()
+
+    expected = [("7", "20.00", "2", "1.00"), ("8", "8.00", "1", "2.00"), ("8.5", "7.50", "1", "3.00")]
+    for result in (from_rows, from_store, mixed):
+        assert list(result.formatted_rows()) == expected
+        assert [type(value) for value in result.rows[0]] == [str, float, int, float]
+
+
+def test_numeric_keys_are_sorted_numerically(sales_rows):
+    aggregation = Aggregation("store_id", [Measure("vendas", "count")])
+
+    result = SalesData.compute_aggregations(ColumnStore.from_rows(sales_rows), [aggregation])[0]
+
+    assert result.rows == [("1", 2), ("2", 2), ("10", 1)]
+    assert list(result.formatted_rows()) == [("1", "2"), ("2", "2"), ("10", "1")]
+
+
+def test_aggregation_from_config(sales_rows):
+    aggregation = Aggregation.from_config({
+        "name": "Receita por loja",
+        "group_by": ["store_id", "category"],
+        "measures": [{"name": "receita", "expression": REVENUE}, {"function": "min", "column": "price"}],
+    })
+
+    result = aggregation.update_many(sales_rows).result()
+
+    assert result.name == "Receita por loja"
+    assert result.columns == ["store_id", "category", "receita", "min(price)"]
+    assert result.rows[0][:2] == ("1", "Alimentos")
+    assert result.rows[0][2:] == (None, None)
+
+
+def test_formatters_write_aggregation_sections(sales_rows):
+    aggregations = [revenue_by_category().update_many(sales_rows).result()]
+    consolidated = {"data": sales_rows, "statistics": {}, "header_map": {"category": []},
+                    "aggregations": aggregations}
+
+    text = TextReportFormatter().format_report(consolidated)
+    html = HTMLReportFormatter().format_report(consolidated)
+    csv_text = CSVReportFormatter().format_aggregations(consolidated)
+
+    assert "Agregações:" in text and "  Roupas | 230.00 | 2 | 115.00 | 100.00" in text
+    assert "<h3>Agregação por category</h3>" in html and html.endswith("</html>")
+    assert csv_text.splitlines()[:3] == ["Agregação por category", "category,receita,vendas,ticket,maior",
+                                         "Alimentos,42.00,2,42.00,10.50"]
+
+    del consolidated["aggregations"]
+    assert "Agregações" not in TextReportFormatter().format_report(consolidated)
+    assert CSVReportFormatter().format_aggregations(consolidated) == ""
@@ -0,0 +1,117 @@
+# tests/test_column_store.py
+
+import pickle
+from array import array
+
+import pytest
+
+from gerador_relatorio.sales_data.column_store import ColumnStore, DATE_TEXT, FLOAT_TEXT, INT, INT_TEXT, OBJECT
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+
+@pytest.fixture
+def sales_rows():
+    """Linhas no formato lido de um CSV, com vazios, nulos e colunas ausentes."""
+    rows = []
+    for i in range(1, 301):
+        rows.append({
+            "order_id": str(i),
+            "price": f"{i * 1.25:.2f}" if i % 10 else "",
+            "quantity": str(i % 5 + 1),
+            "category": ["Roupas", "Acessórios", "Alimentos"][i % 3],
+            "customer_name": None if i % 50 == 0 else f"Cliente {i}",
+        })
+    rows.append({"order_id": "301", "product_id": 7})
+    return rows
+
+
+def test_round_trip_preserves_rows(sales_rows):
+    """Cada linha lida do ColumnStore deve ser igual ao dicionário original."""
+    store = ColumnStore.from_rows(sales_rows)
+
+    assert len(store) == len(sales_rows)
+    assert store == sales_rows
+    assert store[0] == sales_rows[0]
+    assert store[-1] == {"order_id": "301", "product_id": 7}
+    assert "price" not in store[-1]
+    assert store[49]["customer_name"] is None
+    assert store[9]["price"] == ""
+
+
+def test_numeric_columns_use_typed_buffers(sales_rows):
+    """Colunas numéricas ficam em array.array; texto fica em listas."""
+    store = ColumnStore.from_rows(sales_rows)
+
+    assert store.column("order_id").kind == INT_TEXT
+    assert store.column("price").kind == FLOAT_TEXT
+    assert store.column("quantity").kind == INT_TEXT
+    assert store.column("product_id").kind == INT
+    assert store.column("category").kind == OBJECT
+    assert isinstance(store.column("price").data, array)
+
+    buffer = store.column("order_id").buffer
+    assert isinstance(buffer, memoryview)
+    assert buffer[0] == 1 and buffer[299] == 300
+
+
+def test_text_is_returned_exactly_as_read():
+    """Strings numéricas não canônicas ("0.10", "3") voltam idênticas."""
+    rows = [{"price": value} for value in ["111.04", "0.10", "3", "12.5", "1e-05", "007"]]
+    store = ColumnStore.from_rows(rows)
+    assert [row["price"] for row in store] == [row["price"] for row in rows]
+
+
+def test_get_data_by_columns_is_a_projection(sales_rows):
+    """get_data_by_columns compartilha os buffers em vez de copiar as linhas."""
+    sales_data = SalesData(sales_rows, ["order_id", "price"])
+    projected = sales_data.get_data_by_columns(["order_id", "price", "inexistente"])
+
+    assert projected.column_names == ["order_id", "price"]
+    assert projected.column("price") is sales_data.data.column("price")
+    assert projected[0] == {"order_id": "1", "price": "1.25"}
+
+
+def test_iter_values_and_pickle(sales_rows):
+    """iter_values devolve tuplas e o ColumnStore sobrevive ao pickle."""
+    store = ColumnStore.from_rows(sales_rows)
+    columns = ["order_id", "product_id", "customer_name"]
+
+    expected = [tuple(row.get(col, "") for col in columns) for row in sales_rows]
+    assert list(store.iter_values(columns)) == expected
+    assert pickle.loads(pickle.dumps(store)) == sales_rows
+
+
+def test_iso_dates_are_stored_as_day_ordinals():
+    """Datas ISO ficam em um array de ordinais; outras grafias ficam como estão."""
+    rows = [{"dt_sale": value} for value in ["2023-01-15", "2023-02-28", None, "2023-1-5", "20230105"]]
+    store = ColumnStore.from_rows(rows)
+
+    column = store.column("dt_sale")
+    assert column.kind == DATE_TEXT
+    assert isinstance(column.data, array)
+    assert store == rows
+    assert list(store.iter_values(["dt_sale"])) == [(row["dt_sale"],) for row in rows]
+
+
+def test_kind_hints_define_new_columns():
+    """Com o tipo já conhecido, a coluna nasce com ele, mesmo começando com vazios."""
+    rows = [{"price": ""}, {"price": "3"}, {"price": "2.50"}]
+    store = ColumnStore()
+    store.kind_hints["price"] = FLOAT_TEXT
+    store.extend(rows)
+
+    assert store.column("price").kind == FLOAT_TEXT
+    assert store == rows
+
+
+def test_compress_keeps_selected_rows_and_column_kinds():
+    """compress mantém a ordem, os tipos e as células ausentes; colunas que sobram vazias somem."""
+    rows = [{"order_id": "1", "price": "1.50"}, {"order_id": "2", "price": None, "note": "x"},
+            {"order_id": "3"}, {"order_id": "4", "price": "4.00"}]
+    store = ColumnStore.from_rows(rows)
+
+    selected = store.compress(bytearray([1, 0, 1, 1]))
+
+    assert selected == [rows[0], rows[2], rows[3]]
+    assert selected.column("order_id").kind == INT_TEXT and selected.column("price").kind == FLOAT_TEXT
+    assert "note" not in selected.columns
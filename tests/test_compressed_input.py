@@ -0,0 +1,75 @@
+# tests/test_compressed_input.py
+
+import bz2
+import csv
+import gzip
+import io
+import lzma
+
+import pytest
+
+from gerador_relatorio.data_source.compressed_input import (
+    BZ2, GZIP, NONE, XZ, PrefetchReader, detect_compression, open_text,
+)
+from gerador_relatorio.data_source.data_source import DataSourceError, LocalDataSource
+from gerador_relatorio.data_source.filters import RowFilter
+
+CSV_TEXT = "id,produto,preco\n" + "".join(f"{i},Produto ção {i},{i}.50\n" for i in range(1, 2001))
+EXPECTED = list(csv.DictReader(io.StringIO(CSV_TEXT)))
+
+COMPRESSORS = {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+
+@pytest.mark.parametrize("extension", sorted(COMPRESSORS))
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_compressed_files_are_read_transparently(tmp_path, extension, prefetch):
+    path = tmp_path / f"vendas.csv{extension}"
+    path.write_bytes(COMPRESSORS[extension](CSV_TEXT.encode("utf-8")))
+
+    source = LocalDataSource(str(path), buffer_size=4096, prefetch=prefetch)
+
+    assert list(source.iter_rows()) == EXPECTED
+    assert source.cache_validators()["size"] == path.stat().st_size
+
+
+def test_compression_is_detected_by_magic_bytes(tmp_path):
+    path = tmp_path / "vendas.dat"
+    path.write_bytes(gzip.compress(CSV_TEXT.encode("utf-8")))
+    assert list(LocalDataSource(str(path)).iter_rows()) == EXPECTED
+
+    assert detect_compression("x.csv", b"BZh91AY") == BZ2
+    assert detect_compression("x.csv", b"\xfd7zXZ\x00\x00") == XZ
+    assert detect_compression("x.csv.gz", b"") == GZIP
+    assert detect_compression("x.csv", b"id,preco") == NONE
+
+
+def test_filter_and_projection_on_compressed_file(tmp_path):
+    path = tmp_path / "vendas.csv.xz"
+    path.write_bytes(lzma.compress(CSV_TEXT.encode("utf-8")))
+    source = LocalDataSource(str(path), columns=["preco"],
+                             row_filter=RowFilter.from_config({"column": "id", "to": 3}))
+
+    assert list(source.iter_rows()) == [{"preco": "1.50"}, {"preco": "2.50"}, {"preco": "3.50"}]
+
+
+def test_corrupted_compressed_file_raises_data_source_error(tmp_path):
+    path = tmp_path / "vendas.csv.gz"
+    path.write_bytes(gzip.compress(CSV_TEXT.encode("utf-8"))[:200])
+    with pytest.raises(DataSourceError):
+        list(LocalDataSource(str(path)).iter_rows())
+
+    with pytest.raises(DataSourceError):
+        list(LocalDataSource(str(path), compression="zip").iter_rows())
+
+
+def test_abandoned_read_stops_the_prefetch_thread(tmp_path):
+    path = tmp_path / "vendas.csv.gz"
+    path.write_bytes(gzip.compress(CSV_TEXT.encode("utf-8") * 20))
+    text, _ = open_text(str(path), buffer_size=1024)
+    reader = text.buffer.raw
+    assert isinstance(reader, PrefetchReader)
+    text.readline()
+    text.close()
+
+    assert not reader._thread.is_alive()
+    assert reader.source.closed
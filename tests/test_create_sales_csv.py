@@ -0,0 +1,52 @@
+# tests/test_create_sales_csv.py
+
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_example"))
+
+from create_sales_csv import colunas_1, colunas_2, gerar_arquivos  # noqa: E402
+
+
+def ler_csv(caminho):
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        return list(csv.reader(arquivo))
+
+
+def test_gerar_arquivos_padrao_mantem_dois_arquivos_de_20_linhas(tmp_path, capsys):
+    caminhos = gerar_arquivos(diretorio=str(tmp_path))
+
+    assert len(caminhos) == 2
+    primeiro, segundo = ler_csv(caminhos[0]), ler_csv(caminhos[1])
+    assert primeiro[0] == colunas_1
+    assert segundo[0] == colunas_2
+    assert len(primeiro) == len(segundo) == 21
+    assert [linha[0] for linha in segundo[1:]] == [str(i) for i in range(1, 21)]
+
+
+def test_gerar_arquivos_e_deterministico_para_a_mesma_semente(tmp_path, capsys):
+    opcoes = dict(num_linhas=50, num_fontes=3, esquema="esparso", colunas_extras=10,
+                  taxa_vazios=0.1, taxa_sujos=0.1, sobreposicao=0.5, semente=7)
+    primeira = [ler_csv(c) for c in gerar_arquivos(diretorio=str(tmp_path / "a"), **opcoes)]
+    segunda = [ler_csv(c) for c in gerar_arquivos(diretorio=str(tmp_path / "b"), **opcoes)]
+
+    assert primeira == segunda
+    # Sobreposição de 50%: cada fonte começa na metade dos order_id da anterior.
+    assert [arquivo[1][0] for arquivo in primeira] == ["1", "26", "51"]
+    celulas = [celula for arquivo in primeira for linha in arquivo[1:] for celula in linha]
+    assert "" in celulas
+
+
+def test_gerar_arquivos_esquema_largo(tmp_path, capsys):
+    caminhos = gerar_arquivos(num_linhas=5, num_fontes=1, esquema="largo", colunas_extras=4,
+                              diretorio=str(tmp_path))
+    cabecalho = ler_csv(caminhos[0])[0]
+    assert cabecalho == colunas_1 + ["extra_num_0", "extra_txt_1", "extra_num_2", "extra_txt_3"]
+
+
+def test_gerar_arquivos_rejeita_esquema_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="Esquema desconhecido"):
+        gerar_arquivos(esquema="outro", diretorio=str(tmp_path))
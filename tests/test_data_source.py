@@ -1,12 +1,13 @@
 # tests/test_data_source.py
 
 import pytest
+import io
 import os
 import json
 import requests_mock
 from typing import Dict, Any, List
 
-from gerador_relatorio.data_source.data_source import DataSource, LocalDataSource
+from gerador_relatorio.data_source.data_source import DataSource, DataSourceError, LocalDataSource
 from gerador_relatorio.data_source.web_data_source import WebDataSource
 from gerador_relatorio.sales_data.sales_data import SalesData
 from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
@@ -78,6 +79,46 @@ def test_web_data_source_handles_http_error():
         data = web_source.extract_data()
         assert data == []
 
+# --- Testes para LocalDataSource (streaming) ---
+@pytest.fixture
+def sales_csv(tmp_path):
+    """Cria um arquivo CSV de vendas com cinco linhas."""
+    path = tmp_path / "vendas.csv"
+    lines = ["order_id,product_name,price"]
+    lines += [f"{i},Produto {i},{i * 10}.5" for i in range(1, 6)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+def test_local_data_source_iter_rows_is_lazy(sales_csv):
+    """
+    Testa se iter_rows devolve um gerador que lê o arquivo linha a linha.
+    """
+    source = LocalDataSource(location=str(sales_csv))
+    rows = source.iter_rows()
+
+    assert not isinstance(rows, list)
+    assert next(rows) == {"order_id": "1", "product_name": "Produto 1", "price": "10.5"}
+    assert len(list(rows)) == 4
+
+def test_local_data_source_iter_batches(sales_csv):
+    """
+    Testa se iter_batches divide as linhas em lotes do tamanho pedido.
+    """
+    source = LocalDataSource(location=str(sales_csv))
+    batches = list(source.iter_batches(batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[2][0]["order_id"] == "5"
+    assert source.extract_data() == [row for batch in batches for row in batch]
+
+def test_local_data_source_missing_file_raises(tmp_path):
+    """
+    Testa se a leitura de um arquivo inexistente levanta DataSourceError.
+    """
+    source = LocalDataSource(location=str(tmp_path / "nao_existe.csv"))
+    with pytest.raises(DataSourceError, match="Arquivo não encontrado"):
+        list(source.iter_rows())
+
 # --- Testes para SalesData (Refatoração de Estatísticas) ---
 def test_sales_data_computes_statistics_with_strings():
     """
@@ -153,4 +194,27 @@ def test_text_report_formatter_includes_statistics(mock_consolidated_data):
     assert "  - Coluna: quantity" in report
     assert "    Mínimo: 10.0" in report
     assert "    Máximo: 50.0" in report
-    assert "    Nulos: 0" in report
\ No newline at end of file
+    assert "    Nulos: 0" in report
+def test_formatters_write_report_streams_rows(mock_consolidated_data):
+    """
+    Testa se write_report escreve no stream o mesmo conteúdo de format_report,
+    aceitando as linhas como um gerador.
+    """
+    for formatter in (CSVReportFormatter(), HTMLReportFormatter(), TextReportFormatter()):
+        expected = formatter.format_report(mock_consolidated_data)
+        if isinstance(expected, tuple):
+            expected = expected[0]
+
+        stream = io.StringIO()
+        rows = (row for row in mock_consolidated_data["data"])
+        formatter.write_report(stream, mock_consolidated_data, rows=rows)
+
+        assert stream.getvalue() == expected
+        assert next(rows, None) is None
+
+def test_csv_report_formatter_write_report_without_rows_raises(mock_consolidated_data):
+    """
+    Testa se o CSV sem linhas levanta ValueError, mesmo com um gerador vazio.
+    """
+    with pytest.raises(ValueError):
+        CSVReportFormatter().write_report(io.StringIO(), mock_consolidated_data, rows=iter([]))
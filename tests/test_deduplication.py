@@ -0,0 +1,113 @@
+# tests/test_deduplication.py
+
+import os
+import random
+
+import pytest
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.deduplication import (
+    BloomFilter, DeduplicationOptions, KeyIndex, duplicate_mask, key_digest,
+)
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+
+def write_csv(path, rows):
+    lines = ["order_id,store_id,price"] + [",".join(map(str, row)) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_key_digest_compares_values_as_text():
+    assert key_digest(["7", "1"]) == key_digest([7, 1])
+    assert key_digest(["7", "1"]) != key_digest(["71", ""]) and key_digest(["71", ""]) is None
+    assert key_digest(["7", None]) is None
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    digests = [key_digest([i]) for i in range(1000)]
+    for digest in digests:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests)
+    false_positives = sum(key_digest([-i]) in bloom for i in range(1, 10001))
+    assert false_positives < 300
+
+
+@pytest.mark.parametrize("bloom_error", [0.01, None])
+def test_key_index_spills_to_disk_and_still_finds_keys(tmp_path, bloom_error):
+    rng = random.Random(1)
+    keys = [rng.randrange(3000) for _ in range(10000)]
+    with KeyIndex(max_memory_keys=500, expected_keys=len(keys), bloom_error=bloom_error,
+                  directory=str(tmp_path)) as index:
+        new = []
+        for start in range(0, len(keys), 700):
+            new += index.add_many(key_digest([key]) for key in keys[start:start + 700])
+        assert index.spilled and index.spilled_keys > 0
+        assert len(os.listdir(tmp_path)) == 1
+    assert os.listdir(tmp_path) == []
+
+    seen = set()
+    expected = []
+    for key in keys:
+        expected.append(key not in seen)
+        seen.add(key)
+    assert new == expected
+
+
+def test_options_from_config():
+    assert DeduplicationOptions.from_config(None) is None
+    options = DeduplicationOptions.from_config({"keys": ["order_id"], "keep": "last", "bloom_error": 0.01})
+    assert options.keys == ["order_id"] and options.keep == "last" and options.bloom_error == 0.01
+    for config in ({"keys": []}, {"keys": "order_id"}, {"keys": ["a"], "keep": "any"},
+                   {"keys": ["a"], "bloom_error": 1}, {"keys": ["a"], "unknown": 1}, {"keep": "first"}):
+        with pytest.raises(ValueError):
+            DeduplicationOptions.from_config(config)
+
+
+@pytest.mark.parametrize("max_memory_keys", [1_000_000, 3])
+def test_duplicate_mask_first_and_last(max_memory_keys):
+    store = ColumnStore.from_rows([
+        {"order_id": "1", "price": "10"},
+        {"order_id": "2", "price": "20"},
+        {"order_id": "1", "price": "11"},
+        {"order_id": None, "price": "0"},
+        {"order_id": None, "price": "0"},
+        {"order_id": 2, "price": "21"},
+        {"price": "5"},
+    ])
+    first, removed, _ = duplicate_mask(store, DeduplicationOptions(["order_id"], max_memory_keys=max_memory_keys))
+    assert list(first) == [1, 1, 0, 1, 1, 0, 1] and removed == 2
+    last, removed, _ = duplicate_mask(store, DeduplicationOptions(["order_id"], "last",
+                                                                  max_memory_keys=max_memory_keys))
+    assert list(last) == [0, 0, 1, 1, 1, 1, 1] and removed == 2
+
+
+def test_consolidation_removes_duplicates_across_sources(tmp_path):
+    first = write_csv(tmp_path / "a.csv", [(1, 1, "10.00"), (2, 1, "20.00"), (1, 2, "30.00")])
+    second = write_csv(tmp_path / "b.csv", [(2, 1, "25.00"), (3, 1, "40.00"), (2, 1, "26.00")])
+    sources = [LocalDataSource(first), LocalDataSource(second)]
+
+    kept_first = SalesData.consolidate_data(sources, deduplication=DeduplicationOptions(["order_id", "store_id"]))
+    assert [row["price"] for row in kept_first["data"]] == ["10.00", "20.00", "30.00", "40.00"]
+    assert [result.duplicates for result in kept_first["source_results"]] == [0, 2]
+    assert [len(result.rows) for result in kept_first["source_results"]] == [3, 1]
+    assert kept_first["statistics"]["price"]["max"] == 40.0
+
+    kept_last = SalesData.consolidate_data(sources, deduplication=DeduplicationOptions(
+        ["order_id", "store_id"], "last", max_memory_keys=1))
+    assert [row["price"] for row in kept_last["data"]] == ["10.00", "30.00", "40.00", "26.00"]
+    result_a, result_b = kept_last["source_results"]
+    assert (result_a.duplicates, result_b.duplicates) == (1, 1)
+    assert [row["price"] for row in result_b.rows] == ["40.00", "26.00"]
+    assert result_b.statistics.result()["price"]["min"] == 26.0
+    assert kept_last["statistics"]["price"]["sum"] == pytest.approx(106.0)
+
+
+def test_consolidation_without_duplicates_keeps_data(tmp_path):
+    source = LocalDataSource(write_csv(tmp_path / "a.csv", [(1, 1, "10.00"), (2, 1, "20.00")]))
+    plain = SalesData.consolidate_data([source])
+    deduplicated = SalesData.consolidate_data([source], deduplication=DeduplicationOptions(["order_id"]))
+    assert list(deduplicated["data"]) == list(plain["data"])
+    assert deduplicated["statistics"] == plain["statistics"]
@@ -0,0 +1,130 @@
+# tests/test_extraction_cache.py
+
+import os
+
+import pytest
+import requests_mock
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.data_source.web_data_source import WebDataSource
+from gerador_relatorio.data_source.web_engine import WebFetchEngine
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.extraction_cache import ExtractionCache
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+
+def write_csv(path, rows):
+    lines = ["order_id,product_name,price"] + [f"{i},Produto {i},{i}.50" for i in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "cache"))
+
+
+def test_unchanged_local_source_is_loaded_from_cache(tmp_path, cache):
+    path = tmp_path / "vendas.csv"
+    write_csv(path, range(1, 6))
+    source = LocalDataSource(str(path))
+
+    first = SalesData.consolidate_data([source], cache=cache)
+    second = SalesData.consolidate_data([source], cache=cache)
+
+    assert not first["source_results"][0].from_cache
+    assert second["source_results"][0].from_cache
+    assert second["data"] == first["data"]
+    assert second["statistics"] == first["statistics"]
+    assert list(second["header_map"]) == ["order_id", "product_name", "price"]
+
+
+def test_changed_local_source_is_extracted_again(tmp_path, cache):
+    path = tmp_path / "vendas.csv"
+    write_csv(path, range(1, 6))
+    source = LocalDataSource(str(path))
+    SalesData.consolidate_data([source], cache=cache)
+
+    write_csv(path, range(1, 8))
+    result = SalesData.consolidate_data([source], cache=cache)
+
+    assert not result["source_results"][0].from_cache
+    assert len(result["data"]) == 7
+
+
+def test_stale_entry_is_rejected_without_loading_the_data(tmp_path, cache, monkeypatch):
+    path = tmp_path / "vendas.csv"
+    write_csv(path, range(1, 6))
+    source = LocalDataSource(str(path))
+    SalesData.consolidate_data([source], cache=cache)
+    write_csv(path, range(1, 8))
+
+    loaded = []
+    monkeypatch.setattr(ColumnStore, "__setstate__", lambda store, state: loaded.append(store), raising=False)
+    assert cache.load(source) is None
+    assert loaded == []  # Só o cabeçalho foi lido.
+
+
+def test_hash_contents_ignores_modification_time(tmp_path, cache):
+    path = tmp_path / "vendas.csv"
+    write_csv(path, range(1, 6))
+    source = LocalDataSource(str(path), hash_contents=True)
+    SalesData.consolidate_data([source], cache=cache)
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    result = SalesData.consolidate_data([source], cache=cache)
+
+    assert result["source_results"][0].from_cache
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"), max_entries=2)
+    sources = []
+    for index in range(3):
+        path = tmp_path / f"vendas_{index}.csv"
+        write_csv(path, range(index, index + 3))
+        sources.append(LocalDataSource(str(path)))
+
+    for index, source in enumerate(sources):
+        SalesData.extract_source(source, cache=cache)
+        entry = cache._path(source.cache_key())
+        os.utime(entry, (1000 + index, 1000 + index))
+    SalesData.extract_source(sources[2], cache=cache)
+
+    assert len(os.listdir(cache.directory)) == 2
+    assert not os.path.exists(cache._path(sources[0].cache_key()))
+    assert not SalesData.extract_source(sources[0], cache=cache).from_cache
+
+
+def test_web_source_is_revalidated_with_etag(cache):
+    engine = WebFetchEngine(sleep=lambda seconds: None)
+    url = "http://api.example.com/products"
+    source = WebDataSource(name="API", location=url, data_key="products", engine=engine)
+    try:
+        with requests_mock.Mocker() as m:
+            m.get(url, json={"products": [{"id": 1}, {"id": 2}]}, headers={"ETag": '"v1"'})
+            first = SalesData.extract_source(source, cache=cache)
+
+            m.get(url, request_headers={"If-None-Match": '"v1"'}, status_code=304)
+            second = SalesData.extract_source(source, cache=cache)
+    finally:
+        engine.close()
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert list(second.rows) == [{"id": 1}, {"id": 2}]
+
+
+def test_process_pool_workers_share_the_cache(tmp_path, cache):
+    sources = []
+    for index in range(2):
+        path = tmp_path / f"vendas_{index}.csv"
+        write_csv(path, range(index * 10, index * 10 + 4))
+        sources.append(LocalDataSource(str(path)))
+
+    first = SalesData.consolidate_data(sources, max_workers=2, use_processes=True, cache=cache)
+    second = SalesData.consolidate_data(sources, max_workers=2, use_processes=True, cache=cache)
+
+    assert [r.from_cache for r in second["source_results"]] == [True, True]
+    assert second["data"] == first["data"]
+    assert second["statistics"] == first["statistics"]
@@ -0,0 +1,130 @@
+# tests/test_filters.py
+
+import csv
+import io
+import pickle
+
+import pytest
+import requests_mock
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.data_source.filters import Predicate, RowFilter
+from gerador_relatorio.data_source.web_data_source import WebDataSource
+from gerador_relatorio.data_source.web_engine import WebFetchEngine
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+CSV_TEXT = (
+    "id,dt_sale,store_id,price\n"
+    "1,2025-04-06,1,10.00\n"
+    "2,2025-04-07,2,20.00\n"
+    "3,2025-04-10,3,30.00\n"
+    "4,2025-04-13,1\n"
+    "5,2025-04-14,2,50.00,extra\n"
+    "\n"
+    "6,,1,60.00\n"
+)
+
+WEEK = {"column": "dt_sale", "from": "2025-04-07", "to": "2025-04-13"}
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "vendas.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+    return str(path)
+
+
+def test_predicates_compare_dates_values_and_numbers():
+    week = Predicate.from_config(WEEK)
+    assert [week.test(day) for day in ("2025-04-06", "2025-04-07", "2025-04-13", "2025-04-14")] == \
+        [False, True, True, False]
+    assert not week.test(None)
+
+    stores = Predicate.from_config({"column": "store_id", "in": [1, "2"]})
+    assert stores.test("1") and stores.test(2) and stores.test(1.0)
+    assert not stores.test("3")
+
+    price = Predicate.from_config({"column": "price", "from": 20, "to": "30"})
+    assert price.test("20.00") and price.test(30)
+    assert not price.test("10.00") and not price.test("N/A")
+
+
+@pytest.mark.parametrize("config", [
+    {"column": "dt_sale"},
+    {"from": "2025-04-07"},
+    {"column": "dt_sale", "after": "2025-04-07"},
+    {"column": "store_id", "in": "1"},
+])
+def test_invalid_filters_raise_value_error(config):
+    with pytest.raises(ValueError):
+        RowFilter.from_config([config])
+
+
+def test_local_filter_matches_dict_reader_semantics(csv_file):
+    row_filter = RowFilter.from_config([{"column": "id", "from": 2}])
+    expected = [row for row in csv.DictReader(io.StringIO(CSV_TEXT)) if row_filter.matches(row)]
+
+    rows = list(LocalDataSource(csv_file, row_filter=row_filter).iter_rows())
+
+    assert rows == expected
+    assert rows[2]["price"] is None
+    assert rows[3][None] == ["extra"]
+
+
+def test_local_filter_drops_rows_during_parsing(csv_file):
+    source = LocalDataSource(csv_file, row_filter=RowFilter.from_config([WEEK]))
+    assert [row["id"] for row in source.iter_rows()] == ["2", "3", "4"]
+
+    missing = LocalDataSource(csv_file, row_filter=RowFilter.from_config({"column": "city", "equals": "X"}))
+    assert list(missing.iter_rows()) == []
+
+
+def test_consolidation_and_statistics_see_only_filtered_rows(csv_file):
+    row_filter = RowFilter.from_config([WEEK, {"column": "store_id", "in": ["2", "3"]}])
+    result = SalesData.consolidate_data([LocalDataSource(csv_file, row_filter=row_filter)])
+
+    assert [row["id"] for row in result["data"]] == ["2", "3"]
+    assert result["statistics"]["price"]["min"] == 20.0
+    assert result["statistics"]["price"]["max"] == 30.0
+
+
+def test_filter_is_part_of_the_cache_key(csv_file):
+    plain = LocalDataSource(csv_file)
+    filtered = LocalDataSource(csv_file, row_filter=RowFilter.from_config([WEEK]))
+    other = LocalDataSource(csv_file, row_filter=RowFilter.from_config([{**WEEK, "to": "2025-04-30"}]))
+
+    assert len({plain.cache_key(), filtered.cache_key(), other.cache_key()}) == 3
+
+
+def test_filtered_source_survives_pickling(csv_file):
+    source = LocalDataSource(csv_file, row_filter=RowFilter.from_config([WEEK]))
+    clone = pickle.loads(pickle.dumps(source))
+    assert list(clone.iter_rows()) == list(source.iter_rows())
+
+
+def test_web_source_sends_filters_as_query_params_and_checks_rows():
+    engine = WebFetchEngine(sleep=lambda seconds: None)
+    row_filter = RowFilter.from_config([WEEK, {"column": "store_id", "in": ["1", "2"]},
+                                        {"column": "price", "from": 15}])
+    source = WebDataSource("vendas", "https://api.exemplo.com/vendas", data_key="vendas", engine=engine,
+                           params={"fields": "all"}, row_filter=row_filter,
+                           filter_params={"dt_sale": {"from": "data_inicio", "to": "data_fim"},
+                                          "store_id": "loja"})
+    # O servidor aplica apenas parte do filtro: o resto é conferido nas linhas recebidas.
+    payload = {"vendas": [
+        {"id": 1, "dt_sale": "2025-04-07", "store_id": 1, "price": 10.0},
+        {"id": 2, "dt_sale": "2025-04-08", "store_id": 2, "price": 20.0},
+        {"id": 3, "dt_sale": "2025-04-20", "store_id": 2, "price": 30.0},
+    ]}
+    try:
+        with requests_mock.Mocker() as mock:
+            mock.get("https://api.exemplo.com/vendas", json=payload)
+            rows = list(source.iter_rows())
+            query = mock.last_request.qs
+    finally:
+        engine.close()
+
+    assert query == {"fields": ["all"], "data_inicio": ["2025-04-07"], "data_fim": ["2025-04-13"],
+                     "loja": ["1,2"]}
+    assert [row["id"] for row in rows] == [2]
+    assert "filters" in source.cache_key()
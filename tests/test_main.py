@@ -21,7 +21,7 @@ def test_config_file_valid(capsys):
     valid_config = {"sources": [{"type": "local", "location": "test.csv"}]}  # Configuração válida
     with patch("builtins.open", mock_open(read_data=json.dumps(valid_config))):
         with patch("json.load", return_value=valid_config):
-            with patch("gerador_relatorio.data_source.data_source.LocalDataSource.extract_data", return_value=[{"col1": "val1"}]):  # Mock extract_data
+            with patch("gerador_relatorio.data_source.data_source.LocalDataSource.iter_rows", return_value=iter([{"col1": "val1"}])):  # Mock iter_rows
                 main()
                 captured = capsys.readouterr()
                 assert "Arquivo de configuração encontrado em:" in captured.out
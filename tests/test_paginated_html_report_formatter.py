@@ -0,0 +1,92 @@
+# tests/test_paginated_html_report_formatter.py
+
+import io
+import os
+
+import pytest
+
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter
+from gerador_relatorio.sales_report.paginated_html_report_formatter import PaginatedHTMLReportFormatter
+from gerador_relatorio.sales_report.report_renderer import ReportRenderer
+
+
+def make_data(row_count):
+    rows = [{"id": str(i), "product": f"Produto {i}", "price": f"{i}.50"} for i in range(1, row_count + 1)]
+    return {
+        "data": ColumnStore.from_rows(rows),
+        "statistics": {"id": {"min": 1.0, "max": float(row_count), "blank_count": 0}},
+        "header_map": {"id": [], "product": [], "price": []},
+    }
+
+
+def read_pages(directory):
+    names = sorted(name for name in os.listdir(directory) if "_pagina_" in name)
+    return {name: open(os.path.join(directory, name), encoding="utf-8").read() for name in names}
+
+
+def test_rows_are_split_into_numbered_pages(tmp_path):
+    data = make_data(25)
+    formatter = PaginatedHTMLReportFormatter(str(tmp_path), page_size=10)
+
+    index = formatter.format_report(data)
+    pages = read_pages(tmp_path)
+
+    assert list(pages) == ["relatorio_vendas_pagina_0001.html", "relatorio_vendas_pagina_0002.html",
+                           "relatorio_vendas_pagina_0003.html"]
+    assert [page.count("<tr>") - 1 for page in pages.values()] == [10, 10, 5]
+    assert "<td>Produto 11</td>" in pages["relatorio_vendas_pagina_0002.html"]
+    assert "relatorio_vendas_pagina_0003.html'>Próxima" not in pages["relatorio_vendas_pagina_0003.html"]
+    assert "href='relatorio_vendas_pagina_0003.html'>Próxima" in pages["relatorio_vendas_pagina_0002.html"]
+    assert "25 linhas em 3 páginas" in index
+    assert "(linhas 21 a 25)" in index
+    assert "<h2>Estatísticas</h2>" in index
+    assert "<td>Produto 1</td>" not in index
+
+
+def test_pages_hold_the_same_rows_as_the_single_document(tmp_path):
+    data = make_data(23)
+    single = HTMLReportFormatter().format_report(data)
+    PaginatedHTMLReportFormatter(str(tmp_path), page_size=7).format_report(data)
+
+    page_rows = "".join(page.split("<tbody>")[1].split("</tbody>")[0] for page in read_pages(tmp_path).values())
+    single_rows = single.split("<tbody>")[1].split("</tbody>")[0]
+    assert page_rows.replace("\n        ", "") == single_rows.replace("\n        ", "")
+
+
+def test_parallel_generation_matches_serial(tmp_path):
+    data = make_data(45)
+    serial_dir, parallel_dir = tmp_path / "serie", tmp_path / "paralelo"
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+
+    serial_index = PaginatedHTMLReportFormatter(str(serial_dir), page_size=10).format_report(data)
+    parallel_index = PaginatedHTMLReportFormatter(str(parallel_dir), page_size=10,
+                                                  max_workers=2).format_report(data)
+
+    assert parallel_index == serial_index
+    assert read_pages(parallel_dir) == read_pages(serial_dir)
+
+
+def test_paginated_formatter_as_renderer_sink(tmp_path):
+    data = make_data(12)
+    index = io.StringIO()
+    renderer = ReportRenderer(batch_size=5).add_sink(PaginatedHTMLReportFormatter(str(tmp_path), page_size=4), index)
+
+    assert renderer.render(data) == 12
+    assert len(read_pages(tmp_path)) == 3
+    assert index.getvalue().endswith("</html>")
+
+
+def test_empty_report_has_no_pages(tmp_path):
+    data = make_data(0)
+    data["data"] = []
+    index = PaginatedHTMLReportFormatter(str(tmp_path), page_size=10).format_report(data)
+
+    assert "Nenhum dado de vendas disponível." in index
+    assert read_pages(tmp_path) == {}
+
+
+def test_invalid_page_size():
+    with pytest.raises(ValueError):
+        PaginatedHTMLReportFormatter(page_size=0)
@@ -0,0 +1,92 @@
+# tests/test_parallel_statistics.py
+
+import random
+
+import pytest
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.parallel_statistics import chunk_ranges, compute_statistics
+from gerador_relatorio.sales_data import sales_data as sales_data_module
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+
+
+@pytest.fixture
+def store():
+    """Vendas com colunas tipadas, texto, nulos, valores sujos e colunas que só aparecem no fim."""
+    rng = random.Random(7)
+    rows = []
+    for i in range(1000):
+        row = {
+            "order_id": str(i + 1),
+            "price": f"{rng.uniform(1, 500):.2f}" if i % 13 else rng.choice(["", None, "N/A"]),
+            "quantity": rng.randint(1, 9),
+            "dt_sale": f"2023-{i % 12 + 1:02d}-15",
+            "category": rng.choice(["Roupas", "Acessórios", "Alimentos"]),
+        }
+        if i > 900:
+            row["discount"] = f"0.{i % 10}"
+        rows.append(row)
+    return ColumnStore.from_rows(rows)
+
+
+def test_chunk_ranges_cover_the_interval():
+    assert chunk_ranges(0, 10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert chunk_ranges(5, 5, 4) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 333, 97])
+def test_parallel_statistics_match_serial(store, chunk_size):
+    serial = SalesData.compute_basic_statistics(store)
+
+    parallel = SalesData.compute_basic_statistics(store, max_workers=2, chunk_size=chunk_size)
+
+    assert parallel == serial
+    assert list(parallel) == list(serial)
+
+
+def test_parallel_statistics_of_a_row_range(store):
+    partial = compute_statistics(store, 250, 750, max_workers=2, chunk_size=100)
+
+    assert partial.row_count == 500
+    assert partial.result() == StatisticsAccumulator().update_store(store, 250, 750).result()
+
+
+def test_consolidate_data_with_parallel_statistics(tmp_path):
+    path = tmp_path / "vendas.csv"
+    lines = ["order_id,price"] + [f"{i},{i}.25" for i in range(1, 501)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    source = LocalDataSource(str(path))
+
+    serial = SalesData.consolidate_data([source])
+    parallel = SalesData.consolidate_data([source], statistics_workers=2, statistics_chunk_size=64)
+
+    assert parallel["statistics"] == serial["statistics"]
+
+
+def test_invalid_chunk_size(store):
+    with pytest.raises(ValueError):
+        compute_statistics(store, chunk_size=0)
+
+
+def test_concurrent_extraction_uses_parallel_statistics(tmp_path, monkeypatch):
+    sources = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.csv"
+        lines = ["order_id,price"] + [f"{i},{i}.25" for i in range(1, 501)]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        sources.append(LocalDataSource(str(path)))
+    serial = SalesData.consolidate_data(sources)
+
+    calls = []
+
+    def recording_compute_statistics(store, start=0, stop=None, max_workers=1, chunk_size=None, **kwargs):
+        calls.append((max_workers, chunk_size))
+        return compute_statistics(store, start, stop, max_workers, chunk_size, **kwargs)
+
+    monkeypatch.setattr(sales_data_module, "compute_statistics", recording_compute_statistics)
+    concurrent = SalesData.consolidate_data(sources, max_workers=2, statistics_workers=2, statistics_chunk_size=64)
+
+    assert calls[:2] == [(2, 64), (2, 64)]
+    assert concurrent["statistics"] == serial["statistics"]
@@ -0,0 +1,141 @@
+# tests/test_partitioned_data_source.py
+
+import gzip
+import re
+
+import pytest
+
+from gerador_relatorio.data_source.data_source import DataSourceError
+from gerador_relatorio.data_source.filters import RowFilter
+from gerador_relatorio.data_source.partitioned_data_source import PartitionedDataSource, parse_partitions
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+DATE_PATTERN = r"(?P<dt_export>\d{4}-\d{2}-\d{2})"
+
+
+def write(path, text, compress=False):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress:
+        path.write_bytes(gzip.compress(text.encode("utf-8")))
+    else:
+        path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def exports(tmp_path):
+    """Exportações diárias de duas lojas: store_id=N/vendas_AAAA-MM-DD 00:00:00.csv."""
+    for store in (1, 2):
+        for day in (1, 2, 3):
+            rows = "".join(f"{store}{day}{n},{n * 10}.00\n" for n in range(3))
+            write(tmp_path / f"store_id={store}" / f"vendas_2025-04-0{day} 00:00:00.csv",
+                  "id,price\n" + rows, compress=(day == 3))
+    write(tmp_path / "leia-me.txt", "não é CSV")
+    return tmp_path
+
+
+def test_parse_partitions_from_directories_and_file_names():
+    assert parse_partitions("store_id=3/canal=web/vendas_2025-04-01 00:00:00.csv", re.compile(DATE_PATTERN)) == \
+        {"store_id": "3", "canal": "web", "dt_export": "2025-04-01"}
+    assert parse_partitions("vendas.csv", re.compile(DATE_PATTERN)) == {}
+
+
+def test_discovers_files_in_order_with_partition_columns(exports):
+    source = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN, max_workers=3)
+
+    files = source.discover_files()
+    assert len(files) == 6
+    assert files[0].partitions == {"store_id": "1", "dt_export": "2025-04-01"}
+
+    rows = list(source.iter_rows())
+    assert [row["id"] for row in rows[:4]] == ["110", "111", "112", "120"]
+    assert rows[0] == {"id": "110", "price": "0.00", "store_id": "1", "dt_export": "2025-04-01"}
+    assert len(rows) == 18
+
+
+def test_concurrent_read_matches_serial_read(exports):
+    serial = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN, max_workers=1)
+    concurrent = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN, max_workers=4)
+    assert list(concurrent.iter_rows()) == list(serial.iter_rows())
+    assert concurrent.cache_validators() == serial.cache_validators()
+
+
+def test_concurrent_read_keeps_bounded_batches_and_stops_when_closed(exports, monkeypatch):
+    import gerador_relatorio.data_source.partitioned_data_source as partitioned_module
+    monkeypatch.setattr(partitioned_module, "READ_AHEAD_ROWS", 2)
+    monkeypatch.setattr(partitioned_module, "READ_AHEAD_BATCHES", 1)
+    serial = list(PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN).iter_rows())
+    source = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN, max_workers=3)
+    assert list(source.iter_rows()) == serial
+
+    rows = source.iter_rows()
+    assert next(rows) == serial[0]
+    rows.close()  # As threads que esperam espaço na fila terminam.
+
+
+def test_partition_filters_prune_files_without_opening_them(exports):
+    # Um arquivo corrompido fora do filtro nunca é aberto.
+    write(exports / "store_id=3" / "vendas_2025-04-01 00:00:00.csv.gz", "corrompido")
+    row_filter = RowFilter.from_config([{"column": "dt_export", "from": "2025-04-02", "to": "2025-04-03"},
+                                        {"column": "store_id", "in": [1, 2]},
+                                        {"column": "price", "from": 10}])
+    source = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN, row_filter=row_filter)
+
+    assert [file.relative_path for file in source.selected_files()] == [
+        "store_id=1/vendas_2025-04-02 00:00:00.csv", "store_id=1/vendas_2025-04-03 00:00:00.csv",
+        "store_id=2/vendas_2025-04-02 00:00:00.csv", "store_id=2/vendas_2025-04-03 00:00:00.csv"]
+    assert [row["id"] for row in source.iter_rows()] == ["121", "122", "131", "132", "221", "222", "231", "232"]
+
+    everything = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN)
+    with pytest.raises(DataSourceError):
+        list(everything.iter_rows())
+
+
+def test_glob_location_and_projection(exports):
+    source = PartitionedDataSource(str(exports / "store_id=*" / "*2025-04-01*.csv"),
+                                   partition_pattern=DATE_PATTERN, columns=["price", "store_id"])
+    rows = list(source.iter_rows())
+    assert rows[0] == {"price": "0.00", "store_id": "1"}
+    assert len(rows) == 6
+
+
+def test_consolidates_as_a_single_source(exports):
+    source = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN)
+    result = SalesData.consolidate_data([source])
+
+    assert len(result["data"]) == 18
+    assert result["statistics"]["price"]["max"] == 20.0
+
+
+def test_cache_validation_follows_the_selected_files(exports):
+    source = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN)
+    list(source.iter_rows())
+    validators = source.cache_validators()
+    assert source.is_cache_valid(validators)
+
+    write(exports / "store_id=2" / "vendas_2025-04-04 00:00:00.csv", "id,price\n241,1.00\n")
+    assert not source.is_cache_valid(validators)
+    # Um arquivo novo fora do filtro não invalida a extração filtrada.
+    week = RowFilter.from_config([{"column": "dt_export", "to": "2025-04-03"}])
+    filtered = PartitionedDataSource(str(exports), partition_pattern=DATE_PATTERN, row_filter=week)
+    list(filtered.iter_rows())
+    validators = filtered.cache_validators()
+    write(exports / "store_id=2" / "vendas_2025-04-05 00:00:00.csv", "id,price\n251,1.00\n")
+    assert filtered.is_cache_valid(validators)
+    assert filtered.cache_key() != source.cache_key()
+
+
+def test_invalid_partition_pattern_raises_value_error(exports):
+    with pytest.raises(ValueError):
+        PartitionedDataSource(str(exports), partition_pattern="(?P<dt")
+
+
+def test_partition_column_also_in_file_is_filtered_by_row(tmp_path):
+    # O arquivo tem a sua própria coluna dt_sale: nas linhas vale o valor do arquivo.
+    rows = "".join(f"{n},2025-04-{n:02d},{n}.00\n" for n in range(1, 21))
+    write(tmp_path / "dt_sale=2025-04-01" / "a.csv", "id,dt_sale,price\n" + rows)
+    row_filter = RowFilter.from_config({"column": "dt_sale", "from": "2025-04-01", "to": "2025-04-01"})
+
+    source = PartitionedDataSource(str(tmp_path), row_filter=row_filter)
+    assert [(row["id"], row["dt_sale"]) for row in source.iter_rows()] == [("1", "2025-04-01")]
+    concurrent = PartitionedDataSource(str(tmp_path), row_filter=row_filter, columns=["price"], max_workers=2)
+    assert [row["price"] for row in concurrent.iter_rows()] == ["1.00"]
@@ -0,0 +1,118 @@
+# tests/test_plugins.py
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import gerador_relatorio.report_config.report_config as report_config_module
+
+from gerador_relatorio.data_source.data_source import DataSource, LocalDataSource, SourceContext
+from gerador_relatorio.data_source.partitioned_data_source import PartitionedDataSource
+from gerador_relatorio.plugins import FORMATTER_ENTRY_POINTS, FORMATTERS, SOURCES, PluginRegistry
+from gerador_relatorio.report_config.report_config import ReportConfig
+
+
+def test_importing_main_does_not_import_web_sources_or_formatters():
+    code = ("import sys, gerador_relatorio.main; "
+            "print(sorted(m for m in sys.modules if m == 'requests' or m.endswith(("
+            "'web_data_source', 'csv_report_formatter', 'html_report_formatter'))))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_registry_loads_lazily_and_reports_errors():
+    registry = PluginRegistry("Formato de relatório", targets={
+        "local": "gerador_relatorio.data_source.data_source:LocalDataSource",
+        "quebrado": "gerador_relatorio.nao_existe:Formatter",
+    })
+    assert registry.load("local") is LocalDataSource
+    with pytest.raises(ValueError, match="Formato de relatório desconhecido: pdf."):
+        registry.load("pdf")
+    with pytest.raises(ValueError, match="quebrado não pôde ser carregado"):
+        registry.load("quebrado")
+    registry.register("local", PartitionedDataSource)
+    assert registry.load("local") is PartitionedDataSource
+    assert registry.names() == ["local", "quebrado"]
+
+
+def test_built_in_formats_have_file_extensions():
+    assert [FORMATTERS.load(name).FILE_EXTENSION for name in ("csv", "html", "text")] == ["csv", "html", "txt"]
+
+
+def test_entry_points_add_formats_without_overriding_built_ins(tmp_path, monkeypatch):
+    (tmp_path / "meu_plugin.py").write_text(
+        "from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter\n"
+        "class JSONReportFormatter(CSVReportFormatter):\n"
+        "    FILE_EXTENSION = 'json'\n", encoding="utf-8")
+    dist_info = tmp_path / "meu_plugin-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: meu-plugin\nVersion: 1.0\n", encoding="utf-8")
+    (dist_info / "entry_points.txt").write_text(
+        f"[{FORMATTER_ENTRY_POINTS}]\njson = meu_plugin:JSONReportFormatter\ncsv = meu_plugin:JSONReportFormatter\n",
+        encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = PluginRegistry("Formato de relatório", FORMATTER_ENTRY_POINTS, {
+        "csv": "gerador_relatorio.sales_report.csv_report_formatter:CSVReportFormatter",
+    })
+    assert "json" in registry and registry.names() == ["csv", "json"]
+    assert registry.load("json").FILE_EXTENSION == "json"
+    assert registry.load("csv").FILE_EXTENSION == "csv"
+
+
+def test_load_config_creates_sources_by_type(tmp_path, capsys):
+    config = {
+        "filters": [{"column": "store_id", "equals": "1"}],
+        "web": {"retries": 0},
+        "sources": [
+            {"type": "local", "location": "vendas.csv", "compression": "gzip"},
+            {"type": "web", "name": "API", "location": "http://localhost/a", "data_key": "vendas"},
+            {"type": "web", "name": "API 2", "location": "http://localhost/b", "data_key": "vendas",
+             "schema": ["id"]},
+            {"type": "web", "name": "Sem chave", "location": "http://localhost/c"},
+            {"type": "web", "name": "Paginada", "location": "http://localhost/d", "data_key": "vendas",
+             "pagination": {"type": "pagina"}},
+            {"type": "partitioned", "location": str(tmp_path), "partition_pattern": "(?P<x>"},
+            {"type": "ftp", "location": "ftp://vendas"},
+        ],
+    }
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+
+    sources = ReportConfig.load_config(str(path)).sources
+
+    assert [source.type for source in sources] == ["local", "web", "web"]
+    local, first, second = sources
+    assert local.compression == "gzip" and local.row_filter.columns == ["store_id"]
+    assert first.engine is second.engine and first.engine.retries == 0
+    assert second.schema == ["id"]
+    output = capsys.readouterr().out
+    assert "Erro na fonte Sem chave: 'data_key' não especificado para a fonte web. Ignorando." in output
+    assert "Erro na fonte Paginada: Tipo de paginação desconhecido: pagina. Ignorando." in output
+    assert "partition_pattern inválido" in output
+    assert "Tipo de fonte de dados desconhecido: ftp. Ignorando." in output
+
+
+def test_source_registry_resolves_built_in_types():
+    assert SOURCES.load("partitioned") is PartitionedDataSource
+    source = SOURCES.load("local").from_config({"location": "a.csv"}, context=SourceContext(hash_contents=True))
+    assert isinstance(source, LocalDataSource) and source.hash_contents
+
+
+def test_sources_that_are_not_data_sources_or_lack_from_config_are_skipped(monkeypatch, capsys):
+    class SemConfiguracao(DataSource):
+        def extract_data(self):
+            return []
+
+    monkeypatch.setattr(report_config_module, "SOURCES", PluginRegistry("Tipo de fonte de dados", targets={
+        "local": LocalDataSource, "funcao": "os.path:join", "base": SemConfiguracao}))
+    config = {"sources": [{"type": "funcao"}, {"type": "base", "name": "Base"}, {"type": "local", "location": "a.csv"}]}
+
+    sources = ReportConfig.create_sources(config)
+
+    assert [source.type for source in sources] == ["local"]
+    output = capsys.readouterr().out
+    assert "Tipo de fonte de dados funcao não é uma subclasse de DataSource. Ignorando." in output
+    assert "Erro na fonte Base: SemConfiguracao não pode ser criada a partir da configuração. Ignorando." in output
@@ -0,0 +1,103 @@
+# tests/test_profiling.py
+
+import io
+import json
+import os
+import pstats
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.main import CPROFILE_FILE, METRICS_FILE, main
+from gerador_relatorio.profiling import Profiler
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
+from gerador_relatorio.sales_report.report_renderer import ReportRenderer
+from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter
+
+CSV_TEXT = "id,price\n1,10.00\n2,20.00\n3,30.00\n"
+
+
+def write_csv(tmp_path, name="vendas.csv"):
+    path = tmp_path / name
+    path.write_text(CSV_TEXT, encoding="utf-8")
+    return str(path)
+
+
+def test_nested_stages_record_time_rows_and_memory():
+    profiler = Profiler(trace_memory=True)
+    profiler.start()
+    try:
+        with profiler.stage("externa", fonte="x") as outer:
+            with profiler.stage("interna") as inner:
+                data = [0] * 100000
+                inner.rows = len(data)
+                del data
+            profiler.record("medida", seconds=0.5, rows=10, bytes=100)
+            outer.rows = 10
+    finally:
+        profiler.stop()
+
+    stage = profiler.to_dict()["stages"][0]
+    assert stage["name"] == "externa" and stage["fonte"] == "x"
+    assert [child["name"] for child in stage["children"]] == ["interna", "medida"]
+    inner, recorded = stage["children"]
+    assert inner["rows"] == 100000 and inner["seconds"] >= 0 and "cpu_seconds" in inner
+    assert inner["peak_memory_bytes"] >= 800000
+    assert stage["peak_memory_bytes"] >= inner["peak_memory_bytes"]
+    assert recorded["rows_per_second"] == 20
+    assert "peak_memory_bytes" not in recorded
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.stage("etapa") as metrics:
+        metrics.rows = 1
+        with profiler.accumulate(metrics):
+            pass
+    profiler.record("fonte", seconds=1.0)
+    assert profiler.stages == []
+
+
+def test_consolidation_records_stages_per_source(tmp_path):
+    profiler = Profiler()
+    sources = [LocalDataSource(write_csv(tmp_path, "a.csv")), LocalDataSource(write_csv(tmp_path, "b.csv"))]
+    SalesData.consolidate_data(sources, profiler=profiler)
+
+    stages = {stage.name: stage for stage in profiler.stages}
+    assert list(stages) == ["extracao", "cabecalhos", "estatisticas"]
+    extraction = stages["extracao"]
+    assert extraction.rows == 6 and extraction.bytes == 2 * len(CSV_TEXT)
+    assert [child.rows for child in extraction.children] == [3, 3]
+    assert all(child.bytes == len(CSV_TEXT) and child.cpu_seconds is not None for child in extraction.children)
+
+
+def test_renderer_records_each_formatter(tmp_path):
+    consolidated = SalesData.consolidate_data([LocalDataSource(write_csv(tmp_path))])
+    profiler = Profiler()
+    renderer = ReportRenderer(batch_size=2).add_sink(CSVReportFormatter(), io.StringIO())
+    renderer.add_sink(TextReportFormatter(), io.StringIO())
+    with profiler.stage("relatorios"):
+        renderer.render(consolidated, profiler=profiler)
+
+    formatters = profiler.stages[0].children
+    assert [metrics.name for metrics in formatters] == ["CSVReportFormatter", "TextReportFormatter"]
+    assert all(metrics.rows == 3 and metrics.seconds > 0 for metrics in formatters)
+
+
+def test_main_writes_metrics_and_cprofile_next_to_reports(tmp_path, monkeypatch):
+    output_dir = tmp_path / "saida"
+    config = {"sources": [{"type": "local", "location": write_csv(tmp_path)}],
+              "reports": {"output_dir": str(output_dir), "formats": ["csv", "html"]}}
+    (tmp_path / "gerador_relatorio").mkdir()
+    (tmp_path / "gerador_relatorio" / "config.json").write_text(json.dumps(config), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    main(["--profile", "--cprofile"])
+
+    with open(output_dir / METRICS_FILE, encoding="utf-8") as file:
+        metrics = json.load(file)
+    names = [stage["name"] for stage in metrics["stages"]]
+    assert names[:4] == ["configuracao", "extracao", "cabecalhos", "estatisticas"]
+    reports = next(stage for stage in metrics["stages"] if stage["name"] == "relatorios")
+    csv_metrics = next(child for child in reports["children"] if child.get("output", "").endswith(".csv"))
+    assert csv_metrics["bytes"] == os.path.getsize(output_dir / "relatorio_vendas.csv")
+    assert pstats.Stats(str(output_dir / CPROFILE_FILE)).total_calls > 0
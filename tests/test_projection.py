@@ -0,0 +1,88 @@
+# tests/test_projection.py
+
+import csv
+import io
+
+import pytest
+import requests_mock
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.data_source.filters import RowFilter
+from gerador_relatorio.data_source.web_data_source import WebDataSource
+from gerador_relatorio.data_source.web_engine import WebFetchEngine
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+CSV_TEXT = (
+    "id,dt_sale,store_id,price,category\n"
+    "1,2025-04-06,1,10.00,Roupas\n"
+    "2,2025-04-07,2,20.00,Livros\n"
+    "3,2025-04-10,3\n"
+    "4,2025-04-13,1,40.00,Livros,extra\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "vendas.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+    return str(path)
+
+
+def test_local_projection_keeps_only_requested_columns_in_order(csv_file):
+    columns = ["price", "id", "city"]
+    expected = [{name: row[name] for name in columns if name in row}
+                for row in csv.DictReader(io.StringIO(CSV_TEXT))]
+
+    rows = list(LocalDataSource(csv_file, columns=columns).iter_rows())
+
+    assert rows == expected
+    assert [list(row) for row in rows] == [["price", "id"]] * 4
+    assert rows[2]["price"] is None
+
+
+def test_local_projection_with_single_or_no_known_column(csv_file):
+    assert [row["id"] for row in LocalDataSource(csv_file, columns=["id"]).iter_rows()] == ["1", "2", "3", "4"]
+    assert list(LocalDataSource(csv_file, columns=["city"]).iter_rows()) == [{}] * 4
+
+
+def test_projection_combines_with_filter_on_dropped_column(csv_file):
+    source = LocalDataSource(csv_file, columns=["id"],
+                             row_filter=RowFilter.from_config({"column": "category", "equals": "Livros"}))
+    assert list(source.iter_rows()) == [{"id": "2"}, {"id": "4"}]
+
+
+def test_consolidation_matches_post_hoc_projection(csv_file):
+    columns = ["id", "price"]
+    full = SalesData.consolidate_data([LocalDataSource(csv_file)])
+    projected = SalesData.consolidate_data([LocalDataSource(csv_file, columns=columns)])
+
+    expected = SalesData(full["data"], list(full["header_map"])).get_data_by_columns(columns)
+    assert list(projected["data"]) == list(expected)
+    assert list(projected["header_map"]) == columns
+    assert projected["statistics"] == {name: full["statistics"][name] for name in columns}
+
+
+def test_projection_is_part_of_the_cache_key(csv_file):
+    keys = {LocalDataSource(csv_file).cache_key(),
+            LocalDataSource(csv_file, columns=["id"]).cache_key(),
+            LocalDataSource(csv_file, columns=["id", "price"]).cache_key()}
+    assert len(keys) == 3
+
+
+def test_web_projection_requests_fields_and_projects_rows():
+    engine = WebFetchEngine(sleep=lambda seconds: None)
+    source = WebDataSource("vendas", "https://api.exemplo.com/vendas", data_key="vendas", engine=engine,
+                           columns=["id", "price"], projection_param="select",
+                           row_filter=RowFilter.from_config({"column": "category", "equals": "Livros"}))
+    payload = {"vendas": [{"id": 1, "price": 10.0, "category": "Roupas"},
+                          {"id": 2, "price": 20.0, "category": "Livros", "title": "X"}]}
+    try:
+        with requests_mock.Mocker() as mock:
+            mock.get("https://api.exemplo.com/vendas", json=payload)
+            rows = list(source.iter_rows())
+            query = mock.last_request.qs
+    finally:
+        engine.close()
+
+    assert query == {"select": ["id,price,category"]}
+    assert rows == [{"id": 2, "price": 20.0}]
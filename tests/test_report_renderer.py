@@ -0,0 +1,63 @@
+# tests/test_report_renderer.py
+
+import io
+
+import pytest
+
+from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
+from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter
+from gerador_relatorio.sales_report.report_renderer import ReportRenderer
+from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter
+
+
+@pytest.fixture
+def consolidated_data():
+    data = [{"id": i, "product": f"Produto {i}", "price": f"{i}.50"} for i in range(1, 8)]
+    return {
+        "data": data,
+        "statistics": {"id": {"min": 1.0, "max": 7.0, "blank_count": 0}},
+        "header_map": {"id": [], "product": [], "price": []},
+    }
+
+
+class CountingRows:
+    """Iterável que conta quantas vezes foi percorrido."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return iter(self.rows)
+
+
+def test_render_feeds_all_formatters_in_a_single_pass(consolidated_data):
+    formatters = [CSVReportFormatter(), HTMLReportFormatter(), TextReportFormatter()]
+    streams = [io.StringIO() for _ in formatters]
+    rows = CountingRows(consolidated_data["data"])
+
+    renderer = ReportRenderer(list(zip(formatters, streams)), batch_size=3)
+    written = renderer.render(consolidated_data, rows=rows)
+
+    assert written == 7
+    assert rows.passes == 1
+    assert streams[0].getvalue() == formatters[0].format_data(consolidated_data)
+    assert streams[1].getvalue() == formatters[1].format_report(consolidated_data)
+    assert streams[2].getvalue() == formatters[2].format_report(consolidated_data)
+
+
+def test_render_without_rows_writes_empty_reports(consolidated_data):
+    consolidated_data["data"] = []
+    html, text = io.StringIO(), io.StringIO()
+    renderer = ReportRenderer().add_sink(HTMLReportFormatter(), html).add_sink(TextReportFormatter(), text)
+
+    assert renderer.render(consolidated_data) == 0
+    assert "Nenhum dado de vendas disponível." in html.getvalue()
+    assert html.getvalue().endswith("</html>")
+    assert "Nenhum dado de vendas disponível." in text.getvalue()
+
+
+def test_render_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        ReportRenderer(batch_size=0)
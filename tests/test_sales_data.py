@@ -1,9 +1,12 @@
+import os
+import tempfile
+import time
 import unittest
 from unittest.mock import Mock
 from typing import List, Dict
  
 from gerador_relatorio.sales_data.sales_data import SalesData
-from gerador_relatorio.data_source.data_source import DataSource 
+from gerador_relatorio.data_source.data_source import DataSource, LocalDataSource
 
 #### Checar implementações dos testes 
 
@@ -14,8 +17,10 @@ class MockDataSource(DataSource):
     def __init__(self, name: str, data_to_return: List[Dict]):
         self.name = name
         self._data = data_to_return
+        self.extract_calls = 0
 
     def extract_data(self) -> List[Dict]:
+        self.extract_calls += 1
         return self._data
 
 
@@ -293,6 +298,77 @@ class TestSalesData(unittest.TestCase):
         self.assertIn("value", result["header_map"])
         self.assertIn("item", result["header_map"])
 
+    def test_consolidate_data_extracts_each_source_once(self):
+        """Testa que cada fonte é extraída uma única vez e gera um SourceResult."""
+        data1 = [{"id": 1, "value": 10}, {"id": 2, "value": 20}]
+        data2 = [{"id": 3, "product": "A"}]
+        mock_source1 = MockDataSource("Source1", data1)
+        mock_source2 = MockDataSource("Source2", data2)
+
+        result = SalesData.consolidate_data([mock_source1, mock_source2])
+
+        self.assertEqual(mock_source1.extract_calls, 1)
+        self.assertEqual(mock_source2.extract_calls, 1)
+
+        source_results = result["source_results"]
+        self.assertEqual([r.source for r in source_results], [mock_source1, mock_source2])
+        self.assertEqual(source_results[0].row_count, 2)
+        self.assertEqual(source_results[0].columns, ["id", "value"])
+        self.assertEqual(source_results[1].columns, ["id", "product"])
+        self.assertGreaterEqual(source_results[0].elapsed, 0)
+        self.assertEqual(list(result["header_map"]), ["id", "value", "product"])
+
+    def test_consolidate_data_concurrent_matches_sequential(self):
+        """Testa que a extração em threads gera o mesmo resultado, na ordem das fontes."""
+        class SlowSource(MockDataSource):
+            def __init__(self, name, data_to_return, delay):
+                super().__init__(name, data_to_return)
+                self.delay = delay
+
+            def extract_data(self):
+                time.sleep(self.delay)
+                return super().extract_data()
+
+        datasets = [
+            [{"id": 1, "value": "10.50"}, {"id": 2, "value": None}],
+            [],
+            [{"id": 3, "product": "A"}, {"id": 4, "value": "7", "product": "B"}],
+        ]
+        # A primeira fonte termina por último: a ordem do resultado não pode depender disso.
+        sources = [SlowSource(f"Source{i}", data, delay) for i, (data, delay)
+                   in enumerate(zip(datasets, [0.05, 0.0, 0.0]))]
+
+        sequential = SalesData.consolidate_data(sources)
+        concurrent = SalesData.consolidate_data(sources, max_workers=3)
+
+        self.assertEqual(concurrent["data"], sum(datasets, []))
+        self.assertEqual(concurrent["data"], sequential["data"])
+        self.assertEqual(concurrent["statistics"], sequential["statistics"])
+        self.assertEqual(list(concurrent["header_map"]), list(sequential["header_map"]))
+        self.assertEqual([r.source for r in concurrent["source_results"]], sources)
+        self.assertEqual([r.start for r in concurrent["source_results"]], [0, 2, 2])
+
+    def test_consolidate_data_process_pool_local_sources(self):
+        """Testa a extração de fontes locais em um pool de processos."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for index in range(3):
+                path = os.path.join(tmp_dir, f"vendas_{index}.csv")
+                with open(path, "w", encoding="utf-8", newline="") as f:
+                    f.write("ID,Produto,Preco\r\n")
+                    for row in range(5):
+                        f.write(f"{index * 10 + row},Produto {row},{row}.25\r\n")
+                paths.append(path)
+            sources = [LocalDataSource(path) for path in paths]
+
+            sequential = SalesData.consolidate_data(sources)
+            concurrent = SalesData.consolidate_data(sources, max_workers=2, use_processes=True)
+
+        self.assertEqual(len(concurrent["data"]), 15)
+        self.assertEqual(concurrent["data"], sequential["data"])
+        self.assertEqual(concurrent["statistics"], sequential["statistics"])
+        self.assertEqual([r.source for r in concurrent["source_results"]], sources)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+# tests/test_schema.py
+
+import pytest
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.sales_data.column_store import DATE_TEXT, FLOAT_TEXT, INT_TEXT, OBJECT, ColumnStore
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_data.schema import (
+    CATEGORICAL, DATE, DECIMAL, EMPTY, FLOAT_TYPE, INTEGER, TEXT, Schema, infer_schema, merge_types,
+)
+
+
+@pytest.fixture
+def sales_rows():
+    """Linhas no formato lido de um CSV de vendas."""
+    return [{
+        "order_id": str(i),
+        "dt_sale": f"2023-01-{i % 28 + 1:02d}",
+        "price": f"{i * 1.25:.2f}" if i % 30 else "N/A",
+        "category": ["Roupas", "Acessórios", "Alimentos"][i % 3],
+        "customer_name": f"Cliente {i}",
+        "zip_code": f"{i:05d}",
+        "notes": "",
+    } for i in range(1, 101)]
+
+
+def test_infer_schema_types(sales_rows):
+    """Cada coluna recebe o tipo do seu conteúdo, tolerando poucos valores sujos."""
+    schema = infer_schema(sales_rows)
+
+    assert dict(schema) == {
+        "order_id": INTEGER,
+        "dt_sale": DATE,
+        "price": DECIMAL,
+        "category": CATEGORICAL,
+        "customer_name": TEXT,
+        "zip_code": TEXT,  # "00001" não volta igual de int()
+        "notes": EMPTY,
+    }
+    assert schema.storage["order_id"] == INT_TEXT
+    assert schema.storage["price"] == FLOAT_TEXT
+    assert schema.storage["dt_sale"] == DATE_TEXT
+    assert schema.storage["customer_name"] == OBJECT
+    assert "notes" not in schema.storage
+    assert schema.columns_of_type(INTEGER, DECIMAL) == ["order_id", "price"]
+
+
+def test_python_values_and_mixed_numbers():
+    rows = [{"id": 1, "value": 2.5, "mix": "3"}, {"id": 2, "value": 3.0, "mix": "3.5"}]
+    schema = infer_schema(rows)
+
+    assert dict(schema) == {"id": INTEGER, "value": FLOAT_TYPE, "mix": DECIMAL}
+
+
+def test_merge_types():
+    assert merge_types(INTEGER, DECIMAL) == DECIMAL
+    assert merge_types(DECIMAL, FLOAT_TYPE) == FLOAT_TYPE
+    assert merge_types(EMPTY, DATE) == DATE
+    assert merge_types(DATE, TEXT) == TEXT
+    assert merge_types(CATEGORICAL, TEXT) == TEXT
+
+    merged = Schema({"a": INTEGER, "b": DATE}).merge(Schema({"a": DECIMAL, "c": TEXT}))
+    assert dict(merged) == {"a": DECIMAL, "b": DATE, "c": TEXT}
+
+
+def test_schema_is_widened_by_rows_after_the_sample():
+    rows = [{"quantity": str(i)} for i in range(10)] + [{"quantity": "2.5"}]
+    schema = infer_schema(rows, sample_size=5)
+    store = ColumnStore()
+    store.kind_hints.update(schema.storage)
+    store.extend(rows)
+
+    assert schema["quantity"] == INTEGER
+    assert schema.adjusted_to(store)["quantity"] == DECIMAL
+    assert store == rows
+
+
+def test_consolidate_data_returns_source_schemas(tmp_path):
+    path = tmp_path / "vendas.csv"
+    path.write_text("order_id,dt_sale,price\n1,2023-01-15,10.50\n2,2023-01-16,3.00\n", encoding="utf-8")
+
+    result = SalesData.consolidate_data([LocalDataSource(str(path))])
+
+    assert dict(result["source_results"][0].schema) == {"order_id": INTEGER, "dt_sale": DATE, "price": DECIMAL}
+    assert result["schema"] == result["source_results"][0].schema
+    assert result["data"].column("dt_sale").kind == DATE_TEXT
+    assert result["data"][0]["dt_sale"] == "2023-01-15"
+    assert result["statistics"]["dt_sale"]["numeric_count"] == 0
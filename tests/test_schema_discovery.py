@@ -0,0 +1,87 @@
+# tests/test_schema_discovery.py
+
+import gzip
+
+import pytest
+
+from gerador_relatorio.data_source.data_source import DataSource, DataSourceError, LocalDataSource
+from gerador_relatorio.data_source.filters import RowFilter
+from gerador_relatorio.data_source.partitioned_data_source import PartitionedDataSource
+from gerador_relatorio.sales_data.sales_data import SalesData
+
+
+class RowsSource(DataSource):
+    """Fonte em memória que conta quantas linhas foram lidas."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.rows_read = 0
+
+    def extract_data(self):
+        return self.rows
+
+    def iter_rows(self):
+        for row in self.rows:
+            self.rows_read += 1
+            yield row
+
+
+def write_csv(path, header, rows=100000, compress=False):
+    text = header + "\n" + "".join(f"{i},{i}.00,loja {i % 7}\n" for i in range(rows))
+    if compress:
+        path.write_bytes(gzip.compress(text.encode("utf-8")))
+    else:
+        path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_local_source_reads_only_the_header(tmp_path, monkeypatch):
+    source = LocalDataSource(write_csv(tmp_path / "vendas.csv", "order_id,price,store"))
+    monkeypatch.setattr(LocalDataSource, "iter_rows", lambda self: pytest.fail("linhas lidas"))
+    assert source.discover_columns() == ["order_id", "price", "store"]
+
+
+def test_local_source_applies_projection_and_handles_edge_cases(tmp_path):
+    compressed = write_csv(tmp_path / "vendas.csv.gz", "order_id,price,store", compress=True)
+    assert LocalDataSource(compressed, columns=["store", "order_id", "missing"]).discover_columns() == \
+        ["store", "order_id"]
+    # O filtro não muda as colunas da fonte.
+    assert LocalDataSource(compressed, row_filter=RowFilter.from_config({"column": "store", "equals": "loja 1"})).discover_columns() == \
+        ["order_id", "price", "store"]
+
+    empty = tmp_path / "vazio.csv"
+    empty.write_text("", encoding="utf-8")
+    assert LocalDataSource(str(empty)).discover_columns() == []
+    with pytest.raises(DataSourceError):
+        LocalDataSource(str(tmp_path / "inexistente.csv")).discover_columns()
+
+
+def test_default_discovery_samples_rows():
+    source = RowsSource([{"a": 1}] * 5000 + [{"a": 1, "late": 2}])
+    source.DISCOVERY_SAMPLE_SIZE = 10
+    assert source.discover_columns() == ["a"]
+    assert source.rows_read == 10
+    assert RowsSource([{"a": 1}, {"b": 2, "a": 3}]).discover_columns() == ["a", "b"]
+
+
+def test_partitioned_source_discovers_file_and_partition_columns(tmp_path):
+    for store, header in ((1, "order_id,price"), (2, "order_id,price,discount")):
+        directory = tmp_path / f"store_id={store}"
+        directory.mkdir()
+        write_csv(directory / "vendas.csv", header, rows=3)
+    assert PartitionedDataSource(str(tmp_path)).discover_columns() == \
+        ["order_id", "price", "store_id", "discount"]
+    assert PartitionedDataSource(str(tmp_path), columns=["store_id", "price"]).discover_columns() == \
+        ["price", "store_id"]
+
+
+def test_consolidate_header_uses_discovery_without_extraction(tmp_path, monkeypatch):
+    first = LocalDataSource(write_csv(tmp_path / "a.csv", "order_id,price,store"))
+    second = LocalDataSource(write_csv(tmp_path / "b.csv", "order_id,discount", rows=0))
+    monkeypatch.setattr(SalesData, "extract_sources", lambda *args, **kwargs: pytest.fail("fontes extraídas"))
+
+    header_map = SalesData.consolidate_header([first, second])
+
+    assert list(header_map) == ["order_id", "price", "store", "discount"]
+    assert header_map["order_id"] == [first, second]
+    assert header_map["discount"] == [second]
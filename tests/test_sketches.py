@@ -0,0 +1,220 @@
+# tests/test_sketches.py
+
+import bisect
+import io
+import random
+import tracemalloc
+
+import pytest
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.extraction_cache import ExtractionCache
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_data import sketches
+from gerador_relatorio.sales_data.sketches import KLL, HyperLogLog, SketchOptions, SpaceSaving
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
+from gerador_relatorio.sales_report.html_report_formatter import HTMLReportFormatter
+from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter
+
+
+def zipf_values(count, seed=3):
+    """Clientes com frequências bem desiguais: poucos compram muito."""
+    rng = random.Random(seed)
+    return [f"C{min(int(rng.paretovariate(1.2)), 5000)}" for _ in range(count)]
+
+
+def write_csv(path, rows):
+    lines = ["order_id,customer_id,price"] + [f"{i},{customer},{i % 50}.00" for i, customer in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("count", [50, 2000, 100000])
+def test_hyperloglog_estimate_within_error(count):
+    sketch = HyperLogLog(precision=14)
+    for i in range(count):
+        sketch.add(f"pedido-{i}")
+        sketch.add(f"pedido-{i}")  # repetidos não mudam a estimativa
+    assert abs(sketch.estimate() - count) <= max(2, 0.03 * count)
+
+
+def test_hyperloglog_merge_matches_single_sketch():
+    whole, left, right = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for i in range(5000):
+        whole.add(i)
+        (left if i % 3 else right).add(str(i))
+    assert left.merge(right).estimate() == whole.estimate()
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(11))
+
+
+def test_space_saving_finds_heavy_hitters_across_blocks():
+    values = zipf_values(20000)
+    exact = {}
+    for value in values:
+        exact[value] = exact.get(value, 0) + 1
+    summary = SpaceSaving(100)
+    for start in range(0, len(values), 1000):
+        block = {}
+        for value in values[start:start + 1000]:
+            block[value] = block.get(value, 0) + 1
+        summary.update(block)
+
+    expected = sorted(exact, key=lambda value: (-exact[value], value))[:5]
+    assert [value for value, _ in summary.top(5)] == expected
+    assert summary.total == len(values)
+    for value, count in summary.top(5):
+        assert exact[value] <= count <= exact[value] + summary.errors[value]
+
+
+def rank(sorted_values, value):
+    return bisect.bisect_left(sorted_values, value) / len(sorted_values)
+
+
+def test_kll_quantiles_within_rank_error_with_bounded_memory():
+    rng = random.Random(5)
+    values = [rng.lognormvariate(3, 1) for _ in range(200000)]
+    sketch = KLL(k=200)
+    for start in range(0, len(values), 4096):
+        sketch.add_numbers(values[start:start + 4096])
+
+    ordered = sorted(values)
+    for fraction, estimate in zip((0.5, 0.9, 0.99), sketch.quantiles((0.5, 0.9, 0.99))):
+        assert abs(rank(ordered, estimate) - fraction) <= 0.01
+    assert sum(map(len, sketch.levels)) <= 4 * 200
+    assert sketch.count == len(values)
+
+
+def test_kll_is_exact_while_values_fit_and_merges():
+    small = KLL()
+    small.add_numbers([4.0, 1.0, 3.0, 2.0, float("nan")])
+    assert small.quantiles((0.5, 0.9, 0.99)) == [2.0, 4.0, 4.0]
+    assert KLL().quantile(0.5) is None
+
+    rng = random.Random(9)
+    values = [rng.uniform(0, 1000) for _ in range(30000)]
+    left, right = KLL(), KLL()
+    left.add_numbers(values[:10000])
+    right.add_numbers(values[10000:])
+    median = left.merge(right).quantile(0.5)
+    assert left.count == 30000
+    assert abs(rank(sorted(values), median) - 0.5) <= 0.01
+
+
+def test_kll_weighted_values_keep_exact_weight_with_bounded_memory():
+    sketch = KLL(k=50)
+    sketch.add_weighted(1.0, 1_000_000)
+    sketch.add_weighted(3.0, 3_000_000)
+    sketch.add_numbers([2.0] * 1000, times=1000)
+    assert sketch.count == 5_000_000
+    assert sum(len(items) << level for level, items in enumerate(sketch.levels)) == 5_000_000
+    assert sketch.quantiles((0.1, 0.3, 0.9)) == [1.0, 2.0, 3.0]
+    assert sum(map(len, sketch.levels)) <= 4 * 50
+
+
+def sketch_peak_memory(rows):
+    store = ColumnStore.from_rows({"order_id": str(i), "price": f"{i % 997}.{i % 100:02d}"} for i in range(rows))
+    store.columns  # grava as linhas pendentes antes da medição
+    tracemalloc.start()
+    try:
+        StatisticsAccumulator(sketch_options=SketchOptions(top_k_error=0.01)).update_sketches(store)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_sketches_memory_does_not_grow_with_rows(monkeypatch):
+    monkeypatch.setattr(sketches, "BLOCK_SIZE", 500)
+    assert sketch_peak_memory(40000) < 1.5 * sketch_peak_memory(10000)
+
+
+def test_sketch_options_from_config():
+    assert SketchOptions.from_config(None) is None
+    assert SketchOptions.from_config(False) is None
+    assert SketchOptions.from_config(True) == SketchOptions()
+    options = SketchOptions.from_config({"columns": ["customer_id"], "top_k": 3})
+    assert options.includes("customer_id") and not options.includes("price")
+    with pytest.raises(ValueError):
+        SketchOptions.from_config({"top": 3})
+    with pytest.raises(ValueError):
+        SketchOptions.from_config({"distinct_error": 2})
+    with pytest.raises(ValueError):
+        SketchOptions.from_config({"quantile_error": 0})
+    assert SketchOptions.from_config({"quantiles": False}).new_sketch().quantiles is None
+
+
+def test_consolidation_merges_sketches_of_all_sources(tmp_path):
+    customers = zipf_values(3000)
+    first = write_csv(tmp_path / "a.csv", enumerate(customers[:1500]))
+    second = write_csv(tmp_path / "b.csv", enumerate(customers[1500:], 1500))
+    options = SketchOptions(columns=["customer_id", "order_id"], top_k=3)
+
+    statistics = SalesData.consolidate_data([LocalDataSource(first), LocalDataSource(second)],
+                                            sketches=options)["statistics"]
+
+    assert "distinct_count" not in statistics["price"]
+    assert "median" not in statistics["customer_id"]
+    assert statistics["order_id"]["median"] == pytest.approx(1500, abs=30)
+    assert statistics["order_id"]["p99"] == pytest.approx(2970, abs=30)
+    assert abs(statistics["order_id"]["distinct_count"] - 3000) <= 90
+    distinct = len(set(customers))
+    assert abs(statistics["customer_id"]["distinct_count"] - distinct) <= max(2, 0.03 * distinct)
+    top = statistics["customer_id"]["top_values"]
+    assert [value for value, _ in top] == ["C1", "C2", "C3"]
+    assert top[0][1] == customers.count("C1")
+
+
+def test_parallel_statistics_sketches_match_serial():
+    rows = [{"customer_id": customer, "quantity": i % 7} for i, customer in enumerate(zipf_values(4000))]
+    store = ColumnStore.from_rows(rows)
+    options = SketchOptions(top_k=2)
+
+    serial = SalesData.compute_basic_statistics(store, sketches=options)
+    parallel = SalesData.compute_basic_statistics(store, max_workers=2, chunk_size=700, sketches=options)
+
+    assert parallel["customer_id"]["top_values"] == serial["customer_id"]["top_values"]
+    assert parallel["quantity"]["distinct_count"] == serial["quantity"]["distinct_count"] == 7
+    assert parallel["quantity"]["median"] == serial["quantity"]["median"] == 3.0
+
+
+def test_cache_hit_recomputes_sketches_when_options_change(tmp_path):
+    source = write_csv(tmp_path / "vendas.csv", enumerate(["C1", "C2", "C1"]))
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    SalesData.consolidate_data([LocalDataSource(source)], cache=cache)
+
+    consolidated = SalesData.consolidate_data([LocalDataSource(source)], cache=cache,
+                                              sketches=SketchOptions(columns=["customer_id"]))
+
+    assert consolidated["source_results"][0].from_cache
+    assert consolidated["statistics"]["customer_id"]["distinct_count"] == 2
+    assert consolidated["statistics"]["customer_id"]["top_values"] == [["C1", 2], ["C2", 1]]
+
+
+def test_formatters_render_sketches_only_when_present(tmp_path):
+    source = LocalDataSource(write_csv(tmp_path / "vendas.csv", enumerate(["C1", "C2", "C1"])))
+    plain = SalesData.consolidate_data([source])
+    sketched = SalesData.consolidate_data([source], sketches=SketchOptions(columns=["customer_id", "price"]))
+
+    def statistics_csv(consolidated):
+        stream = io.StringIO()
+        CSVReportFormatter().write_statistics(stream, consolidated)
+        return stream.getvalue()
+
+    assert statistics_csv(plain).splitlines()[0] == "metric,min,max,blank_count"
+    lines = statistics_csv(sketched).splitlines()
+    assert lines[0] == "metric,min,max,blank_count,distinct_count,top_values,median,p90,p99"
+    assert "customer_id,,,0,2,C1 (2); C2 (1),,," in lines
+    assert "price,0.0,2.0,0,3,0.00 (1); 1.00 (1); 2.00 (1),1.0,2.0,2.0" in lines
+    assert any(line.startswith("order_id,") and line.endswith(",0,,,,,") for line in lines)
+
+    html = HTMLReportFormatter().format_report(sketched)
+    assert "Valores Distintos (aprox.)" in html and "<td>C1 (2); C2 (1)</td>" in html
+    assert "<th>P99 (aprox.)</th>" in html
+    assert "Valores Distintos" not in HTMLReportFormatter().format_report(plain)
+
+    text = TextReportFormatter().format_report(sketched)
+    assert "Distintos (aprox.): 2" in text and "Mais frequentes (aprox.): C1 (2); C2 (1)" in text
+    assert "Mediana / P90 / P99 (aprox.): 1.0 / 2.0 / 2.0" in text
+    assert "Distintos" not in TextReportFormatter().format_report(plain)
@@ -0,0 +1,154 @@
+# tests/test_snapshot.py
+
+import io
+
+import pytest
+import requests_mock
+
+from gerador_relatorio.data_source.data_source import LocalDataSource
+from gerador_relatorio.data_source.filters import RowFilter
+from gerador_relatorio.data_source.web_data_source import WebDataSource
+from gerador_relatorio.data_source.web_engine import WebFetchEngine
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.deduplication import DeduplicationOptions
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_data.sketches import SketchOptions
+from gerador_relatorio.sales_data.snapshot import MAGIC, open_snapshot, write_snapshot
+from gerador_relatorio.sales_report.csv_report_formatter import CSVReportFormatter
+from gerador_relatorio.sales_report.text_report_formatter import TextReportFormatter
+
+SAMPLE_CSV = "data_example/vendas_especificas.csv"
+
+
+def rows_of(store):
+    return [sorted(dict(row).items(), key=repr) for row in store]
+
+
+@pytest.fixture
+def consolidated():
+    return SalesData.consolidate_data([LocalDataSource(SAMPLE_CSV)])
+
+
+def test_snapshot_round_trip_keeps_rows_statistics_and_schema(consolidated, tmp_path):
+    path = str(tmp_path / "vendas.snapshot")
+    SalesData.save_snapshot(consolidated, path)
+    reopened = SalesData.load_snapshot(path)
+
+    assert rows_of(reopened["data"]) == rows_of(consolidated["data"])
+    assert reopened["statistics"] == consolidated["statistics"]
+    assert list(reopened["header_map"]) == list(consolidated["header_map"])
+    assert reopened["schema"].types == consolidated["schema"].types
+    assert SalesData.compute_basic_statistics(reopened["data"]) == consolidated["statistics"]
+
+
+def test_reports_from_snapshot_are_identical(consolidated, tmp_path):
+    path = str(tmp_path / "vendas.snapshot")
+    write_snapshot(path, consolidated)
+    reopened = open_snapshot(path)
+
+    for formatter in (CSVReportFormatter(), TextReportFormatter()):
+        assert formatter.format_report(reopened) == formatter.format_report(consolidated)
+
+
+def test_typed_columns_are_memory_mapped(consolidated, tmp_path):
+    path = str(tmp_path / "vendas.snapshot")
+    write_snapshot(path, consolidated)
+    data = open_snapshot(path)["data"]
+
+    price = data.column("price")
+    assert isinstance(price.data, memoryview) and price.data.readonly
+    assert price.buffer.tolist() == consolidated["data"].column("price").data.tolist()
+
+
+def test_snapshot_preserves_nulls_missing_cells_and_mixed_values(tmp_path):
+    rows = [
+        {"id": "1", "price": "10.50", "tags": ["a", "b"], "flag": True},
+        {"id": "2", "price": None, "note": ""},
+        {"id": "x", "price": "N/A", "flag": 1, "tags": {"cor": "azul"}},
+        {"price": "3.25", "flag": 1.0, "note": -0.0},
+        {"id": "4", "note": 0.0},
+    ]
+    store = ColumnStore.from_rows(rows)
+    path = str(tmp_path / "misto.snapshot")
+    write_snapshot(path, {"data": store})
+    reopened = open_snapshot(path)["data"]
+
+    assert [dict(row) for row in reopened] == rows
+    assert [repr(dict(row)) for row in reopened] == [repr(dict(row)) for row in store]
+    assert list(reopened.iter_values(["id", "price", "flag"], None)) == \
+        list(store.iter_values(["id", "price", "flag"], None))
+
+
+def test_empty_store_round_trip(tmp_path):
+    path = str(tmp_path / "vazio.snapshot")
+    write_snapshot(path, {"data": ColumnStore(), "statistics": {}, "header_map": {}})
+    reopened = open_snapshot(path)
+    assert len(reopened["data"]) == 0
+    assert reopened["source_results"] == []
+
+
+def test_invalid_files_are_rejected(tmp_path):
+    path = tmp_path / "outro.bin"
+    path.write_bytes(b"nao e um snapshot")
+    with pytest.raises(ValueError):
+        open_snapshot(str(path))
+
+    path.write_bytes(MAGIC + bytes(16))
+    with pytest.raises(ValueError):
+        open_snapshot(str(path))
+
+
+def test_unsupported_values_raise_value_error(tmp_path):
+    store = ColumnStore.from_rows([{"valor": object()}])
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / "invalido.snapshot"), {"data": store})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_snapshot_from_another_configuration_is_rejected(consolidated, tmp_path):
+    sources = [LocalDataSource(SAMPLE_CSV)]
+    fingerprint = SalesData.snapshot_fingerprint(sources)
+    filtered = [LocalDataSource(SAMPLE_CSV, row_filter=RowFilter.from_config({"column": "store_id", "equals": "1"}))]
+    others = [SalesData.snapshot_fingerprint(filtered),
+              SalesData.snapshot_fingerprint([LocalDataSource(SAMPLE_CSV, columns=["price"])]),
+              SalesData.snapshot_fingerprint(sources, deduplication=DeduplicationOptions(["order_id"])),
+              SalesData.snapshot_fingerprint(sources, sketches=SketchOptions())]
+    assert fingerprint == SalesData.snapshot_fingerprint([LocalDataSource(SAMPLE_CSV)])
+    assert len({fingerprint, *others}) == 5
+
+    path = str(tmp_path / "vendas.snap")
+    SalesData.save_snapshot(consolidated, path, fingerprint)
+    assert len(SalesData.load_snapshot(path, fingerprint)["data"]) == len(consolidated["data"])
+    with pytest.raises(ValueError, match="outra configuração"):
+        SalesData.load_snapshot(path, others[0])
+    SalesData.save_snapshot(consolidated, path)
+    with pytest.raises(ValueError, match="outra configuração"):
+        SalesData.load_snapshot(path, fingerprint)
+
+
+def test_snapshot_is_rejected_when_a_source_changes(tmp_path):
+    csv_path = tmp_path / "vendas.csv"
+    csv_path.write_text("id,price\n1,10.00\n", encoding="utf-8")
+    local = LocalDataSource(str(csv_path))
+    fingerprint = SalesData.snapshot_fingerprint([local])
+    with open(csv_path, "a", encoding="utf-8") as file:
+        file.write("2,20.00\n")
+    assert SalesData.snapshot_fingerprint([local]) != fingerprint
+
+    engine = WebFetchEngine(sleep=lambda seconds: None)
+    url = "http://api.example.com/vendas"
+    web = WebDataSource(name="API", location=url, data_key="vendas", engine=engine)
+    path = str(tmp_path / "vendas.snap")
+    try:
+        with requests_mock.Mocker() as m:
+            m.get(url, json={"vendas": [{"id": 1}]}, headers={"ETag": '"v1"'})
+            SalesData.save_snapshot(SalesData.consolidate_data([web]), path)
+
+            m.get(url, request_headers={"If-None-Match": '"v1"'}, status_code=304)
+            assert len(SalesData.load_snapshot(path, sources=[web])["data"]) == 1
+
+            m.get(url, request_headers={"If-None-Match": '"v1"'}, json={"vendas": []}, headers={"ETag": '"v2"'})
+            with pytest.raises(ValueError, match="A fonte API mudou"):
+                SalesData.load_snapshot(path, sources=[web])
+    finally:
+        engine.close()
@@ -0,0 +1,89 @@
+# tests/test_statistics_accumulator.py
+
+import random
+import statistics as py_statistics
+
+import pytest
+
+from gerador_relatorio.sales_data.column_store import ColumnStore
+from gerador_relatorio.sales_data.sales_data import SalesData
+from gerador_relatorio.sales_data.statistics_accumulator import StatisticsAccumulator
+
+
+@pytest.fixture
+def sales_rows():
+    """Gera linhas de vendas com valores numéricos, textuais e em branco."""
+    rng = random.Random(42)
+    rows = []
+    for i in range(500):
+        rows.append({
+            "order_id": str(i + 1),
+            "price": f"{rng.uniform(10, 200):.2f}" if i % 17 else None,
+            "quantity": rng.randint(1, 5),
+            "customer_name": f"Cliente {rng.randint(1, 50)}",
+        })
+    rows.append({"order_id": "501", "discount": "0.1"})
+    return rows
+
+
+def test_single_pass_matches_reference(sales_rows):
+    """Verifica min/max/blank_count/mean/variance contra um cálculo de referência."""
+    stats = StatisticsAccumulator().update_many(sales_rows).result()
+
+    prices = [float(row["price"]) for row in sales_rows if row.get("price") is not None]
+    assert stats["price"]["min"] == min(prices)
+    assert stats["price"]["max"] == max(prices)
+    assert stats["price"]["blank_count"] == len(sales_rows) - len(prices)
+    assert stats["price"]["numeric_count"] == len(prices)
+    assert stats["price"]["mean"] == pytest.approx(py_statistics.fmean(prices))
+    assert stats["price"]["variance"] == pytest.approx(py_statistics.variance(prices))
+
+    assert stats["customer_name"]["min"] is None
+    assert stats["customer_name"]["count"] == 500
+    assert stats["customer_name"]["numeric_count"] == 0
+    assert stats["customer_name"]["mean"] is None
+
+    # 'discount' só aparece na última linha: todas as outras contam como em branco
+    assert stats["discount"]["blank_count"] == 500
+    assert stats["discount"]["variance"] is None
+
+
+def test_merge_is_exact_for_any_chunking(sales_rows):
+    """Acumuladores parciais combinados devem dar exatamente o resultado serial."""
+    serial = SalesData.compute_basic_statistics(sales_rows)
+
+    for chunk_size in (1, 7, 64, 333):
+        merged = StatisticsAccumulator()
+        for start in range(0, len(sales_rows), chunk_size):
+            chunk = StatisticsAccumulator().update_many(sales_rows[start:start + chunk_size])
+            merged.merge(chunk)
+        assert merged.result() == serial
+
+
+def test_merge_order_does_not_change_sums():
+    """A soma exata não depende da ordem em que os parciais são combinados."""
+    values = [1e16, 1.0, -1e16, 0.1, 0.2, 0.3] * 10
+    forward = StatisticsAccumulator().update_many({"v": v} for v in values)
+    backward = StatisticsAccumulator().update_many({"v": v} for v in reversed(values))
+
+    assert forward.result() == backward.result()
+    assert forward.result()["v"]["sum"] == pytest.approx(16.0)
+
+
+def test_compute_basic_statistics_accepts_generator():
+    """compute_basic_statistics precisa de uma única passada, então aceita geradores."""
+    stats = SalesData.compute_basic_statistics({"value": str(v)} for v in range(1, 5))
+    assert stats["value"]["min"] == 1.0
+    assert stats["value"]["max"] == 4.0
+    assert stats["value"]["sum"] == 10.0
+
+
+def test_column_store_statistics_match_row_by_row(sales_rows):
+    """As estatísticas coluna a coluna de um ColumnStore são idênticas às por linha."""
+    rows = sales_rows + [{"order_id": "N/A", "price": "inf", "quantity": 2 ** 60, "customer_name": {"a": 1}}]
+    store = ColumnStore.from_rows(rows)
+    serial = StatisticsAccumulator().update_many(rows).result()
+
+    assert SalesData.compute_basic_statistics(store) == serial
+    assert StatisticsAccumulator().update_store(store, 100, 300).result() == \
+        StatisticsAccumulator().update_many(rows[100:300]).result()
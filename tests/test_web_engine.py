@@ -0,0 +1,186 @@
+# tests/test_web_engine.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from gerador_relatorio.data_source.web_data_source import WebDataSource
+from gerador_relatorio.data_source.web_engine import WebFetchEngine
+
+ITEMS = [{"id": i, "title": f"Produto {i}"} for i in range(1, 26)]
+
+
+class FakeAPI:
+    """Estado compartilhado do servidor de teste: falhas programadas e concorrência."""
+
+    def __init__(self):
+        self.failures = {}  # caminho -> quantidade de respostas 503 antes do sucesso
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0.0
+        self.lock = threading.Lock()
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, payload, status=200, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            with api.lock:
+                api.requests.append((url.path, query))
+                api.in_flight += 1
+                api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                failing = api.failures.get(url.path, 0)
+                if failing:
+                    api.failures[url.path] = failing - 1
+            try:
+                time.sleep(api.delay)
+                if failing:
+                    return self.send_json({"error": "indisponível"}, status=503)
+                if url.path == "/offset":
+                    start, limit = int(query.get("offset", 0)), int(query.get("limit", 10))
+                    return self.send_json({"products": ITEMS[start:start + limit], "total": len(ITEMS)})
+                if url.path == "/page":
+                    page, size = int(query["page"]), int(query.get("per_page", 10))
+                    return self.send_json({"products": ITEMS[(page - 1) * size:page * size]})
+                if url.path == "/cursor":
+                    start = int(query.get("cursor", 0))
+                    following = start + 10 if start + 10 < len(ITEMS) else None
+                    return self.send_json({"products": ITEMS[start:start + 10], "meta": {"next": following}})
+                if url.path == "/link":
+                    start = int(query.get("start", 0))
+                    headers = {}
+                    if start + 10 < len(ITEMS):
+                        headers["Link"] = f'</link?start={start + 10}>; rel="next"'
+                    return self.send_json({"products": ITEMS[start:start + 10]}, headers=headers)
+                return self.send_json({"error": "não encontrado"}, status=404)
+            finally:
+                with api.lock:
+                    api.in_flight -= 1
+
+    return Handler
+
+
+@pytest.fixture
+def fake_api():
+    """Sobe um servidor HTTP local que simula uma API paginada."""
+    api = FakeAPI()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(api))
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def engine():
+    engine = WebFetchEngine(sleep=lambda seconds: None)
+    yield engine
+    engine.close()
+
+
+def test_offset_pagination_fetches_all_pages_in_order(fake_api, engine):
+    pages = engine.fetch_all_pages(f"{fake_api.url}/offset", "products",
+                                   {"type": "offset", "page_size": 10})
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [item["id"] for page in pages for item in page] == list(range(1, 26))
+
+
+def test_page_pagination_stops_at_short_page(fake_api, engine):
+    pages = engine.fetch_all_pages(f"{fake_api.url}/page", "products",
+                                   {"type": "page", "size_param": "per_page", "page_size": 10})
+    assert [len(page) for page in pages] == [10, 10, 5]
+
+
+def test_cursor_pagination(fake_api, engine):
+    pages = engine.fetch_all_pages(f"{fake_api.url}/cursor", "products",
+                                   {"type": "cursor", "cursor_key": "meta.next"})
+    assert [item["id"] for page in pages for item in page] == list(range(1, 26))
+
+
+def test_next_link_pagination_uses_link_header(fake_api, engine):
+    pages = engine.fetch_all_pages(f"{fake_api.url}/link", "products", {"type": "next_link"})
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert fake_api.requests[-1] == ("/link", {"start": "20"})
+
+
+def test_transient_errors_are_retried_with_backoff(fake_api):
+    waits = []
+    engine = WebFetchEngine(retries=3, backoff_factor=0.5, sleep=waits.append)
+    fake_api.failures["/offset"] = 2
+    try:
+        pages = engine.fetch_all_pages(f"{fake_api.url}/offset", "products")
+    finally:
+        engine.close()
+    assert len(pages[0]) == 10
+    assert len(waits) == 2
+    assert 0 <= waits[0] <= 0.5 and 0 <= waits[1] <= 1.0
+
+
+def test_requests_per_host_are_bounded(fake_api):
+    engine = WebFetchEngine(per_host_limit=2, sleep=lambda seconds: None)
+    fake_api.delay = 0.02
+    try:
+        pages = engine.fetch_all_pages(f"{fake_api.url}/offset", "products",
+                                       {"type": "offset", "page_size": 2})
+    finally:
+        engine.close()
+    assert len(pages) == 13
+    assert fake_api.max_in_flight == 2
+
+
+def test_web_data_source_uses_engine_and_handles_errors(fake_api, engine, capsys):
+    source = WebDataSource(name="API", location=f"{fake_api.url}/offset", data_key="products",
+                           pagination={"type": "offset", "page_size": 10}, engine=engine)
+    assert [row["id"] for row in source.iter_rows()] == list(range(1, 26))
+
+    missing = WebDataSource(name="API", location=f"{fake_api.url}/nao-existe", data_key="products",
+                            engine=engine)
+    assert missing.extract_data() == []
+    assert "Erro ao extrair dados da URL" in capsys.readouterr().out
+    assert [path for path, _ in fake_api.requests].count("/nao-existe") == 1  # 404 não é refeito
+
+    invalid = WebDataSource(name="API", location=f"{fake_api.url}/offset", data_key="products",
+                            pagination={"type": "offset", "page_size": "dez"}, engine=engine)
+    assert invalid.extract_data() == []
+    assert "Erro ao decodificar JSON ou acessar a chave 'products'" in capsys.readouterr().out
+    with pytest.raises(ValueError, match="Tipo de paginação desconhecido: pagina."):
+        WebDataSource(name="API", location=f"{fake_api.url}/offset", data_key="products",
+                      pagination={"type": "pagina"}, engine=engine)
+
+
+def test_web_data_source_discovers_columns_from_first_page_or_schema(fake_api, engine, capsys):
+    source = WebDataSource(name="API", location=f"{fake_api.url}/offset", data_key="products",
+                           pagination={"type": "offset", "page_size": 10}, engine=engine)
+    assert source.discover_columns() == ["id", "title"]
+    assert fake_api.requests == [("/offset", {"limit": "10", "offset": "0"})]
+
+    declared = WebDataSource(name="API", location=f"{fake_api.url}/offset", data_key="products",
+                             engine=engine, schema=["id", "title", "price"], columns=["price", "id"])
+    assert declared.discover_columns() == ["price", "id"]
+    assert len(fake_api.requests) == 1
+
+    missing = WebDataSource(name="API", location=f"{fake_api.url}/nao-existe", data_key="products",
+                            engine=engine)
+    assert missing.discover_columns() == []
+    assert "Erro ao consultar as colunas da URL" in capsys.readouterr().out